@@ -10,15 +10,17 @@ import streamlit as st
 
 from app.ui.data_access import load_pipeline_summary
 from app.ui.execution import ExecutionManager
-from app.ui.progress_events import latest_progress_by_stage, parse_progress_events
+from app.ui.progress_channel import ProgressSubscriber, open_subscriber
 from app.ui.run_artifacts import (
+    count_alias_index,
+    count_runs,
     get_run_dir,
+    latest_run_progress,
     list_alias_index,
     list_runs_from_run_json,
     list_stage_results,
     parse_stage_elapsed_sec,
     parse_stage_errors,
-    read_pipeline_log,
     read_run_json,
     resolve_run_id_from_slug,
     tail_pipeline_log,
@@ -39,6 +41,12 @@ st.caption("이 페이지는 파이프라인(Batch/End-to-End) 오케스트레
 col_controls, col_results = st.columns([0.3, 0.7], gap="small")
 
 
+@st.cache_resource
+def _progress_subscriber() -> ProgressSubscriber | None:
+    # One socket per server process; launched runs push progress to it
+    return open_subscriber()
+
+
 @st.dialog("Live Run Log", width="medium")
 def _live_log_dialog(run_id: str) -> None:
     st.caption("실행 중인 로그를 artifacts(pipeline.log)에서 tail로 표시합니다.")
@@ -55,6 +63,28 @@ def _live_log_dialog(run_id: str) -> None:
         st.rerun()
 
 
+@st.fragment(run_every="1s")
+def _render_progress(run_id: str, live: bool) -> None:
+    # Pushed events (in memory) first; file tail for CLI / older runs
+    sub = _progress_subscriber()
+    pushed = sub.snapshot(run_id) if sub is not None else None
+    latest = pushed.latest if pushed is not None else latest_run_progress(run_id)
+    if not latest:
+        st.caption("No PROGRESS_JSON events yet.")
+    else:
+        for stage, ev in latest.items():
+            if ev.total and ev.current is not None:
+                st.write(f"{stage}: {ev.event or 'progress'}")
+                st.progress(min(max(ev.current / max(ev.total, 1), 0.0), 1.0))
+                st.caption(f"{ev.current}/{ev.total}")
+
+    # Refresh status/results once the pipeline reports completion
+    seen = f"progress_end_seen_{run_id}"
+    if live and pushed is not None and pushed.finished and seen not in st.session_state:
+        st.session_state[seen] = True
+        st.rerun(scope="app")
+
+
 def _build_pipeline_cmd(
     *,
     strategy_path: Path | None,
@@ -268,6 +298,7 @@ with col_controls:
                             "PYTHONPATH": str(settings.quant_data_dir.parent),
                             "QUANT_PLAN_RUN_ID": plan_run_id,
                             "QUANT_PLAN_ARTIFACTS_DIR": plan_artifacts_dir,
+                            **(sub.env() if (sub := _progress_subscriber()) else {}),
                         },
                     )
                     if started:
@@ -437,6 +468,12 @@ with col_results:
                     derived_status = "success" if int(exit_code) == 0 else "fail"
 
                 effective_status = derived_status or status
+                # The pipeline pushes its final status before the process exits
+                sub = _progress_subscriber()
+                pushed = sub.snapshot(run_id) if sub is not None else None
+                if pushed is not None and pushed.finished and pushed.status:
+                    if effective_status in {None, "", "running"}:
+                        effective_status = pushed.status
 
                 if effective_status == "success":
                     st.success("Status: SUCCEEDED")
@@ -511,19 +548,9 @@ with col_results:
 
                 st.markdown("---")
                 st.subheader("Progress (PROGRESS_JSON)")
-                log_text = read_pipeline_log(run_id) or ""
-                events = parse_progress_events(log_text)
-                latest = latest_progress_by_stage(events)
-                if not latest:
-                    st.caption("No PROGRESS_JSON events yet.")
-                else:
-                    for stage, ev in latest.items():
-                        if ev.total and ev.current is not None:
-                            st.write(f"{stage}: {ev.event or 'progress'}")
-                            st.progress(
-                                min(max(ev.current / max(ev.total, 1), 0.0), 1.0)
-                            )
-                            st.caption(f"{ev.current}/{ev.total}")
+                _render_progress(
+                    run_id, live=running or effective_status == "running"
+                )
 
                 st.markdown("---")
                 st.subheader("pipeline.log (tail)")
@@ -563,7 +590,16 @@ with col_results:
                     else:
                         st.warning("Could not resolve run_id.")
 
-            idx = list_alias_index()
+            # Served from the run index (artifacts/index/run_index.db), paged
+            p1, p2 = st.columns([0.3, 0.7])
+            page_size = p1.selectbox("Rows per page", [25, 50, 100, 200], index=1)
+            n_pages = max(1, -(-max(count_runs(), count_alias_index()) // page_size))
+            page = p2.number_input(
+                f"Page (1-{n_pages})", min_value=1, max_value=n_pages, value=1
+            )
+            offset = (int(page) - 1) * page_size
+
+            idx = list_alias_index(limit=page_size, offset=offset)
             if idx:
                 st.markdown("**1) Alias index** (`artifacts/index/runs/*.json`)")
                 st.dataframe(
@@ -587,7 +623,7 @@ with col_results:
             st.markdown(
                 "**2) Runs scanned from run.json** (`artifacts/runs/*/run.json`)"
             )
-            runs_from_json = list_runs_from_run_json()
+            runs_from_json = list_runs_from_run_json(limit=page_size, offset=offset)
             if runs_from_json:
                 st.dataframe(
                     pd.DataFrame(
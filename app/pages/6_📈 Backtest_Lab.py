@@ -5,10 +5,16 @@ from app.ui.charts import (
     plot_backtest_comparison,
     plot_equity_drawdown,
     plot_price_with_markers,
+    plot_rolling_metrics,
+    plot_symbol_contribution,
 )
 from app.ui.data_access import (
+    load_backtest_batch,
+    load_backtest_bootstrap,
+    load_backtest_equity,
     load_backtest_summary,
     load_backtest_trades,
+    load_in_background,
     load_ohlcv,
 )
 from app.ui.navigation import open_run_center
@@ -52,8 +58,20 @@ with ctrl_col, st.container(border=True, height="stretch"):
         run_row = df_summ[df_summ["run_id"] == sel_run_id].iloc[0]
         st.caption(f"Strategy: **{run_row['strategy_id']}**")
 
+        # Compare-tab curve loads while the selected run renders
+        other_run_ids = [r for r in run_ids if r != sel_run_id]
+        other_default = st.session_state.get("cmp_run_id")
+        if other_default not in other_run_ids:
+            other_default = other_run_ids[0] if other_run_ids else None
+        equity2_future = (
+            load_in_background(load_backtest_equity, other_default)
+            if other_default
+            else None
+        )
+
         # 2. Symbol Selection (from result)
         df_trades = load_backtest_trades(sel_run_id)
+        df_equity = load_backtest_equity(sel_run_id)
         symbols = (
             ["All"]
             + sorted(
@@ -100,10 +118,30 @@ with res_col:
                     k5.metric("Turnover", f"{run_row['turnover']:.2f}")
                     k6.metric("Win Rate", f"{run_row['win_rate']:.1%}")
 
+                    df_ci = load_backtest_bootstrap(sel_run_id)
+                    if not df_ci.empty:
+                        ci = df_ci.set_index("metric")
+                        parts = [
+                            f"{label} [{fmt.format(ci.at[m, 'ci_low'])}, "
+                            f"{fmt.format(ci.at[m, 'ci_high'])}]"
+                            for m, label, fmt in [
+                                ("cagr", "CAGR", "{:.2%}"),
+                                ("sharpe", "Sharpe", "{:.2f}"),
+                                ("max_dd", "MDD", "{:.2%}"),
+                            ]
+                            if m in ci.index
+                        ]
+                        first = df_ci.iloc[0]
+                        st.caption(
+                            f"{first['confidence']:.0%} bootstrap CI "
+                            f"({int(first['n_samples'])} resamples, "
+                            f"block {first['mean_block']:.0f}d): " + " · ".join(parts)
+                        )
+
                 # Equity Curve
 
                 mode = "CumReturn %"  # Default
-                fig_eq, fig_dd, mdd_period = plot_equity_drawdown(df_trades, mode=mode)
+                fig_eq, fig_dd, mdd_period = plot_equity_drawdown(df_equity, mode=mode)
                 if fig_eq:
                     with st.container(border=True):
                         st.plotly_chart(fig_eq, width="stretch", height=250)
@@ -111,6 +149,10 @@ with res_col:
                         if fig_dd:
                             st.plotly_chart(fig_dd, width="stretch", height=250)
                         st.caption(mdd_period)
+                fig_roll = plot_rolling_metrics(df_equity)
+                if fig_roll:
+                    with st.container(border=True):
+                        st.plotly_chart(fig_roll, width="stretch", height=250)
             # --- Tab 2: Trades Analysis ---
             with tab_detail:
                 # with st.container(border=True):
@@ -121,6 +163,9 @@ with res_col:
                     st.info(
                         "Select a specific symbol in controls to view Line + Trade Markers."
                     )
+                    fig_contrib = plot_symbol_contribution(df_trades)
+                    if fig_contrib:
+                        st.plotly_chart(fig_contrib, width="stretch")
                     st.dataframe(df_trades, width="stretch", hide_index=True)
                 else:
                     # Load Price Data for context
@@ -145,22 +190,39 @@ with res_col:
 
             # --- Tab 3: Compare ---
             with tab_compare:
+                df_batch = load_backtest_batch(sel_run_id)
+                if len(df_batch) > 1:
+                    st.subheader("Batch Comparison")
+                    st.dataframe(
+                        df_batch,
+                        width="stretch",
+                        hide_index=True,
+                        column_config={
+                            c: st.column_config.NumberColumn(format="percent")
+                            for c in ["cagr", "max_dd", "vol", "win_rate"]
+                        },
+                    )
                 st.subheader("Benchmark Comparison")
                 other_run_id = st.selectbox(
                     "Compare with",
-                    [r for r in run_ids if r != sel_run_id],
-                    index=0 if len(run_ids) > 1 else None,
+                    other_run_ids,
+                    index=0 if other_run_ids else None,
+                    key="cmp_run_id",
                 )
 
                 if other_run_id:
                     row2 = df_summ[df_summ["run_id"] == other_run_id].iloc[0]
-                    df_trades2 = load_backtest_trades(other_run_id)
+                    df_equity2 = (
+                        equity2_future.result()
+                        if equity2_future is not None and other_run_id == other_default
+                        else load_backtest_equity(other_run_id)
+                    )
 
                     c1, c2 = st.columns(2)
                     c1.info(f"Base: {sel_run_id} ({run_row['strategy_id']})")
                     c2.success(f"Vs: {other_run_id} ({row2['strategy_id']})")
 
                     fig_comp = plot_backtest_comparison(
-                        df_trades, df_trades2, sel_run_id, other_run_id
+                        df_equity, df_equity2, sel_run_id, other_run_id
                     )
                     st.plotly_chart(fig_comp, width="stretch")
@@ -2,6 +2,7 @@ import plotly.express as px
 import streamlit as st
 
 from app.ui.data_access import (
+    load_in_background,
     load_targets,
     load_targets_comparison,
     load_targets_history,
@@ -35,6 +36,10 @@ with ctrl_col, st.container(border=True, height="stretch"):
         else []
     )
     sel_strat = st.selectbox("Strategy", strategies)
+    # History (tab 3) loads while the current/compare tabs render
+    hist_future = (
+        load_in_background(load_targets_history, sel_strat) if sel_strat else None
+    )
 
     dates = []
     if sel_strat:
@@ -132,7 +137,7 @@ with res_col, st.container(border=True, height="stretch"):
 
     with tab3, st.container(border=True):
         st.subheader("Strategy Metrics History")
-        df_hist = load_targets_history(sel_strat)
+        df_hist = hist_future.result()
         if df_hist.empty:
             st.info("No history available.")
         else:
@@ -3,16 +3,16 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+from app.ui.downsample import downsample_line, downsample_ohlc, downsample_series
 
-def plot_equity_drawdown(df_trades, mode="Equity 1.0"):
-    if df_trades.empty:
-        return None, None, None
 
-    df_trades["ts"] = pd.to_datetime(df_trades["entry_ts"])
-    daily_ret = df_trades.groupby("ts")["pnl_pct"].sum()
+def plot_equity_drawdown(df_equity, mode="Equity 1.0"):
+    """Equity and drawdown charts from a persisted curve (load_backtest_equity)."""
+    if df_equity.empty:
+        return None, None, None
 
-    # Calculate Equity/Return
-    cum_ret = (1 + daily_ret).cumprod()
+    ts = pd.to_datetime(df_equity["ts"])
+    cum_ret = pd.Series(df_equity["equity"].to_numpy(), index=ts)
     if mode == "CumReturn %":
         display_series = (cum_ret - 1) * 100
         y_label = "Return (%)"
@@ -20,33 +20,91 @@ def plot_equity_drawdown(df_trades, mode="Equity 1.0"):
         display_series = cum_ret
         y_label = "Equity (1.0 base)"
 
-    drawdown = cum_ret / cum_ret.cummax() - 1
+    drawdown = pd.Series(df_equity["drawdown"].to_numpy(), index=ts)
+    # Plot LTTB-reduced curves; the MDD period below uses the full series
+    plot_series = downsample_series(display_series)
+    plot_dd = downsample_series(drawdown)
 
     fig_ret = px.line(
-        x=display_series.index,
-        y=display_series.values,
+        x=plot_series.index,
+        y=plot_series.values,
         labels={"x": "Date", "y": y_label},
         title="Performance Curve",
     )
     fig_ret.update_layout(template="plotly_white", height=400)
 
     fig_dd = px.area(
-        x=drawdown.index,
-        y=drawdown.values * 100,
+        x=plot_dd.index,
+        y=plot_dd.values * 100,
         labels={"x": "Date", "y": "Drawdown (%)"},
         title="Drawdown (%)",
     )
     fig_dd.update_traces(fillcolor="rgba(239, 83, 80, 0.3)", line_color="#ef5350")
     fig_dd.update_layout(template="plotly_white", height=200)
 
-    # Find MDD Period
-    end_idx = drawdown.idxmin()
-    peak_idx = cum_ret[:end_idx].idxmax()
-    mdd_text = f"MDD Period: {peak_idx.date()} ~ {end_idx.date()}"
+    # MDD period: last peak before the trough (underwater_days counts from it)
+    end_pos = int(drawdown.to_numpy().argmin())
+    peak_pos = max(end_pos - int(df_equity["underwater_days"].iloc[end_pos]), 0)
+    longest = int(df_equity["underwater_days"].max())
+    mdd_text = (
+        f"MDD Period: {ts.iloc[peak_pos].date()} ~ {ts.iloc[end_pos].date()}"
+        f" | Longest drawdown: {longest} days"
+    )
 
     return fig_ret, fig_dd, mdd_text
 
 
+def plot_rolling_metrics(df_equity):
+    """Rolling Sharpe / volatility (persisted with the equity curve)."""
+    if df_equity.empty or df_equity["rolling_sharpe"].isna().all():
+        return None
+    ts = pd.to_datetime(df_equity["ts"])
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    for col, name, secondary in [
+        ("rolling_sharpe", "Rolling Sharpe", False),
+        ("rolling_vol", "Rolling Vol", True),
+    ]:
+        s = downsample_series(pd.Series(df_equity[col].to_numpy(), index=ts).dropna())
+        fig.add_trace(
+            go.Scatter(x=s.index, y=s.values, mode="lines", name=name),
+            secondary_y=secondary,
+        )
+    fig.update_yaxes(title_text="Sharpe", secondary_y=False)
+    fig.update_yaxes(title_text="Vol", tickformat=".0%", secondary_y=True)
+    fig.update_layout(
+        title="Rolling Sharpe / Volatility (63d)", template="plotly_white", height=250
+    )
+    return fig
+
+
+def plot_symbol_contribution(df_trades):
+    """Total PnL contribution per symbol (ledger pnl_pct, net of its costs)."""
+    if df_trades.empty:
+        return None
+    contrib = (
+        df_trades[~df_trades["symbol"].isin(["CASH", "COST"])]
+        .groupby("symbol")["pnl_pct"]
+        .sum()
+        .sort_values()
+    )
+    if contrib.empty:
+        return None
+    fig = go.Figure(
+        go.Bar(
+            x=contrib.values * 100,
+            y=contrib.index,
+            orientation="h",
+            marker_color=["#26a69a" if v >= 0 else "#ef5350" for v in contrib.values],
+        )
+    )
+    fig.update_layout(
+        title="PnL Contribution by Symbol (%)",
+        template="plotly_white",
+        height=max(250, 22 * len(contrib)),
+    )
+    return fig
+
+
 def plot_price_with_markers(df_ohlcv, df_trades, symbol, threshold=0.0, mode="Line"):
     if df_ohlcv.empty:
         return None
@@ -57,21 +115,23 @@ def plot_price_with_markers(df_ohlcv, df_trades, symbol, threshold=0.0, mode="Li
 
     # 1. Base Price Chart
     if mode == "Candlestick":
+        bars, period = downsample_ohlc(df_ohlcv)
         fig.add_trace(
             go.Candlestick(
-                x=df_ohlcv["ts"],
-                open=df_ohlcv["open"],
-                high=df_ohlcv["high"],
-                low=df_ohlcv["low"],
-                close=df_ohlcv["close"],
-                name="OHLC",
+                x=bars["ts"],
+                open=bars["open"],
+                high=bars["high"],
+                low=bars["low"],
+                close=bars["close"],
+                name=f"OHLC ({period})" if period else "OHLC",
             )
         )
     else:
+        line = downsample_line(df_ohlcv, "ts", "close")
         fig.add_trace(
             go.Scatter(
-                x=df_ohlcv["ts"],
-                y=df_ohlcv["close"],
+                x=line["ts"],
+                y=line["close"],
                 mode="lines",
                 name="Price",
                 line={"color": "#2196f3", "width": 2},
@@ -163,6 +223,29 @@ def plot_market_explorer_chart(
     df = df.sort_values("ts")
     df["ts"] = pd.to_datetime(df["ts"])
 
+    # Indicators on daily bars, before downsampling
+    for period in sma_list or []:
+        df[f"sma_{period}"] = df["close"].rolling(window=period).mean()
+    if bb_params:
+        window, std_dev = bb_params
+        mid = df["close"].rolling(window=window).mean()
+        std = df["close"].rolling(window=window).std()
+        df["bb_upper"] = mid + (std * std_dev)
+        df["bb_lower"] = mid - (std * std_dev)
+    if rsi_period:
+        delta = df["close"].diff()
+        gain = (delta.where(delta > 0, 0)).rolling(window=rsi_period).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(window=rsi_period).mean()
+        rs = gain / loss
+        df["rsi"] = 100 - (100 / (1 + rs))
+
+    # Point budget: resampled bars for candles, LTTB on close for lines
+    bar_period = None
+    if chart_type == "Candlestick":
+        df, bar_period = downsample_ohlc(df)
+    else:
+        df = downsample_line(df, "ts", "close")
+
     # Create figure with 2 rows if RSI is enabled
     row_heights = [0.8, 0.2] if rsi_period else [1.0]
     specs = [[{"secondary_y": True}]]
@@ -187,7 +270,7 @@ def plot_market_explorer_chart(
                 high=df["high"],
                 low=df["low"],
                 close=df["close"],
-                name="Price",
+                name=f"Price ({bar_period})" if bar_period else "Price",
                 increasing_line_color="#26a69a",
                 decreasing_line_color="#ef5350",
             ),
@@ -211,11 +294,10 @@ def plot_market_explorer_chart(
     if sma_list:
         colors = ["#ff9800", "#e91e63", "#9c27b0"]
         for i, period in enumerate(sma_list):
-            sma = df["close"].rolling(window=period).mean()
             fig.add_trace(
                 go.Scatter(
                     x=df["ts"],
-                    y=sma,
+                    y=df[f"sma_{period}"],
                     mode="lines",
                     name=f"SMA({period})",
                     line={"width": 1.5, "color": colors[i % len(colors)]},
@@ -226,16 +308,10 @@ def plot_market_explorer_chart(
 
     # 3. Indicators - Bollinger Bands
     if bb_params:
-        window, std_dev = bb_params
-        mid = df["close"].rolling(window=window).mean()
-        std = df["close"].rolling(window=window).std()
-        upper = mid + (std * std_dev)
-        lower = mid - (std * std_dev)
-
         fig.add_trace(
             go.Scatter(
                 x=df["ts"],
-                y=upper,
+                y=df["bb_upper"],
                 mode="lines",
                 name="BB Upper",
                 line={"width": 1, "color": "rgba(173, 216, 230, 0.4)"},
@@ -246,7 +322,7 @@ def plot_market_explorer_chart(
         fig.add_trace(
             go.Scatter(
                 x=df["ts"],
-                y=lower,
+                y=df["bb_lower"],
                 mode="lines",
                 name="BB Lower",
                 line={"width": 1, "color": "rgba(173, 216, 230, 0.4)"},
@@ -277,16 +353,10 @@ def plot_market_explorer_chart(
 
     # 5. RSI Subplot
     if rsi_period:
-        delta = df["close"].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=rsi_period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=rsi_period).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-
         fig.add_trace(
             go.Scatter(
                 x=df["ts"],
-                y=rsi,
+                y=df["rsi"],
                 mode="lines",
                 name="RSI",
                 line={"color": "#7e57c2", "width": 1.5},
@@ -402,14 +472,15 @@ def plot_label_analysis(df_lbl):
 
 def plot_backtest_comparison(run1_data, run2_data, run1_id, run2_id):
     """
-    Plots two equity curves for comparison.
+    Plots two equity curves (load_backtest_equity frames) for comparison.
     """
     fig = go.Figure()
 
     for df, label in [(run1_data, run1_id), (run2_data, run2_id)]:
         if not df.empty:
-            df["ts"] = pd.to_datetime(df["entry_ts"])
-            daily_cum = (1 + df.groupby("ts")["pnl_pct"].sum()).cumprod()
+            daily_cum = downsample_series(
+                pd.Series(df["equity"].to_numpy(), index=pd.to_datetime(df["ts"]))
+            )
             fig.add_trace(
                 go.Scatter(
                     x=daily_cum.index, y=daily_cum.values, mode="lines", name=label
@@ -1,31 +1,30 @@
+import functools
 import os
 import sqlite3
+import threading
 from collections import namedtuple
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
 
 import duckdb
 import pandas as pd
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
+from app.ui.db_pool import DuckReadPool, file_watermark
+from quant.backtest_engine.metrics import equity_curve
 from quant.config import settings
 
 DB_PATH = str(settings.quant_duckdb_path)
 META_DB_PATH = str(settings.quant_sqlite_path)
 
 
-# Removed caching to avoid closed connection issues
 def get_duckdb_connection():
     """
-    Returns a read-only DuckDB connection.
-    For local DuckDB, read_only=True is essential for concurrency.
+    Returns a standalone read-only DuckDB connection (caller closes it).
+    Queries should go through run_query, which uses the shared pool.
     """
-    if not os.path.exists(DB_PATH):
-        # Allow creating if not exists? No, should exist from ingest.
-        # But for first run, maybe return None.
-        pass
-
     try:
-        # Note: In Streamlit, persistent DuckDB connections can sometimes trigger
-        # pybind11 'instance allocation failed' errors during reloads.
         return duckdb.connect(DB_PATH, read_only=True)
     except Exception as e:
         st.error(f"Failed to connect to DB: {e}")
@@ -36,17 +35,96 @@ def get_duckdb_connection():
 get_db_connection = get_duckdb_connection
 
 
+@st.cache_resource
+def _read_pool(db_path: str) -> DuckReadPool:
+    # One read-only connection per server process, shared by all sessions
+    return DuckReadPool(db_path)
+
+
+def duckdb_watermark() -> tuple:
+    """Changes whenever a write to the DuckDB file is committed."""
+    return file_watermark(DB_PATH)
+
+
+def meta_watermark() -> tuple:
+    """Same for the SQLite meta DB (runs/symbols)."""
+    return file_watermark(META_DB_PATH, wal_suffix="-wal")
+
+
+# Per-thread count of failed run_query calls (see watermark_cache)
+_query_failures = threading.local()
+
+
+def _failure_count() -> int:
+    return getattr(_query_failures, "n", 0)
+
+
+def watermark_cache(*sources: Callable[[], tuple], max_entries: int = 128):
+    """st.cache_data keyed by database watermarks instead of a TTL.
+
+    Results stay cached until one of `sources` changes (i.e. something was
+    written), so idle pages do not re-query and new runs show up right away.
+    """
+
+    def decorate(func):
+        def cached(watermark, *args, **kwargs):
+            return func(*args, **kwargs)
+
+        # st.cache_data keys functions by module + qualname (+ source)
+        cached.__module__ = func.__module__
+        cached.__qualname__ = func.__qualname__
+        cached = st.cache_data(max_entries=max_entries, show_spinner=False)(cached)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            mark = tuple(src() for src in sources)
+            failures = _failure_count()
+            result = cached(mark, *args, **kwargs)
+            if _failure_count() != failures:
+                # Don't pin an error fallback (e.g. DB locked by a running
+                # pipeline) until the next write
+                cached.clear(mark, *args, **kwargs)
+            return result
+
+        wrapper.clear = cached.clear
+        return wrapper
+
+    return decorate
+
+
+@st.cache_resource
+def _loader_pool() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="quant-ui-load")
+
+
+def load_in_background(loader: Callable, *args, **kwargs) -> Future:
+    """Start `loader(*args, **kwargs)` on a worker thread; `.result()` joins.
+
+    Pages kick off heavy loads early and render other widgets meanwhile.
+    The worker runs with the caller's script context so st.cache_data and
+    st.error behave as in the main thread.
+    """
+    ctx = get_script_run_ctx()
+
+    def run():
+        if ctx is not None:
+            add_script_run_ctx(ctx=ctx)
+        return loader(*args, **kwargs)
+
+    return _loader_pool().submit(run)
+
+
 def run_query(query, params=None):
-    """Helper to run a query and return a dataframe, handling connection lifecycle."""
-    conn = get_duckdb_connection()
-    if conn is None:
+    """Helper to run a query on a cursor of the shared read-only connection."""
+    if not os.path.exists(DB_PATH):
         return pd.DataFrame()
     try:
-        if params:
-            return conn.execute(query, params).df()
-        else:
-            return conn.execute(query).df()
+        with _read_pool(DB_PATH).cursor() as cur:
+            if params:
+                return cur.execute(query, params).df()
+            return cur.execute(query).df()
     except Exception as e:
+        _query_failures.n = _failure_count() + 1
         st.error(f"Query Error: {e}")
         return pd.DataFrame()
 
@@ -86,7 +164,7 @@ def load_runs(limit=100):
 Symbol = namedtuple("Symbol", ["symbol"])
 
 
-@st.cache_data(ttl=60)
+@watermark_cache(meta_watermark)
 def load_active_symbols():
     """Load active symbols from SQLite metadata DB."""
     conn = get_meta_connection()
@@ -102,7 +180,7 @@ def load_active_symbols():
         return []
 
 
-@st.cache_data(ttl=60)
+@watermark_cache(meta_watermark, duckdb_watermark)
 def load_symbol_inventory():
     """
     Combined inventory: metadata from SQLite + OHLCV stats from DuckDB.
@@ -132,7 +210,7 @@ def load_symbol_inventory():
     return df_inventory.sort_values("symbol")
 
 
-@st.cache_data(ttl=60)  # Cache for 60 seconds
+@watermark_cache(duckdb_watermark)
 def load_ohlcv_summary(_conn_placeholder=None):
     query = """
     SELECT symbol, count(*) as count, min(ts) as min_date, max(ts) as max_date 
@@ -143,7 +221,7 @@ def load_ohlcv_summary(_conn_placeholder=None):
     return run_query(query)
 
 
-@st.cache_data(ttl=60)
+@watermark_cache(duckdb_watermark)
 def load_ohlcv(symbol, from_date, to_date):
     q = """
                 SELECT ts, open, high, low, close, volume
@@ -156,7 +234,7 @@ def load_ohlcv(symbol, from_date, to_date):
     return run_query(q, params=[symbol, from_date, to_date])
 
 
-@st.cache_data(ttl=60)
+@watermark_cache(duckdb_watermark)
 def load_features(symbol, from_date, to_date):
     # Pivot features: ts | feature_name...
     try:
@@ -177,7 +255,7 @@ def load_features(symbol, from_date, to_date):
         return pd.DataFrame()
 
 
-@st.cache_data(ttl=60)
+@watermark_cache(duckdb_watermark)
 def load_labels(symbol, from_date, to_date):
     try:
         q = """
@@ -197,7 +275,7 @@ def load_labels(symbol, from_date, to_date):
         return pd.DataFrame()
 
 
-@st.cache_data(ttl=60)
+@watermark_cache(duckdb_watermark)
 def load_targets(strategy_id=None, asof=None):
     where_parts = ["1=1"]
     params = []
@@ -224,7 +302,7 @@ def load_targets(strategy_id=None, asof=None):
     return run_query(q, params=params)
 
 
-@st.cache_data(ttl=10)  # Shorter cache for run summary updates
+@watermark_cache(duckdb_watermark)
 def load_backtest_summary(limit=100):
     query = """
     SELECT 
@@ -243,13 +321,83 @@ def load_backtest_summary(limit=100):
     return run_query(query, params=[limit_i])
 
 
-@st.cache_data(ttl=60)
+@watermark_cache(duckdb_watermark)
 def load_backtest_trades(run_id):
     query = "SELECT * FROM backtest_trades WHERE run_id = ? ORDER BY entry_ts"
     return run_query(query, params=[run_id])
 
 
-@st.cache_data(ttl=10)
+def _has_table(name, column=None):
+    # Tables / columns added after a DB was created (absent until first written)
+    if column is None:
+        found = run_query(
+            "SELECT 1 FROM information_schema.tables WHERE table_name = ?",
+            params=[name],
+        )
+    else:
+        found = run_query(
+            "SELECT 1 FROM information_schema.columns "
+            "WHERE table_name = ? AND column_name = ?",
+            params=[name, column],
+        )
+    return not found.empty
+
+
+@watermark_cache(duckdb_watermark)
+def load_backtest_batch(run_id):
+    """Summaries of the runs saved in the same batch as `run_id`.
+
+    Batches come from `quant backtest --strategies`; single runs return empty.
+    """
+    if not _has_table("backtest_summary", "batch_id"):
+        return pd.DataFrame()
+    query = """
+    SELECT
+        b.strategy_id, b.cagr, b.sharpe, b.max_dd, b.vol, b.turnover,
+        b.win_rate, b.num_trades, b.run_id
+    FROM backtest_summary a
+    JOIN backtest_summary b ON a.batch_id = b.batch_id
+    WHERE a.run_id = ? AND a.batch_id IS NOT NULL
+    ORDER BY b.sharpe DESC
+    """
+    return run_query(query, params=[run_id])
+
+
+@watermark_cache(duckdb_watermark)
+def load_backtest_bootstrap(run_id):
+    """Bootstrap CIs of a run (quant backtest --bootstrap), one row per metric."""
+    if not _has_table("backtest_bootstrap"):
+        return pd.DataFrame()
+    return run_query(
+        "SELECT * FROM backtest_bootstrap WHERE run_id = ? ORDER BY metric",
+        params=[run_id],
+    )
+
+
+@watermark_cache(duckdb_watermark)
+def load_backtest_equity(run_id):
+    """Persisted equity curve of a run (backtest_equity_curve).
+
+    Runs saved before the table existed get the same columns computed from
+    their ledger with backtest_engine.metrics.
+    """
+    if _has_table("backtest_equity_curve"):
+        df = run_query(
+            "SELECT * FROM backtest_equity_curve WHERE run_id = ? ORDER BY ts",
+            params=[run_id],
+        )
+        if not df.empty:
+            df["ts"] = pd.to_datetime(df["ts"])
+            return df
+    df_trades = load_backtest_trades(run_id)
+    if df_trades.empty:
+        return pd.DataFrame()
+    daily = df_trades.groupby(pd.to_datetime(df_trades["entry_ts"]))["pnl_pct"].sum()
+    curve = equity_curve(daily.to_numpy())
+    return pd.DataFrame({"run_id": run_id, "ts": daily.index, **curve})
+
+
+@watermark_cache(meta_watermark)
 def load_pipeline_summary(limit=5):
     """
     Returns the latest run status for each pipeline step or a set of recent runs.
@@ -282,11 +430,7 @@ def load_pipeline_status():
     try:
         from app.ui.run_artifacts import list_runs_from_run_json, list_stage_results
 
-        runs = [
-            r
-            for r in (list_runs_from_run_json() or [])
-            if str(r.get("kind") or "") == "pipeline"
-        ]
+        runs = list_runs_from_run_json(limit=1, kind="pipeline")
         if runs:
             latest = runs[0]
             run_id = str(latest.get("run_id") or "").strip()
@@ -339,7 +483,7 @@ def load_pipeline_status():
     return status_map
 
 
-@st.cache_data(ttl=2)
+@watermark_cache(meta_watermark)
 def load_run_status(run_id: str) -> dict:
     """Load a single run row from SQLite meta DB."""
     conn = get_meta_connection()
@@ -359,7 +503,7 @@ def load_run_status(run_id: str) -> dict:
         return {}
 
 
-@st.cache_data(ttl=2)
+@watermark_cache(meta_watermark)
 def load_stage_runs(parent_run_id: str) -> pd.DataFrame:
     """Load child stage runs for a pipeline run_id."""
     conn = get_meta_connection()
@@ -386,7 +530,7 @@ def load_system_health():
     }
 
 
-@st.cache_data(ttl=60)
+@watermark_cache(duckdb_watermark)
 def load_latest_targets_snapshot(limit=5):
     """
     Aggregates target data for the most recent study_date.
@@ -420,7 +564,7 @@ def load_latest_targets_snapshot(limit=5):
     return df
 
 
-@st.cache_data(ttl=60)
+@watermark_cache(duckdb_watermark)
 def load_targets_comparison(strategy_id, asof):
     """
     Compare current targets with previous date's targets for the same strategy.
@@ -462,7 +606,7 @@ def load_targets_comparison(strategy_id, asof):
     return merged
 
 
-@st.cache_data(ttl=60)
+@watermark_cache(duckdb_watermark)
 def load_targets_history(strategy_id):
     """
     Aggregated historical stats for a strategy.
@@ -0,0 +1,111 @@
+"""Shared read-only DuckDB connection for the Streamlit process.
+
+Every `run_query` used to open (and drop) its own `duckdb.connect(read_only=True)`,
+re-reading the catalog each time. `DuckReadPool` keeps one read-only connection
+and hands out a cursor per query (cursors share the database instance and can
+be used from several threads at once).
+
+Two constraints shape the lifecycle:
+
+- a read-only connection does not see commits made by other processes (the
+  CLI pipeline), so the connection is reopened once the file watermark changes
+- an open connection holds the file lock, so it is closed after `idle_s`
+  without queries and pipeline runs started from the UI can open the file
+  for writing
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+import duckdb
+
+
+def file_watermark(path: str, wal_suffix: str = ".wal") -> tuple:
+    """(mtime_ns, size) of a database file and its WAL; None for missing files.
+
+    Committed writes change it (from any process), reads leave it as is.
+    """
+    sig = []
+    for p in (path, path + wal_suffix):
+        try:
+            st = os.stat(p)
+        except FileNotFoundError:
+            sig.append(None)
+        else:
+            sig.append((st.st_mtime_ns, st.st_size))
+    return tuple(sig)
+
+
+class DuckReadPool:
+    def __init__(self, db_path: str, idle_s: float = 5.0):
+        self.db_path = str(db_path)
+        self.idle_s = idle_s
+        self._lock = threading.Lock()
+        self._conn: duckdb.DuckDBPyConnection | None = None
+        self._mark: tuple | None = None
+        self._active = 0
+        self._timer: threading.Timer | None = None
+        self._idle_gen = 0
+        self.opened = 0
+
+    @property
+    def is_open(self) -> bool:
+        return self._conn is not None
+
+    def _close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+        self._conn, self._mark = None, None
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _idle_close(self, gen: int) -> None:
+        with self._lock:
+            if gen == self._idle_gen and self._active == 0:
+                self._timer = None
+                self._close()
+
+    @contextmanager
+    def cursor(self) -> Iterator[duckdb.DuckDBPyConnection]:
+        """Cursor on the shared connection, (re)opened if missing or stale."""
+        with self._lock:
+            self._cancel_timer()
+            mark = file_watermark(self.db_path)
+            if self._conn is not None and self._mark != mark and self._active == 0:
+                self._close()
+            if self._conn is None:
+                self._conn = duckdb.connect(self.db_path, read_only=True)
+                self._mark = mark
+                self.opened += 1
+            cur = self._conn.cursor()
+            self._active += 1
+        try:
+            yield cur
+        finally:
+            cur.close()
+            with self._lock:
+                self._active -= 1
+                if self._active == 0:
+                    stale = self._mark != file_watermark(self.db_path)
+                    if stale or self.idle_s <= 0:
+                        self._close()
+                    else:
+                        self._idle_gen += 1
+                        self._timer = threading.Timer(
+                            self.idle_s, self._idle_close, args=[self._idle_gen]
+                        )
+                        self._timer.daemon = True
+                        self._timer.start()
+
+    def close(self) -> None:
+        with self._lock:
+            self._cancel_timer()
+            if self._active == 0:
+                self._close()
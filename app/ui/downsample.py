@@ -0,0 +1,124 @@
+"""Server-side downsampling for time-series charts.
+
+Plotly ships every point to the browser, so decades of daily bars for a few
+symbols turn into multi-megabyte payloads. Charts reduce their frames here
+before plotting:
+
+- lines: LTTB (Largest-Triangle-Three-Buckets) keeps the visually important
+  points (peaks, troughs, drawdown bottoms) within `LINE_POINT_BUDGET`
+- candlesticks: OHLC bars are resampled to the finest of daily / weekly /
+  monthly / quarterly that fits `CANDLE_BUDGET`
+
+The choice depends on the rows passed in, i.e. the date range the page
+loaded; short ranges are plotted as is.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+LINE_POINT_BUDGET = 2_000
+CANDLE_BUDGET = 600
+
+# (label, pandas period) from finest to coarsest
+OHLC_PERIODS = (("weekly", "W-FRI"), ("monthly", "M"), ("quarterly", "Q"))
+
+
+def lttb_indices(y, n_out: int, x=None) -> np.ndarray:
+    """Row positions LTTB keeps out of `y` (all rows when len(y) <= n_out).
+
+    `x` defaults to the row position; datetimes are used as int64 ns. NaNs
+    are forward/back filled for the area computation only.
+    """
+    y = pd.Series(np.asarray(y, dtype=float)).ffill().bfill().fillna(0.0).to_numpy()
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    if x is None:
+        xs = np.arange(n, dtype=float)
+    else:
+        xs = np.asarray(x)
+        if np.issubdtype(xs.dtype, np.datetime64):
+            xs = xs.astype("datetime64[ns]").astype(np.int64)
+        xs = xs.astype(float)
+
+    # First and last points are fixed; the rest is split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        # Average of the next bucket (the last point for the final bucket)
+        cx, cy = xs[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs(
+            (xs[a] - cx) * (y[lo:hi] - y[a]) - (xs[a] - xs[lo:hi]) * (cy - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def downsample_line(
+    df: pd.DataFrame, x: str, y: str, budget: int = LINE_POINT_BUDGET
+) -> pd.DataFrame:
+    """Rows of `df` kept by LTTB on column `y` (other columns follow along)."""
+    if len(df) <= budget:
+        return df
+    return df.iloc[lttb_indices(df[y].to_numpy(), budget, df[x].to_numpy())]
+
+
+def downsample_series(s: pd.Series, budget: int = LINE_POINT_BUDGET) -> pd.Series:
+    """LTTB over a series indexed by date."""
+    if len(s) <= budget:
+        return s
+    return s.iloc[lttb_indices(s.to_numpy(), budget, s.index.to_numpy())]
+
+
+def ohlc_period(ts: pd.Series, budget: int = CANDLE_BUDGET) -> tuple[str, str] | None:
+    """Finest (label, period) whose bar count fits `budget`; None = keep daily."""
+    if len(ts) <= budget:
+        return None
+    ts = pd.to_datetime(ts)
+    for label, period in OHLC_PERIODS:
+        if ts.dt.to_period(period).nunique() <= budget:
+            return label, period
+    return OHLC_PERIODS[-1]
+
+
+def resample_ohlc(df: pd.DataFrame, period: str, ts: str = "ts") -> pd.DataFrame:
+    """Aggregate daily bars per calendar `period`.
+
+    open/high/low/close/volume aggregate as first/max/min/last/sum; any other
+    column (e.g. indicators computed on daily data) takes the period's last
+    value. Bars are stamped with the last trading day in the period.
+    """
+    df = df.sort_values(ts)
+    agg = dict.fromkeys(df.columns, "last")
+    agg.update(
+        {
+            k: v
+            for k, v in {
+                "open": "first",
+                "high": "max",
+                "low": "min",
+                "volume": "sum",
+            }.items()
+            if k in df.columns
+        }
+    )
+    keys = pd.to_datetime(df[ts]).dt.to_period(period)
+    return df.groupby(keys, sort=True).agg(agg).reset_index(drop=True)
+
+
+def downsample_ohlc(
+    df: pd.DataFrame, ts: str = "ts", budget: int = CANDLE_BUDGET
+) -> tuple[pd.DataFrame, str | None]:
+    """(bars, label) with label None when the frame already fits `budget`."""
+    chosen = ohlc_period(df[ts], budget)
+    if chosen is None:
+        return df, None
+    label, period = chosen
+    return resample_ohlc(df, period, ts), label
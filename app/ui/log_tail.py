@@ -0,0 +1,170 @@
+"""Constant-cost polling of run logs and progress events.
+
+Run Center polls `pipeline.log` every couple of seconds. Reading and
+splitting the whole file each time gets slow once logs reach hundreds of MB,
+so:
+
+- `tail_lines()` seeks from the end and reads backwards block by block until
+  it has the requested number of lines
+- `ProgressTailer` remembers the byte offset it has consumed and only parses
+  lines appended since the previous poll; tailers live in a process-wide
+  registry (`get_progress_tailer`) so they survive Streamlit reruns
+
+The pipeline also writes progress to a compact `progress.jsonl` next to the
+log; tailers prefer it and fall back to the `PROGRESS_JSON:` lines in
+`pipeline.log` for runs that predate it.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from app.ui.progress_events import (
+    PROGRESS_PREFIX,
+    ProgressEvent,
+    parse_progress_line,
+    progress_event_from_payload,
+)
+
+PROGRESS_FILE = "progress.jsonl"
+
+_BLOCK = 64 * 1024
+_READ_CHUNK = 8 * 1024 * 1024
+_PROGRESS_LINE = re.compile(
+    rb"^" + re.escape(PROGRESS_PREFIX.encode()) + rb"[^\n]*", re.M
+)
+# Stop scanning backwards after this much (e.g. a log made only of progress lines)
+_MAX_TAIL_BYTES = 8 * 1024 * 1024
+
+
+def tail_lines(
+    path: Path | str, lines: int = 200, *, skip_prefix: str | None = None
+) -> list[str]:
+    """Last `lines` lines of a text file, reading only the end of it.
+
+    Lines starting with `skip_prefix` are dropped before counting.
+    """
+    if lines <= 0:
+        return []
+    kept: list[str] = []
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = end = f.tell()
+        carry = b""  # partial first line of the region already read
+        while pos > 0 and len(kept) < lines and end - pos <= _MAX_TAIL_BYTES:
+            step = min(_BLOCK, pos)
+            pos -= step
+            f.seek(pos)
+            block = f.read(step) + carry
+            if pos + step == end and block.endswith(b"\n"):
+                block = block[:-1]
+            parts = block.split(b"\n")
+            carry = parts.pop(0) if pos > 0 else b""
+            new = [p.decode("utf-8", errors="replace").rstrip("\r") for p in parts]
+            if skip_prefix:
+                new = [ln for ln in new if not ln.strip().startswith(skip_prefix)]
+            kept = new + kept
+    return kept[-lines:]
+
+
+class ProgressTailer:
+    """Incremental reader of progress events for one run directory."""
+
+    def __init__(self, run_dir: Path | str):
+        self.run_dir = Path(run_dir)
+        self.source: Path | None = None
+        self.offset = 0
+        self._partial = b""
+        self.latest: dict[str, ProgressEvent] = {}
+        self.n_events = 0
+        self._lock = threading.Lock()
+
+    def _pick_source(self) -> Path | None:
+        events = self.run_dir / PROGRESS_FILE
+        if events.exists():
+            return events
+        log = self.run_dir / "pipeline.log"
+        return log if log.exists() else None
+
+    def _reset(self, source: Path | None) -> None:
+        self.source, self.offset, self._partial = source, 0, b""
+        self.latest, self.n_events = {}, 0
+
+    def _parse(self, line: str) -> ProgressEvent | None:
+        if self.source is not None and self.source.name == PROGRESS_FILE:
+            try:
+                payload = json.loads(line)
+            except Exception:
+                return None
+            if not isinstance(payload, dict):
+                return None
+            return progress_event_from_payload(payload)
+        return parse_progress_line(line)
+
+    def poll(self) -> dict[str, ProgressEvent]:
+        """Consume appended bytes; returns the latest event per stage."""
+        with self._lock:
+            source = self._pick_source()
+            if source != self.source:
+                self._reset(source)
+            if source is None:
+                return dict(self.latest)
+            try:
+                size = source.stat().st_size
+            except FileNotFoundError:
+                self._reset(None)
+                return {}
+            if size < self.offset:  # truncated / rewritten
+                self._reset(source)
+            if size == self.offset:
+                return dict(self.latest)
+
+            with open(source, "rb") as f:
+                f.seek(self.offset)
+                while self.offset < size:
+                    chunk = f.read(min(_READ_CHUNK, size - self.offset))
+                    if not chunk:
+                        break
+                    self.offset += len(chunk)
+                    self._consume(self._partial + chunk)
+            return dict(self.latest)
+
+    def _consume(self, data: bytes) -> None:
+        complete, sep, self._partial = data.rpartition(b"\n")
+        if not sep:  # no complete line yet
+            return
+        if self.source is not None and self.source.name == PROGRESS_FILE:
+            lines = complete.split(b"\n")
+        else:
+            # Only PROGRESS_JSON lines matter in the full log
+            lines = _PROGRESS_LINE.findall(complete)
+        for raw in lines:
+            ev = self._parse(raw.decode("utf-8", errors="replace"))
+            if ev is None:
+                continue
+            self.n_events += 1
+            if ev.stage:
+                self.latest[ev.stage] = ev
+
+
+_TAILERS: OrderedDict[str, ProgressTailer] = OrderedDict()
+_TAILERS_LOCK = threading.Lock()
+_MAX_TAILERS = 64
+
+
+def get_progress_tailer(run_dir: Path | str) -> ProgressTailer:
+    """Process-wide tailer for `run_dir` (kept across Streamlit reruns)."""
+    key = str(Path(run_dir).resolve())
+    with _TAILERS_LOCK:
+        tailer = _TAILERS.get(key)
+        if tailer is None:
+            tailer = _TAILERS[key] = ProgressTailer(run_dir)
+            while len(_TAILERS) > _MAX_TAILERS:
+                _TAILERS.popitem(last=False)
+        _TAILERS.move_to_end(key)
+        return tailer
@@ -0,0 +1,108 @@
+"""UI side of the pipeline progress socket (quant.batch_orchestrator.progress_channel).
+
+`ProgressSubscriber` binds a Unix datagram socket and keeps the latest event
+per run/stage in memory from a daemon thread. Run Center passes
+`subscriber.env()` to the runs it launches and renders from `snapshot()`,
+which costs no disk reads, so its fragment can refresh every second. Runs
+started elsewhere (CLI) or platforms without AF_UNIX use the file tailers.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import tempfile
+import threading
+import uuid
+from dataclasses import dataclass, field
+
+from app.ui.progress_events import ProgressEvent, progress_event_from_payload
+from quant.batch_orchestrator.progress_channel import PROGRESS_SOCKET_ENV
+
+
+@dataclass
+class RunProgress:
+    latest: dict[str, ProgressEvent] = field(default_factory=dict)
+    finished: bool = False
+    status: str | None = None
+    n_events: int = 0
+
+
+class ProgressSubscriber:
+    def __init__(self, path: str | None = None):
+        self.path = path or os.path.join(
+            tempfile.gettempdir(), f"quant-progress-{uuid.uuid4().hex[:12]}.sock"
+        )
+        self._runs: dict[str, RunProgress] = {}
+        self._lock = threading.Lock()
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sock.bind(self.path)
+        self._sock.settimeout(0.5)  # lets close() stop the loop
+        self._closed = threading.Event()
+        self._thread = threading.Thread(
+            target=self._loop, name="quant-progress", daemon=True
+        )
+        self._thread.start()
+
+    def env(self) -> dict[str, str]:
+        """Environment for a launched run so it publishes here."""
+        return {PROGRESS_SOCKET_ENV: self.path}
+
+    def _loop(self) -> None:
+        while not self._closed.is_set():
+            try:
+                data = self._sock.recv(65536)
+            except TimeoutError:
+                continue
+            except OSError:
+                return
+            try:
+                payload = json.loads(data)
+            except Exception:
+                continue
+            if isinstance(payload, dict) and payload.get("run_id"):
+                self._apply(payload)
+
+    def _apply(self, payload: dict) -> None:
+        with self._lock:
+            run = self._runs.setdefault(str(payload["run_id"]), RunProgress())
+            run.n_events += 1
+            if payload.get("event") == "pipeline_end":
+                run.finished = True
+                run.status = payload.get("status")
+                return
+            ev = progress_event_from_payload(payload)
+            if ev.stage:
+                run.latest[ev.stage] = ev
+
+    def snapshot(self, run_id: str) -> RunProgress | None:
+        """Copy of what was received for `run_id` (None: nothing pushed)."""
+        with self._lock:
+            run = self._runs.get(run_id)
+            if run is None:
+                return None
+            return RunProgress(
+                latest=dict(run.latest),
+                finished=run.finished,
+                status=run.status,
+                n_events=run.n_events,
+            )
+
+    def close(self) -> None:
+        self._closed.set()
+        try:
+            self._sock.close()
+        finally:
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+
+
+def open_subscriber() -> ProgressSubscriber | None:
+    """A bound subscriber, or None where Unix sockets are unavailable."""
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    try:
+        return ProgressSubscriber()
+    except OSError:
+        return None
@@ -16,45 +16,48 @@ class ProgressEvent:
     payload: dict[str, Any]
 
 
+def _to_int(v: Any) -> int | None:
+    try:
+        if v is None:
+            return None
+        return int(v)
+    except Exception:
+        return None
+
+
+def progress_event_from_payload(payload: dict[str, Any]) -> ProgressEvent:
+    return ProgressEvent(
+        stage=str(payload.get("stage")) if payload.get("stage") is not None else None,
+        event=str(payload.get("event")) if payload.get("event") is not None else None,
+        current=_to_int(payload.get("current")),
+        total=_to_int(payload.get("total")),
+        payload=payload,
+    )
+
+
+def parse_progress_line(line: str) -> ProgressEvent | None:
+    """One `PROGRESS_JSON: {...}` log line (None for anything else)."""
+    if not line.startswith(PROGRESS_PREFIX):
+        return None
+    raw = line.split(PROGRESS_PREFIX, 1)[1].strip()
+    try:
+        payload = json.loads(raw)
+    except Exception:
+        return None
+    if not isinstance(payload, dict):
+        return None
+    return progress_event_from_payload(payload)
+
+
 def parse_progress_events(log_text: str) -> list[ProgressEvent]:
     events: list[ProgressEvent] = []
     if not log_text:
         return events
 
     for line in log_text.splitlines():
-        if not line.startswith(PROGRESS_PREFIX):
-            continue
-        raw = line.split(PROGRESS_PREFIX, 1)[1].strip()
-        try:
-            payload = json.loads(raw)
-        except Exception:
-            continue
-
-        def _to_int(v: Any) -> int | None:
-            try:
-                if v is None:
-                    return None
-                return int(v)
-            except Exception:
-                return None
-
-        events.append(
-            ProgressEvent(
-                stage=(
-                    str(payload.get("stage"))
-                    if payload.get("stage") is not None
-                    else None
-                ),
-                event=(
-                    str(payload.get("event"))
-                    if payload.get("event") is not None
-                    else None
-                ),
-                current=_to_int(payload.get("current")),
-                total=_to_int(payload.get("total")),
-                payload=payload,
-            )
-        )
+        ev = parse_progress_line(line)
+        if ev is not None:
+            events.append(ev)
 
     return events
 
@@ -6,7 +6,10 @@ from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any
 
+from app.ui.log_tail import get_progress_tailer, tail_lines
+from app.ui.progress_events import PROGRESS_PREFIX, ProgressEvent
 from quant.config import settings
+from quant.repos.run_index import RunIndex, index_run
 
 
 @dataclass(frozen=True)
@@ -82,18 +85,21 @@ def read_pipeline_log(run_id: str) -> str | None:
 def tail_pipeline_log(
     run_id: str, *, lines: int = 200, filter_progress: bool = True
 ) -> str:
-    text = read_pipeline_log(run_id)
-    if not text:
+    p = get_run_dir(run_id) / "pipeline.log"
+    try:
+        # Machine-readable PROGRESS_JSON lines are filtered out
+        tail = tail_lines(
+            p, lines, skip_prefix=PROGRESS_PREFIX if filter_progress else None
+        )
+    except OSError:
         return "No pipeline.log found."
-    all_lines = text.splitlines()
+    return "\n".join(tail) if tail else "No pipeline.log found."
 
-    if filter_progress:
-        # Filter out machine-readable PROGRESS_JSON lines
-        all_lines = [
-            line for line in all_lines if not line.strip().startswith("PROGRESS_JSON:")
-        ]
 
-    return "\n".join(all_lines[-lines:])
+def latest_run_progress(run_id: str) -> dict[str, ProgressEvent]:
+    """Latest progress event per stage, parsing only what was appended since
+    the previous call for this run."""
+    return get_progress_tailer(get_run_dir(run_id)).poll()
 
 
 def parse_stage_elapsed_sec(result: dict[str, Any]) -> float | None:
@@ -118,7 +124,7 @@ def parse_stage_errors(result: dict[str, Any]) -> list[str]:
     return []
 
 
-def list_alias_index() -> list[dict[str, Any]]:
+def _scan_alias_index() -> list[dict[str, Any]]:
     idx_dir = index_runs_dir()
     if not idx_dir.exists():
         return []
@@ -138,8 +144,7 @@ def list_alias_index() -> list[dict[str, Any]]:
     return out
 
 
-def list_runs_from_run_json() -> list[dict[str, Any]]:
-    """Fallback SSOT: scan artifacts/runs/*/run.json (excludes plan_* dirs)."""
+def _scan_runs_from_run_json() -> list[dict[str, Any]]:
     out: list[dict[str, Any]] = []
     base = runs_dir()
     if not base.exists():
@@ -163,6 +168,43 @@ def list_runs_from_run_json() -> list[dict[str, Any]]:
     return out
 
 
+def list_alias_index(limit: int | None = None, offset: int = 0) -> list[dict[str, Any]]:
+    """Alias entries (artifacts/index/runs/*.json) from the run index, newest first."""
+    try:
+        return RunIndex().ensure().list_aliases(limit=limit, offset=offset)
+    except Exception:
+        # Index unavailable (e.g. read-only artifacts): scan the files
+        out = _scan_alias_index()
+        return out[offset:] if limit is None else out[offset : offset + limit]
+
+
+def list_runs_from_run_json(
+    limit: int | None = None, offset: int = 0, kind: str | None = None
+) -> list[dict[str, Any]]:
+    """run.json payloads (excludes plan_* dirs) from the run index, newest first."""
+    try:
+        return RunIndex().ensure().list_runs(kind=kind, limit=limit, offset=offset)
+    except Exception:
+        out = _scan_runs_from_run_json()
+        if kind:
+            out = [r for r in out if str(r.get("kind") or "") == kind]
+        return out[offset:] if limit is None else out[offset : offset + limit]
+
+
+def count_runs(kind: str | None = None) -> int:
+    try:
+        return RunIndex().ensure().count_runs(kind=kind)
+    except Exception:
+        return len(list_runs_from_run_json(kind=kind))
+
+
+def count_alias_index() -> int:
+    try:
+        return RunIndex().ensure().count_aliases()
+    except Exception:
+        return len(_scan_alias_index())
+
+
 def resolve_run_id_from_slug(run_slug: str) -> RunLookupResult | None:
     slug = (run_slug or "").strip()
     if not slug:
@@ -220,4 +262,7 @@ def write_initial_run_json(
     p.write_text(
         json.dumps(payload, ensure_ascii=False, indent=2) + "\n", encoding="utf-8"
     )
+    # The run index covers the configured runs dir only
+    if artifacts_dir.resolve().parent == runs_dir().resolve():
+        index_run(payload)
     return p
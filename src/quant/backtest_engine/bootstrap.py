@@ -0,0 +1,115 @@
+"""Stationary block bootstrap of a backtest's daily returns.
+
+Politis & Romano (1994): each resample is built from blocks of consecutive
+days with geometric lengths (mean `mean_block`), wrapping around the end, so
+volatility clustering and short-range autocorrelation survive resampling.
+
+Resamples are generated and scored as (batch x n_days) NumPy matrices (no
+per-sample Python loop): block starts are the running max of the "new
+block" positions, and every metric is an axis-1 reduction. 5,000 resamples
+of a 10-year series take about a second.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from .metrics import ANNUAL_FACTOR
+
+BOOTSTRAP_METRICS = ("sharpe", "cagr", "max_dd")
+
+
+def default_block_length(n_days: int) -> int:
+    """n^(1/3) rule of thumb for the mean block length."""
+    return max(1, round(n_days ** (1.0 / 3.0)))
+
+
+def stationary_bootstrap_indices(
+    n_days: int, n_samples: int, mean_block: float, rng: np.random.Generator
+) -> np.ndarray:
+    """(n_samples, n_days) day indices of stationary-bootstrap resamples."""
+    t = np.arange(n_days)
+    new_block = rng.random((n_samples, n_days)) < 1.0 / max(mean_block, 1.0)
+    new_block[:, 0] = True
+    block_start = np.maximum.accumulate(np.where(new_block, t, 0), axis=1)
+    origin = rng.integers(0, n_days, size=(n_samples, n_days))
+    first = np.take_along_axis(origin, block_start, axis=1)
+    return (first + (t - block_start)) % n_days
+
+
+def resampled_metrics(
+    returns: np.ndarray,
+    idx: np.ndarray,
+    *,
+    span_days: float | None = None,
+    annual_factor: float = ANNUAL_FACTOR,
+) -> dict[str, np.ndarray]:
+    """Sharpe / CAGR / max drawdown of each resample (rows of `idx`).
+
+    Same conventions as metrics.compute_metrics (ddof=1, equity from 1.0).
+    """
+    r = returns[idx]
+    n = r.shape[1]
+    mean = r.mean(axis=1)
+    std = r.std(axis=1, ddof=1) if n > 1 else np.zeros(len(r))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(std > 0, mean / std * np.sqrt(annual_factor), 0.0)
+
+    equity = np.cumprod(1.0 + r, axis=1)
+    peak = np.maximum.accumulate(np.maximum(equity, 1.0), axis=1)
+    max_dd = (equity / peak - 1.0).min(axis=1)
+
+    span = span_days if span_days is not None else n * 365.0 / annual_factor
+    total = equity[:, -1]
+    cagr = np.full(len(total), -1.0)
+    alive = total > 0
+    cagr[alive] = total[alive] ** (365.0 / span) - 1.0
+    return {"sharpe": sharpe, "cagr": cagr, "max_dd": max_dd}
+
+
+def bootstrap_metrics(
+    returns,
+    n_samples: int = 1000,
+    *,
+    mean_block: float | None = None,
+    span_days: float | None = None,
+    batch_size: int = 500,
+    seed: int | None = None,
+    annual_factor: float = ANNUAL_FACTOR,
+) -> dict[str, np.ndarray]:
+    """Metric samples over `n_samples` stationary-bootstrap resamples."""
+    r = np.nan_to_num(np.asarray(returns, dtype=np.float64))
+    n = len(r)
+    if n < 2 or n_samples <= 0:
+        return {k: np.empty(0) for k in BOOTSTRAP_METRICS}
+    block = mean_block or default_block_length(n)
+    rng = np.random.default_rng(seed)
+    out: dict[str, list[np.ndarray]] = {k: [] for k in BOOTSTRAP_METRICS}
+    for start in range(0, n_samples, batch_size):
+        size = min(batch_size, n_samples - start)
+        idx = stationary_bootstrap_indices(n, size, block, rng)
+        batch = resampled_metrics(
+            r, idx, span_days=span_days, annual_factor=annual_factor
+        )
+        for k in BOOTSTRAP_METRICS:
+            out[k].append(batch[k])
+    return {k: np.concatenate(v) for k, v in out.items()}
+
+
+def confidence_intervals(
+    samples: dict[str, np.ndarray], confidence: float = 0.95
+) -> dict[str, dict[str, float]]:
+    """Percentile intervals plus mean / std of each metric's samples."""
+    tail = (1.0 - confidence) / 2.0 * 100.0
+    result: dict[str, dict[str, float]] = {}
+    for k, v in samples.items():
+        if not len(v):
+            continue
+        lo, hi = np.percentile(v, [tail, 100.0 - tail])
+        result[k] = {
+            "ci_low": float(lo),
+            "ci_high": float(hi),
+            "mean": float(v.mean()),
+            "std": float(v.std(ddof=1)) if len(v) > 1 else 0.0,
+        }
+    return result
@@ -0,0 +1,198 @@
+"""Transaction cost models for the backtest engine.
+
+A cost model turns the (dates x symbols) matrix of absolute weight changes
+into a same-shaped matrix of costs (fractions of NAV), so per-symbol costs
+stay in the ledger. Everything is computed on whole matrices; a model adds a
+few array passes to a run, no per-day Python loop.
+
+Models are picked by `backtest.cost_model.type` in the strategy YAML:
+
+- flat (default): (fee_bps + slippage_bps) x turnover.
+- sqrt_impact: fee + half the symbol's estimated spread + square-root
+  market impact, coef x sigma x sqrt(participation), where participation is
+  the traded notional (weight change x AUM) over the average daily dollar
+  volume. sigma (Parkinson, from the high/low range), the spread
+  (Corwin-Schultz, from two-day highs/lows) and ADV are rolling estimates
+  through T-1, so day T's cost does not look at day T's bar.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+
+from ..db.panel import Panel
+
+# ohlcv columns the market-data models read
+MARKET_FIELDS = ("high", "low", "close", "volume")
+
+DEFAULT_WINDOW = 20
+DEFAULT_AUM = 1_000_000.0
+
+
+class CostModel:
+    """Base class: cost matrix of a trade matrix."""
+
+    type_name = "base"
+    # Models reading ohlcv get a MARKET_FIELDS panel with `lookback_days`
+    # calendar days of history before the simulation range
+    needs_market_data = False
+    lookback_days = 0
+
+    def cost(
+        self, trade: np.ndarray, dates: np.ndarray, market: Panel | None = None
+    ) -> np.ndarray:
+        """Cost (fraction of NAV) of each |dW| cell of `trade` (dates x symbols).
+
+        `market` is aligned to the trade's symbols; `dates` are its rows.
+        """
+        raise NotImplementedError
+
+
+class FlatCostModel(CostModel):
+    type_name = "flat"
+
+    def __init__(self, fee_bps: float = 0.0, slippage_bps: float = 0.0):
+        self.rate = (fee_bps + slippage_bps) / 10000.0
+
+    # A flat rate needs neither dates nor market; they stay for the interface
+    def cost(
+        self,
+        trade: np.ndarray,
+        dates: np.ndarray,  # noqa: ARG002
+        market: Panel | None = None,  # noqa: ARG002
+    ) -> np.ndarray:
+        return trade * self.rate
+
+
+class SqrtImpactCostModel(CostModel):
+    """Fee + half spread + coef * sigma * sqrt(participation), per cell.
+
+    Cells without enough market history (new listings, missing bars) fall
+    back to the flat `slippage_bps` in place of spread and impact.
+    """
+
+    type_name = "sqrt_impact"
+    needs_market_data = True
+
+    def __init__(
+        self,
+        fee_bps: float = 0.0,
+        slippage_bps: float = 0.0,
+        *,
+        aum: float = DEFAULT_AUM,
+        impact_coef: float = 1.0,
+        window: int = DEFAULT_WINDOW,
+        spread_bps: float | None = None,
+    ):
+        if aum <= 0:
+            raise ValueError(f"cost_model.aum must be positive, got {aum}")
+        self.fee = fee_bps / 10000.0
+        self.slippage = slippage_bps / 10000.0
+        self.aum = float(aum)
+        self.impact_coef = float(impact_coef)
+        self.window = max(int(window), 2)
+        self.spread = None if spread_bps is None else spread_bps / 10000.0
+        # Trading days -> calendar days, with room for holidays
+        self.lookback_days = int(self.window * 1.6) + 10
+
+    def estimates(self, dates: np.ndarray, market: Panel) -> dict[str, np.ndarray]:
+        """Per-cell ADV ($), daily sigma and spread known before each date."""
+        high = market["high"].astype(np.float64)
+        low = market["low"].astype(np.float64)
+        close = market["close"].astype(np.float64)
+        volume = market["volume"].astype(np.float64)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_hl = np.log(high / low)
+            adv = rolling_nanmean(close * volume, self.window)
+            sigma = np.sqrt(
+                rolling_nanmean(log_hl**2, self.window) / (4.0 * np.log(2.0))
+            )
+            if self.spread is None:
+                spread = rolling_nanmean(corwin_schultz_spread(high, low), self.window)
+            else:
+                spread = np.full(high.shape, self.spread)
+
+        # Through T-1, then the simulation's rows
+        rows = market.day_index(dates)
+        out = {}
+        for name, arr in (("adv", adv), ("sigma", sigma), ("spread", spread)):
+            lagged = np.vstack([np.full((1, arr.shape[1]), np.nan), arr[:-1]])
+            picked = np.full((len(dates), arr.shape[1]), np.nan)
+            picked[rows >= 0] = lagged[rows[rows >= 0]]
+            out[name] = picked
+        return out
+
+    def cost(
+        self, trade: np.ndarray, dates: np.ndarray, market: Panel | None = None
+    ) -> np.ndarray:
+        if market is None or not len(market.dates):
+            return trade * (self.fee + self.slippage)
+        est = self.estimates(dates, market)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            participation = trade * self.aum / est["adv"]
+            variable = est["spread"] / 2.0 + self.impact_coef * est["sigma"] * np.sqrt(
+                participation
+            )
+        variable = np.where(np.isfinite(variable), variable, self.slippage)
+        return trade * (self.fee + variable)
+
+
+def rolling_nanmean(x: np.ndarray, window: int) -> np.ndarray:
+    """Trailing `window`-row mean per column ignoring NaN (NaN if none valid)."""
+    valid = np.isfinite(x)
+    csum = np.cumsum(np.where(valid, x, 0.0), axis=0)
+    ccount = np.cumsum(valid, axis=0, dtype=np.float64)
+    if len(x) > window:
+        csum[window:] = csum[window:] - csum[:-window]
+        ccount[window:] = ccount[window:] - ccount[:-window]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(ccount > 0, csum / ccount, np.nan)
+
+
+def corwin_schultz_spread(high: np.ndarray, low: np.ndarray) -> np.ndarray:
+    """Corwin & Schultz (2012) two-day high/low spread estimate per cell.
+
+    Row t uses days t-1 and t (row 0 is NaN); negative estimates are 0.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        hl2 = np.log(high / low) ** 2
+        beta = hl2[1:] + hl2[:-1]
+        gamma = np.log(np.fmax(high[1:], high[:-1]) / np.fmin(low[1:], low[:-1])) ** 2
+        k = 3.0 - 2.0 * np.sqrt(2.0)
+        alpha = (np.sqrt(2.0 * beta) - np.sqrt(beta)) / k - np.sqrt(gamma / k)
+        spread = 2.0 * (np.exp(alpha) - 1.0) / (1.0 + np.exp(alpha))
+    spread = np.where(np.isfinite(spread), np.maximum(spread, 0.0), np.nan)
+    return np.vstack([np.full((1, high.shape[1]), np.nan), spread])
+
+
+def build_cost_model(strategy_config: dict[str, Any]) -> CostModel:
+    """Cost model of a strategy's `backtest` block (flat when unset)."""
+    bt_config = strategy_config.get("backtest") or {}
+    fee_bps = float(bt_config.get("fee_bps", 0) or 0)
+    slippage_bps = float(bt_config.get("slippage_bps", 0) or 0)
+    model_cfg = bt_config.get("cost_model") or {}
+    if isinstance(model_cfg, str):
+        model_cfg = {"type": model_cfg}
+    model_type = model_cfg.get("type", FlatCostModel.type_name)
+
+    if model_type == FlatCostModel.type_name:
+        return FlatCostModel(fee_bps, slippage_bps)
+    if model_type == SqrtImpactCostModel.type_name:
+        spread_bps = model_cfg.get("spread_bps")
+        return SqrtImpactCostModel(
+            fee_bps,
+            slippage_bps,
+            aum=float(
+                model_cfg.get("aum") or bt_config.get("initial_cash") or DEFAULT_AUM
+            ),
+            impact_coef=float(model_cfg.get("impact_coef", 1.0)),
+            window=int(model_cfg.get("window", DEFAULT_WINDOW)),
+            spread_bps=None if spread_bps is None else float(spread_bps),
+        )
+    raise ValueError(
+        f"Unknown backtest.cost_model.type '{model_type}' "
+        f"(expected one of: {FlatCostModel.type_name}, {SqrtImpactCostModel.type_name})"
+    )
@@ -5,9 +5,21 @@ from typing import Any
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
 
 from ..config import settings
+from ..db.cache import PanelKey, cached_panel
 from ..db.duck import connect as duck_connect
+from ..db.duck import object_type, table_ddl
+from ..db.panel import (
+    Panel,
+    load_ohlcv_panel,
+    load_return_panel,
+    returns_from_close,
+)
+from . import bootstrap as bootstrap_lib
+from . import costs as costs_lib
+from . import metrics as metrics_lib
 
 logger = logging.getLogger(__name__)
 
@@ -22,38 +34,138 @@ class BacktestEngine:
     - Rebalancing happens at T Close based on targets for study_date = T.
     - PnL for T reflects weights set at T-1 Close applying to T Close returns.
     - If no targets at T, 'Hold' policy: keep previous weights.
+      Targets are only persisted on rebalance dates (see
+      strategy_lab.rebalance.RebalanceCalendar), so Hold fills the days between.
     """
 
     def __init__(self, db_path: str | None = None):
         self.db_path = db_path or settings.quant_duckdb_path
 
-    def load_ohlcv_returns(
+    def load_returns_panel(
         self, symbols: list[str], from_date: str, to_date: str
-    ) -> pd.DataFrame:
-        """Load OHLCV and calculate 1d returns for given symbols and range."""
+    ) -> Panel:
+        """float32 1d-return panel ('ret_1d') for given symbols and range.
+
+        Reads the precomputed `returns` table when it covers every ohlcv row in
+        range; otherwise falls back to close -> pct_change. Served from the
+        in-process panel cache when the same symbols were loaded before.
+        """
+        start = str((pd.Timestamp(from_date) - pd.Timedelta(days=5)).date())
+        end = str((pd.Timestamp(to_date) + pd.Timedelta(days=1)).date())
+        key = PanelKey.build(
+            db=self.db_path,
+            table="returns",
+            symbols=symbols,
+            from_date=start,
+            to_date=end,
+            fields=("ret_1d",),
+        )
+        return cached_panel(key, lambda: self._load_returns_panel(symbols, start, end))
+
+    def _load_returns_panel(self, symbols: list[str], start: str, end: str) -> Panel:
         conn = duck_connect(
             Path(self.db_path) if isinstance(self.db_path, str) else self.db_path
         )
         try:
-            sym_list = "', '".join(symbols)
-            query = f"""
-                SELECT symbol, ts, close
-                FROM ohlcv
-                WHERE symbol IN ('{sym_list}')
-                  AND ts >= DATE '{from_date}' - INTERVAL 5 DAY
-                  AND ts <= DATE '{to_date}' + INTERVAL 1 DAY
-                ORDER BY ts
-            """
-            df = conn.execute(query).df()
-            if df.empty:
-                return pd.DataFrame()
-
-            df["ts"] = pd.to_datetime(df["ts"])
-            df = df.pivot(index="ts", columns="symbol", values="close")
-            df_ret = df.pct_change().fillna(0)
-            return df_ret
+            if self._returns_cover(conn, symbols, start, end):
+                return load_return_panel(
+                    conn, symbols=symbols, from_date=start, to_date=end
+                )
+            logger.debug("returns table incomplete; computing from ohlcv close")
+            close = load_ohlcv_panel(
+                conn, symbols=symbols, from_date=start, to_date=end, fields=("close",)
+            )
         finally:
             conn.close()
+        if not len(close.dates):
+            return Panel.empty(close.symbols)
+        return Panel(
+            symbols=close.symbols,
+            dates=close.dates,
+            values={"ret_1d": returns_from_close(close["close"])},
+        )
+
+    @staticmethod
+    def _returns_cover(
+        conn: Any, symbols: list[str], from_date: str, to_date: str
+    ) -> bool:
+        """True when `returns` has a row for every ohlcv (symbol, ts) in range."""
+        params = [list(symbols), from_date, to_date]
+        scope = """
+            WHERE symbol IN (SELECT UNNEST(?::VARCHAR[]))
+              AND ts >= CAST(? AS DATE)
+              AND ts <= CAST(? AS DATE)
+        """
+        row = conn.execute(
+            f"""
+            SELECT
+              (SELECT COUNT(*) FROM ohlcv {scope}) AS n_px,
+              (SELECT COUNT(*) FROM returns {scope}) AS n_ret
+            """,
+            params + params,
+        ).fetchone()
+        return bool(row and row[0] > 0 and row[1] >= row[0])
+
+    def load_market_panel(
+        self, symbols: list[str], from_date: str, to_date: str, lookback_days: int = 0
+    ) -> Panel:
+        """ohlcv high / low / close / volume panel for market-data cost models.
+
+        Starts `lookback_days` calendar days before from_date so rolling
+        estimates (ADV, volatility, spread) are warm on the first day.
+        """
+        start = str(
+            (pd.Timestamp(from_date) - pd.Timedelta(days=lookback_days + 5)).date()
+        )
+        end = str((pd.Timestamp(to_date) + pd.Timedelta(days=1)).date())
+        key = PanelKey.build(
+            db=self.db_path,
+            table="ohlcv",
+            symbols=symbols,
+            from_date=start,
+            to_date=end,
+            fields=costs_lib.MARKET_FIELDS,
+        )
+
+        def load() -> Panel:
+            conn = duck_connect(
+                Path(self.db_path) if isinstance(self.db_path, str) else self.db_path,
+                read_only=True,
+            )
+            try:
+                return load_ohlcv_panel(
+                    conn,
+                    symbols=symbols,
+                    from_date=start,
+                    to_date=end,
+                    fields=costs_lib.MARKET_FIELDS,
+                )
+            finally:
+                conn.close()
+
+        return cached_panel(key, load)
+
+    def _market_for(
+        self,
+        cost_model: costs_lib.CostModel,
+        symbols: list[str],
+        from_date: str,
+        to_date: str,
+    ) -> Panel | None:
+        if not cost_model.needs_market_data:
+            return None
+        return self.load_market_panel(
+            symbols, from_date, to_date, cost_model.lookback_days
+        )
+
+    def load_ohlcv_returns(
+        self, symbols: list[str], from_date: str, to_date: str
+    ) -> pd.DataFrame:
+        """Load OHLCV and calculate 1d returns for given symbols and range."""
+        panel = self.load_returns_panel(symbols, from_date, to_date)
+        if not len(panel.dates):
+            return pd.DataFrame()
+        return panel.to_frame("ret_1d")
 
     def load_targets(
         self, strategy_id: str, from_date: str, to_date: str
@@ -80,15 +192,30 @@ class BacktestEngine:
         finally:
             conn.close()
 
-    def run(self, strategy_config: dict[str, Any], from_date: str, to_date: str):
+    def run(
+        self,
+        strategy_config: dict[str, Any],
+        from_date: str,
+        to_date: str,
+        returns: Panel | None = None,
+        targets: pd.DataFrame | None = None,
+    ):
         """
         Run backtest simulation with Hold Policy.
+
+        `returns` may carry a preloaded 'ret_1d' panel (shared across strategies);
+        otherwise it is loaded from ohlcv. `targets` may carry audited targets
+        straight from the recommender / supervisor (asof or study_date,
+        symbol, weight, score, approved) instead of reading the targets table.
         """
         strategy_id = strategy_config["strategy_id"]
         version = strategy_config["version"]
 
         # 1. Load targets
-        df_targets = self.load_targets(strategy_id, from_date, to_date)
+        if targets is None:
+            df_targets = self.load_targets(strategy_id, from_date, to_date)
+        else:
+            df_targets = targets_frame(targets, from_date, to_date)
         if df_targets.empty:
             raise ValueError(
                 f"No approved targets found for {strategy_id} in range {from_date} ~ {to_date}"
@@ -96,241 +223,748 @@ class BacktestEngine:
 
         symbols = df_targets["symbol"].unique().tolist()
 
-        # 2. Load returns
-        df_returns = self.load_ohlcv_returns(symbols, from_date, to_date)
-        if df_returns.empty:
+        # 2. Load returns (date x symbol, float32)
+        if returns is None:
+            returns = self.load_returns_panel(symbols, from_date, to_date)
+        if not len(returns.dates):
             logger.warning("No price data found for the given range.")
             return None
 
-        all_dates = sorted(df_returns.index)
-        simulation_dates = [
-            d
-            for d in all_dates
-            if pd.Timestamp(from_date) <= d <= pd.Timestamp(to_date)
-        ]
-
-        bt_config = strategy_config.get("backtest", {})
-        fee_bps = bt_config.get("fee_bps", 0) / 10000.0
-        slippage_bps = bt_config.get("slippage_bps", 0) / 10000.0
-        total_cost_bps = fee_bps + slippage_bps
-
-        current_weights = pd.Series(0.0, index=symbols)
-        ledger = []
-
-        for t in simulation_dates:
-            target_df = df_targets[df_targets["ts"] == t]
-
-            # Rebalancing check (T Close)
-            if not target_df.empty:
-                # Update weights based on T targets
-                new_weights = target_df.set_index("symbol")["weight"]
-                new_weights = new_weights.reindex(symbols, fill_value=0.0)
-
-                # Rebalance cost: (new - current).abs().sum()
-                turnover = (new_weights - current_weights).abs().sum()
-                turnover * total_cost_bps
-                current_weights = new_weights
-            else:
-                # [Hold Policy] No targets for T, keep current_weights as set at T-1
-                pass
-
-            # PnL for today (T) matches current_weights (which includes rebal at T Close)
-            # wait, semantic check:
-            # Rebalance at T Close.
-            # PnL for T comes from weights set at T-1.
-            # In our loop, 'current_weights' is updated BEFORE PnL calculation if T has targets.
-            # Correct logic: PnL(T) = Weights(T-1) * Return(T).
-            # Then Rebalance at T Close affects PnL(T+1).
-
-            # Let's adjust: Calculate PnL with OLD weights first, then update weights.
-            # But the 'ledger' stores weights active DURING the day.
-            # Let's use 'prev_weights' for PnL.
-            pass  # We will use a more robust day-step below.
-
-        # Refined Loop
-        current_weights = pd.Series(0.0, index=symbols)
-        ledger = []
-        for t in simulation_dates:
-            # 1. PnL for day T (using weights from T-1)
-            day_returns = (
-                df_returns.loc[t]
-                if t in df_returns.index
-                else pd.Series(0.0, index=symbols)
-            )
-            (current_weights * day_returns).sum()
-
-            # 2. Rebalance at T Close (affects T+1)
-            target_df = df_targets[df_targets["ts"] == t]
-            rebal_cost = 0.0
-            if not target_df.empty:
-                new_weights = target_df.set_index("symbol")["weight"].reindex(
-                    symbols, fill_value=0.0
+        fee_bps, slippage_bps = _cost_bps(strategy_config)
+        cost_model = costs_lib.build_cost_model(strategy_config)
+        ledger, daily, final_w = self._simulate(
+            returns,
+            df_targets,
+            symbols,
+            from_date,
+            to_date,
+            cost_model,
+            market=self._market_for(cost_model, symbols, from_date, to_date),
+        )
+        return self.save_results(
+            strategy_id,
+            version,
+            ledger,
+            from_date,
+            to_date,
+            fee_bps,
+            slippage_bps,
+            daily=daily,
+            weights=dict(zip(symbols, final_w.tolist(), strict=True)),
+        )
+
+    def run_many(
+        self,
+        strategy_configs: list[dict[str, Any]],
+        from_date: str,
+        to_date: str,
+    ) -> dict[str, dict[str, Any] | None]:
+        """Backtest several strategies against one shared returns panel.
+
+        Targets are read in one query, the union of their symbols' returns is
+        loaded once, and each strategy's weight matrix is simulated against
+        it. All runs are written in a single transaction and share a
+        `batch_id` in backtest_summary. Returns {strategy_id: run() result},
+        None for strategies without approved targets in range.
+        """
+        ids = [c["strategy_id"] for c in strategy_configs]
+        targets = self.load_targets_many(ids, from_date, to_date)
+        results: dict[str, dict[str, Any] | None] = dict.fromkeys(ids)
+        runnable = [c for c in strategy_configs if c["strategy_id"] in targets]
+        for sid in ids:
+            if sid not in targets:
+                logger.warning(
+                    "No approved targets for %s in %s ~ %s", sid, from_date, to_date
                 )
-                turnover = (new_weights - current_weights).abs().sum()
-                rebal_cost = turnover * total_cost_bps
-                current_weights = new_weights
-
-            # 3. Record to Ledger (Position after rebalance, PnL using prev weights)
-            # Actually, per user: "리밸런싱은 T close에서 수행하고 PnL은 T+1 close 수익부터 반영"
-            # This confirms: Day T PnL uses Weights available UNTIL Day T Close.
-            # We records weights as of T (post-rebalance) and pnl contribution.
-
-            # For simplicity in Ledger: sum(contribution) = day_pnl
-            # Let's attribute day_pnl_raw to the active symbols.
-            current_weights.index[
-                current_weights > 0
-            ]  # This is not right if we rebalanced.
-
-            # Let's follow a cleaner "End of Day" snapshot:
-            # Day T:
-            # - Start with weights W_{T-1}
-            # - Asset return R_{T}
-            # - PnL_{T} = W_{T-1} * R_{T} - RebalanceCost_{T} (if any)
-            # - Update to W_{T}
-
-            # Let's re-save 'prev_weights'
-            # (First day will have 0 PnL/0 Cost unless it updates weights)
-            pass
-
-        # FINAL IMPLEMENTATION OF LOOP
-        current_weights = pd.Series(0.0, index=symbols)
-        ledger = []
-        for t in simulation_dates:
-            # T's 1d returns
-            day_returns = (
-                df_returns.loc[t]
-                if t in df_returns.index
-                else pd.Series(0.0, index=symbols)
-            )
+        if not runnable:
+            return results
 
-            # T's PnL CONTRIBUTION (from T-1 weights)
-            day_pnl_from_assets = (current_weights * day_returns).sum()
+        universe = sorted({s for df in targets.values() for s in df["symbol"]})
+        returns = self.load_returns_panel(universe, from_date, to_date)
+        if not len(returns.dates):
+            logger.warning("No price data found for the given range.")
+            return results
+
+        models = {c["strategy_id"]: costs_lib.build_cost_model(c) for c in runnable}
+        lookback = [m.lookback_days for m in models.values() if m.needs_market_data]
+        market = (
+            self.load_market_panel(universe, from_date, to_date, max(lookback))
+            if lookback
+            else None
+        )
 
-            # T Close Rebalancing
-            target_df = df_targets[df_targets["ts"] == t]
-            rebal_cost = 0.0
-            if not target_df.empty:
-                new_weights = target_df.set_index("symbol")["weight"].reindex(
-                    symbols, fill_value=0.0
-                )
-                turnover = (new_weights - current_weights).abs().sum()
-                rebal_cost = turnover * total_cost_bps
-                current_weights = new_weights
-
-            # Total PnL for T
-            total_day_pnl = day_pnl_from_assets - rebal_cost
-
-            # Ledger: Record current_weights (post-rebal) and total contribution
-            # We split total_day_pnl across active symbols for visibility
-            active_syms = current_weights[current_weights > 0].index.tolist()
-            if active_syms:
-                pnl_per_sym = total_day_pnl / len(active_syms)
-                for sym in active_syms:
-                    ledger.append(
-                        {
-                            "ts": t,
-                            "symbol": sym,
-                            "weight": float(current_weights[sym]),
-                            "contribution": float(pnl_per_sym),
-                            "cost": float(rebal_cost / len(active_syms)),
-                        }
-                    )
-            elif rebal_cost > 0:
-                ledger.append(
-                    {
-                        "ts": t,
-                        "symbol": "COST",
-                        "weight": 0.0,
-                        "contribution": -float(rebal_cost),
-                        "cost": float(rebal_cost),
-                    }
+        simulated = []
+        for config in runnable:
+            df_targets = targets[config["strategy_id"]]
+            symbols = df_targets["symbol"].unique().tolist()
+            fee_bps, slippage_bps = _cost_bps(config)
+            cost_model = models[config["strategy_id"]]
+            ledger, daily, final_w = self._simulate(
+                returns,
+                df_targets,
+                symbols,
+                from_date,
+                to_date,
+                cost_model,
+                market=market if cost_model.needs_market_data else None,
+            )
+            weights = dict(zip(symbols, final_w.tolist(), strict=True))
+            simulated.append((config, (fee_bps, slippage_bps), ledger, daily, weights))
+
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        batch_id = f"btb_{stamp}"
+        conn = duck_connect(
+            Path(self.db_path) if isinstance(self.db_path, str) else self.db_path
+        )
+        try:
+            conn.execute("BEGIN TRANSACTION")
+            for i, (config, costs, ledger, daily, weights) in enumerate(simulated, 1):
+                results[config["strategy_id"]] = self.save_results(
+                    config["strategy_id"],
+                    config["version"],
+                    ledger,
+                    from_date,
+                    to_date,
+                    *costs,
+                    daily=daily,
+                    weights=weights,
+                    conn=conn,
+                    run_id=f"bt_{stamp}_{i:02d}",
+                    batch_id=batch_id,
                 )
-            else:
-                # Cash day
-                ledger.append(
-                    {
-                        "ts": t,
-                        "symbol": "CASH",
-                        "weight": 0.0,
-                        "contribution": 0.0,
-                        "cost": 0.0,
-                    }
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return results
+
+    def load_targets_many(
+        self, strategy_ids: list[str], from_date: str, to_date: str
+    ) -> dict[str, pd.DataFrame]:
+        """Approved targets of several strategies in one query, by strategy."""
+        if not strategy_ids:
+            return {}
+        conn = duck_connect(
+            Path(self.db_path) if isinstance(self.db_path, str) else self.db_path,
+            read_only=True,
+        )
+        try:
+            marks = ", ".join("?" for _ in strategy_ids)
+            df = conn.execute(
+                f"""
+                SELECT strategy_id, study_date as ts, symbol, weight, score
+                FROM targets
+                WHERE strategy_id IN ({marks})
+                  AND approved = True
+                  AND study_date >= CAST(? AS DATE)
+                  AND study_date <= CAST(? AS DATE)
+                ORDER BY strategy_id, study_date
+                """,
+                [*strategy_ids, from_date, to_date],
+            ).df()
+        finally:
+            conn.close()
+        if df.empty:
+            return {}
+        df["ts"] = pd.to_datetime(df["ts"])
+        return {
+            str(sid): g.drop(columns="strategy_id").reset_index(drop=True)
+            for sid, g in df.groupby("strategy_id", sort=False)
+        }
+
+    def resume(
+        self,
+        strategy_config: dict[str, Any],
+        to_date: str,
+        run_id: str | None = None,
+    ) -> dict[str, Any] | None:
+        """Extend a saved run to `to_date` from its `backtest_state`.
+
+        Only the days after the state's last_ts are simulated, starting from
+        the saved weights; ledger and equity curve rows are appended and the
+        run's `backtest_summary` row is updated in place. `run_id` defaults
+        to the strategy's most recently updated run. Returns the same dict as
+        `run()` plus `n_new_days` (None when the run has no state).
+        """
+        strategy_id = strategy_config["strategy_id"]
+        saved = self.load_state(strategy_id, run_id)
+        if saved is None:
+            return None
+        run_id = saved["run_id"]
+        state: metrics_lib.MetricsState = saved["state"]
+        first_ts, last_ts = saved["first_ts"], saved["last_ts"]
+
+        from_date = str((pd.Timestamp(last_ts) + pd.Timedelta(days=1)).date())
+        if pd.Timestamp(from_date) > pd.Timestamp(to_date):
+            m = state.metrics(_span_days(first_ts, last_ts))
+            return {"run_id": run_id, **_result(m), "n_new_days": 0}
+        df_targets = self.load_targets(strategy_id, from_date, to_date)
+        held = saved["weights"]
+        symbols = [*held, *(s for s in df_targets["symbol"].unique() if s not in held)]
+        start_w = np.array([held.get(s, 0.0) for s in symbols])
+
+        ledger = None
+        if not df_targets.empty or start_w.any():
+            returns = self.load_returns_panel(symbols, from_date, to_date)
+            if len(returns.dates):
+                cost_model = costs_lib.build_cost_model(strategy_config)
+                ledger, daily, final_w = self._simulate(
+                    returns,
+                    df_targets,
+                    symbols,
+                    from_date,
+                    to_date,
+                    cost_model,
+                    market=self._market_for(cost_model, symbols, from_date, to_date),
+                    start_weights=start_w,
                 )
+        if ledger is None or ledger.num_rows == 0:
+            # Nothing new. Flat days without targets are left for the next
+            # resume (simulated once the run trades again)
+            m = state.metrics(_span_days(first_ts, last_ts))
+            return {"run_id": run_id, **_result(m), "n_new_days": 0}
+
+        curve = state.update(
+            daily["daily_return"].to_numpy(),
+            turnover=daily["turnover"].to_numpy(),
+            rebalance=daily["rebalance"].to_numpy(),
+            exposure=daily["exposure"].to_numpy(),
+        )
+        last_ts = daily["ts"].iloc[-1]
+        m = state.metrics(_span_days(first_ts, last_ts))
+        conn = duck_connect(
+            Path(self.db_path) if isinstance(self.db_path, str) else self.db_path
+        )
+        try:
+            # One transaction: a failed write must not leave appended rows
+            # behind for the retry (resumed from the old state) to duplicate
+            conn.execute("BEGIN TRANSACTION")
+            self._insert_rows(conn, run_id, strategy_id, ledger, daily["ts"], curve)
+            conn.execute(
+                """
+                UPDATE backtest_summary SET
+                    to_ts = CAST(? AS DATE), cagr = ?, sharpe = ?, max_dd = ?,
+                    vol = ?, mean_daily_return = ?, std_daily_return = ?,
+                    turnover = ?, win_rate = ?, avg_trade = ?, num_trades = ?,
+                    n_days = ?
+                WHERE run_id = ?
+                """,
+                [
+                    to_date,
+                    m.cagr,
+                    m.sharpe,
+                    m.max_dd,
+                    m.vol,
+                    m.mean_daily_return,
+                    m.std_daily_return,
+                    m.turnover,
+                    m.win_rate,
+                    m.avg_trade,
+                    m.num_trades,
+                    m.n_days,
+                    run_id,
+                ],
+            )
+            self._write_state(
+                conn,
+                run_id,
+                strategy_id,
+                first_ts,
+                last_ts,
+                dict(zip(symbols, final_w.tolist(), strict=True)),
+                state,
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return {"run_id": run_id, **_result(m), "n_new_days": len(daily)}
 
-        return self.save_results(
-            strategy_id, version, ledger, from_date, to_date, fee_bps, slippage_bps
+    def _simulate(
+        self,
+        returns: Panel,
+        df_targets: pd.DataFrame,
+        symbols: list[str],
+        from_date: str,
+        to_date: str,
+        cost_model: costs_lib.CostModel,
+        market: Panel | None = None,
+        start_weights: np.ndarray | None = None,
+    ) -> tuple[pa.Table, pd.DataFrame, np.ndarray]:
+        """Simulate [from_date, to_date]; (ledger, per-day frame, last weights).
+
+        `cost_model` prices the (dates x symbols) trade matrix, reading
+        `market` (load_market_panel) when it needs ohlcv. `start_weights` are
+        the weights held coming into from_date (resume); a fresh run starts
+        in cash.
+        """
+        returns = returns.reindex(symbols=symbols)
+        ret = np.nan_to_num(returns["ret_1d"], nan=0.0, posinf=0.0, neginf=0.0)
+
+        day_mask = (returns.dates >= np.datetime64(from_date, "D")) & (
+            returns.dates <= np.datetime64(to_date, "D")
+        )
+        simulation_days = np.flatnonzero(day_mask)
+
+        # Target weights on rebalance dates (date x symbol, 0 where not targeted)
+        if df_targets.empty:
+            target_w = np.zeros((0, len(symbols)))
+            target_row: dict = {}
+        else:
+            weights = Panel.from_long(df_targets, value_col="weight", symbols=symbols)
+            target_w = np.nan_to_num(weights["weight"], nan=0.0).astype(np.float64)
+            target_row = {d: i for i, d in enumerate(weights.dates)}
+        start_w = (
+            np.zeros(len(symbols))
+            if start_weights is None
+            else np.asarray(start_weights, dtype=np.float64)
+        )
+
+        # Day T:
+        # - Start with weights W_{T-1}
+        # - Asset return R_{T}
+        # - PnL_{T} = W_{T-1} * R_{T} - RebalanceCost_{T} (if any)
+        # - Update to W_{T} at T Close (Hold policy when T has no targets)
+        sim_dates = returns.dates[simulation_days]
+        sim_ret = ret[simulation_days].astype(np.float64)
+        rebal_row = np.array([target_row.get(d, -1) for d in sim_dates], dtype=np.int64)
+        rebal = rebal_row >= 0
+        # Post-rebalance weights: last target row carried forward (Hold),
+        # start weights before the first rebalance
+        held_row = np.maximum.accumulate(np.where(rebal, rebal_row, -1))
+        if len(target_w):
+            w_post = np.where(
+                (held_row >= 0)[:, None], target_w[np.maximum(held_row, 0)], start_w
+            )
+        else:
+            w_post = np.tile(start_w, (len(sim_dates), 1))
+        w_prev = np.vstack([start_w[None, :], w_post])[:-1]
+
+        # Per-symbol attribution: W_{T-1} * R_T and the symbol's own trade cost
+        trade = np.abs(w_post - w_prev) * rebal[:, None]
+        if market is not None:
+            market = market.reindex(symbols=symbols)
+        cost = cost_model.cost(trade, sim_dates, market)
+        contrib = w_prev * sim_ret - cost
+        day_ret = contrib.sum(axis=1)
+
+        ledger = self._ledger_table(sim_dates, symbols, w_prev, w_post, contrib, cost)
+        daily = pd.DataFrame(
+            {
+                "ts": pd.to_datetime(sim_dates),
+                "daily_return": day_ret,
+                "turnover": trade.sum(axis=1),
+                "exposure": np.abs(w_prev).sum(axis=1),
+                "rebalance": rebal,
+                "cost": cost.sum(axis=1),
+            }
+        )
+        final_w = w_post[-1] if len(w_post) else start_w
+        return ledger, daily, final_w
+
+    @staticmethod
+    def _ledger_table(
+        dates: np.ndarray,
+        symbols: list[str],
+        w_prev: np.ndarray,
+        w_post: np.ndarray,
+        contrib: np.ndarray,
+        cost: np.ndarray,
+    ) -> pa.Table:
+        """Columnar daily ledger (one row per held / traded symbol per day).
+
+        weight is the post-rebalance weight, contribution the symbol's
+        W_{T-1} * R_T net of its own cost, so contributions sum to the day's
+        PnL. Days with no position get a single CASH row.
+        """
+        day_idx, sym_idx = np.nonzero((w_prev != 0) | (w_post != 0) | (cost > 0))
+        cash = np.setdiff1d(np.arange(len(dates)), day_idx)
+        n_sym = len(symbols)
+        day_idx = np.concatenate([day_idx, cash])
+        sym_code = np.concatenate([sym_idx, np.full(len(cash), n_sym)])
+        order = np.argsort(day_idx, kind="stable")
+        day_idx, sym_code = day_idx[order], sym_code[order]
+        held = sym_code < n_sym
+        pick = (day_idx[held], sym_code[held])
+
+        def column(values: np.ndarray) -> np.ndarray:
+            out = np.zeros(len(day_idx))
+            out[held] = values[pick]
+            return out
+
+        return pa.table(
+            {
+                "ts": pa.array(dates[day_idx].astype("datetime64[D]")),
+                "symbol": pa.DictionaryArray.from_arrays(
+                    pa.array(sym_code.astype(np.int32)),
+                    pa.array([*symbols, "CASH"]),
+                ),
+                "weight": column(w_post),
+                "contribution": column(contrib),
+                "cost": column(cost),
+            }
         )
 
     def save_results(
         self,
         strategy_id: str,
         _version: str,
-        ledger: list[dict],
+        ledger: pa.Table | list[dict],
         from_ts: str,
         to_ts: str,
-        _fee_bps: float,
-        _slippage_bps: float,
+        fee_bps: float,
+        slippage_bps: float,
+        daily: pd.DataFrame | None = None,
+        weights: dict[str, float] | None = None,
+        *,
+        conn=None,
+        run_id: str | None = None,
+        batch_id: str | None = None,
     ):
-        if not ledger:
+        """Persist summary, ledger, equity curve and resume state of one run.
+
+        `ledger` is the columnar ledger (ts, symbol, weight, contribution,
+        cost); row dicts are accepted too. `daily` holds the engine's per-day
+        arrays (ts, daily_return, turnover, exposure, rebalance, cost); without it
+        returns are summed from the ledger and turnover / trade metrics are
+        left at 0. `weights` are the holdings after the last day; without
+        them no `backtest_state` is written (the run cannot be resumed).
+        A caller-owned `conn` (run_many's transaction) is used and left open.
+        """
+        if isinstance(ledger, list):
+            ledger = pa.Table.from_pylist(ledger)
+        if ledger.num_rows == 0:
             return None
-        df_ledger = pd.DataFrame(ledger)
-        # ensure ts is datetime and contributions are numeric to avoid type errors
-        df_ledger["ts"] = pd.to_datetime(df_ledger["ts"])
-        daily_pnl = df_ledger.groupby("ts")["contribution"].sum()
-        daily_pnl = pd.to_numeric(daily_pnl, errors="coerce").fillna(0.0)
-
-        n_days = len(daily_pnl)
-        mean_ret = daily_pnl.mean()
-        std_ret = daily_pnl.std()
-        annual_factor = 252.0
-
-        # CAGR
-        cum_ret = (1.0 + daily_pnl).prod() - 1.0  # type: ignore
-        # ensure index is datetime for span calculation
-        if not pd.api.types.is_datetime64_any_dtype(daily_pnl.index):
-            daily_pnl.index = pd.to_datetime(daily_pnl.index)
-        span = (daily_pnl.index[-1] - daily_pnl.index[0]).days + 1
-        cagr = (1.0 + cum_ret) ** (365.0 / span) - 1.0 if span > 0 else 0.0
-
-        # [P5 Refinement] Sharpe Safety
-        if n_days < 2 or std_ret == 0 or np.isnan(std_ret):
-            sharpe = 0.0
-        else:
-            sharpe = (mean_ret / std_ret) * np.sqrt(annual_factor)
+        if daily is None:
+            pnl = (
+                ledger.group_by("ts")
+                .aggregate([("contribution", "sum")])
+                .to_pandas()
+                .sort_values("ts")
+            )
+            daily = pd.DataFrame(
+                {
+                    "ts": pd.to_datetime(pnl["ts"]).to_numpy(),
+                    "daily_return": pd.to_numeric(
+                        pnl["contribution_sum"], errors="coerce"
+                    )
+                    .fillna(0.0)
+                    .to_numpy(),
+                }
+            )
 
-        mdd = ((1 + daily_pnl).cumprod() / (1 + daily_pnl).cumprod().cummax() - 1).min()
+        def col(name: str) -> np.ndarray | None:
+            return daily[name].to_numpy() if name in daily.columns else None
 
-        run_id = f"bt_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        conn = duck_connect(
-            Path(self.db_path) if isinstance(self.db_path, str) else self.db_path
+        state = metrics_lib.MetricsState()
+        curve = state.update(
+            daily["daily_return"].to_numpy(dtype=np.float64),
+            turnover=col("turnover"),
+            rebalance=col("rebalance"),
+            exposure=col("exposure"),
         )
+        first_ts, last_ts = daily["ts"].iloc[0], daily["ts"].iloc[-1]
+        m = state.metrics(_span_days(first_ts, last_ts))
+
+        run_id = run_id or f"bt_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        own_conn = conn is None
+        if own_conn:
+            conn = duck_connect(
+                Path(self.db_path) if isinstance(self.db_path, str) else self.db_path
+            )
         try:
+            # DBs created before batch runs existed
             conn.execute(
-                f"""
-                INSERT INTO backtest_summary 
-                (run_id, strategy_id, from_ts, to_ts, cagr, sharpe, max_dd, vol, 
-                 mean_daily_return, std_daily_return, annual_factor, n_days, created_at)
-                VALUES (
-                    '{run_id}', '{strategy_id}', DATE '{from_ts}', DATE '{to_ts}',
-                    {cagr}, {sharpe}, {mdd}, {std_ret * np.sqrt(annual_factor) if not np.isnan(std_ret) else 0.0},
-                    {mean_ret if not np.isnan(mean_ret) else 0.0}, {std_ret if not np.isnan(std_ret) else 0.0},
-                    {annual_factor}, {n_days}, now()
+                "ALTER TABLE backtest_summary ADD COLUMN IF NOT EXISTS batch_id TEXT"
+            )
+            # A summary row without its curve/state would trip resume and
+            # bootstrap; run_many's caller-owned conn is already in a transaction
+            if own_conn:
+                conn.execute("BEGIN TRANSACTION")
+            try:
+                conn.execute(
+                    """
+                    INSERT INTO backtest_summary
+                    (run_id, strategy_id, from_ts, to_ts, cagr, sharpe, max_dd, vol,
+                     mean_daily_return, std_daily_return, annual_factor, turnover,
+                     win_rate, avg_trade, num_trades, n_days, fee_bps, slippage_bps,
+                     created_at, batch_id)
+                    VALUES (?, ?, CAST(? AS DATE), CAST(? AS DATE), ?, ?, ?, ?, ?, ?,
+                            ?, ?, ?, ?, ?, ?, ?, ?, now(), ?)
+                    """,
+                    [
+                        run_id,
+                        strategy_id,
+                        from_ts,
+                        to_ts,
+                        m.cagr,
+                        m.sharpe,
+                        m.max_dd,
+                        m.vol,
+                        m.mean_daily_return,
+                        m.std_daily_return,
+                        m.annual_factor,
+                        m.turnover,
+                        m.win_rate,
+                        m.avg_trade,
+                        m.num_trades,
+                        m.n_days,
+                        fee_bps * 10000.0,
+                        slippage_bps * 10000.0,
+                        batch_id,
+                    ],
+                )
+                self._insert_rows(conn, run_id, strategy_id, ledger, daily["ts"], curve)
+                if weights is not None:
+                    self._write_state(
+                        conn, run_id, strategy_id, first_ts, last_ts, weights, state
+                    )
+                if own_conn:
+                    conn.execute("COMMIT")
+            except Exception:
+                if own_conn:
+                    conn.execute("ROLLBACK")
+                raise
+            result = {"run_id": run_id, "strategy_id": strategy_id, **_result(m)}
+            if "cost" in daily.columns and m.n_days:
+                # Annualized cost drag (fraction of NAV per year)
+                result["cost_drag"] = float(
+                    daily["cost"].sum() * m.annual_factor / m.n_days
                 )
+            return result
+        finally:
+            if own_conn:
+                conn.close()
+
+    @staticmethod
+    def _insert_rows(
+        conn,
+        run_id: str,
+        strategy_id: str,
+        ledger: pa.Table,
+        ts: pd.Series,
+        curve: dict[str, np.ndarray],
+    ) -> None:
+        """Append ledger rows and equity curve rows of `run_id`."""
+        # Arrow scan: no per-row Python objects between the engine and DuckDB
+        conn.register("ledger_tmp", ledger)
+        conn.execute(
             """
+            INSERT INTO backtest_trades
+            (run_id, strategy_id, symbol, entry_ts, qty, pnl_pct, fees, reason)
+            SELECT ?, ?, CAST(symbol AS TEXT), CAST(ts AS DATE), weight,
+                   contribution, cost, 'daily_ledger'
+            FROM ledger_tmp
+            """,
+            [run_id, strategy_id],
+        )
+        # DBs created before the table existed
+        conn.execute(table_ddl("backtest_equity_curve"))
+        df_curve = pd.DataFrame({"ts": ts.dt.date.to_numpy(), **curve})
+        conn.register("df_curve_tmp", df_curve)
+        conn.execute(
+            """
+            INSERT INTO backtest_equity_curve
+            SELECT ?, ts, daily_return, equity, drawdown, underwater_days,
+                   rolling_sharpe, rolling_vol
+            FROM df_curve_tmp
+            """,
+            [run_id],
+        )
+
+    @staticmethod
+    def _write_state(
+        conn,
+        run_id: str,
+        strategy_id: str,
+        first_ts,
+        last_ts,
+        weights: dict[str, float],
+        state: metrics_lib.MetricsState,
+    ) -> None:
+        conn.execute(table_ddl("backtest_state"))
+        held = {s: w for s, w in weights.items() if w != 0}
+        fields = state.as_dict()
+        cols = ", ".join(fields)
+        marks = ", ".join("?" for _ in fields)
+        conn.execute(
+            f"""
+            INSERT OR REPLACE INTO backtest_state
+            (run_id, strategy_id, first_ts, last_ts, symbols, weights, {cols},
+             updated_at)
+            VALUES (?, ?, CAST(? AS DATE), CAST(? AS DATE), ?, ?, {marks}, now())
+            """,
+            [
+                run_id,
+                strategy_id,
+                str(pd.Timestamp(first_ts).date()),
+                str(pd.Timestamp(last_ts).date()),
+                list(held),
+                list(held.values()),
+                *fields.values(),
+            ],
+        )
+
+    def load_state(
+        self, strategy_id: str, run_id: str | None = None
+    ) -> dict[str, Any] | None:
+        """Saved resume point of `run_id` (default: strategy's latest run)."""
+        conn = duck_connect(
+            Path(self.db_path) if isinstance(self.db_path, str) else self.db_path,
+            read_only=True,
+        )
+        try:
+            if object_type(conn, "backtest_state") is None:
+                return None
+            query = "SELECT * FROM backtest_state WHERE strategy_id = ?"
+            params = [strategy_id]
+            if run_id:
+                query += " AND run_id = ?"
+                params.append(run_id)
+            df = conn.execute(query + " ORDER BY updated_at DESC LIMIT 1", params).df()
+        finally:
+            conn.close()
+        if df.empty:
+            return None
+        row = df.iloc[0]
+        names = metrics_lib.MetricsState.__dataclass_fields__
+        kwargs = {k: row[k] for k in names}
+        kwargs["ret_tail"] = [float(x) for x in kwargs["ret_tail"]]
+        kwargs["open_exposed"] = bool(kwargs["open_exposed"])
+        for k in ("n_days", "underwater_days", "max_underwater_days", "n_trades"):
+            kwargs[k] = int(kwargs[k])
+        kwargs["n_wins"] = int(kwargs["n_wins"])
+        return {
+            "run_id": str(row["run_id"]),
+            "first_ts": pd.Timestamp(row["first_ts"]),
+            "last_ts": pd.Timestamp(row["last_ts"]),
+            "weights": dict(
+                zip(row["symbols"], map(float, row["weights"]), strict=True)
+            ),
+            "state": metrics_lib.MetricsState(**kwargs),
+        }
+
+    def bootstrap(
+        self,
+        run_id: str,
+        n_samples: int = 1000,
+        *,
+        mean_block: float | None = None,
+        confidence: float = 0.95,
+        seed: int | None = None,
+    ) -> dict[str, dict[str, float]]:
+        """Bootstrap CIs of a saved run's Sharpe / CAGR / MDD.
+
+        Resamples the run's persisted daily returns (backtest_equity_curve)
+        and replaces its rows in `backtest_bootstrap`. Returns
+        {metric: {point, ci_low, ci_high, mean, std}}.
+        """
+        db = Path(self.db_path) if isinstance(self.db_path, str) else self.db_path
+        conn = duck_connect(db)
+        try:
+            curve = conn.execute(
+                """
+                SELECT ts, daily_return FROM backtest_equity_curve
+                WHERE run_id = ? ORDER BY ts
+                """,
+                [run_id],
+            ).df()
+            summary = conn.execute(
+                "SELECT sharpe, cagr, max_dd FROM backtest_summary WHERE run_id = ?",
+                [run_id],
+            ).df()
+            if curve.empty or summary.empty:
+                raise ValueError(f"No equity curve / summary for run {run_id}")
+
+            block = mean_block or bootstrap_lib.default_block_length(len(curve))
+            samples = bootstrap_lib.bootstrap_metrics(
+                curve["daily_return"].to_numpy(),
+                n_samples,
+                mean_block=block,
+                span_days=_span_days(curve["ts"].iloc[0], curve["ts"].iloc[-1]),
+                seed=seed,
             )
-            df_ledger["ts"] = pd.to_datetime(df_ledger["ts"])
-            conn.register("df_ledger_tmp", df_ledger)
-            conn.execute(
-                f"INSERT INTO backtest_trades (run_id, strategy_id, symbol, entry_ts, qty, pnl_pct, reason) SELECT '{run_id}', '{strategy_id}', symbol, ts, weight, contribution, 'daily_ledger' FROM df_ledger_tmp"
-            )
-            return {
-                "run_id": run_id,
-                "cagr": cagr,
-                "sharpe": sharpe,
-                "max_dd": mdd,
-                "mean": mean_ret,
-                "std": std_ret,
-                "n_days": n_days,
+            intervals = bootstrap_lib.confidence_intervals(samples, confidence)
+            result: dict[str, dict[str, float]] = {
+                metric: {"point": float(summary[metric].iloc[0]), **ci}
+                for metric, ci in intervals.items()
             }
+            rows = [
+                {
+                    "run_id": run_id,
+                    "metric": metric,
+                    **values,
+                    "confidence": confidence,
+                    "n_samples": n_samples,
+                    "mean_block": float(block),
+                    "seed": seed,
+                }
+                for metric, values in result.items()
+            ]
+            conn.execute(table_ddl("backtest_bootstrap"))
+            conn.execute("BEGIN TRANSACTION")
+            try:
+                conn.execute(
+                    "DELETE FROM backtest_bootstrap WHERE run_id = ?", [run_id]
+                )
+                if rows:
+                    conn.register("df_boot_tmp", pd.DataFrame(rows))
+                    conn.execute(
+                        """
+                        INSERT INTO backtest_bootstrap
+                        SELECT run_id, metric, point, ci_low, ci_high, mean, std,
+                               confidence, n_samples, mean_block, seed, now()
+                        FROM df_boot_tmp
+                        """
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
         finally:
             conn.close()
+        return result
+
+
+def targets_frame(df: pd.DataFrame, from_date: str, to_date: str) -> pd.DataFrame:
+    """In-memory targets in load_targets() shape (ts, symbol, weight, score).
+
+    Mirrors the targets-table query: approved rows (all rows when there is
+    no `approved` column) with the date in [from_date, to_date].
+    """
+    date_col = next((c for c in ("study_date", "asof", "ts") if c in df.columns), None)
+    if df.empty or date_col is None:
+        return pd.DataFrame(columns=["ts", "symbol", "weight", "score"])
+    ts = pd.to_datetime(df[date_col]).dt.normalize()
+    mask = (ts >= pd.Timestamp(from_date)) & (ts <= pd.Timestamp(to_date))
+    if "approved" in df.columns:
+        mask &= df["approved"].astype(bool)
+    out = pd.DataFrame(
+        {
+            "ts": ts[mask],
+            "symbol": df.loc[mask, "symbol"].astype(str),
+            "weight": df.loc[mask, "weight"].astype(float),
+            "score": df.loc[mask, "score"] if "score" in df.columns else np.nan,
+        }
+    )
+    return out.sort_values("ts", kind="stable").reset_index(drop=True)
+
+
+def _cost_bps(strategy_config: dict[str, Any]) -> tuple[float, float]:
+    """(fee, slippage) from the strategy's backtest block, as fractions."""
+    bt_config = strategy_config.get("backtest", {})
+    fee_bps = bt_config.get("fee_bps", 0) / 10000.0
+    slippage_bps = bt_config.get("slippage_bps", 0) / 10000.0
+    return fee_bps, slippage_bps
+
+
+def _span_days(first_ts, last_ts) -> int:
+    return (pd.Timestamp(last_ts) - pd.Timestamp(first_ts)).days + 1
+
+
+def _result(m: metrics_lib.BacktestMetrics) -> dict[str, Any]:
+    return {**m.as_dict(), "mean": m.mean_daily_return, "std": m.std_daily_return}
@@ -0,0 +1,305 @@
+"""NumPy kernels for backtest performance metrics.
+
+Everything is computed from the daily portfolio return array the engine
+produces (plus optional per-day turnover / rebalance / exposure arrays), with
+one cumulative product and one running max shared by all drawdown figures:
+
+- `equity_curve()` -> equity, drawdown, underwater days, rolling Sharpe/vol
+  (the per-day series persisted to `backtest_equity_curve`)
+- `MetricsState` -> the `backtest_summary` scalars, accumulated day batch by
+  day batch (so a run can be resumed)
+- `compute_metrics()` -> the same for one whole return array
+
+Conventions: equity starts at 1.0 (the initial capital counts as a peak),
+std uses ddof=1, Sharpe is 0 when it is undefined (< 2 days or zero std).
+"""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, field
+
+import numpy as np
+
+ANNUAL_FACTOR = 252.0
+ROLLING_WINDOW = 63  # ~3 months of trading days
+_CURVE_KEYS = (
+    "daily_return",
+    "equity",
+    "drawdown",
+    "underwater_days",
+    "rolling_sharpe",
+    "rolling_vol",
+)
+
+
+@dataclass(frozen=True)
+class BacktestMetrics:
+    n_days: int
+    cagr: float
+    sharpe: float
+    max_dd: float
+    vol: float
+    mean_daily_return: float
+    std_daily_return: float
+    annual_factor: float
+    turnover: float
+    win_rate: float
+    avg_trade: float
+    num_trades: int
+    max_dd_duration: int
+    current_dd_duration: int
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def _as_returns(returns) -> np.ndarray:
+    r = np.asarray(returns, dtype=np.float64)
+    return np.nan_to_num(r, nan=0.0, posinf=0.0, neginf=0.0)
+
+
+def rolling_mean_std(
+    returns, window: int = ROLLING_WINDOW
+) -> tuple[np.ndarray, np.ndarray]:
+    """Trailing mean / std (ddof=1) over `window` days; NaN before it fills."""
+    r = _as_returns(returns)
+    n = len(r)
+    mean = np.full(n, np.nan)
+    std = np.full(n, np.nan)
+    if window < 2 or n < window:
+        return mean, std
+    c1 = np.concatenate(([0.0], np.cumsum(r)))
+    c2 = np.concatenate(([0.0], np.cumsum(r * r)))
+    s1 = c1[window:] - c1[:-window]
+    s2 = c2[window:] - c2[:-window]
+    var = (s2 - s1 * s1 / window) / (window - 1)
+    mean[window - 1 :] = s1 / window
+    # Cumsum differences can dip slightly below zero for flat windows
+    std[window - 1 :] = np.sqrt(np.clip(var, 0.0, None))
+    return mean, std
+
+
+def rolling_sharpe_vol(
+    returns, window: int = ROLLING_WINDOW, annual_factor: float = ANNUAL_FACTOR
+) -> tuple[np.ndarray, np.ndarray]:
+    """Annualized trailing Sharpe and volatility."""
+    mean, std = rolling_mean_std(returns, window)
+    scale = np.sqrt(annual_factor)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(std > 1e-12, mean / std * scale, np.nan)
+    return sharpe, std * scale
+
+
+def underwater_days(drawdown: np.ndarray) -> np.ndarray:
+    """Days since the last equity peak (0 on a new high)."""
+    dd = np.asarray(drawdown, dtype=np.float64)
+    idx = np.arange(len(dd))
+    # -1: the initial capital is the peak before day 0
+    last_peak = np.maximum.accumulate(np.where(dd >= 0.0, idx, -1))
+    return (idx - last_peak).astype(np.int64)
+
+
+def equity_curve(
+    returns, window: int = ROLLING_WINDOW, annual_factor: float = ANNUAL_FACTOR
+) -> dict[str, np.ndarray]:
+    """Per-day curve: equity, drawdown, underwater_days, rolling_sharpe/vol."""
+    r = _as_returns(returns)
+    equity = np.cumprod(1.0 + r)
+    peak = np.maximum.accumulate(np.maximum(equity, 1.0))
+    drawdown = equity / peak - 1.0
+    sharpe, vol = rolling_sharpe_vol(r, window, annual_factor)
+    return {
+        "daily_return": r,
+        "equity": equity,
+        "drawdown": drawdown,
+        "underwater_days": underwater_days(drawdown),
+        "rolling_sharpe": sharpe,
+        "rolling_vol": vol,
+    }
+
+
+def compute_metrics(
+    returns,
+    *,
+    span_days: int | None = None,
+    turnover=None,
+    rebalance=None,
+    exposure=None,
+    annual_factor: float = ANNUAL_FACTOR,
+) -> BacktestMetrics:
+    """Summary metrics for a daily portfolio return array.
+
+    A one-batch `MetricsState` run, so there is a single implementation of
+    the formulas.
+
+    span_days: calendar days covered (CAGR); defaults to n_days scaled by
+        365 / annual_factor.
+    turnover: one-way turnover per day; reported annualized.
+    rebalance / exposure: per-day flags / gross weights used to split the
+        series into holding periods for win_rate, avg_trade and num_trades.
+        Without rebalance flags every invested day is its own trade.
+    """
+    state = MetricsState()
+    state.update(
+        returns,
+        turnover=turnover,
+        rebalance=rebalance,
+        exposure=exposure,
+        annual_factor=annual_factor,
+    )
+    return state.metrics(span_days, annual_factor)
+
+
+@dataclass
+class MetricsState:
+    """Running accumulators for the summary metrics and `equity_curve` rows.
+
+    `update()` folds in new days and returns their curve rows, so a backtest
+    can be extended by appending days instead of re-simulating its history
+    (persisted per run in `backtest_state`). Returns are combined with
+    Chan's parallel mean/variance update; drawdown continues from the saved
+    equity and peak; rolling windows continue from the last `window - 1`
+    returns. Results match a full recomputation up to float rounding.
+    """
+
+    n_days: int = 0
+    mean_ret: float = 0.0
+    m2_ret: float = 0.0
+    equity: float = 1.0
+    peak: float = 1.0
+    max_dd: float = 0.0
+    underwater_days: int = 0
+    max_underwater_days: int = 0
+    turnover_sum: float = 0.0
+    n_trades: int = 0
+    n_wins: int = 0
+    trade_ret_sum: float = 0.0
+    # Holding period still open after the last day (log return, invested?)
+    open_log_ret: float = 0.0
+    open_exposed: bool = False
+    ret_tail: list[float] = field(default_factory=list)
+
+    def update(
+        self,
+        returns,
+        *,
+        turnover=None,
+        rebalance=None,
+        exposure=None,
+        window: int = ROLLING_WINDOW,
+        annual_factor: float = ANNUAL_FACTOR,
+    ) -> dict[str, np.ndarray]:
+        """Fold in new days; returns their `equity_curve()` rows."""
+        r = _as_returns(returns)
+        n = len(r)
+        if n == 0:
+            return {k: np.empty(0) for k in _CURVE_KEYS}
+
+        # Mean / variance (Chan et al. pairwise combination)
+        mean_b = float(r.mean())
+        m2_b = float(((r - mean_b) ** 2).sum())
+        total = self.n_days + n
+        delta = mean_b - self.mean_ret
+        self.mean_ret += delta * n / total
+        self.m2_ret += m2_b + delta * delta * self.n_days * n / total
+
+        # Equity / drawdown continue from the saved state
+        equity = self.equity * np.cumprod(1.0 + r)
+        peak = np.maximum.accumulate(np.maximum(equity, self.peak))
+        drawdown = equity / peak - 1.0
+        idx = np.arange(n)
+        last_peak = np.maximum.accumulate(
+            np.where(drawdown >= 0.0, idx, -1 - self.underwater_days)
+        )
+        underwater = (idx - last_peak).astype(np.int64)
+
+        tail = np.asarray(self.ret_tail, dtype=np.float64)
+        sharpe, vol = rolling_sharpe_vol(
+            np.concatenate([tail, r]), window, annual_factor
+        )
+
+        # Holding periods: a rebalance day closes the period it belongs to
+        invested = (
+            np.asarray(exposure, dtype=np.float64) > 0
+            if exposure is not None
+            else r != 0
+        )
+        reb = (
+            np.asarray(rebalance, dtype=bool)
+            if rebalance is not None
+            else np.ones(n, dtype=bool)
+        )
+        log_r = np.log1p(np.maximum(r, -0.999999))
+        period = np.concatenate(([0], np.cumsum(reb[:-1]))).astype(np.int64)
+        n_periods = int(period[-1]) + 1
+        p_log = np.bincount(period, weights=log_r, minlength=n_periods)
+        p_inv = np.bincount(period, weights=invested, minlength=n_periods) > 0
+        p_log[0] += self.open_log_ret
+        p_inv[0] |= self.open_exposed
+        closed = n_periods if reb[-1] else n_periods - 1
+        trades = np.expm1(p_log[:closed][p_inv[:closed]])
+        self.n_trades += len(trades)
+        self.n_wins += int((trades > 0).sum())
+        self.trade_ret_sum += float(trades.sum())
+        if reb[-1]:
+            self.open_log_ret, self.open_exposed = 0.0, False
+        else:
+            self.open_log_ret, self.open_exposed = float(p_log[-1]), bool(p_inv[-1])
+
+        self.n_days = total
+        self.equity = float(equity[-1])
+        self.peak = float(peak[-1])
+        self.max_dd = min(self.max_dd, float(drawdown.min()))
+        self.underwater_days = int(underwater[-1])
+        self.max_underwater_days = max(self.max_underwater_days, int(underwater.max()))
+        if turnover is not None:
+            self.turnover_sum += float(np.nansum(turnover))
+        self.ret_tail = np.concatenate([tail, r])[-(window - 1) :].tolist()
+        return {
+            "daily_return": r,
+            "equity": equity,
+            "drawdown": drawdown,
+            "underwater_days": underwater,
+            "rolling_sharpe": sharpe[len(tail) :],
+            "rolling_vol": vol[len(tail) :],
+        }
+
+    def metrics(
+        self, span_days: int | None = None, annual_factor: float = ANNUAL_FACTOR
+    ) -> BacktestMetrics:
+        """Summary metrics so far (an open holding period counts as a trade)."""
+        n = self.n_days
+        if n == 0:
+            return BacktestMetrics(
+                0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, annual_factor, 0.0, 0.0, 0.0, 0, 0, 0
+            )
+        std = float(np.sqrt(self.m2_ret / (n - 1))) if n > 1 else 0.0
+        sharpe = self.mean_ret / std * np.sqrt(annual_factor) if std > 0 else 0.0
+        span = span_days if span_days is not None else n * 365.0 / annual_factor
+        total = self.equity
+        cagr = total ** (365.0 / span) - 1.0 if span > 0 and total > 0 else -1.0
+        n_trades, n_wins, trade_sum = self.n_trades, self.n_wins, self.trade_ret_sum
+        if self.open_exposed:
+            open_ret = float(np.expm1(self.open_log_ret))
+            n_trades += 1
+            n_wins += int(open_ret > 0)
+            trade_sum += open_ret
+        return BacktestMetrics(
+            n_days=n,
+            cagr=float(cagr),
+            sharpe=float(sharpe),
+            max_dd=self.max_dd,
+            vol=std * float(np.sqrt(annual_factor)),
+            mean_daily_return=self.mean_ret,
+            std_daily_return=std,
+            annual_factor=float(annual_factor),
+            turnover=self.turnover_sum * annual_factor / n,
+            win_rate=n_wins / n_trades if n_trades else 0.0,
+            avg_trade=trade_sum / n_trades if n_trades else 0.0,
+            num_trades=n_trades,
+            max_dd_duration=self.max_underwater_days,
+            current_dd_duration=self.underwater_days,
+        )
+
+    def as_dict(self) -> dict:
+        return asdict(self)
@@ -0,0 +1,102 @@
+"""Backtest straight from recommender output, without the targets table.
+
+The pipeline's recommend stage writes every rebalance date into `targets`
+and the backtest stage reads them back. For research iterations this
+module keeps the whole chain in memory: recommender -> rebalance calendar
+-> PortfolioSupervisor.audit_many -> BacktestEngine.run(targets=...).
+Persisting the audited targets is optional (a single upsert).
+"""
+
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+from ..portfolio_supervisor.engine import PortfolioSupervisor
+from ..strategy_lab.rebalance import RebalanceCalendar
+from ..strategy_lab.recommender import Recommender
+from .engine import BacktestEngine
+
+logger = logging.getLogger(__name__)
+
+
+def recommend_targets(
+    strategy_config: dict[str, Any],
+    from_date: str,
+    to_date: str,
+    *,
+    symbols: list[str] | None = None,
+    artifacts_dir: Path | None = None,
+    db_path: str | None = None,
+) -> pd.DataFrame:
+    """Audited targets for every rebalance date in the window (in memory)."""
+    if symbols is None:
+        symbols = (strategy_config.get("universe") or {}).get("symbols") or []
+    df_raw = Recommender(db_path=db_path).generate_targets_for_window(
+        config=strategy_config,
+        symbols=symbols,
+        from_date=from_date,
+        to_date=to_date,
+        artifacts_dir=artifacts_dir,
+    )
+    if df_raw.empty:
+        return df_raw
+    # Single-date (asof scope) output too, as the pipeline's run_recommend
+    calendar = RebalanceCalendar.from_config(
+        strategy_config,
+        from_date=from_date,
+        to_date=to_date,
+        symbols=symbols,
+        db_path=db_path,
+    )
+    df_raw = calendar.filter_targets(df_raw)
+    if df_raw.empty:
+        return df_raw
+    return PortfolioSupervisor(strategy_config).audit_many(df_raw)
+
+
+def backtest_from_recommender(
+    strategy_config: dict[str, Any],
+    from_date: str,
+    to_date: str,
+    *,
+    symbols: list[str] | None = None,
+    persist_targets: bool = False,
+    artifacts_dir: Path | None = None,
+    db_path: str | None = None,
+) -> tuple[dict[str, Any] | None, pd.DataFrame]:
+    """Recommend, audit and backtest in one pass; (run() result, targets).
+
+    With `persist_targets` the audited targets are also written to the
+    targets table of `db_path`, replacing the strategy's whole window in one
+    delete + insert.
+    """
+    df_targets = recommend_targets(
+        strategy_config,
+        from_date,
+        to_date,
+        symbols=symbols,
+        artifacts_dir=artifacts_dir,
+        db_path=db_path,
+    )
+    if df_targets.empty:
+        raise ValueError(
+            f"Recommender produced no targets for {strategy_config['strategy_id']} "
+            f"in range {from_date} ~ {to_date}"
+        )
+    if persist_targets:
+        from ..repos.targets import save_targets_many
+
+        save_targets_many(df_targets, db_path, window=(from_date, to_date))
+    logger.info(
+        "In-memory targets: %d rows over %d dates",
+        len(df_targets),
+        df_targets["asof"].nunique(),
+    )
+    result = BacktestEngine(db_path).run(
+        strategy_config, from_date, to_date, targets=df_targets
+    )
+    return result, df_targets
@@ -15,7 +15,9 @@ from typing import Any, cast
 
 from ..config import settings
 from ..db.engine import get_session
+from ..repos.run_index import index_alias, index_run
 from ..repos.run_registry import RunRegistry
+from .progress_channel import publish as publish_progress
 
 log = logging.getLogger(__name__)
 
@@ -162,18 +164,40 @@ def _make_run_slug(
     return slug2[:max_len], display
 
 
+def _refresh_panel_store(
+    ctx: PipelineContext, tables: list[str], version: str = "v1"
+) -> list[str]:
+    """Best-effort on-disk panel refresh after a write stage (opt-in)."""
+    from ..db.panel_store import refresh_panel_store
+
+    try:
+        return [
+            str(p) for p in refresh_panel_store(tables, version, ctx.duckdb_path)
+        ]
+    except Exception as e:
+        log.warning(f"Panel store refresh skipped for {tables}: {e}")
+        return []
+
+
 def _write_progress_json(artifacts_dir: Path | None, payload: dict[str, Any]) -> None:
-    """Append machine-readable progress to pipeline.log without polluting stdout."""
+    """Append machine-readable progress to pipeline.log without polluting stdout.
+
+    The same event also goes to progress.jsonl, a compact file the UI tails
+    instead of scanning the full log, and to the UI's progress socket when the
+    run was launched from Run Center (QUANT_PROGRESS_SOCKET).
+    """
+    publish_progress(payload)
     if artifacts_dir is None:
         return
     try:
         p = artifacts_dir / "pipeline.log"
-        line = "PROGRESS_JSON: " + json.dumps(
-            payload, ensure_ascii=False, separators=(",", ":")
-        )
+        event = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+        line = "PROGRESS_JSON: " + event
         p.write_text("", encoding="utf-8") if not p.exists() else None
         with p.open("a", encoding="utf-8") as f:
             f.write(line + "\n")
+        with (artifacts_dir / "progress.jsonl").open("a", encoding="utf-8") as f:
+            f.write(event + "\n")
     except Exception:
         pass
 
@@ -293,6 +317,7 @@ class PipelineRunner:
                 json.dumps(payload, ensure_ascii=False, indent=2) + "\n",
                 encoding="utf-8",
             )
+            index_run(payload)
         except Exception:
             # Best-effort only
             pass
@@ -610,6 +635,7 @@ class PipelineRunner:
                         json.dumps(idx_payload, ensure_ascii=False, indent=2) + "\n",
                         encoding="utf-8",
                     )
+                    index_alias(idx_payload)
             except Exception:
                 pass
 
@@ -644,6 +670,10 @@ class PipelineRunner:
                 RunRegistry.run_fail(self.ctx.pipeline_run_id, str(e))
             return False
 
+        # Writers upsert with DELETE + INSERT; re-cluster once churn is high
+        if success and not self.ctx.dry_run:
+            self._maybe_compact()
+
         # 2. Finish Pipeline Run
         if not self.ctx.dry_run and self.ctx.pipeline_run_id:
             self.ctx.pipeline_ended_at = datetime.now(UTC).isoformat()
@@ -667,10 +697,31 @@ class PipelineRunner:
         # Always persist summary artifacts best-effort
         if not self.ctx.dry_run:
             self._persist_run_json()
+            _write_progress_json(
+                self.ctx.artifacts_dir,
+                {
+                    "run_id": self.ctx.pipeline_run_id,
+                    "event": "pipeline_end",
+                    "status": self.ctx.pipeline_status,
+                    "exit_code": self.ctx.exit_code,
+                },
+            )
             self._detach_file_logger()
 
         return success
 
+    def _maybe_compact(self) -> None:
+        """Best-effort auto-compaction (settings.quant_compact_deleted_rows)."""
+        from ..db.maintenance import maybe_compact
+
+        try:
+            results = maybe_compact(self.ctx.duckdb_path)
+        except Exception as e:
+            log.warning(f"Auto-compact skipped: {e}")
+            return
+        for r in results:
+            log.info(f"Compacted {r.table}: {r.rows:,} rows in {r.seconds:.1f}s")
+
     def _run_stage_wrapper(self, stage_name: str) -> bool:
         """Wraps stage execution with timing and logging."""
         from rich.console import Console
@@ -695,6 +746,16 @@ class PipelineRunner:
             return True
 
         result = StageResult(stage_name=stage_name, status="running", duration_sec=0.0)
+        _write_progress_json(
+            self.ctx.artifacts_dir,
+            {
+                "run_id": self.ctx.pipeline_run_id,
+                "stage": stage_name,
+                "event": "stage_start",
+                "current": 0,
+                "total": 1,
+            },
+        )
 
         # Reset stage meta; adapters may populate it.
         self.ctx.stage_meta = {}
@@ -753,6 +814,19 @@ class PipelineRunner:
                         encoding="utf-8",
                     )
 
+            _write_progress_json(
+                self.ctx.artifacts_dir,
+                {
+                    "run_id": self.ctx.pipeline_run_id,
+                    "stage": stage_name,
+                    "event": "stage_end",
+                    "status": result.status,
+                    "current": 1,
+                    "total": 1,
+                    "elapsed_sec": result.duration_sec,
+                },
+            )
+
             status_icon = "✅" if result.status == "success" else "❌"
             log.info(
                 f"[{stage_name.upper()}] {status_icon} Finished in {result.duration_sec:.2f}s"
@@ -805,7 +879,8 @@ def run_ingest(ctx: PipelineContext) -> str:
 
     try:
         api_key = settings.alpha_vantage_api_key
-        if api_key is None:
+        # Replay mode (QUANT_HTTP_CACHE=replay) serves recorded responses only
+        if api_key is None and settings.quant_http_cache.lower() != "replay":
             raise ValueError(
                 "Alpha Vantage API key is not configured: set settings.alpha_vantage_api_key"
             )
@@ -843,6 +918,10 @@ def run_ingest(ctx: PipelineContext) -> str:
         ctx.stage_meta = {
             "n_symbols": len(ctx.symbols),
             "symbols": ctx.symbols,
+            # Symbols whose history was rescaled after a split/dividend; their
+            # features and labels were dropped for the next stages to rebuild
+            "readjusted": ingester.readjusted,
+            "panel_store": _refresh_panel_store(ctx, ["ohlcv"]),
         }
 
         RunRegistry.run_success(run_id)
@@ -913,6 +992,7 @@ def run_features(ctx: PipelineContext) -> str:
             "n_symbols": len(ctx.symbols),
             "symbols": ctx.symbols,
             "feature_version": "v1",
+            "panel_store": _refresh_panel_store(ctx, ["features_daily"], "v1"),
         }
 
         RunRegistry.run_success(run_id)
@@ -985,6 +1065,7 @@ def run_labels(ctx: PipelineContext) -> str:
             "symbols": ctx.symbols,
             "label_version": "v1",
             "horizon": 60,
+            "panel_store": _refresh_panel_store(ctx, ["labels"], "v1"),
         }
 
         RunRegistry.run_success(run_id)
@@ -1011,8 +1092,9 @@ def run_recommend(ctx: PipelineContext) -> str:
     )
 
     from ..portfolio_supervisor.engine import PortfolioSupervisor
-    from ..repos.targets import save_targets
+    from ..repos.targets import clear_targets, save_targets
     from ..strategy_lab.loader import StrategyLoader
+    from ..strategy_lab.rebalance import RebalanceCalendar, rebalance_settings
     from ..strategy_lab.recommender import Recommender
 
     # We are using 'to_date' as 'asof' date for recommendation?
@@ -1086,12 +1168,29 @@ def run_recommend(ctx: PipelineContext) -> str:
 
         if not df_raw.empty:
             supervisor = PortfolioSupervisor(strategy_config)
+            # Only rebalance dates are audited/persisted; the backtest Hold
+            # policy carries weights across the days in between.
+            calendar = RebalanceCalendar.from_config(
+                strategy_config,
+                from_date=ctx.from_date,
+                to_date=ctx.to_date,
+                symbols=ctx.symbols,
+            )
+            # Window runs replace the strategy's whole window, so targets left
+            # from an earlier (e.g. daily) calendar do not survive a switch
+            window = (
+                (ctx.from_date, ctx.to_date)
+                if rec_type == "ml_gbdt"
+                or rebalance_settings(strategy_config)[1] == "window"
+                else None
+            )
 
             # Supervisor는 날짜별(리밸런싱 단위)로 감사해야 한다.
             if "asof" in df_raw.columns and df_raw["asof"].nunique() > 1:
-                tmp = df_raw.copy()
+                tmp = calendar.filter_targets(df_raw).copy()
                 tmp["asof"] = pd.to_datetime(tmp["asof"]).dt.strftime("%Y-%m-%d")
-                groups = list(tmp.groupby("asof"))
+                # All dates audited in one vectorized pass, then written per date
+                groups = list(supervisor.audit_many(tmp).groupby("asof"))
 
                 use_progress = bool(
                     getattr(sys.stderr, "isatty", lambda: False)()
@@ -1100,6 +1199,8 @@ def run_recommend(ctx: PipelineContext) -> str:
 
                 total_dates = len(groups)
                 total_rows = 0
+                if window is not None:
+                    clear_targets(strategy_config["strategy_id"], *window)
                 first_date = groups[0][0] if groups else None
                 last_date = groups[-1][0] if groups else None
 
@@ -1119,8 +1220,7 @@ def run_recommend(ctx: PipelineContext) -> str:
                         task_id = progress.add_task(
                             "Saving targets (per date)", total=total_dates
                         )
-                        for i, (asof_str, g) in enumerate(groups, start=1):
-                            df_audited = supervisor.audit(g)
+                        for i, (asof_str, df_audited) in enumerate(groups, start=1):
                             total_rows += len(df_audited)
                             save_targets(df_audited)
                             _write_progress_json(
@@ -1138,8 +1238,7 @@ def run_recommend(ctx: PipelineContext) -> str:
                             )
                             progress.advance(task_id)
                 else:
-                    for i, (asof_str, g) in enumerate(groups, start=1):
-                        df_audited = supervisor.audit(g)
+                    for i, (asof_str, df_audited) in enumerate(groups, start=1):
                         total_rows += len(df_audited)
                         save_targets(df_audited)
                         _write_progress_json(
@@ -1213,11 +1312,26 @@ def run_recommend(ctx: PipelineContext) -> str:
                         "featureset": featureset,
                         "feature_version": feature_version,
                     },
+                    "rebalance": {
+                        "frequency": calendar.frequency,
+                        "n_rebalance_dates": len(calendar),
+                    },
                     "artifacts": artifacts,
                 }
             else:
-                df_final = supervisor.audit(df_raw)
-                save_targets(df_final)
+                if "asof" in df_raw.columns:
+                    df_raw = calendar.filter_targets(df_raw)
+                if df_raw.empty:
+                    # asof is not a rebalance date: nothing to audit or write
+                    df_final = df_raw
+                    log.info(
+                        "[RECOMMEND] %s is not a %s rebalance date; no targets saved",
+                        asof,
+                        calendar.frequency,
+                    )
+                else:
+                    df_final = supervisor.audit(df_raw)
+                    save_targets(df_final, window=window)
 
                 # Single-date metadata
                 asof_single = None
@@ -1248,6 +1362,10 @@ def run_recommend(ctx: PipelineContext) -> str:
                         "featureset": featureset,
                         "feature_version": feature_version,
                     },
+                    "rebalance": {
+                        "frequency": calendar.frequency,
+                        "n_rebalance_dates": len(calendar),
+                    },
                     "artifacts": {},
                 }
 
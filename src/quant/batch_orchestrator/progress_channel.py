@@ -0,0 +1,61 @@
+"""Push channel for pipeline progress (Unix datagram socket).
+
+When the UI launches a run it binds a datagram socket and passes its path in
+`QUANT_PROGRESS_SOCKET`. Every progress / stage event the pipeline writes to
+its artifacts is also sent there as one JSON datagram, so Run Center sees it
+without re-reading files.
+
+Publishing is fire-and-forget: no listener, a full socket buffer or a
+platform without AF_UNIX just drops the datagram. The artifact files
+(pipeline.log, progress.jsonl, stages/*/result.json) stay the record.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import threading
+from typing import Any
+
+PROGRESS_SOCKET_ENV = "QUANT_PROGRESS_SOCKET"
+
+# Datagrams above this size are truncated to the core fields
+MAX_DATAGRAM = 8 * 1024
+
+_lock = threading.Lock()
+_sock: socket.socket | None = None
+
+
+def _socket() -> socket.socket | None:
+    global _sock
+    if _sock is None and hasattr(socket, "AF_UNIX"):
+        with _lock:
+            if _sock is None:
+                s = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+                s.setblocking(False)
+                _sock = s
+    return _sock
+
+
+def publish(payload: dict[str, Any], path: str | None = None) -> bool:
+    """Send one event to the UI socket; True when it was handed to the kernel."""
+    target = path or os.environ.get(PROGRESS_SOCKET_ENV)
+    if not target:
+        return False
+    try:
+        sock = _socket()
+        if sock is None:
+            return False
+        data = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode()
+        if len(data) > MAX_DATAGRAM:
+            core = {
+                k: payload.get(k)
+                for k in ("run_id", "stage", "event", "status", "current", "total")
+            }
+            data = json.dumps(core, separators=(",", ":")).encode()
+        sock.sendto(data, target)
+        return True
+    except OSError:
+        # No listener (UI gone), buffer full, ...: files remain the fallback
+        return False
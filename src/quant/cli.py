@@ -10,6 +10,8 @@ from rich.console import Console
 from rich.panel import Panel
 
 from .config import settings
+from .db.cache import panel_cache
+from .db.dictionary import drop_encoded
 from .db.duck import connect as duck_connect
 from .db.engine import get_engine, get_session
 from .logging import setup_logging
@@ -77,6 +79,9 @@ def init_db(
             schema_duck_sql = (
                 Path(__file__).parent / "db" / "schema_duck.sql"
             ).read_text(encoding="utf-8")
+            # Dictionary-encoded views/fact/dim tables first (quant db encode)
+            drop_encoded(dconn)
+
             # Drop all V2 tables
             tables = [
                 "ohlcv",
@@ -87,12 +92,17 @@ def init_db(
                 "targets",
                 "backtest_trades",
                 "backtest_summary",
+                "backtest_equity_curve",
+                "backtest_state",
+                "backtest_bootstrap",
+                "db_maintenance",
             ]
             for t in tables:
                 dconn.execute(f"DROP TABLE IF EXISTS {t} CASCADE;")
 
             dconn.execute(schema_duck_sql)
             dconn.close()
+            panel_cache.clear()
         except Exception as de:
             rprint(f"[red]DuckDB Error: {de}[/red]")
             raise de
@@ -156,6 +166,7 @@ def show_config():
         "quant_duckdb_path": str(settings.quant_duckdb_path),
         "quant_sqlite_path": str(settings.quant_sqlite_path),
         "quant_log_level": settings.quant_log_level,
+        "quant_http_cache": settings.quant_http_cache,
     }
     rprint(Panel.fit(str(data), title="config"))
     RunRegistry.run_success(run_id)
@@ -170,18 +181,52 @@ def ingest(
     force_full: bool = typer.Option(
         False, "--full", help="Force full instead of compact"
     ),
+    from_dir: Path | None = typer.Option(
+        None,
+        "--from-dir",
+        help="Bulk-load vendor dumps (CSV/Parquet, one file or directory per "
+        "symbol) instead of calling Alpha Vantage",
+    ),
 ):
     """Ingest OHLCV from Alpha Vantage into DuckDB (V2 Ingester)."""
     from .data_curator.ingest import DataIngester
-    from .data_curator.provider import AlphaVantageProvider
+    from .data_curator.provider import AlphaVantageProvider, LocalFileProvider
     from .repos.run_registry import RunRegistry
     from .repos.symbol import SymbolRepo
 
     run_id = RunRegistry.run_start(
-        "ingest", {"symbols": symbols, "force_full": force_full}
+        "ingest",
+        {
+            "symbols": symbols,
+            "force_full": force_full,
+            "from_dir": str(from_dir) if from_dir else None,
+        },
     )
 
     try:
+        if from_dir is not None:
+            # Backfill from local files: every symbol found (or --symbols),
+            # registered or not
+            ingester = DataIngester(LocalFileProvider(from_dir))
+            with console.status("[bold green]Bulk loading local files..."):
+                report = ingester.bulk_load(symbols or None, force_full=force_full)
+            RunRegistry.run_success(run_id)
+            if report.empty:
+                rprint(f"[yellow]No CSV/Parquet files found under {from_dir}[/yellow]")
+                return
+            failed = report[~report["passed"]]
+            for row in failed.itertuples():
+                rprint(f"[red]{row.symbol}: {row.reason}[/red]")
+            rprint(
+                Panel.fit(
+                    f"Bulk load complete: {int(report['n_loaded'].sum())} rows, "
+                    f"{int((report['n_loaded'] > 0).sum())}/{len(report)} symbols "
+                    f"({len(failed)} failed the quality gate)",
+                    title="ingest",
+                )
+            )
+            return
+
         # 1. Prepare target symbols
         with get_session() as session:
             repo = SymbolRepo(session)
@@ -209,6 +254,12 @@ def ingest(
                 ingester.ingest_symbol(sym, force_full=force_full)
 
         RunRegistry.run_success(run_id)
+        for sym, factor in ingester.readjusted.items():
+            rprint(
+                f"[yellow]{sym}: adjustment changed (split/dividend), history "
+                f"rescaled x{factor:.6f}; features/labels dropped, re-run them"
+                "[/yellow]"
+            )
         rprint(
             Panel.fit(
                 f"Ingestion Complete for {len(target_symbols)} symbols", title="ingest"
@@ -349,6 +400,9 @@ def train(
                     for s in session.exec(select(Symbol).where(Symbol.is_active)).all()
                 ]
 
+        # One float32 panel load for all symbols instead of per-symbol queries
+        features, labels = trainer.load_panels(symbols, feature_version, label_version)
+
         for symbol in symbols:
             if task == "experts":
                 trainer.train_experts(
@@ -356,6 +410,8 @@ def train(
                     feature_version=feature_version,
                     label_version=label_version,
                     horizon=horizon,
+                    features=features,
+                    labels=labels,
                 )
             else:
                 trainer.train_baseline(
@@ -365,6 +421,8 @@ def train(
                     horizon,
                     feature_selection=feature_selection,
                     stability_n_runs=stability_n_runs,
+                    features=features,
+                    labels=labels,
                 )
 
     rprint(Panel.fit(f"Training Complete ({task})", title="train"))
@@ -489,24 +547,84 @@ def recommend(
 
 @app.command("backtest")
 def backtest(
-    strategy: Path = typer.Option(
-        ..., "--strategy", "-s", help="Path to strategy YAML"
+    strategy: Path | None = typer.Option(
+        None, "--strategy", "-s", help="Path to strategy YAML"
+    ),
+    strategies: str | None = typer.Option(
+        None,
+        "--strategies",
+        help="Batch over several YAMLs sharing one returns panel: quoted glob, "
+        "directory or comma-separated paths (e.g. 'strategies/*.yaml')",
+    ),
+    start: str | None = typer.Option(
+        None, "--from", "-f", help="Start date YYYY-MM-DD (not used with --resume)"
     ),
-    start: str = typer.Option(..., "--from", "-f", help="Start date YYYY-MM-DD"),
     end: str = typer.Option(..., "--to", "-t", help="End date YYYY-MM-DD"),
+    resume: bool = typer.Option(
+        False,
+        "--resume",
+        help="Extend the strategy's latest run to --to from its saved state",
+    ),
+    resume_run_id: str | None = typer.Option(
+        None, "--run-id", help="Run to resume (default: latest for the strategy)"
+    ),
+    bootstrap: int = typer.Option(
+        0,
+        "--bootstrap",
+        help="Stationary block bootstrap resamples for Sharpe/CAGR/MDD CIs (0: off)",
+    ),
+    block_len: float | None = typer.Option(
+        None, "--block-len", help="Mean bootstrap block length in days (n^(1/3))"
+    ),
+    seed: int | None = typer.Option(None, "--seed", help="Bootstrap RNG seed"),
+    in_memory: bool = typer.Option(
+        False,
+        "--in-memory",
+        help="Recommend + audit the window in memory and backtest those targets "
+        "without reading them from the targets table",
+    ),
+    save_targets: bool = typer.Option(
+        False, "--save-targets", help="With --in-memory: also persist the targets"
+    ),
 ):
     """Run backtest simulation (V2 Backtest Engine)."""
     from .backtest_engine.engine import BacktestEngine
     from .repos.run_registry import RunRegistry
     from .strategy_lab.loader import StrategyLoader
 
+    if not resume and not start:
+        rprint("[red]--from is required unless --resume is given[/red]")
+        raise typer.Exit(code=1)
+    if (strategy is None) == (strategies is None):
+        rprint("[red]Give exactly one of --strategy / --strategies[/red]")
+        raise typer.Exit(code=1)
+    if in_memory and (resume or strategies is not None):
+        rprint("[red]--in-memory works on a single --strategy without --resume[/red]")
+        raise typer.Exit(code=1)
+    if save_targets and not in_memory:
+        rprint("[red]--save-targets requires --in-memory[/red]")
+        raise typer.Exit(code=1)
+    if strategies is not None:
+        if resume:
+            rprint("[red]--resume works on a single --strategy[/red]")
+            raise typer.Exit(code=1)
+        _backtest_batch(strategies, start, end, bootstrap, block_len, seed)
+        return
+
     # DuckDB Concurrency Warning
     rprint(
         "[bold yellow]WARNING: DuckDB write 작업 중에는 Streamlit 동시 실행을 권장하지 않습니다.[/bold yellow]"
     )
 
     run_id = RunRegistry.run_start(
-        "backtest", {"strategy": str(strategy), "from": start, "to": end}
+        "backtest",
+        {
+            "strategy": str(strategy),
+            "from": start,
+            "to": end,
+            "resume": resume,
+            "in_memory": in_memory,
+        },
     )
 
     try:
@@ -518,7 +636,21 @@ def backtest(
         with console.status(
             f"[bold green]Running backtest for {config['strategy_id']}..."
         ):
-            metrics = engine.run(config, start, end)
+            if resume:
+                metrics = engine.resume(config, end, run_id=resume_run_id)
+                if metrics is None:
+                    raise ValueError(
+                        f"No saved backtest state for {config['strategy_id']}; "
+                        "run a full backtest with --from first"
+                    )
+            elif in_memory:
+                from .backtest_engine.research import backtest_from_recommender
+
+                metrics, _ = backtest_from_recommender(
+                    config, start, end, persist_targets=save_targets
+                )
+            else:
+                metrics = engine.run(config, start, end)
 
         if not metrics:
             rprint(
@@ -529,6 +661,20 @@ def backtest(
 
         RunRegistry.run_success(run_id)
 
+        # The backtest is already saved: a bootstrap failure is reported on its own
+        intervals = {}
+        if bootstrap > 0:
+            try:
+                with console.status(
+                    f"[bold green]Bootstrapping {bootstrap} resamples..."
+                ):
+                    intervals = engine.bootstrap(
+                        metrics["run_id"], bootstrap, mean_block=block_len, seed=seed
+                    )
+            except Exception as e:
+                log.exception("Bootstrap failed for %s", metrics["run_id"])
+                rprint(f"[yellow]Bootstrap failed (backtest was saved): {e}[/yellow]")
+
         # 3. Display Summary
         from rich.table import Table
 
@@ -541,7 +687,26 @@ def backtest(
         table.add_row("MaxDD", f"{metrics['max_dd']:.2%}")
         table.add_row("Daily Mean", f"{metrics['mean']:.4%}")
         table.add_row("Daily Std", f"{metrics['std']:.4%}")
+        table.add_row("Turnover (ann.)", f"{metrics['turnover']:.2f}")
+        if "cost_drag" in metrics:
+            table.add_row("Cost Drag (ann.)", f"{metrics['cost_drag']:.2%}")
+        table.add_row("Win Rate", f"{metrics['win_rate']:.1%}")
+        table.add_row("Trades", str(metrics["num_trades"]))
+        table.add_row("Max DD Days", str(metrics["max_dd_duration"]))
         table.add_row("Days", str(metrics["n_days"]))
+        if resume:
+            table.add_row("New Days", str(metrics["n_new_days"]))
+        for key, label, fmt in [
+            ("sharpe", "Sharpe", "{:.2f}"),
+            ("cagr", "CAGR", "{:.2%}"),
+            ("max_dd", "MaxDD", "{:.2%}"),
+        ]:
+            if key in intervals:
+                ci = intervals[key]
+                table.add_row(
+                    f"{label} 95% CI",
+                    f"[{fmt.format(ci['ci_low'])}, {fmt.format(ci['ci_high'])}]",
+                )
         table.add_row("Run ID", metrics["run_id"])
 
         console.print(table)
@@ -558,6 +723,121 @@ def backtest(
         raise typer.Exit(code=1) from None
 
 
+def _expand_strategy_paths(spec: str) -> list[Path]:
+    """Comma-separated YAML paths, directories (their *.yaml) or globs."""
+    import glob
+
+    paths: list[Path] = []
+    for part in (p.strip() for p in spec.split(",")):
+        if not part:
+            continue
+        if any(ch in part for ch in "*?["):
+            paths += [Path(p) for p in sorted(glob.glob(part))]
+        elif Path(part).is_dir():
+            paths += sorted(Path(part).glob("*.yaml"))
+        else:
+            paths.append(Path(part))
+    return list(dict.fromkeys(paths))
+
+
+def _backtest_batch(
+    spec: str,
+    start: str,
+    end: str,
+    bootstrap: int,
+    block_len: float | None,
+    seed: int | None,
+) -> None:
+    from rich.table import Table
+
+    from .backtest_engine.engine import BacktestEngine
+    from .repos.run_registry import RunRegistry
+    from .strategy_lab.loader import StrategyLoader
+
+    paths = _expand_strategy_paths(spec)
+    if not paths:
+        rprint(f"[red]No strategy files match {spec}[/red]")
+        raise typer.Exit(code=1)
+
+    # DuckDB Concurrency Warning
+    rprint(
+        "[bold yellow]WARNING: DuckDB write 작업 중에는 Streamlit 동시 실행을 권장하지 않습니다.[/bold yellow]"
+    )
+
+    run_id = RunRegistry.run_start(
+        "backtest",
+        {"strategies": [str(p) for p in paths], "from": start, "to": end},
+    )
+    try:
+        configs = [StrategyLoader.load_yaml(p) for p in paths]
+        engine = BacktestEngine()
+        with console.status(
+            f"[bold green]Running {len(configs)} backtests on one returns panel..."
+        ):
+            results = engine.run_many(configs, start, end)
+        RunRegistry.run_success(run_id)
+    except Exception as e:
+        log.exception("Batch backtest failed")
+        RunRegistry.run_fail(run_id, str(e))
+        rprint(f"[red]Error during backtest: {e}[/red]")
+        raise typer.Exit(code=1) from None
+
+    # The runs are already saved: a bootstrap failure is reported on its own
+    intervals: dict[str, dict[str, dict[str, float]]] = {}
+    for sid, res in results.items():
+        if not res or bootstrap <= 0:
+            continue
+        try:
+            with console.status(f"[bold green]Bootstrapping {sid}..."):
+                intervals[sid] = engine.bootstrap(
+                    res["run_id"], bootstrap, mean_block=block_len, seed=seed
+                )
+        except Exception as e:
+            log.exception("Bootstrap failed for %s", res["run_id"])
+            rprint(
+                f"[yellow]Bootstrap failed for {sid} ({res['run_id']}): {e}[/yellow]"
+            )
+
+    table = Table(title=f"Backtest Comparison ({start} ~ {end})")
+    for col in ["Strategy", "CAGR", "Sharpe", "MaxDD", "Turnover", "Win Rate"]:
+        table.add_column(col, style="cyan" if col == "Strategy" else "magenta")
+    if bootstrap > 0:
+        table.add_column("Sharpe 95% CI", style="magenta")
+    table.add_column("Run ID")
+    ranked = sorted(
+        results.items(),
+        key=lambda kv: kv[1]["sharpe"] if kv[1] else float("-inf"),
+        reverse=True,
+    )
+    for sid, res in ranked:
+        if res is None:
+            row = [sid, *["-"] * 5]
+            if bootstrap > 0:
+                row.append("-")
+            table.add_row(*row, "[yellow]no targets[/yellow]")
+            continue
+        row = [
+            sid,
+            f"{res['cagr']:.2%}",
+            f"{res['sharpe']:.2f}",
+            f"{res['max_dd']:.2%}",
+            f"{res['turnover']:.2f}",
+            f"{res['win_rate']:.1%}",
+        ]
+        if bootstrap > 0:
+            ci = intervals.get(sid, {}).get("sharpe")
+            row.append(f"[{ci['ci_low']:.2f}, {ci['ci_high']:.2f}]" if ci else "-")
+        table.add_row(*row, res["run_id"])
+    console.print(table)
+    rprint(
+        Panel.fit(
+            f"{sum(r is not None for r in results.values())}/{len(results)} "
+            f"backtests saved to DuckDB | Run ID: {run_id}",
+            title="backtest",
+        )
+    )
+
+
 # --- Pipeline Command Group ---
 pipeline_app = typer.Typer(help="Batch Pipeline Orchestration")
 app.add_typer(pipeline_app, name="pipeline")
@@ -713,6 +993,380 @@ def run_pipeline(
     rprint("[green]Pipeline Completed Successfully[/green]")
 
 
+# --- DuckDB Maintenance Command Group ---
+db_app = typer.Typer(help="DuckDB storage maintenance")
+app.add_typer(db_app, name="db")
+
+
+def _parse_db_tables(tables: str | None, allowed: list[str]) -> list[str]:
+    names = [t.strip() for t in tables.split(",") if t.strip()] if tables else allowed
+    unknown = [t for t in names if t not in allowed]
+    if unknown:
+        rprint(f"[red]Unsupported tables: {unknown} (choose from {allowed})[/red]")
+        raise typer.Exit(code=1)
+    return names
+
+
+def _parse_encode_tables(tables: str | None) -> list[str]:
+    from .db.dictionary import ENCODED_TABLES
+
+    return _parse_db_tables(tables, list(ENCODED_TABLES))
+
+
+def _file_mb(path: Path) -> float:
+    return path.stat().st_size / 1e6 if path.exists() else 0.0
+
+
+@db_app.command("encode")
+def db_encode(
+    tables: str | None = typer.Option(
+        None,
+        "--tables",
+        help="Comma-separated tables (features_daily,labels,targets). Default: all",
+    ),
+    duckdb_path: Path | None = typer.Option(None, "--duckdb", help="DuckDB file path"),
+):
+    """Migrate fact tables to integer symbol/feature keys + dimension tables.
+
+    Views keep the original table/column names, so readers are unchanged.
+    """
+    from .db.dictionary import encode
+    from .repos.run_registry import RunRegistry
+
+    names = _parse_encode_tables(tables)
+    path = Path(duckdb_path or settings.quant_duckdb_path)
+    run_id = RunRegistry.run_start("db-encode", {"tables": names, "duckdb": str(path)})
+    try:
+        size_before = _file_mb(path)
+        conn = duck_connect(path)
+        try:
+            migrated = encode(conn, names)
+        finally:
+            conn.close()
+        size_after = _file_mb(path)
+
+        RunRegistry.run_success(run_id)
+        lines = [f"{t}: {n:,} rows" for t, n in migrated.items()] or [
+            "Nothing to migrate (already encoded)"
+        ]
+        rprint(
+            Panel.fit(
+                "\n".join(lines)
+                + f"\nFile size: {size_before:.1f} MB -> {size_after:.1f} MB",
+                title="db encode",
+            )
+        )
+    except Exception as e:
+        log.exception("db encode failed")
+        RunRegistry.run_fail(run_id, str(e))
+        rprint(f"[red]Error during db encode: {e}[/red]")
+        raise typer.Exit(code=1) from None
+
+
+@db_app.command("decode")
+def db_decode(
+    tables: str | None = typer.Option(
+        None,
+        "--tables",
+        help="Comma-separated tables (features_daily,labels,targets). Default: all",
+    ),
+    duckdb_path: Path | None = typer.Option(None, "--duckdb", help="DuckDB file path"),
+):
+    """Restore plain (TEXT-keyed) fact tables from the encoded layout."""
+    from .db.dictionary import decode
+    from .repos.run_registry import RunRegistry
+
+    names = _parse_encode_tables(tables)
+    path = Path(duckdb_path or settings.quant_duckdb_path)
+    run_id = RunRegistry.run_start("db-decode", {"tables": names, "duckdb": str(path)})
+    try:
+        conn = duck_connect(path)
+        try:
+            restored = decode(conn, names)
+        finally:
+            conn.close()
+
+        RunRegistry.run_success(run_id)
+        lines = [f"{t}: {n:,} rows" for t, n in restored.items()] or [
+            "Nothing to restore (not encoded)"
+        ]
+        rprint(Panel.fit("\n".join(lines), title="db decode"))
+    except Exception as e:
+        log.exception("db decode failed")
+        RunRegistry.run_fail(run_id, str(e))
+        rprint(f"[red]Error during db decode: {e}[/red]")
+        raise typer.Exit(code=1) from None
+
+
+@db_app.command("compact")
+def db_compact(
+    tables: str | None = typer.Option(
+        None,
+        "--tables",
+        help="Comma-separated tables (ohlcv,returns,features_daily,...). Default: all",
+    ),
+    duckdb_path: Path | None = typer.Option(None, "--duckdb", help="DuckDB file path"),
+    rewrite: bool = typer.Option(
+        True,
+        "--rewrite/--no-rewrite",
+        help="Copy into a fresh file afterwards to return freed space to disk",
+    ),
+):
+    """Re-sort fact tables by their access key so zone maps can prune again."""
+    from .db.maintenance import COMPACT_ORDER, compact, deleted_rows, rewrite_file
+    from .repos.run_registry import RunRegistry
+
+    names = _parse_db_tables(tables, list(COMPACT_ORDER))
+    path = Path(duckdb_path or settings.quant_duckdb_path)
+    run_id = RunRegistry.run_start(
+        "db-compact", {"tables": names, "duckdb": str(path), "rewrite": rewrite}
+    )
+    try:
+        size_before = _file_mb(path)
+        conn = duck_connect(path)
+        try:
+            churn = deleted_rows(conn)
+            results = compact(conn, names)
+        finally:
+            conn.close()
+        if rewrite:
+            rewrite_file(path)
+        size_after = _file_mb(path)
+
+        RunRegistry.run_success(run_id)
+
+        def _ms(v: float | None) -> str:
+            return "-" if v is None else f"{v:.2f}ms"
+
+        lines = [
+            f"{r.table}: {r.rows:,} rows, {churn.get(r.table, 0):,} deleted, "
+            f"{r.seconds:.2f}s | probe {_ms(r.probe_ms_before)} -> "
+            f"{_ms(r.probe_ms_after)}"
+            for r in results
+        ] or ["No tables to compact"]
+        rprint(
+            Panel.fit(
+                "\n".join(lines)
+                + f"\nFile size: {size_before:.1f} MB -> {size_after:.1f} MB",
+                title="db compact",
+            )
+        )
+    except Exception as e:
+        log.exception("db compact failed")
+        RunRegistry.run_fail(run_id, str(e))
+        rprint(f"[red]Error during db compact: {e}[/red]")
+        raise typer.Exit(code=1) from None
+
+
+@db_app.command("rebuild-returns")
+def db_rebuild_returns(
+    symbols: str | None = typer.Option(
+        None, "--symbols", help="Comma-separated symbols. Default: all in ohlcv"
+    ),
+    duckdb_path: Path | None = typer.Option(None, "--duckdb", help="DuckDB file path"),
+):
+    """Recompute the precomputed `returns` table (ret_1d..ret_60d) from ohlcv."""
+    from .data_curator.returns import rebuild_returns
+    from .repos.run_registry import RunRegistry
+
+    sym_list = [s.strip().upper() for s in (symbols or "").split(",") if s.strip()]
+    path = Path(duckdb_path or settings.quant_duckdb_path)
+    run_id = RunRegistry.run_start(
+        "db-rebuild-returns", {"symbols": sym_list or "ALL", "duckdb": str(path)}
+    )
+    try:
+        conn = duck_connect(path)
+        try:
+            n = rebuild_returns(conn, sym_list or None)
+        finally:
+            conn.close()
+
+        RunRegistry.run_success(run_id)
+        rprint(
+            Panel.fit(
+                f"Rebuilt {n:,} return rows for "
+                f"{', '.join(sym_list) if sym_list else 'all symbols'}",
+                title="db rebuild-returns",
+            )
+        )
+    except Exception as e:
+        log.exception("db rebuild-returns failed")
+        RunRegistry.run_fail(run_id, str(e))
+        rprint(f"[red]Error during db rebuild-returns: {e}[/red]")
+        raise typer.Exit(code=1) from None
+
+
+@db_app.command("audit")
+def db_audit(
+    symbols: str | None = typer.Option(
+        None, "--symbols", help="Comma-separated symbols. Default: all in ohlcv"
+    ),
+    spike: float = typer.Option(
+        0.5, "--spike", help="Flag |close-to-close return| above this"
+    ),
+    stale_days: int = typer.Option(
+        5, "--stale-days", help="Flag runs of this many unchanged closes"
+    ),
+    gap_days: int = typer.Option(
+        7, "--gap-days", help="Flag gaps longer than this many calendar days"
+    ),
+    out: Path | None = typer.Option(None, "--out", help="Write the report as CSV"),
+    duckdb_path: Path | None = typer.Option(None, "--duckdb", help="DuckDB file path"),
+):
+    """Audit ohlcv data quality for the whole universe in one SQL pass."""
+    from rich.table import Table
+
+    from .data_curator.quality_gate import QualityGate
+    from .repos.run_registry import RunRegistry
+
+    sym_list = [s.strip().upper() for s in (symbols or "").split(",") if s.strip()]
+    path = Path(duckdb_path or settings.quant_duckdb_path)
+    run_id = RunRegistry.run_start(
+        "db-audit",
+        {
+            "symbols": sym_list or "ALL",
+            "duckdb": str(path),
+            "spike": spike,
+            "stale_days": stale_days,
+            "gap_days": gap_days,
+            "out": str(out) if out is not None else None,
+        },
+    )
+    try:
+        conn = duck_connect(path)
+        try:
+            report = QualityGate.validate_batch(
+                conn,
+                "ohlcv",
+                symbols=sym_list or None,
+                spike_threshold=spike,
+                stale_days=stale_days,
+                gap_days=gap_days,
+            )
+        finally:
+            conn.close()
+
+        if out is not None:
+            out.parent.mkdir(parents=True, exist_ok=True)
+            report.to_csv(out, index=False)
+
+        RunRegistry.run_success(run_id)
+
+        flagged = report[(report["reason"] != "") | (report["warnings"] != "")]
+        if not flagged.empty:
+            table = Table(title="ohlcv audit: flagged symbols")
+            for col in ["Symbol", "Rows", "Range", "Errors", "Warnings"]:
+                table.add_column(col)
+            for row in flagged.itertuples():
+                table.add_row(
+                    row.symbol,
+                    f"{row.n_rows:,}",
+                    f"{str(row.first_ts)[:10]} ~ {str(row.last_ts)[:10]}",
+                    f"[red]{row.reason}[/red]",
+                    f"[yellow]{row.warnings}[/yellow]",
+                )
+            console.print(table)
+        rprint(
+            Panel.fit(
+                f"{len(report):,} symbols, {int(report['n_rows'].sum()):,} rows | "
+                f"{int((~report['passed']).sum())} failed, "
+                f"{int((report['warnings'] != '').sum())} with warnings"
+                + (f"\nReport: {out}" if out is not None else ""),
+                title="db audit",
+            )
+        )
+    except Exception as e:
+        log.exception("db audit failed")
+        RunRegistry.run_fail(run_id, str(e))
+        rprint(f"[red]Error during db audit: {e}[/red]")
+        raise typer.Exit(code=1) from None
+
+
+@db_app.command("panel-store")
+def db_panel_store(
+    tables: str | None = typer.Option(
+        None,
+        "--tables",
+        help="Comma-separated tables (features_daily,labels,ohlcv). Default: all",
+    ),
+    version: str = typer.Option("v1", "--version", help="Feature/label version"),
+    clear: bool = typer.Option(False, "--clear", help="Delete stored panels"),
+    duckdb_path: Path | None = typer.Option(None, "--duckdb", help="DuckDB file path"),
+):
+    """Build (or clear) the memory-mapped on-disk panel store."""
+    import time
+
+    from .db.panel_store import STORE_SOURCES, PanelStore
+    from .repos.run_registry import RunRegistry
+
+    names = _parse_db_tables(tables, list(STORE_SOURCES))
+    store = PanelStore(db_path=duckdb_path)
+    if clear:
+        for t in names:
+            store.clear(t, version)
+        rprint(f"[green]Cleared panel store: {', '.join(names)}[/green]")
+        return
+
+    run_id = RunRegistry.run_start(
+        "db-panel-store", {"tables": names, "version": version}
+    )
+    try:
+        lines = []
+        for t in names:
+            t0 = time.perf_counter()
+            panel = store.build(t, version)
+            built = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            store.load(t, version, check=False)
+            mapped = (time.perf_counter() - t0) * 1000
+            lines.append(
+                f"{t}: {panel.shape[0]:,} dates x {panel.shape[1]:,} symbols x "
+                f"{len(panel.fields)} fields ({panel.nbytes / 1e6:.1f} MB) | "
+                f"build {built:.2f}s, mmap load {mapped:.1f}ms"
+            )
+        RunRegistry.run_success(run_id)
+        lines.append(f"Dir: {store.root}")
+        rprint(Panel.fit("\n".join(lines), title="db panel-store"))
+    except Exception as e:
+        log.exception("db panel-store failed")
+        RunRegistry.run_fail(run_id, str(e))
+        rprint(f"[red]Error during db panel-store: {e}[/red]")
+        raise typer.Exit(code=1) from None
+
+
+# --- Run Artifacts Index Command Group ---
+runs_app = typer.Typer(help="Run artifacts index (artifacts/index/run_index.db)")
+app.add_typer(runs_app, name="runs")
+
+
+@runs_app.command("reindex")
+def runs_reindex():
+    """Rebuild the run index from artifacts/runs/*/run.json and alias files."""
+    import time
+
+    from .repos.run_index import RunIndex
+    from .repos.run_registry import RunRegistry
+
+    run_id = RunRegistry.run_start("runs-reindex")
+    try:
+        idx = RunIndex()
+        t0 = time.perf_counter()
+        n_runs, n_aliases = idx.rebuild()
+        RunRegistry.run_success(run_id)
+        rprint(
+            Panel.fit(
+                f"Runs: {n_runs:,} | Aliases: {n_aliases:,} | "
+                f"{time.perf_counter() - t0:.2f}s\nIndex: {idx.path}",
+                title="runs reindex",
+            )
+        )
+    except Exception as e:
+        log.exception("runs reindex failed")
+        RunRegistry.run_fail(run_id, str(e))
+        rprint(f"[red]Error during runs reindex: {e}[/red]")
+        raise typer.Exit(code=1) from None
+
+
 def main() -> None:
     """Module entrypoint (enables `python -m quant.cli ...`)."""
     app()
@@ -24,6 +24,27 @@ class Settings(BaseSettings):
 
     quant_log_level: str = "INFO"
 
+    # Auto-compact (pipeline) once a table has this many upsert-deleted rows.
+    # 0 disables; `quant db compact` always works.
+    quant_compact_deleted_rows: int = 2_000_000
+
+    # In-process panel cache budget (quant.db.cache). 0 disables.
+    quant_panel_cache_mb: int = 512
+
+    # On-disk memory-mapped panel store (quant.db.panel_store), written by the
+    # ingest/features/labels stages when enabled.
+    quant_panel_store: bool = False
+    quant_panel_store_dir: Path = Path("./data/panels")
+
+    # Alpha Vantage response cache (quant.data_curator.http_cache):
+    # off | use (read-through, TTL) | record | replay (offline, no API key).
+    # quant_http_cache_date pins replay to the responses recorded on that day.
+    quant_http_cache: str = "off"
+    quant_http_cache_dir: Path = Path("./data/http_cache")
+    quant_http_cache_ttl_hours: float = 24.0
+    quant_http_cache_mb: int = 512
+    quant_http_cache_date: str | None = None
+
     @model_validator(mode="after")
     def _fallback_to_streamlit_secrets(self) -> Settings:
         """
@@ -0,0 +1,240 @@
+"""On-disk cache / record-replay store for Alpha Vantage responses.
+
+Each successful response is one gzip JSON file (the response plus its
+fetch time and request params, never the API key) keyed by
+(function, symbol, outputsize, date), where date is the day the request was
+made, so a symbol is fetched at most once per day per request shape:
+
+    <root>/<FUNCTION>/<symbol>__<outputsize>__<YYYY-MM-DD>.json.gz
+
+Modes (`settings.quant_http_cache` / QUANT_HTTP_CACHE):
+
+- off: no caching (default)
+- use: read-through; today's entry is served while younger than the TTL,
+  otherwise the network is hit and the entry rewritten
+- record: always hit the network and store the response
+- replay: never hit the network; the newest recorded entry for the key (or
+  the one on `replay_date`) is served, a missing entry raises CacheMissError.
+  Runs are offline and deterministic; no API key is needed
+
+The store is bounded by `max_bytes`: writes keep a running byte total
+(initialised from one scan of the store), and once it goes over the budget
+the least recently used files (mtime is touched on every hit) are deleted
+until it fits.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import os
+import re
+import threading
+import time
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+from ..config import settings
+
+log = logging.getLogger(__name__)
+
+CACHE_MODES = ("off", "use", "record", "replay")
+
+# Request params that never belong to the key
+_IGNORED_PARAMS = {"apikey", "datatype"}
+_UNSAFE = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+class CacheMissError(LookupError):
+    """Replay mode found no recorded response for the request."""
+
+
+def _slug(value: Any) -> str:
+    return _UNSAFE.sub("-", str(value)).strip("-") or "_"
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        root: Path | str,
+        *,
+        mode: str = "use",
+        ttl_seconds: float = 24 * 3600,
+        max_bytes: int = 512 * 1024 * 1024,
+        replay_date: str | None = None,
+    ):
+        if mode not in CACHE_MODES:
+            raise ValueError(
+                f"Unknown HTTP cache mode '{mode}' (expected one of {CACHE_MODES})"
+            )
+        self.root = Path(root)
+        self.mode = mode
+        self.ttl_seconds = float(ttl_seconds)
+        self.max_bytes = int(max_bytes)
+        self.replay_date = replay_date
+        self.hits = 0
+        self.misses = 0
+        self._nbytes: int | None = None  # running store size, None = unscanned
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> ResponseCache | None:
+        """Cache configured by settings; None when the mode is 'off'."""
+        mode = (settings.quant_http_cache or "off").strip().lower()
+        if mode == "off":
+            return None
+        return cls(
+            settings.quant_http_cache_dir,
+            mode=mode,
+            ttl_seconds=float(settings.quant_http_cache_ttl_hours) * 3600,
+            max_bytes=int(settings.quant_http_cache_mb) * 1024 * 1024,
+            replay_date=settings.quant_http_cache_date,
+        )
+
+    @property
+    def offline(self) -> bool:
+        return self.mode == "replay"
+
+    # ------------------------------------------------------------------
+    # Keys
+    # ------------------------------------------------------------------
+    def _prefix(self, params: dict[str, Any]) -> tuple[Path, str]:
+        """(directory, file-name prefix) of a request, without the date."""
+        function = _slug(params.get("function", "UNKNOWN"))
+        symbol = params.get("symbol") or params.get("keywords") or "_"
+        extra = sorted(
+            (k, v)
+            for k, v in params.items()
+            if k not in _IGNORED_PARAMS
+            and k not in {"function", "symbol", "keywords", "outputsize"}
+        )
+        parts = [_slug(symbol), _slug(params.get("outputsize", "default"))]
+        parts += [f"{_slug(k)}-{_slug(v)}" for k, v in extra]
+        return self.root / function, "__".join(parts)
+
+    def path_for(self, params: dict[str, Any], day: str | None = None) -> Path:
+        directory, prefix = self._prefix(params)
+        day = day or date.today().isoformat()
+        return directory / f"{prefix}__{day}.json.gz"
+
+    def _recorded(self, params: dict[str, Any]) -> list[Path]:
+        """Recorded entries of a request, oldest day first."""
+        directory, prefix = self._prefix(params)
+        if not directory.is_dir():
+            return []
+        pattern = re.compile(re.escape(prefix) + r"__(\d{4}-\d{2}-\d{2})\.json\.gz$")
+        return sorted(p for p in directory.iterdir() if pattern.match(p.name))
+
+    # ------------------------------------------------------------------
+    # Read / write
+    # ------------------------------------------------------------------
+    def get(self, params: dict[str, Any]) -> dict[str, Any] | None:
+        """Cached response for the request under the current mode, or None.
+
+        Raises CacheMissError in replay mode when nothing was recorded.
+        """
+        if self.mode == "record":
+            return None
+        if self.offline:
+            if self.replay_date:
+                path = self.path_for(params, self.replay_date)
+                candidates = [path] if path.exists() else []
+            else:
+                candidates = self._recorded(params)
+            data = self._read(candidates[-1]) if candidates else None
+            if data is None:
+                raise CacheMissError(
+                    f"No recorded response for {params.get('function')} "
+                    f"{params.get('symbol') or params.get('keywords') or ''} "
+                    f"in {self.root}"
+                )
+            return data
+        return self._read(self.path_for(params), max_age=self.ttl_seconds)
+
+    def _read(self, path: Path, max_age: float | None = None) -> dict[str, Any] | None:
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as fh:
+                entry = json.load(fh)
+            fetched_at, data = float(entry["fetched_at"]), entry["response"]
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError, KeyError, TypeError):
+            log.warning("Unreadable HTTP cache entry dropped: %s", path)
+            path.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+        if max_age is not None and time.time() - fetched_at > max_age:
+            self.misses += 1
+            return None
+        os.utime(path)  # LRU: mtime is the last access
+        self.hits += 1
+        return data
+
+    def put(self, params: dict[str, Any], data: dict[str, Any]) -> Path:
+        """Store a response as today's entry and enforce the size budget."""
+        path = self.path_for(params)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        entry = {"fetched_at": time.time(), "params": self._public(params)}
+        with gzip.open(tmp, "wt", encoding="utf-8") as fh:
+            json.dump({**entry, "response": data}, fh, separators=(",", ":"))
+        try:
+            replaced = path.stat().st_size
+        except FileNotFoundError:
+            replaced = 0
+        added = tmp.stat().st_size
+        os.replace(tmp, path)
+        if self._account(added - replaced) > self.max_bytes > 0:
+            self.evict()
+        return path
+
+    def _account(self, delta: int) -> int:
+        """Apply a write's size delta to the running total and return it."""
+        with self._lock:
+            if self._nbytes is None:
+                # The first scan already sees the file just written
+                self._nbytes = sum(size for _, size, _ in self._scan())
+            else:
+                self._nbytes += delta
+            return self._nbytes
+
+    def _scan(self) -> list[tuple[float, int, Path]]:
+        """(mtime, size, path) of every stored entry."""
+        entries = []
+        for path in self.root.rglob("*.json.gz"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    @staticmethod
+    def _public(params: dict[str, Any]) -> dict[str, Any]:
+        return {k: v for k, v in params.items() if k not in _IGNORED_PARAMS}
+
+    def evict(self) -> int:
+        """Delete least recently used entries until the store fits max_bytes.
+
+        Rescans the store, so the running total also picks up writes made by
+        other processes sharing the directory.
+        """
+        if self.max_bytes <= 0 or not self.root.is_dir():
+            return 0
+        with self._lock:
+            entries = self._scan()
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            for _, size, path in sorted(entries, key=lambda e: e[0]):
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+                removed += 1
+            self._nbytes = total
+        if removed:
+            log.info("HTTP cache: evicted %d entries (LRU)", removed)
+        return removed
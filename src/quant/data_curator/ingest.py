@@ -2,21 +2,42 @@ import logging
 from datetime import UTC, datetime
 from pathlib import Path
 
+import duckdb
 import pandas as pd
 
 from ..config import settings
+from ..db.cache import invalidate as invalidate_panels
+from ..db.dictionary import delete_symbol
 from ..db.duck import connect as duck_connect
-from .provider import AlphaVantageProvider
+from ..db.maintenance import record_write
+from .provider import AlphaVantageProvider, LocalFileProvider
 from .quality_gate import QualityGate
+from .returns import recompute_returns, update_returns
 
 logger = logging.getLogger(__name__)
 
 
+# Tables computed from ohlcv prices, dropped when a symbol is re-adjusted
+DERIVED_TABLES = ("features_daily", "labels")
+
+
 class DataIngester:
-    def __init__(self, provider: AlphaVantageProvider, db_path: str | None = None):
+    # Relative adjusted_close difference treated as an adjustment change
+    ADJUST_TOL = 1e-4
+    # adjusted_close is quoted to 4 decimals: differences within a tick are
+    # rounding, which dominates ADJUST_TOL for sub-dollar prices
+    PRICE_TICK = 1e-4
+
+    def __init__(
+        self,
+        provider: AlphaVantageProvider | LocalFileProvider,
+        db_path: str | None = None,
+    ):
         self.provider = provider
         self.db_path = db_path or settings.quant_duckdb_path
         self.gate = QualityGate()
+        # {symbol: history factor} of symbols re-adjusted by this ingester
+        self.readjusted: dict[str, float] = {}
 
     def get_latest_ts(self, symbol: str) -> datetime | None:
         """Get the latest timestamp for a symbol from DuckDB."""
@@ -65,9 +86,14 @@ class DataIngester:
         # 2. Validate
         self.gate.validate_ohlcv(df, symbol)
 
-        # 3. Filter incremental
+        # 3. Filter incremental. A split/dividend since the last run changes
+        # the adjustment of the overlapping rows: those are rewritten from the
+        # fetch and the older history rescaled (step 4) instead of refetched.
+        readjust: tuple[float, pd.Timestamp] | None = None
         if latest_ts and not force_full:
-            df = df[df.index > pd.Timestamp(latest_ts)]
+            readjust = self.detect_readjustment(symbol, df)
+            if readjust is None:
+                df = df[df.index > pd.Timestamp(latest_ts)]
             if df.empty:
                 logger.debug(f"No new data for {symbol}")
                 return
@@ -113,21 +139,245 @@ class DataIngester:
             # Atomic delete & insert
             conn.execute("BEGIN TRANSACTION")
             try:
-                conn.execute(
+                deleted = conn.execute(
                     f"DELETE FROM ohlcv WHERE symbol = '{symbol}' AND ts::DATE IN (SELECT ts::DATE FROM df_tmp)"
-                )
+                ).fetchone()[0]
                 conn.execute(
                     "INSERT INTO ohlcv SELECT symbol, ts::DATE, open, high, low, close, volume, adjusted_close, source, ingested_at::TIMESTAMP FROM df_tmp"
                 )
+                record_write(conn, "ohlcv", deleted)
+                if readjust is not None:
+                    self._rescale_history(conn, symbol, *readjust)
+                    update_returns(conn, symbol)
+                else:
+                    update_returns(conn, symbol, since=str(df["ts"].min()))
                 conn.execute("COMMIT")
             except Exception as e:
                 conn.execute("ROLLBACK")
                 raise e
 
+            invalidate_panels("ohlcv", [symbol])
+            invalidate_panels("returns", [symbol])
+            if readjust is not None:
+                for table in DERIVED_TABLES:
+                    invalidate_panels(table, [symbol])
+                self.readjusted[symbol] = readjust[0]
             logger.debug(f"Successfully ingested {len(df)} rows for {symbol}")
         finally:
             conn.close()
 
+    def detect_readjustment(
+        self, symbol: str, df: pd.DataFrame
+    ) -> tuple[float, pd.Timestamp] | None:
+        """Adjustment change between stored rows and an adjusted fetch.
+
+        Compares adjusted_close on the overlapping dates. Returns None when
+        they agree within max(ADJUST_TOL, PRICE_TICK), else (factor, first
+        overlap date): the median fetched/stored ratio, by which every older
+        stored row must be scaled (back-adjustment factors are multiplicative,
+        so a new split or dividend scales all earlier prices alike). An overlap
+        that no single factor explains (within rounding) is left alone: it is
+        not a re-adjustment, and rescaling would drop derived data for nothing.
+        """
+        if df.empty or "adjusted_close" not in df.columns:
+            return None
+        conn = duck_connect(
+            Path(self.db_path) if isinstance(self.db_path, str) else self.db_path
+        )
+        try:
+            stored = conn.execute(
+                """
+                SELECT ts, adjusted_close FROM ohlcv
+                WHERE symbol = ? AND ts BETWEEN CAST(? AS DATE) AND CAST(? AS DATE)
+                ORDER BY ts
+                """,
+                [symbol, df.index.min().date(), df.index.max().date()],
+            ).df()
+        finally:
+            conn.close()
+        if stored.empty:
+            return None
+        stored_close = pd.Series(
+            stored["adjusted_close"].to_numpy(), index=pd.to_datetime(stored["ts"])
+        )
+        both = pd.DataFrame(
+            {"fetched": df["adjusted_close"], "stored": stored_close}
+        ).dropna()
+        both = both[both["stored"] > 0]
+        fetched, stored_px = both["fetched"], both["stored"]
+        moved = (fetched - stored_px).abs() > (self.ADJUST_TOL * stored_px).clip(
+            lower=self.PRICE_TICK
+        )
+        if not moved.any():
+            return None
+        factor = float((fetched / stored_px).median())
+        # Both sides are rounded to a tick, so allow one per side
+        residual = (fetched - factor * stored_px).abs()
+        tol = (self.ADJUST_TOL * fetched).clip(lower=2 * self.PRICE_TICK)
+        if (residual > tol).any():
+            logger.warning(
+                f"Adjusted closes for {symbol} moved by no common factor on the "
+                "overlap; not re-adjusting stored history (use force_full)"
+            )
+            return None
+        first = both.index.min()
+        logger.info(
+            f"Adjustment change for {symbol}: overlap from {first.date()} differs "
+            f"(factor {factor:.6f}), re-adjusting stored history"
+        )
+        return factor, first
+
+    def _rescale_history(
+        self,
+        conn: duckdb.DuckDBPyConnection,
+        symbol: str,
+        factor: float,
+        before: pd.Timestamp,
+    ) -> int:
+        """Scale stored prices before `before` by `factor` in one UPDATE and
+        drop the symbol's derived rows (features, labels), all versions.
+
+        Runs inside the caller's transaction. Returns the rescaled row count.
+        """
+        updated = 0
+        if abs(factor - 1.0) > self.ADJUST_TOL:
+            row = conn.execute(
+                """
+                UPDATE ohlcv
+                SET open = open * $f, high = high * $f, low = low * $f,
+                    close = close * $f, adjusted_close = adjusted_close * $f
+                WHERE symbol = $symbol AND ts < CAST($before AS DATE)
+                """,
+                {"f": factor, "symbol": symbol, "before": before.date()},
+            ).fetchone()
+            updated = int(row[0]) if row else 0
+            record_write(conn, "ohlcv")
+        for table in DERIVED_TABLES:
+            record_write(conn, table, delete_symbol(conn, table, symbol))
+        logger.info(f"Re-adjusted {updated} stored rows for {symbol} (x{factor:.6f})")
+        return updated
+
+    def bulk_load(
+        self, symbols: list[str] | None = None, force_full: bool = False
+    ) -> pd.DataFrame:
+        """Load a LocalFileProvider's dumps into ohlcv in one set-based pass.
+
+        All files are scanned by DuckDB (read_csv_auto / read_parquet) into a
+        staging table, back-adjusted with adjusted_close / close and checked
+        per symbol by QualityGate.validate_batch, all in SQL. Failed symbols
+        are skipped, the rest are upserted (only dates after each symbol's
+        latest ts unless `force_full`) and their returns rebuilt, in one
+        transaction. Returns the quality report plus `n_loaded` per symbol.
+        """
+        if not isinstance(self.provider, LocalFileProvider):
+            raise TypeError("bulk_load needs a LocalFileProvider")
+        files = self.provider.symbol_files(symbols)
+        if not files:
+            logger.warning("No local files to load under %s", self.provider.root)
+            return pd.DataFrame()
+
+        conn = duck_connect(
+            Path(self.db_path) if isinstance(self.db_path, str) else self.db_path
+        )
+        try:
+            file_map = pd.DataFrame(
+                [(str(p), sym) for sym, paths in files.items() for p in paths],
+                columns=["filename", "symbol"],
+            )
+            conn.register("file_map_tmp", file_map)
+            scan = self.provider.scan_sql(conn, [Path(p) for p in file_map["filename"]])
+            # Standard back-adjustment, as in ingest_symbol
+            conn.execute(
+                f"""
+                CREATE OR REPLACE TEMPORARY TABLE ohlcv_stage AS
+                SELECT
+                  m.symbol,
+                  s.ts,
+                  s.open * s.adj AS open,
+                  s.high * s.adj AS high,
+                  s.low * s.adj AS low,
+                  s.close * s.adj AS close,
+                  s.volume,
+                  s.adjusted_close
+                FROM (
+                  SELECT
+                    * REPLACE (COALESCE(adjusted_close, close) AS adjusted_close),
+                    COALESCE(adjusted_close, close)
+                      / CASE WHEN close = 0 THEN 1 ELSE close END AS adj
+                  FROM ({scan})
+                ) s
+                JOIN file_map_tmp m USING (filename)
+                """
+            )
+            report = self.gate.validate_batch(conn, "ohlcv_stage")
+            empty = sorted(set(files) - set(report["symbol"]))
+            if empty:
+                logger.warning("Empty data for %d symbols: %s", len(empty), empty)
+            failed = report.loc[~report["passed"], ["symbol", "reason"]]
+            for row in failed.itertuples():
+                logger.error(f"Quality gate failed for {row.symbol}: {row.reason}")
+            passed = report.loc[report["passed"], "symbol"].tolist()
+
+            conn.execute(
+                "DELETE FROM ohlcv_stage WHERE symbol NOT IN "
+                "(SELECT UNNEST(?::VARCHAR[]))",
+                [passed],
+            )
+            if not force_full:
+                # Incremental: only dates after each symbol's stored history
+                conn.execute(
+                    """
+                    DELETE FROM ohlcv_stage s
+                    USING (SELECT symbol, MAX(ts) AS last_ts FROM ohlcv
+                           GROUP BY symbol) o
+                    WHERE s.symbol = o.symbol AND s.ts <= o.last_ts
+                    """
+                )
+            loaded = conn.execute(
+                "SELECT symbol, COUNT(*) AS n_loaded FROM ohlcv_stage GROUP BY symbol"
+            ).df()
+
+            conn.execute("BEGIN TRANSACTION")
+            try:
+                deleted = conn.execute(
+                    """
+                    DELETE FROM ohlcv o USING ohlcv_stage s
+                    WHERE o.symbol = s.symbol AND o.ts = s.ts
+                    """
+                ).fetchone()[0]
+                conn.execute(
+                    """
+                    INSERT INTO ohlcv
+                    SELECT symbol, ts, open, high, low, close, volume,
+                           adjusted_close, 'local_file', now()::TIMESTAMP
+                    FROM ohlcv_stage
+                    """
+                )
+                record_write(conn, "ohlcv", deleted)
+                # Returns move with the prices, as update_returns in ingest_symbol
+                changed = loaded["symbol"].tolist()
+                if changed:
+                    recompute_returns(conn, changed)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+            if changed:
+                invalidate_panels("ohlcv", changed)
+                invalidate_panels("returns", changed)
+            logger.info(
+                "Bulk load: %d rows for %d symbols (%d failed the quality gate)",
+                int(loaded["n_loaded"].sum()),
+                len(changed),
+                len(failed),
+            )
+        finally:
+            conn.close()
+        report = report.merge(loaded, on="symbol", how="left")
+        report["n_loaded"] = report["n_loaded"].fillna(0).astype(int)
+        return report
+
     def ingest_overview(self, symbol: str):
         """Fetch and save company overview to SQLite."""
         from ..db.metastore import MetaStore
@@ -1,8 +1,10 @@
 import contextlib
 import logging
 from datetime import datetime
+from pathlib import Path
 from typing import Any
 
+import duckdb
 import pandas as pd
 import requests
 from tenacity import (
@@ -12,17 +14,37 @@ from tenacity import (
     wait_exponential,
 )
 
+from .http_cache import ResponseCache
+
 logger = logging.getLogger(__name__)
 
 
 class AlphaVantageProvider:
     BASE_URL = "https://www.alphavantage.co/query"
 
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str | None, cache: ResponseCache | None = None):
+        """`cache` defaults to the settings-configured response cache (if any).
+
+        Replay mode serves recorded responses only, so no API key is needed.
+        """
         self.api_key = api_key
-        if not self.api_key:
+        self.cache = cache if cache is not None else ResponseCache.from_settings()
+        if not self.api_key and not (self.cache and self.cache.offline):
             raise ValueError("Alpha Vantage API Key is required")
 
+    def _fetch(self, params: dict[str, Any]) -> dict[str, Any]:
+        """Fetch through the response cache (replay misses raise CacheMissError)."""
+        if self.cache is None:
+            return self._fetch_with_retry(params)
+        data = self.cache.get(params)
+        if data is not None:
+            return data
+        data = self._fetch_with_retry(dict(params))
+        # Rate-limit / premium notices come back as 200s without data
+        if "Information" not in data and "Note" not in data:
+            self.cache.put(params, data)
+        return data
+
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=4, max=10),
@@ -58,7 +80,7 @@ class AlphaVantageProvider:
             "outputsize": outputsize,
         }
 
-        data = self._fetch_with_retry(params)
+        data = self._fetch(params)
 
         ts_key = "Time Series (Daily)"
         if ts_key not in data:
@@ -102,13 +124,13 @@ class AlphaVantageProvider:
     def get_overview(self, symbol: str) -> dict[str, Any]:
         """Fetch company overview data and map to internal schema."""
         params = {"function": "OVERVIEW", "symbol": symbol}
-        data = self._fetch_with_retry(params)
+        data = self._fetch(params)
         return self._map_overview(data)
 
     def search_symbols(self, query: str) -> pd.DataFrame:
         """Search for symbols using Alpha Vantage API."""
         params = {"function": "SYMBOL_SEARCH", "keywords": query}
-        data = self._fetch_with_retry(params)
+        data = self._fetch(params)
         results = []
         for item in data.get("bestMatches", []):
             results.append(
@@ -207,3 +229,187 @@ class AlphaVantageProvider:
                     if model_key not in mapped:
                         mapped[model_key] = val
         return mapped
+
+
+# Output columns of get_daily_ohlcv (both providers)
+OHLCV_COLUMNS = [
+    "open",
+    "high",
+    "low",
+    "close",
+    "adjusted_close",
+    "volume",
+    "dividend_amount",
+    "split_coefficient",
+]
+
+
+class LocalFileProvider:
+    """Daily OHLCV from vendor dumps on disk (CSV / Parquet), read by DuckDB.
+
+    Layout under `root`, one of (mixable):
+    - <SYMBOL>.csv / .csv.gz / .parquet: one file per symbol
+    - <SYMBOL>/*.csv|*.parquet: one directory per symbol (files unioned,
+      e.g. yearly dumps)
+
+    Column names are matched case-insensitively against common vendor
+    spellings (COLUMN_ALIASES). Without an adjusted close the raw close is
+    used (factor 1); dividends default to 0 and split coefficients to 1.
+    Files hold the full history, so `outputsize` is accepted and ignored.
+    `DataIngester.bulk_load` loads many symbols in one set-based pass.
+    """
+
+    SUFFIXES = (".csv", ".csv.gz", ".parquet")
+
+    COLUMN_ALIASES: dict[str, tuple[str, ...]] = {
+        "ts": ("ts", "date", "timestamp", "datetime", "time", "trade_date"),
+        "open": ("open", "1. open"),
+        "high": ("high", "2. high"),
+        "low": ("low", "3. low"),
+        "close": ("close", "4. close"),
+        "adjusted_close": (
+            "adjusted_close",
+            "adj_close",
+            "adj close",
+            "adjclose",
+            "5. adjusted close",
+        ),
+        "volume": ("volume", "vol", "6. volume"),
+        "dividend_amount": (
+            "dividend_amount",
+            "dividend",
+            "dividends",
+            "7. dividend amount",
+        ),
+        "split_coefficient": (
+            "split_coefficient",
+            "split",
+            "splits",
+            "stock splits",
+            "split_factor",
+            "8. split coefficient",
+        ),
+    }
+    _DEFAULTS = {"dividend_amount": "0.0", "split_coefficient": "1.0"}
+
+    def __init__(self, root: Path | str):
+        self.root = Path(root)
+        if not self.root.exists():
+            raise ValueError(f"Local data directory not found: {self.root}")
+
+    @classmethod
+    def _is_data_file(cls, path: Path) -> bool:
+        return path.is_file() and path.name.lower().endswith(cls.SUFFIXES)
+
+    @classmethod
+    def _symbol_of(cls, path: Path) -> str:
+        name = path.name
+        for suffix in cls.SUFFIXES:
+            if name.lower().endswith(suffix):
+                name = name[: -len(suffix)]
+                break
+        return name.upper()
+
+    def symbol_files(self, symbols: list[str] | None = None) -> dict[str, list[Path]]:
+        """{SYMBOL: files} found under root (optionally only `symbols`)."""
+        found: dict[str, list[Path]] = {}
+        if self._is_data_file(self.root):
+            found[self._symbol_of(self.root)] = [self.root]
+        else:
+            for entry in sorted(self.root.iterdir()):
+                if self._is_data_file(entry):
+                    found.setdefault(self._symbol_of(entry), []).append(entry)
+                elif entry.is_dir():
+                    files = sorted(p for p in entry.iterdir() if self._is_data_file(p))
+                    if files:
+                        found.setdefault(entry.name.upper(), []).extend(files)
+        if symbols is not None:
+            wanted = {s.upper() for s in symbols}
+            found = {s: f for s, f in found.items() if s in wanted}
+        return found
+
+    def list_symbols(self) -> list[str]:
+        return sorted(self.symbol_files())
+
+    def scan_sql(self, conn: duckdb.DuckDBPyConnection, files: list[Path]) -> str:
+        """SELECT over `files` with normalized columns (+ `filename`).
+
+        CSV and Parquet files are scanned separately and unioned by name.
+        """
+        csv = [str(p) for p in files if not p.name.lower().endswith(".parquet")]
+        parquet = [str(p) for p in files if p.name.lower().endswith(".parquet")]
+        parts = []
+        for reader, paths in (("read_csv_auto", csv), ("read_parquet", parquet)):
+            if not paths:
+                continue
+            listing = ", ".join("'" + p.replace("'", "''") + "'" for p in paths)
+            source = f"{reader}([{listing}], union_by_name = true, filename = true)"
+            described = conn.execute(f"DESCRIBE SELECT * FROM {source}").fetchall()
+            columns = [row[0] for row in described]
+            parts.append(f"SELECT {self._select_list(columns, paths)} FROM {source}")
+        return "\nUNION ALL BY NAME\n".join(parts)
+
+    def _select_list(self, columns: list[str], paths: list[str]) -> str:
+        by_name: dict[str, list[str]] = {}
+        for c in columns:
+            by_name.setdefault(c.strip().lower(), []).append(c)
+        exprs = ["filename"]
+        missing = []
+        for target, aliases in self.COLUMN_ALIASES.items():
+            # Files unioned by name may spell a column differently
+            sources = [c for a in aliases for c in by_name.get(a, [])]
+            if sources:
+                cast = "DATE" if target == "ts" else "DOUBLE"
+                casts = [
+                    'TRY_CAST("' + c.replace('"', '""') + f'" AS {cast})'
+                    for c in sources
+                ]
+                expr = casts[0] if len(casts) == 1 else f"COALESCE({', '.join(casts)})"
+                exprs.append(f"{expr} AS {target}")
+            elif target == "adjusted_close":
+                exprs.append("NULL::DOUBLE AS adjusted_close")
+            elif target in self._DEFAULTS:
+                exprs.append(f"{self._DEFAULTS[target]}::DOUBLE AS {target}")
+            else:
+                missing.append(target)
+        if missing:
+            from .quality_gate import DataQualityError
+
+            raise DataQualityError(
+                f"Missing columns {missing} in {paths[0]}"
+                + (f" (+{len(paths) - 1} files)" if len(paths) > 1 else "")
+            )
+        return ", ".join(exprs)
+
+    def get_daily_ohlcv(
+        self,
+        symbol: str,
+        outputsize: str = "full",  # noqa: ARG002 - files hold the full history
+    ) -> pd.DataFrame:
+        """Same frame as AlphaVantageProvider.get_daily_ohlcv (ts index, float)."""
+        files = self.symbol_files([symbol]).get(symbol.upper())
+        if not files:
+            logger.error(f"No local files for {symbol} under {self.root}")
+            return pd.DataFrame()
+        conn = duckdb.connect()
+        try:
+            df = conn.execute(
+                f"SELECT * EXCLUDE (filename) FROM ({self.scan_sql(conn, files)}) "
+                "ORDER BY ts"
+            ).df()
+        finally:
+            conn.close()
+        df["adjusted_close"] = df["adjusted_close"].fillna(df["close"])
+        df.index = pd.to_datetime(df.pop("ts"))
+        df.index.name = "ts"
+        return df[OHLCV_COLUMNS].astype(float)
+
+    def get_overview(self, symbol: str) -> dict[str, Any]:  # noqa: ARG002
+        """Vendor dumps carry no company metadata."""
+        return {}
+
+    def search_symbols(self, query: str) -> pd.DataFrame:
+        q = query.strip().upper()
+        return pd.DataFrame(
+            {"symbol": [s for s in self.list_symbols() if q in s], "type": "local"}
+        )
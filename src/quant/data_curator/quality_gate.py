@@ -1,5 +1,6 @@
 import logging
 
+import duckdb
 import pandas as pd
 
 logger = logging.getLogger(__name__)
@@ -52,3 +53,141 @@ class QualityGate:
             raise DataQualityError(f"Duplicate timestamps detected for {symbol}")
 
         return True
+
+    @staticmethod
+    def validate_batch(
+        conn: duckdb.DuckDBPyConnection,
+        table: str = "ohlcv",
+        *,
+        symbols: list[str] | None = None,
+        nan_ratio_max: float = 0.05,
+        spike_threshold: float = 0.5,
+        stale_days: int = 5,
+        gap_days: int = 7,
+    ) -> pd.DataFrame:
+        """validate_ohlcv for every symbol of a table, in one SQL pass.
+
+        `table` is `ohlcv` or a staged table/view with symbol, ts, open, high,
+        low, close, volume. Missing columns raise DataQualityError; everything
+        else is reported per symbol instead of raised:
+
+        - errors (passed=False): duplicate or unparseable ts, NaN ratio over
+          `nan_ratio_max`
+        - warnings: non-positive prices, OHLC inconsistency (high below
+          open/close/low or low above open/close), |close-to-close return| over
+          `spike_threshold`, a run of `stale_days`+ unchanged closes, a gap of
+          more than `gap_days` calendar days between bars
+        """
+        cols = ["open", "high", "low", "close", "volume"]
+        present = {
+            row[0].lower()
+            for row in conn.execute(f"DESCRIBE SELECT * FROM {table}").fetchall()
+        }
+        missing = [c for c in ["symbol", "ts", *cols] if c not in present]
+        if missing:
+            raise DataQualityError(f"Missing columns in {table}: {missing}")
+
+        where = "WHERE symbol IN (SELECT UNNEST(?::VARCHAR[]))" if symbols else ""
+        params = [[s.upper() for s in symbols]] if symbols else []
+        nan_sum = " + ".join(f"SUM(({c} IS NULL OR isnan({c}))::INT)" for c in cols)
+        report = conn.execute(
+            f"""
+            WITH src AS (
+              SELECT symbol, TRY_CAST(ts AS DATE) AS ts, open, high, low, close,
+                volume
+              FROM {table} {where}
+            ),
+            seq AS (
+              SELECT
+                *,
+                close / NULLIF(LAG(close) OVER w, 0) - 1 AS ret,
+                ts - LAG(ts) OVER w AS gap,
+                close IS DISTINCT FROM LAG(close) OVER w AS moved
+              FROM src
+              WHERE ts IS NOT NULL
+              WINDOW w AS (PARTITION BY symbol ORDER BY ts)
+            ),
+            runs AS (
+              -- Consecutive bars with an unchanged close share a run id
+              SELECT symbol, SUM(moved::INT) OVER (
+                PARTITION BY symbol ORDER BY ts ROWS UNBOUNDED PRECEDING
+              ) AS run_id
+              FROM seq
+            ),
+            stale AS (
+              SELECT symbol, MAX(n) AS max_stale_run
+              FROM (SELECT symbol, run_id, COUNT(*) AS n FROM runs GROUP BY ALL)
+              GROUP BY symbol
+            ),
+            ordered AS (
+              SELECT
+                symbol,
+                COUNT(*) FILTER (
+                  WHERE high < GREATEST(open, close, low)
+                     OR low > LEAST(open, close, high)
+                ) AS n_ohlc_inconsistent,
+                COUNT(*) FILTER (WHERE abs(ret) > ?) AS n_return_spikes,
+                COUNT(*) FILTER (WHERE gap > ?) AS n_gaps,
+                COALESCE(MAX(gap), 0) AS max_gap_days
+              FROM seq
+              GROUP BY symbol
+            ),
+            base AS (
+              SELECT
+                symbol,
+                COUNT(*) AS n_rows,
+                MIN(ts) AS first_ts,
+                MAX(ts) AS last_ts,
+                {nan_sum} AS n_nan,
+                COUNT(*) FILTER (
+                  WHERE open <= 0 OR high <= 0 OR low <= 0 OR close <= 0
+                ) AS n_nonpositive,
+                COUNT(ts) - COUNT(DISTINCT ts) AS n_duplicate_ts,
+                COUNT(*) - COUNT(ts) AS n_bad_ts
+              FROM src
+              GROUP BY symbol
+            )
+            SELECT
+              b.*,
+              COALESCE(o.n_ohlc_inconsistent, 0) AS n_ohlc_inconsistent,
+              COALESCE(o.n_return_spikes, 0) AS n_return_spikes,
+              COALESCE(s.max_stale_run, 0) AS max_stale_run,
+              COALESCE(o.n_gaps, 0) AS n_gaps,
+              COALESCE(o.max_gap_days, 0) AS max_gap_days
+            FROM base b
+            LEFT JOIN ordered o USING (symbol)
+            LEFT JOIN stale s USING (symbol)
+            ORDER BY symbol
+            """,
+            [*params, spike_threshold, gap_days],
+        ).df()
+
+        nan_ratio = report["n_nan"] / (report["n_rows"] * len(cols))
+        errors = {
+            "duplicate timestamps": report["n_duplicate_ts"] > 0,
+            "unparseable dates": report["n_bad_ts"] > 0,
+            "too many NaN values": nan_ratio > nan_ratio_max,
+        }
+        warnings = {
+            "non-positive prices": report["n_nonpositive"] > 0,
+            "inconsistent OHLC": report["n_ohlc_inconsistent"] > 0,
+            "return spikes": report["n_return_spikes"] > 0,
+            "stale prices": report["max_stale_run"] >= stale_days,
+            "calendar gaps": report["n_gaps"] > 0,
+        }
+
+        def _labels(flags: dict[str, pd.Series]) -> list[str]:
+            return [
+                ", ".join(name for name, hit in zip(flags, row, strict=True) if hit)
+                for row in zip(*flags.values(), strict=True)
+            ]
+
+        report["reason"] = _labels(errors)
+        report["warnings"] = _labels(warnings)
+        report["passed"] = report["reason"] == ""
+        for row in report[report["n_nonpositive"] > 0].itertuples():
+            logger.warning(
+                f"Invalid price detected (<= 0) for {row.symbol}: "
+                f"{row.n_nonpositive} rows"
+            )
+        return report
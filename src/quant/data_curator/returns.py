@@ -0,0 +1,115 @@
+"""Precomputed close-to-close returns (`returns` table), derived from ohlcv.
+
+ret_k = close_t / close_{t-k rows} - 1 per symbol, i.e. the same definition
+as `FeatureCalculator.calculate_v1_features` (pct_change over trading rows).
+Ingest keeps the table current for the rows it writes; `rebuild_returns()`
+(`quant db rebuild-returns`) backfills existing databases.
+"""
+
+from __future__ import annotations
+
+import duckdb
+
+from ..db.cache import invalidate as invalidate_panels
+from ..db.maintenance import record_write
+
+RETURN_HORIZONS = (1, 5, 20, 60)
+RETURN_COLUMNS = [f"ret_{k}d" for k in RETURN_HORIZONS]
+
+_RET_EXPRS = ",\n    ".join(
+    f"close / LAG(close, {k}) OVER w - 1 AS ret_{k}d" for k in RETURN_HORIZONS
+)
+
+_INSERT_SQL = f"""
+INSERT INTO returns (symbol, ts, {", ".join(RETURN_COLUMNS)})
+SELECT symbol, ts, {", ".join(RETURN_COLUMNS)}
+FROM (
+  SELECT
+    symbol,
+    ts,
+    {_RET_EXPRS}
+  FROM ohlcv
+  WHERE {{where}}
+  WINDOW w AS (PARTITION BY symbol ORDER BY ts)
+)
+WHERE {{keep}}
+"""
+
+
+def update_returns(
+    conn: duckdb.DuckDBPyConnection, symbol: str, since: str | None = None
+) -> int:
+    """Recompute one symbol's returns for ts >= `since` (all rows when None).
+
+    Only the trailing max(RETURN_HORIZONS) price rows before `since` are read.
+    Returns the number of rows written. Like recompute_returns, panel caches
+    are left alone; the caller invalidates them after COMMIT.
+    """
+    if since is None:
+        deleted = conn.execute(
+            "DELETE FROM returns WHERE symbol = ?", [symbol]
+        ).fetchone()[0]
+        conn.execute(_INSERT_SQL.format(where="symbol = ?", keep="TRUE"), [symbol])
+    else:
+        deleted = conn.execute(
+            "DELETE FROM returns WHERE symbol = ? AND ts >= CAST(? AS DATE)",
+            [symbol, since],
+        ).fetchone()[0]
+        lookback = f"""
+            symbol = ?
+            AND ts >= COALESCE(
+              (SELECT MIN(ts) FROM (
+                 SELECT ts FROM ohlcv
+                 WHERE symbol = ? AND ts < CAST(? AS DATE)
+                 ORDER BY ts DESC
+                 LIMIT {max(RETURN_HORIZONS)}
+              )),
+              CAST(? AS DATE)
+            )
+        """
+        conn.execute(
+            _INSERT_SQL.format(where=lookback, keep="ts >= CAST(? AS DATE)"),
+            [symbol, symbol, since, since, since],
+        )
+    record_write(conn, "returns", deleted)
+
+    row = conn.execute(
+        "SELECT COUNT(*) FROM returns WHERE symbol = ? AND ts >= CAST(? AS DATE)",
+        [symbol, since or "0001-01-01"],
+    ).fetchone()
+    return int(row[0]) if row else 0
+
+
+def rebuild_returns(
+    conn: duckdb.DuckDBPyConnection, symbols: list[str] | None = None
+) -> int:
+    """Full recompute for `symbols` (default: every ohlcv symbol) in one pass."""
+    conn.execute("BEGIN TRANSACTION")
+    try:
+        n = recompute_returns(conn, symbols)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    invalidate_panels("returns", symbols)
+    return n
+
+
+def recompute_returns(
+    conn: duckdb.DuckDBPyConnection, symbols: list[str] | None = None
+) -> int:
+    """rebuild_returns without its own transaction, for callers already in one.
+
+    Panel caches are left alone; the caller invalidates them after COMMIT.
+    """
+    if symbols:
+        where = "symbol IN (SELECT UNNEST(?::VARCHAR[]))"
+        params: list = [list(symbols)]
+    else:
+        where, params = "TRUE", []
+    deleted = conn.execute(f"DELETE FROM returns WHERE {where}", params).fetchone()
+    conn.execute(_INSERT_SQL.format(where=where, keep="TRUE"), params)
+    row = conn.execute(f"SELECT COUNT(*) FROM returns WHERE {where}", params)
+    n = int(row.fetchone()[0])
+    record_write(conn, "returns", int(deleted[0]) if deleted else 0)
+    return n
@@ -0,0 +1,249 @@
+"""In-process LRU cache for float32 panels read from DuckDB.
+
+One pipeline run reads the same features/returns several times (recommend
+predict, supervisor, backtest, multi-strategy backtests). Loaders go through
+`cached_panel(key, load)`:
+
+- exact key hit, or a cached panel for the same (table, version, fields,
+  symbols) whose date range covers the request -> sliced by date
+- entries are dropped when a writer calls `invalidate(table, symbols)`, and
+  when the source table's `db_maintenance.write_seq` (bumped by
+  `record_write()`) moved since load, which also catches writes from other
+  processes; writes to unrelated tables keep the entry
+- total `Panel.nbytes` is capped at `settings.quant_panel_cache_mb` (0 disables);
+  least recently used entries are evicted first
+
+Cached arrays are marked read-only; callers must copy before mutating.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import duckdb
+import numpy as np
+
+from ..config import settings
+from .duck import connect as duck_connect
+from .maintenance import write_seq
+from .panel import Panel
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PanelKey:
+    db: str
+    table: str
+    symbols: tuple[str, ...]
+    from_date: str = ""
+    to_date: str = ""
+    version: str = ""
+    fields: tuple[str, ...] = ()
+    dates: tuple[str, ...] | None = None
+
+    @classmethod
+    def build(
+        cls,
+        *,
+        db: Path | str | None,
+        table: str,
+        symbols: Iterable[str],
+        from_date: str = "",
+        to_date: str = "",
+        version: str = "",
+        fields: Iterable[str] = (),
+        dates: Iterable[str] | None = None,
+    ) -> PanelKey:
+        return cls(
+            db=str(Path(db or settings.quant_duckdb_path).resolve()),
+            table=table,
+            symbols=tuple(sorted({s.upper() for s in symbols})),
+            from_date=str(from_date),
+            to_date=str(to_date),
+            version=str(version),
+            fields=tuple(fields),
+            dates=tuple(sorted(str(d) for d in dates)) if dates is not None else None,
+        )
+
+    def covers(self, other: PanelKey) -> bool:
+        """True when this entry's rows are a superset of `other`'s.
+
+        Only the date range / date filter may differ, so slicing by date gives
+        exactly what the loader would have returned.
+        """
+        if (self.db, self.table, self.version, self.fields, self.symbols) != (
+            other.db,
+            other.table,
+            other.version,
+            other.fields,
+            other.symbols,
+        ):
+            return False
+        if (self.from_date and self.from_date > other.from_date) or (
+            self.to_date and (not other.to_date or self.to_date < other.to_date)
+        ):
+            return False
+        if self.dates is None:
+            return True
+        return other.dates is not None and set(other.dates) <= set(self.dates)
+
+
+@dataclass
+class _Entry:
+    panel: Panel
+    signature: tuple
+    nbytes: int = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.nbytes = self.panel.nbytes
+
+
+# Tables a cached panel is read from, when more than its key's table
+# (the returns panel falls back to ohlcv close when `returns` is incomplete)
+_SOURCE_TABLES: dict[str, tuple[str, ...]] = {"returns": ("returns", "ohlcv")}
+
+
+def _signature(key: PanelKey) -> tuple | None:
+    """write_seq of the key's source tables; None when it cannot be read."""
+    if not Path(key.db).exists():
+        return None
+    tables = _SOURCE_TABLES.get(key.table, (key.table,))
+    try:
+        conn = duck_connect(Path(key.db))
+    except duckdb.Error:
+        return None
+    try:
+        return tuple(write_seq(conn, t) for t in tables)
+    finally:
+        conn.close()
+
+
+def _slice(panel: Panel, key: PanelKey) -> Panel:
+    lo = np.datetime64(key.from_date, "D") if key.from_date else None
+    hi = np.datetime64(key.to_date, "D") if key.to_date else None
+    mask = np.ones(len(panel.dates), dtype=bool)
+    if lo is not None:
+        mask &= panel.dates >= lo
+    if hi is not None:
+        mask &= panel.dates <= hi
+    if key.dates is not None:
+        mask &= np.isin(panel.dates, np.asarray(key.dates, dtype="datetime64[D]"))
+    if mask.all():
+        return panel
+    return Panel(
+        symbols=panel.symbols,
+        dates=panel.dates[mask],
+        values={k: v[mask] for k, v in panel.values.items()},
+    )
+
+
+class PanelCache:
+    def __init__(self, max_bytes: int | None = None):
+        self.max_bytes = (
+            int(settings.quant_panel_cache_mb) * 1024 * 1024
+            if max_bytes is None
+            else int(max_bytes)
+        )
+        self._entries: OrderedDict[PanelKey, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _drop(self, key: PanelKey) -> None:
+        entry = self._entries.pop(key)
+        self.nbytes -= entry.nbytes
+
+    def get(self, key: PanelKey, signature: tuple | None = None) -> Panel | None:
+        """Cached panel for `key`; `signature` defaults to `_signature(key)`."""
+        if self.max_bytes <= 0:
+            return None
+        sig = _signature(key) if signature is None else signature
+        with self._lock:
+            # Entries of the same (db, table) share the source state
+            for k in [
+                k
+                for k, e in self._entries.items()
+                if (k.db, k.table) == (key.db, key.table) and e.signature != sig
+            ]:
+                self._drop(k)
+            entry = self._entries.get(key)
+            if entry is None:
+                cover = next((k for k in self._entries if k.covers(key)), None)
+                entry = self._entries.get(cover) if cover is not None else None
+                key = cover if cover is not None else key
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.panel
+
+    def put(self, key: PanelKey, panel: Panel, signature: tuple | None = None) -> None:
+        """Cache `panel`; pass the `signature` read before loading it."""
+        if self.max_bytes <= 0 or panel.nbytes > self.max_bytes:
+            return
+        sig = _signature(key) if signature is None else signature
+        if sig is None:
+            return
+        for arr in panel.values.values():
+            arr.flags.writeable = False
+        entry = _Entry(panel=panel, signature=sig)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = entry
+            self.nbytes += entry.nbytes
+            while self.nbytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate(
+        self, table: str | None = None, symbols: Iterable[str] | None = None
+    ) -> int:
+        """Drop entries for `table` (all tables when None) touching `symbols`."""
+        wanted = {s.upper() for s in symbols} if symbols is not None else None
+        with self._lock:
+            stale = [
+                k
+                for k in self._entries
+                if (table is None or k.table == table)
+                and (wanted is None or wanted.intersection(k.symbols))
+            ]
+            for k in stale:
+                self._drop(k)
+        return len(stale)
+
+    def clear(self) -> None:
+        self.invalidate()
+
+
+panel_cache = PanelCache()
+
+
+def cached_panel(key: PanelKey, load: Callable[[], Panel]) -> Panel:
+    """Serve `key` from the process-wide cache, loading (and caching) on miss."""
+    if panel_cache.max_bytes <= 0:
+        return load()
+    # Read before loading, so a write racing the load leaves the entry stale
+    sig = _signature(key)
+    panel = panel_cache.get(key, sig) if sig is not None else None
+    if panel is not None:
+        return _slice(panel, key)
+    panel = load()
+    if sig is not None:
+        panel_cache.put(key, panel, sig)
+    return panel
+
+
+def invalidate(table: str | None = None, symbols: Iterable[str] | None = None) -> int:
+    """Writer hook: forget cached panels built from `table` for `symbols`."""
+    return panel_cache.invalidate(table, symbols)
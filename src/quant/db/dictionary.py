@@ -0,0 +1,331 @@
+"""Optional dictionary-encoded storage for the long-form fact tables.
+
+`features_daily`, `labels` and `targets` repeat TEXT symbol/feature/label keys on
+every row. When encoded (`quant db encode`), each table becomes:
+
+- `<table>_fact`: the rows with integer `symbol_id` / `feature_id` / `label_id`
+- `dim_symbol`, `dim_feature`, `dim_label`: the dictionaries
+- a view named `<table>` that joins them back to the original column names,
+  so readers (UI, recommenders, backtest) are unchanged.
+
+Writers check `is_encoded()` and go through `insert_encoded()` /
+`delete_symbol_rows()` / `delete_symbol()`; DuckDB views are not insertable.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import duckdb
+
+from .duck import object_type, table_ddl
+
+DIM_DDL = """
+CREATE SEQUENCE IF NOT EXISTS dim_symbol_seq START 1;
+CREATE TABLE IF NOT EXISTS dim_symbol (
+  symbol_id INTEGER PRIMARY KEY DEFAULT nextval('dim_symbol_seq'),
+  symbol TEXT NOT NULL UNIQUE
+);
+
+CREATE SEQUENCE IF NOT EXISTS dim_feature_seq START 1;
+CREATE TABLE IF NOT EXISTS dim_feature (
+  feature_id INTEGER PRIMARY KEY DEFAULT nextval('dim_feature_seq'),
+  feature_name TEXT NOT NULL,
+  feature_version TEXT NOT NULL,
+  UNIQUE(feature_name, feature_version)
+);
+
+CREATE SEQUENCE IF NOT EXISTS dim_label_seq START 1;
+CREATE TABLE IF NOT EXISTS dim_label (
+  label_id INTEGER PRIMARY KEY DEFAULT nextval('dim_label_seq'),
+  label_name TEXT NOT NULL,
+  label_version TEXT NOT NULL,
+  UNIQUE(label_name, label_version)
+);
+"""
+
+DIM_TABLES = ("dim_symbol", "dim_feature", "dim_label")
+DIM_SEQUENCES = ("dim_symbol_seq", "dim_feature_seq", "dim_label_seq")
+
+_FILL_DIM_SYMBOL = """
+INSERT INTO dim_symbol (symbol)
+SELECT DISTINCT x.symbol
+FROM {src} x
+WHERE NOT EXISTS (SELECT 1 FROM dim_symbol s WHERE s.symbol = x.symbol)
+"""
+
+_FILL_DIM_FEATURE = """
+INSERT INTO dim_feature (feature_name, feature_version)
+SELECT DISTINCT x.feature_name, x.feature_version
+FROM {src} x
+WHERE NOT EXISTS (
+  SELECT 1 FROM dim_feature d
+  WHERE d.feature_name = x.feature_name AND d.feature_version = x.feature_version
+)
+"""
+
+_FILL_DIM_LABEL = """
+INSERT INTO dim_label (label_name, label_version)
+SELECT DISTINCT x.label_name, x.label_version
+FROM {src} x
+WHERE NOT EXISTS (
+  SELECT 1 FROM dim_label d
+  WHERE d.label_name = x.label_name AND d.label_version = x.label_version
+)
+"""
+
+
+@dataclass(frozen=True)
+class EncodedTable:
+    name: str
+    fact: str
+    fact_ddl: str
+    view_sql: str
+    fill_dims: tuple[str, ...]
+    insert_sql: str
+
+
+ENCODED_TABLES: dict[str, EncodedTable] = {
+    "features_daily": EncodedTable(
+        name="features_daily",
+        fact="features_daily_fact",
+        fact_ddl="""
+CREATE TABLE IF NOT EXISTS features_daily_fact (
+  symbol_id INTEGER NOT NULL,
+  ts DATE NOT NULL,
+  feature_id INTEGER NOT NULL,
+  feature_value DOUBLE,
+  computed_at TIMESTAMP,
+  PRIMARY KEY(symbol_id, ts, feature_id)
+);
+""",
+        view_sql="""
+CREATE VIEW features_daily AS
+SELECT s.symbol, f.ts, d.feature_name, f.feature_value, d.feature_version,
+       f.computed_at
+FROM features_daily_fact f
+JOIN dim_symbol s ON s.symbol_id = f.symbol_id
+JOIN dim_feature d ON d.feature_id = f.feature_id
+""",
+        fill_dims=(_FILL_DIM_SYMBOL, _FILL_DIM_FEATURE),
+        insert_sql="""
+INSERT INTO features_daily_fact
+  (symbol_id, ts, feature_id, feature_value, computed_at)
+SELECT s.symbol_id, CAST(x.ts AS DATE), d.feature_id, x.feature_value,
+       CAST(x.computed_at AS TIMESTAMP)
+FROM {src} x
+JOIN dim_symbol s ON s.symbol = x.symbol
+JOIN dim_feature d
+  ON d.feature_name = x.feature_name AND d.feature_version = x.feature_version
+""",
+    ),
+    "labels": EncodedTable(
+        name="labels",
+        fact="labels_fact",
+        fact_ddl="""
+CREATE TABLE IF NOT EXISTS labels_fact (
+  symbol_id INTEGER NOT NULL,
+  ts DATE NOT NULL,
+  label_id INTEGER NOT NULL,
+  label_value DOUBLE,
+  PRIMARY KEY(symbol_id, ts, label_id)
+);
+""",
+        view_sql="""
+CREATE VIEW labels AS
+SELECT s.symbol, f.ts, d.label_name, f.label_value, d.label_version
+FROM labels_fact f
+JOIN dim_symbol s ON s.symbol_id = f.symbol_id
+JOIN dim_label d ON d.label_id = f.label_id
+""",
+        fill_dims=(_FILL_DIM_SYMBOL, _FILL_DIM_LABEL),
+        insert_sql="""
+INSERT INTO labels_fact (symbol_id, ts, label_id, label_value)
+SELECT s.symbol_id, CAST(x.ts AS DATE), d.label_id, x.label_value
+FROM {src} x
+JOIN dim_symbol s ON s.symbol = x.symbol
+JOIN dim_label d
+  ON d.label_name = x.label_name AND d.label_version = x.label_version
+""",
+    ),
+    "targets": EncodedTable(
+        name="targets",
+        fact="targets_fact",
+        fact_ddl="""
+CREATE TABLE IF NOT EXISTS targets_fact (
+  strategy_id TEXT NOT NULL,
+  version TEXT NOT NULL,
+  study_date DATE NOT NULL,
+  symbol_id INTEGER NOT NULL,
+  weight DOUBLE,
+  score DOUBLE,
+  approved BOOLEAN,
+  risk_flags TEXT,
+  reason TEXT,
+  generated_at TIMESTAMP,
+  PRIMARY KEY(strategy_id, study_date, symbol_id)
+);
+""",
+        view_sql="""
+CREATE VIEW targets AS
+SELECT t.strategy_id, t.version, t.study_date, s.symbol, t.weight, t.score,
+       t.approved, t.risk_flags, t.reason, t.generated_at
+FROM targets_fact t
+JOIN dim_symbol s ON s.symbol_id = t.symbol_id
+""",
+        fill_dims=(_FILL_DIM_SYMBOL,),
+        insert_sql="""
+INSERT INTO targets_fact
+  (strategy_id, version, study_date, symbol_id, weight, score, approved,
+   risk_flags, reason, generated_at)
+SELECT x.strategy_id, x.version, CAST(x.study_date AS DATE), s.symbol_id,
+       x.weight, x.score, x.approved, x.risk_flags, x.reason,
+       CAST(x.generated_at AS TIMESTAMP)
+FROM {src} x
+JOIN dim_symbol s ON s.symbol = x.symbol
+""",
+    ),
+}
+
+# Per-table key columns for the writers' (symbol, version) replace scope
+_SYMBOL_SCOPE = {
+    "features_daily": ("dim_feature", "feature_id", "feature_version"),
+    "labels": ("dim_label", "label_id", "label_version"),
+}
+
+
+def is_encoded(conn: duckdb.DuckDBPyConnection, table: str) -> bool:
+    """True when `table` is served by the dictionary-encoded view."""
+    return table in ENCODED_TABLES and object_type(conn, table) == "VIEW"
+
+
+def encoded_tables(conn: duckdb.DuckDBPyConnection) -> list[str]:
+    return [t for t in ENCODED_TABLES if is_encoded(conn, t)]
+
+
+def insert_encoded(
+    conn: duckdb.DuckDBPyConnection, table: str, src: str, *, replace: bool = False
+) -> None:
+    """Insert rows shaped like the plain `table` from relation `src`.
+
+    `replace=True` upserts on the fact table's primary key (INSERT OR REPLACE).
+    """
+    spec = ENCODED_TABLES[table]
+    for sql in spec.fill_dims:
+        conn.execute(sql.format(src=src))
+    insert_sql = spec.insert_sql.format(src=src)
+    if replace:
+        insert_sql = insert_sql.replace("INSERT INTO", "INSERT OR REPLACE INTO", 1)
+    conn.execute(insert_sql)
+
+
+def delete_symbol_rows(
+    conn: duckdb.DuckDBPyConnection,
+    table: str,
+    *,
+    symbol: str,
+    version: str,
+    src: str,
+) -> int:
+    """DELETE for one symbol/version on the dates present in `src` (encoded).
+
+    Returns the number of deleted rows.
+    """
+    dim, key, version_col = _SYMBOL_SCOPE[table]
+    row = conn.execute(
+        f"""
+        DELETE FROM {ENCODED_TABLES[table].fact}
+        WHERE symbol_id = (SELECT symbol_id FROM dim_symbol WHERE symbol = ?)
+          AND {key} IN (SELECT {key} FROM {dim} WHERE {version_col} = ?)
+          AND ts IN (SELECT CAST(ts AS DATE) FROM {src})
+        """,
+        [symbol, version],
+    ).fetchone()
+    return int(row[0]) if row else 0
+
+
+def delete_symbol(conn: duckdb.DuckDBPyConnection, table: str, symbol: str) -> int:
+    """DELETE every row of one symbol, all versions (plain or encoded table).
+
+    Returns the number of deleted rows.
+    """
+    if is_encoded(conn, table):
+        row = conn.execute(
+            f"""
+            DELETE FROM {ENCODED_TABLES[table].fact}
+            WHERE symbol_id = (SELECT symbol_id FROM dim_symbol WHERE symbol = ?)
+            """,
+            [symbol],
+        ).fetchone()
+    else:
+        row = conn.execute(f"DELETE FROM {table} WHERE symbol = ?", [symbol]).fetchone()
+    return int(row[0]) if row else 0
+
+
+def encode(conn: duckdb.DuckDBPyConnection, tables: list[str]) -> dict[str, int]:
+    """Migrate plain tables to fact + dimension tables behind same-named views.
+
+    Returns migrated row counts per table; already-encoded tables are skipped.
+    """
+    migrated: dict[str, int] = {}
+    conn.execute(DIM_DDL)
+    for table in tables:
+        spec = ENCODED_TABLES[table]
+        if object_type(conn, table) != "BASE TABLE":
+            continue
+        conn.execute("BEGIN TRANSACTION")
+        try:
+            conn.execute(spec.fact_ddl)
+            insert_encoded(conn, table, table)
+            row = conn.execute(f"SELECT COUNT(*) FROM {spec.fact}").fetchone()
+            conn.execute(f"DROP TABLE {table}")
+            conn.execute(spec.view_sql)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        migrated[table] = int(row[0]) if row else 0
+    conn.execute("CHECKPOINT")
+    return migrated
+
+
+def decode(conn: duckdb.DuckDBPyConnection, tables: list[str]) -> dict[str, int]:
+    """Reverse of encode(): restore plain tables from schema_duck.sql DDL."""
+    restored: dict[str, int] = {}
+    for table in tables:
+        spec = ENCODED_TABLES[table]
+        if not is_encoded(conn, table):
+            continue
+        conn.execute("BEGIN TRANSACTION")
+        try:
+            conn.execute(f"ALTER VIEW {table} RENAME TO {table}__encoded")
+            conn.execute(table_ddl(table))
+            conn.execute(f"INSERT INTO {table} SELECT * FROM {table}__encoded")
+            row = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()
+            conn.execute(f"DROP VIEW {table}__encoded")
+            conn.execute(f"DROP TABLE {spec.fact}")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        restored[table] = int(row[0]) if row else 0
+    if not encoded_tables(conn):
+        _drop_dims(conn)
+    conn.execute("CHECKPOINT")
+    return restored
+
+
+def drop_encoded(conn: duckdb.DuckDBPyConnection) -> None:
+    """Drop views, fact and dimension tables (used by init-db before recreate)."""
+    for table in encoded_tables(conn):
+        conn.execute(f"DROP VIEW IF EXISTS {table}")
+    for spec in ENCODED_TABLES.values():
+        conn.execute(f"DROP TABLE IF EXISTS {spec.fact}")
+    _drop_dims(conn)
+
+
+def _drop_dims(conn: duckdb.DuckDBPyConnection) -> None:
+    for t in DIM_TABLES:
+        conn.execute(f"DROP TABLE IF EXISTS {t}")
+    for seq in DIM_SEQUENCES:
+        conn.execute(f"DROP SEQUENCE IF EXISTS {seq}")
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import re
 from pathlib import Path
 from typing import Any
 
@@ -23,3 +24,32 @@ def exec_sql(
         conn.execute(sql)
     else:
         conn.execute(sql, params)
+
+
+SCHEMA_PATH = Path(__file__).parent / "schema_duck.sql"
+
+
+def table_ddl(table: str) -> str:
+    """`CREATE TABLE IF NOT EXISTS <table> (...)` statement from schema_duck.sql."""
+    schema = SCHEMA_PATH.read_text(encoding="utf-8")
+    m = re.search(
+        rf"CREATE TABLE IF NOT EXISTS {re.escape(table)} \(.*?\n\);",
+        schema,
+        flags=re.DOTALL,
+    )
+    if not m:
+        raise KeyError(f"Table {table} is not defined in {SCHEMA_PATH.name}")
+    return m.group(0)
+
+
+def object_type(conn: duckdb.DuckDBPyConnection, name: str) -> str | None:
+    """'BASE TABLE' | 'VIEW' | None for a main-schema object."""
+    row = conn.execute(
+        """
+        SELECT table_type
+        FROM information_schema.tables
+        WHERE table_schema = 'main' AND table_name = ?
+        """,
+        [name],
+    ).fetchone()
+    return str(row[0]) if row else None
@@ -0,0 +1,260 @@
+"""Physical layout maintenance for the DuckDB fact tables.
+
+Writers upsert with DELETE + INSERT per symbol, which leaves deleted rows in
+old row groups and appends fresh rows at the end of the table. Over time the
+row groups stop being clustered on (symbol, ts) and DuckDB's min/max zone
+maps can no longer skip them. `compact()` rewrites each table in its dominant
+access order; `rewrite_file()` copies the database into a fresh file so the
+freed blocks are actually returned to the filesystem.
+
+Writers call `record_write()` so the pipeline can compact automatically once
+`settings.quant_compact_deleted_rows` is exceeded (`maybe_compact()`); the
+per-table `write_seq` it bumps is also the watermark of the on-disk panel store.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import time
+import weakref
+from dataclasses import dataclass
+from pathlib import Path
+
+import duckdb
+
+from ..config import settings
+from .dictionary import ENCODED_TABLES, is_encoded
+from .duck import connect as duck_connect
+from .duck import object_type, table_ddl
+
+log = logging.getLogger(__name__)
+
+# Sort keys per table, following how each table is read:
+# - ohlcv/returns/features/labels: per-symbol date ranges (ingest, training,
+#   panels with a symbol filter)
+# - predictions: per-date cross sections (scoring/recommend)
+# - targets: per-strategy rebalance dates
+COMPACT_ORDER: dict[str, tuple[str, ...]] = {
+    "ohlcv": ("symbol", "ts"),
+    "returns": ("symbol", "ts"),
+    "features_daily": ("symbol", "ts", "feature_name"),
+    "labels": ("symbol", "ts", "label_name"),
+    "predictions": ("ts", "symbol"),
+    "targets": ("strategy_id", "study_date", "symbol"),
+}
+
+# Same orders for the dictionary-encoded fact tables
+_FACT_ORDER: dict[str, tuple[str, ...]] = {
+    "features_daily": ("symbol_id", "ts", "feature_id"),
+    "labels": ("symbol_id", "ts", "label_id"),
+    "targets": ("strategy_id", "study_date", "symbol_id"),
+}
+
+STATS_TABLE = "db_maintenance"
+
+# Connections whose stats table is known to be current (init-db creates it;
+# older databases get it on their first recorded write)
+_STATS_READY: weakref.WeakSet[duckdb.DuckDBPyConnection] = weakref.WeakSet()
+
+
+@dataclass
+class CompactResult:
+    table: str
+    physical: str
+    rows: int
+    seconds: float
+    probe_ms_before: float | None
+    probe_ms_after: float | None
+
+
+def _ensure_stats(conn: duckdb.DuckDBPyConnection) -> None:
+    """Create/upgrade the stats table; checked once per connection.
+
+    A connection is only remembered once the table already exists, so DDL run
+    inside a transaction that is later rolled back is simply retried.
+    """
+    if conn in _STATS_READY:
+        return
+    row = conn.execute(
+        """
+        SELECT COUNT(*)
+        FROM information_schema.columns
+        WHERE table_schema = 'main' AND table_name = ? AND column_name = 'write_seq'
+        """,
+        [STATS_TABLE],
+    ).fetchone()
+    if row and row[0]:
+        _STATS_READY.add(conn)
+        return
+    conn.execute(table_ddl(STATS_TABLE))
+    conn.execute(
+        f"ALTER TABLE {STATS_TABLE} ADD COLUMN IF NOT EXISTS write_seq BIGINT DEFAULT 0"
+    )
+
+
+def record_write(conn: duckdb.DuckDBPyConnection, table: str, deleted: int = 0) -> None:
+    """Bump `table`'s write_seq and add `deleted` upsert-deleted rows."""
+    _ensure_stats(conn)
+    conn.execute(
+        f"""
+        INSERT INTO {STATS_TABLE} (table_name, deleted_rows, write_seq)
+        VALUES (?, ?, 1)
+        ON CONFLICT (table_name)
+        DO UPDATE SET deleted_rows = deleted_rows + excluded.deleted_rows,
+                      write_seq = write_seq + 1
+        """,
+        [table, max(int(deleted), 0)],
+    )
+
+
+def write_seq(conn: duckdb.DuckDBPyConnection, table: str) -> int:
+    """Number of recorded writes to `table` (0 when never recorded)."""
+    if object_type(conn, STATS_TABLE) is None:
+        return 0
+    try:
+        row = conn.execute(
+            f"SELECT write_seq FROM {STATS_TABLE} WHERE table_name = ?", [table]
+        ).fetchone()
+    except duckdb.BinderException:
+        # db_maintenance created before write_seq existed and never written since
+        return 0
+    return int(row[0] or 0) if row else 0
+
+
+def deleted_rows(conn: duckdb.DuckDBPyConnection) -> dict[str, int]:
+    """Deleted rows per table since the last compaction."""
+    if object_type(conn, STATS_TABLE) is None:
+        return {}
+    rows = conn.execute(
+        f"SELECT table_name, deleted_rows FROM {STATS_TABLE} ORDER BY table_name"
+    ).fetchall()
+    return {str(t): int(n or 0) for t, n in rows}
+
+
+def _physical(conn: duckdb.DuckDBPyConnection, table: str) -> tuple[str, str, str]:
+    """(physical table, CREATE DDL, ORDER BY) for a plain or encoded table."""
+    if is_encoded(conn, table):
+        spec = ENCODED_TABLES[table]
+        return spec.fact, spec.fact_ddl, ", ".join(_FACT_ORDER[table])
+    return table, table_ddl(table), ", ".join(COMPACT_ORDER[table])
+
+
+def _probe_ms(
+    conn: duckdb.DuckDBPyConnection, physical: str, order: str, repeat: int = 5
+) -> float | None:
+    """Average time of a lead-key point lookup (what zone maps should prune)."""
+    cols = [c.strip() for c in order.split(",")]
+    lead, second = cols[0], cols[1]
+    n = conn.execute(f"SELECT COUNT(*) FROM {physical}").fetchone()
+    if not n or not n[0]:
+        return None
+    key = conn.execute(
+        f"SELECT {lead} FROM {physical} ORDER BY {lead} LIMIT 1 OFFSET ?",
+        [int(n[0]) // 2],
+    ).fetchone()
+    query = f"SELECT COUNT(*), MAX({second}) FROM {physical} WHERE {lead} = ?"
+    conn.execute(query, [key[0]]).fetchone()  # warm-up
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        conn.execute(query, [key[0]]).fetchone()
+    return (time.perf_counter() - t0) / repeat * 1000.0
+
+
+def compact_table(conn: duckdb.DuckDBPyConnection, table: str) -> CompactResult:
+    """Rewrite one table sorted by its COMPACT_ORDER key (transactional)."""
+    physical, ddl, order = _physical(conn, table)
+    probe_before = _probe_ms(conn, physical, order)
+
+    t0 = time.perf_counter()
+    conn.execute("BEGIN TRANSACTION")
+    try:
+        conn.execute(f"ALTER TABLE {physical} RENAME TO {physical}__compact")
+        conn.execute(ddl)
+        conn.execute(
+            f"INSERT INTO {physical} SELECT * FROM {physical}__compact ORDER BY {order}"
+        )
+        row = conn.execute(f"SELECT COUNT(*) FROM {physical}").fetchone()
+        conn.execute(f"DROP TABLE {physical}__compact")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    seconds = time.perf_counter() - t0
+
+    return CompactResult(
+        table=table,
+        physical=physical,
+        rows=int(row[0]) if row else 0,
+        seconds=seconds,
+        probe_ms_before=probe_before,
+        probe_ms_after=_probe_ms(conn, physical, order),
+    )
+
+
+def compact(
+    conn: duckdb.DuckDBPyConnection, tables: list[str] | None = None
+) -> list[CompactResult]:
+    """Sort-rewrite the given non-empty tables (default: all), then checkpoint."""
+    results: list[CompactResult] = []
+    for table in tables or list(COMPACT_ORDER):
+        if object_type(conn, table) is None:
+            continue
+        if conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] == 0:
+            continue
+        results.append(compact_table(conn, table))
+
+    if object_type(conn, STATS_TABLE) is not None and results:
+        conn.execute(
+            f"""
+            UPDATE {STATS_TABLE}
+            SET deleted_rows = 0, compacted_at = CAST(now() AS TIMESTAMP)
+            WHERE table_name IN (SELECT UNNEST(?::VARCHAR[]))
+            """,
+            [[r.table for r in results]],
+        )
+    conn.execute("CHECKPOINT")
+    return results
+
+
+def rewrite_file(db_path: Path | str) -> tuple[float, float]:
+    """Copy the database into a fresh file and swap it in (needs exclusive access).
+
+    DuckDB reuses freed blocks but does not shrink the file; copying is the
+    supported way to give the space back. Returns (size_before, size_after) bytes.
+    """
+    path = Path(db_path)
+    tmp = path.with_name(path.name + ".compact")
+    tmp.unlink(missing_ok=True)
+    size_before = float(path.stat().st_size)
+
+    conn = duck_connect(path)
+    try:
+        row = conn.execute("SELECT current_database()").fetchone()
+        conn.execute(f"ATTACH '{tmp}' AS quant_compact")
+        conn.execute(f'COPY FROM DATABASE "{row[0]}" TO quant_compact')
+        conn.execute("DETACH quant_compact")
+    finally:
+        conn.close()
+
+    os.replace(tmp, path)
+    return size_before, float(path.stat().st_size)
+
+
+def maybe_compact(
+    db_path: Path | str | None = None, threshold: int | None = None
+) -> list[CompactResult]:
+    """Compact tables whose deleted-row counter passed `threshold` (0 disables)."""
+    limit = settings.quant_compact_deleted_rows if threshold is None else threshold
+    if limit <= 0:
+        return []
+
+    conn = duck_connect(Path(db_path or settings.quant_duckdb_path))
+    try:
+        due = [t for t, n in deleted_rows(conn).items() if n >= limit]
+        if not due:
+            return []
+        log.info(f"Auto-compacting {due} (deleted rows >= {limit:,})")
+        return compact(conn, due)
+    finally:
+        conn.close()
@@ -0,0 +1,390 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+PANEL_DTYPE = np.float32
+
+
+def _as_day(values: Any) -> np.ndarray:
+    return np.asarray(pd.to_datetime(values).values, dtype="datetime64[D]")
+
+
+def _as_values(values: Any) -> np.ndarray:
+    """float32 array with NULLs (masked entries from fetchnumpy) as NaN."""
+    return np.ma.asarray(values).astype(PANEL_DTYPE).filled(np.nan)
+
+
+@dataclass
+class Panel:
+    """Compact (date x symbol) panel of float32 fields.
+
+    - symbols: shared symbol axis (integer code = position)
+    - dates: shared day axis as datetime64[D] (int32 day index = position)
+    - values: field name -> float32 array of shape (n_dates, n_symbols), NaN = missing
+
+    Used instead of float64 wide frames / long frames with object symbol columns
+    for features, returns and weights.
+    """
+
+    symbols: np.ndarray
+    dates: np.ndarray
+    values: dict[str, np.ndarray] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        self.symbols = np.asarray(self.symbols, dtype=object)
+        self.dates = np.asarray(self.dates, dtype="datetime64[D]")
+        shape = self.shape
+        for name, arr in self.values.items():
+            if arr.shape != shape:
+                raise ValueError(
+                    f"Panel field {name} has shape {arr.shape}, expected {shape}"
+                )
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+    @classmethod
+    def empty(cls, symbols: Iterable[str] = (), dates: Any = ()) -> Panel:
+        return cls(
+            symbols=np.asarray(list(symbols), dtype=object), dates=_as_day(dates)
+        )
+
+    @classmethod
+    def from_arrays(
+        cls,
+        *,
+        symbol: Any,
+        ts: Any,
+        values: dict[str, Any],
+        symbols: Iterable[str] | None = None,
+        dates: Any = None,
+    ) -> Panel:
+        """Scatter long-form column arrays into (date x symbol) float32 arrays.
+
+        `symbols`/`dates` fix the axes (rows outside them are dropped); by default
+        the axes are the sorted unique values present in the input.
+        """
+        sym_arr = np.asarray(symbol, dtype=object)
+        day_arr = _as_day(ts)
+
+        sym_axis = (
+            np.asarray(list(symbols), dtype=object)
+            if symbols is not None
+            else np.asarray(sorted(set(sym_arr.tolist())), dtype=object)
+        )
+        day_axis = _as_day(dates) if dates is not None else np.unique(day_arr)
+
+        sym_codes = pd.Index(sym_axis).get_indexer(sym_arr).astype(np.int32)
+        day_idx = pd.Index(day_axis).get_indexer(day_arr).astype(np.int32)
+        keep = (sym_codes >= 0) & (day_idx >= 0)
+        sym_codes = sym_codes[keep]
+        day_idx = day_idx[keep]
+
+        out: dict[str, np.ndarray] = {}
+        for name, vals in values.items():
+            arr = np.full((len(day_axis), len(sym_axis)), np.nan, dtype=PANEL_DTYPE)
+            arr[day_idx, sym_codes] = _as_values(vals)[keep]
+            out[name] = arr
+        return cls(symbols=sym_axis, dates=day_axis, values=out)
+
+    @classmethod
+    def from_long(
+        cls,
+        df: pd.DataFrame,
+        *,
+        value_col: str,
+        field_col: str | None = None,
+        symbol_col: str = "symbol",
+        ts_col: str = "ts",
+        fields: Iterable[str] | None = None,
+        symbols: Iterable[str] | None = None,
+        dates: Any = None,
+    ) -> Panel:
+        """Build from a long frame.
+
+        - field_col=None: single field named `value_col`
+        - field_col set: one panel field per distinct value (e.g. feature_name)
+        """
+        if field_col is None:
+            return cls.from_arrays(
+                symbol=df[symbol_col].to_numpy(),
+                ts=df[ts_col].to_numpy(),
+                values={value_col: df[value_col].to_numpy()},
+                symbols=symbols,
+                dates=dates,
+            )
+
+        names = list(fields) if fields is not None else sorted(df[field_col].unique())
+        base = cls.from_arrays(
+            symbol=df[symbol_col].to_numpy(),
+            ts=df[ts_col].to_numpy(),
+            values={},
+            symbols=symbols,
+            dates=dates,
+        )
+        for name in names:
+            part = df[df[field_col] == name]
+            base.values[name] = cls.from_arrays(
+                symbol=part[symbol_col].to_numpy(),
+                ts=part[ts_col].to_numpy(),
+                values={name: part[value_col].to_numpy()},
+                symbols=base.symbols,
+                dates=base.dates,
+            ).values[name]
+        return base
+
+    @classmethod
+    def from_wide(cls, df: pd.DataFrame, name: str) -> Panel:
+        """Build a single-field panel from a (ts index x symbol columns) frame."""
+        return cls(
+            symbols=np.asarray(df.columns, dtype=object),
+            dates=_as_day(df.index),
+            values={name: df.to_numpy(dtype=PANEL_DTYPE, na_value=np.nan)},
+        )
+
+    # ------------------------------------------------------------------
+    # Accessors
+    # ------------------------------------------------------------------
+    @property
+    def shape(self) -> tuple[int, int]:
+        return (len(self.dates), len(self.symbols))
+
+    @property
+    def fields(self) -> list[str]:
+        return list(self.values)
+
+    @property
+    def nbytes(self) -> int:
+        return int(sum(a.nbytes for a in self.values.values()) + self.dates.nbytes)
+
+    @property
+    def date_index(self) -> pd.DatetimeIndex:
+        return pd.DatetimeIndex(self.dates.astype("datetime64[ns]"), name="ts")
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.values[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.values
+
+    def symbol_codes(self, symbols: Iterable[str]) -> np.ndarray:
+        """int32 codes for `symbols` on this panel's axis (-1 = absent)."""
+        return pd.Index(self.symbols).get_indexer(list(symbols)).astype(np.int32)
+
+    def day_index(self, dates: Any) -> np.ndarray:
+        """int32 day indices for `dates` on this panel's axis (-1 = absent)."""
+        return pd.Index(self.dates).get_indexer(_as_day(dates)).astype(np.int32)
+
+    def reindex(self, symbols: Iterable[str] | None = None, dates: Any = None) -> Panel:
+        """Align to new axes; missing cells become NaN."""
+        sym_axis = (
+            np.asarray(list(symbols), dtype=object)
+            if symbols is not None
+            else self.symbols
+        )
+        day_axis = _as_day(dates) if dates is not None else self.dates
+        si = self.symbol_codes(sym_axis)
+        di = self.day_index(day_axis)
+        out: dict[str, np.ndarray] = {}
+        for name, arr in self.values.items():
+            new = np.full((len(day_axis), len(sym_axis)), np.nan, dtype=PANEL_DTYPE)
+            rows = di >= 0
+            cols = si >= 0
+            new[np.ix_(rows, cols)] = arr[np.ix_(di[rows], si[cols])]
+            out[name] = new
+        return Panel(symbols=sym_axis, dates=day_axis, values=out)
+
+    def to_frame(self, name: str) -> pd.DataFrame:
+        """Wide (ts x symbol) float32 frame for one field."""
+        return pd.DataFrame(
+            self.values[name], index=self.date_index, columns=list(self.symbols)
+        )
+
+    def symbol_frame(self, symbol: str) -> pd.DataFrame:
+        """(ts x field) float32 frame for one symbol; all-NaN dates are dropped."""
+        code = int(self.symbol_codes([symbol])[0])
+        if code < 0:
+            return pd.DataFrame()
+        df = pd.DataFrame(
+            {k: v[:, code] for k, v in self.values.items()}, index=self.date_index
+        )
+        df.index.name = "date"
+        return df.dropna(how="all")
+
+    def stack(
+        self, fields: Iterable[str] | None = None, dropna: bool = True
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Model-ready rows.
+
+        Returns (symbol_codes int32, day_idx int32, X float32 [n_rows, n_fields]),
+        ordered by (symbol, day). With dropna, rows with any NaN field are skipped.
+        """
+        names = list(fields) if fields is not None else self.fields
+        n_dates, n_syms = self.shape
+        X = np.empty((n_syms * n_dates, len(names)), dtype=PANEL_DTYPE)
+        for j, name in enumerate(names):
+            # symbol-major order: (S, D) -> flat
+            X[:, j] = self.values[name].T.reshape(-1)
+        sym_codes = np.repeat(np.arange(n_syms, dtype=np.int32), n_dates)
+        day_idx = np.tile(np.arange(n_dates, dtype=np.int32), n_syms)
+        if dropna and len(names):
+            ok = ~np.isnan(X).any(axis=1)
+            return sym_codes[ok], day_idx[ok], X[ok]
+        return sym_codes, day_idx, X
+
+    def rows_frame(self, sym_codes: np.ndarray, day_idx: np.ndarray) -> pd.DataFrame:
+        """(symbol categorical, ts) frame for stacked row indices."""
+        return pd.DataFrame(
+            {
+                "symbol": pd.Categorical.from_codes(
+                    sym_codes, categories=pd.Index(self.symbols, dtype=object)
+                ),
+                "ts": self.date_index[day_idx],
+            }
+        )
+
+
+# ----------------------------------------------------------------------
+# DuckDB loaders (long-form tables -> Panel, no pandas long frame)
+# ----------------------------------------------------------------------
+def _fetch_long(
+    conn: duckdb.DuckDBPyConnection, query: str, params: list[Any]
+) -> dict[str, np.ndarray]:
+    return conn.execute(query, params).fetchnumpy()
+
+
+def load_ohlcv_panel(
+    conn: duckdb.DuckDBPyConnection,
+    *,
+    symbols: list[str],
+    from_date: str,
+    to_date: str,
+    fields: tuple[str, ...] = ("close",),
+) -> Panel:
+    """ohlcv columns as float32 fields (missing/NULL -> NaN)."""
+    cols = _fetch_long(
+        conn,
+        f"""
+        SELECT symbol, ts, {", ".join(fields)}
+        FROM ohlcv
+        WHERE symbol IN (SELECT UNNEST(?::VARCHAR[]))
+          AND ts >= CAST(? AS DATE)
+          AND ts <= CAST(? AS DATE)
+        """,
+        [list(symbols), from_date, to_date],
+    )
+    return Panel.from_arrays(
+        symbol=cols["symbol"],
+        ts=cols["ts"],
+        values={f: cols[f] for f in fields},
+        symbols=sorted(set(symbols)),
+    )
+
+
+def load_return_panel(
+    conn: duckdb.DuckDBPyConnection,
+    *,
+    symbols: list[str],
+    from_date: str,
+    to_date: str,
+    fields: tuple[str, ...] = ("ret_1d",),
+) -> Panel:
+    """Precomputed `returns` columns as float32 fields (missing/NULL -> NaN)."""
+    cols = _fetch_long(
+        conn,
+        f"""
+        SELECT symbol, ts, {", ".join(fields)}
+        FROM returns
+        WHERE symbol IN (SELECT UNNEST(?::VARCHAR[]))
+          AND ts >= CAST(? AS DATE)
+          AND ts <= CAST(? AS DATE)
+        """,
+        [list(symbols), from_date, to_date],
+    )
+    return Panel.from_arrays(
+        symbol=cols["symbol"],
+        ts=cols["ts"],
+        values={f: cols[f] for f in fields},
+        symbols=sorted(set(symbols)),
+    )
+
+
+def load_feature_panel(
+    conn: duckdb.DuckDBPyConnection,
+    *,
+    symbols: list[str],
+    feature_version: str,
+    feature_names: list[str],
+    from_date: str,
+    to_date: str,
+    dates: list[str] | None = None,
+) -> Panel:
+    """features_daily (long) -> one float32 field per feature_name.
+
+    `dates` restricts rows to the given days (e.g. rebalance dates).
+    """
+    params: list[Any] = [
+        list(symbols),
+        feature_version,
+        list(feature_names),
+        from_date,
+        to_date,
+    ]
+    date_filter = ""
+    if dates is not None:
+        date_filter = "AND ts IN (SELECT UNNEST(?::DATE[]))"
+        params.append(list(dates))
+    cols = _fetch_long(
+        conn,
+        f"""
+        SELECT symbol, ts, feature_name, feature_value
+        FROM features_daily
+        WHERE symbol IN (SELECT UNNEST(?::VARCHAR[]))
+          AND feature_version = ?
+          AND feature_name IN (SELECT UNNEST(?::VARCHAR[]))
+          AND ts >= CAST(? AS DATE)
+          AND ts <= CAST(? AS DATE)
+          {date_filter}
+        """,
+        params,
+    )
+    day_axis = np.unique(_as_day(cols["ts"])) if len(cols["ts"]) else None
+    panel = Panel.from_arrays(
+        symbol=cols["symbol"],
+        ts=cols["ts"],
+        values={},
+        symbols=sorted(set(symbols)),
+        dates=day_axis if day_axis is not None else [],
+    )
+    names = np.asarray(cols["feature_name"], dtype=object)
+    feature_values = _as_values(cols["feature_value"])
+    for name in feature_names:
+        m = names == name
+        panel.values[name] = Panel.from_arrays(
+            symbol=np.asarray(cols["symbol"], dtype=object)[m],
+            ts=np.asarray(cols["ts"])[m],
+            values={name: feature_values[m]},
+            symbols=panel.symbols,
+            dates=panel.dates,
+        ).values[name]
+    return panel
+
+
+def returns_from_close(close: np.ndarray) -> np.ndarray:
+    """1d simple returns on a (date x symbol) close array.
+
+    Gaps are forward-filled first (pct_change pad semantics); the first row and
+    leading gaps are 0.
+    """
+    filled = pd.DataFrame(close).ffill().to_numpy(dtype=PANEL_DTYPE)
+    ret = np.zeros_like(filled)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ret[1:] = filled[1:] / filled[:-1] - 1.0
+    ret[~np.isfinite(ret)] = 0.0
+    return ret
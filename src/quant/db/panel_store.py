@@ -0,0 +1,247 @@
+"""Optional on-disk panel store: memory-mapped `.npy` (date x symbol) matrices.
+
+Research notebooks, the trainer and the UI keep materializing the same
+features/labels/close panels from DuckDB. When enabled
+(`settings.quant_panel_store`), the pipeline writes the full panel for a table
+and version after the ingest/features/labels stages:
+
+    <quant_panel_store_dir>/<table>__<version>/
+        manifest.json     source watermark, axes, fields
+        symbols.npy       str symbol axis
+        dates.npy         datetime64[D] day axis
+        f<i>.npy          float32 (n_dates, n_symbols) for manifest fields[i]
+
+Reads memory-map the field files, so loading is O(1) and concurrent processes
+share the pages through the OS page cache. The watermark is the source row
+count, max date and `db_maintenance.write_seq`; a mismatch means the files
+are stale and `load()` returns None.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import duckdb
+import numpy as np
+
+from ..config import settings
+from .duck import connect as duck_connect
+from .duck import object_type
+from .maintenance import write_seq
+from .panel import Panel, _as_values
+
+log = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+
+
+@dataclass(frozen=True)
+class _Source:
+    name_col: str | None
+    value_col: str
+    version_col: str | None
+
+
+# Long tables: one field per name; ohlcv: the close column only
+STORE_SOURCES: dict[str, _Source] = {
+    "features_daily": _Source("feature_name", "feature_value", "feature_version"),
+    "labels": _Source("label_name", "label_value", "label_version"),
+    "ohlcv": _Source(None, "close", None),
+}
+
+
+class PanelStore:
+    def __init__(
+        self, root: Path | str | None = None, db_path: Path | str | None = None
+    ):
+        self.root = Path(root or settings.quant_panel_store_dir)
+        self.db_path = Path(db_path or settings.quant_duckdb_path)
+
+    def path(self, table: str, version: str = "v1") -> Path:
+        return self.root / f"{table}__{self._version(table, version)}"
+
+    @staticmethod
+    def _version(table: str, version: str) -> str:
+        return version if STORE_SOURCES[table].version_col else "all"
+
+    # ------------------------------------------------------------------
+    # Watermark
+    # ------------------------------------------------------------------
+    def watermark(
+        self, conn: duckdb.DuckDBPyConnection, table: str, version: str = "v1"
+    ) -> dict[str, Any]:
+        """Cheap source state: row count, max ts and the table's write_seq."""
+        src = STORE_SOURCES[table]
+        where, params = "", []
+        if src.version_col:
+            where, params = f"WHERE {src.version_col} = ?", [version]
+        if object_type(conn, table) is None:
+            return {"rows": 0, "max_ts": None, "write_seq": 0}
+        row = conn.execute(
+            f"SELECT COUNT(*), MAX(ts) FROM {table} {where}", params
+        ).fetchone()
+        n, max_ts = row if row is not None else (0, None)
+        return {
+            "rows": int(n),
+            "max_ts": str(max_ts) if max_ts is not None else None,
+            "write_seq": write_seq(conn, table),
+        }
+
+    # ------------------------------------------------------------------
+    # Build / write
+    # ------------------------------------------------------------------
+    def _load_full(
+        self, conn: duckdb.DuckDBPyConnection, table: str, version: str
+    ) -> Panel:
+        src = STORE_SOURCES[table]
+        name = f"{src.name_col} AS name" if src.name_col else "NULL AS name"
+        where, params = "", []
+        if src.version_col:
+            where, params = f"WHERE {src.version_col} = ?", [version]
+        cols = conn.execute(
+            f"SELECT symbol, ts, {name}, {src.value_col} AS value FROM {table} {where}",
+            params,
+        ).fetchnumpy()
+        if src.name_col is None:
+            return Panel.from_arrays(
+                symbol=cols["symbol"], ts=cols["ts"], values={"close": cols["value"]}
+            )
+        panel = Panel.from_arrays(symbol=cols["symbol"], ts=cols["ts"], values={})
+        names = np.asarray(cols["name"], dtype=object)
+        values = _as_values(cols["value"])
+        symbols = np.asarray(cols["symbol"], dtype=object)
+        for field_name in sorted(set(names.tolist())):
+            m = names == field_name
+            panel.values[field_name] = Panel.from_arrays(
+                symbol=symbols[m],
+                ts=np.asarray(cols["ts"])[m],
+                values={field_name: values[m]},
+                symbols=panel.symbols,
+                dates=panel.dates,
+            ).values[field_name]
+        return panel
+
+    def write(
+        self, table: str, panel: Panel, watermark: dict[str, Any], version: str = "v1"
+    ) -> Path:
+        """Write `panel` atomically (temp dir + rename) with its manifest."""
+        target = self.path(table, version)
+        tmp = target.with_name(target.name + ".tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+
+        np.save(tmp / "symbols.npy", np.asarray(panel.symbols, dtype=str))
+        np.save(tmp / "dates.npy", panel.dates)
+        for i, arr in enumerate(panel.values.values()):
+            np.save(tmp / f"f{i}.npy", np.ascontiguousarray(arr, dtype=np.float32))
+        manifest = {
+            "table": table,
+            "version": self._version(table, version),
+            "fields": panel.fields,
+            "shape": list(panel.shape),
+            "watermark": watermark,
+            "written_at": datetime.now(UTC).isoformat(),
+        }
+        (tmp / MANIFEST).write_text(
+            json.dumps(manifest, ensure_ascii=False, indent=2) + "\n", encoding="utf-8"
+        )
+
+        old = target.with_name(target.name + ".old")
+        shutil.rmtree(old, ignore_errors=True)
+        if target.exists():
+            os.replace(target, old)
+        os.replace(tmp, target)
+        shutil.rmtree(old, ignore_errors=True)
+        return target
+
+    def build(self, table: str, version: str = "v1") -> Panel:
+        """Materialize the full table panel from DuckDB and write it."""
+        conn = duck_connect(self.db_path, read_only=True)
+        try:
+            mark = self.watermark(conn, table, version)
+            panel = self._load_full(conn, table, version)
+        finally:
+            conn.close()
+        self.write(table, panel, mark, version)
+        return panel
+
+    # ------------------------------------------------------------------
+    # Read
+    # ------------------------------------------------------------------
+    def manifest(self, table: str, version: str = "v1") -> dict[str, Any] | None:
+        path = self.path(table, version) / MANIFEST
+        if not path.exists():
+            return None
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def is_fresh(
+        self,
+        table: str,
+        version: str = "v1",
+        conn: duckdb.DuckDBPyConnection | None = None,
+    ) -> bool:
+        """Manifest watermark matches the source table (`conn` reused if given)."""
+        manifest = self.manifest(table, version)
+        if manifest is None:
+            return False
+        if conn is not None:
+            return manifest["watermark"] == self.watermark(conn, table, version)
+        if not self.db_path.exists():
+            return False
+        own = duck_connect(self.db_path, read_only=True)
+        try:
+            return manifest["watermark"] == self.watermark(own, table, version)
+        finally:
+            own.close()
+
+    def load(
+        self,
+        table: str,
+        version: str = "v1",
+        *,
+        check: bool = True,
+        conn: duckdb.DuckDBPyConnection | None = None,
+    ) -> Panel | None:
+        """Memory-mapped panel, or None when missing (or stale when `check`)."""
+        manifest = self.manifest(table, version)
+        if manifest is None or (check and not self.is_fresh(table, version, conn)):
+            return None
+        base = self.path(table, version)
+        return Panel(
+            symbols=np.load(base / "symbols.npy").astype(object),
+            dates=np.load(base / "dates.npy"),
+            values={
+                name: np.load(base / f"f{i}.npy", mmap_mode="r")
+                for i, name in enumerate(manifest["fields"])
+            },
+        )
+
+    def clear(self, table: str | None = None, version: str = "v1") -> None:
+        if table is None:
+            shutil.rmtree(self.root, ignore_errors=True)
+        else:
+            shutil.rmtree(self.path(table, version), ignore_errors=True)
+
+
+def refresh_panel_store(
+    tables: list[str], version: str = "v1", db_path: Path | str | None = None
+) -> list[Path]:
+    """Rebuild stale store entries (no-op unless settings.quant_panel_store)."""
+    if not settings.quant_panel_store:
+        return []
+    store = PanelStore(db_path=db_path)
+    written: list[Path] = []
+    for table in tables:
+        if store.is_fresh(table, version):
+            continue
+        store.build(table, version)
+        written.append(store.path(table, version))
+        log.info(f"Panel store refreshed: {store.path(table, version)}")
+    return written
@@ -104,5 +104,73 @@ CREATE TABLE IF NOT EXISTS backtest_summary (
   fee_bps DOUBLE,
   slippage_bps DOUBLE,
   created_at TIMESTAMP,
+  batch_id TEXT,
   PRIMARY KEY(run_id)
 );
+
+-- Per-day equity curve of a backtest run (backtest_engine.metrics.equity_curve)
+CREATE TABLE IF NOT EXISTS backtest_equity_curve (
+  run_id TEXT NOT NULL,
+  ts DATE NOT NULL,
+  daily_return DOUBLE,
+  equity DOUBLE,
+  drawdown DOUBLE,
+  underwater_days BIGINT,
+  rolling_sharpe DOUBLE,
+  rolling_vol DOUBLE,
+  PRIMARY KEY(run_id, ts)
+);
+
+-- Stationary block bootstrap confidence intervals (quant backtest --bootstrap)
+CREATE TABLE IF NOT EXISTS backtest_bootstrap (
+  run_id TEXT NOT NULL,
+  metric TEXT NOT NULL,
+  point DOUBLE,
+  ci_low DOUBLE,
+  ci_high DOUBLE,
+  mean DOUBLE,
+  std DOUBLE,
+  confidence DOUBLE,
+  n_samples BIGINT,
+  mean_block DOUBLE,
+  seed BIGINT,
+  created_at TIMESTAMP,
+  PRIMARY KEY(run_id, metric)
+);
+
+-- Resume point of a backtest run (BacktestEngine.resume): last weights plus
+-- backtest_engine.metrics.MetricsState accumulators
+CREATE TABLE IF NOT EXISTS backtest_state (
+  run_id TEXT NOT NULL,
+  strategy_id TEXT,
+  first_ts DATE,
+  last_ts DATE,
+  symbols TEXT[],
+  weights DOUBLE[],
+  n_days BIGINT,
+  mean_ret DOUBLE,
+  m2_ret DOUBLE,
+  equity DOUBLE,
+  peak DOUBLE,
+  max_dd DOUBLE,
+  underwater_days BIGINT,
+  max_underwater_days BIGINT,
+  turnover_sum DOUBLE,
+  n_trades BIGINT,
+  n_wins BIGINT,
+  trade_ret_sum DOUBLE,
+  open_log_ret DOUBLE,
+  open_exposed BOOLEAN,
+  ret_tail DOUBLE[],
+  updated_at TIMESTAMP,
+  PRIMARY KEY(run_id)
+);
+
+-- Upsert churn (quant db compact) and write watermark (panel store) per table
+CREATE TABLE IF NOT EXISTS db_maintenance (
+  table_name TEXT NOT NULL,
+  deleted_rows BIGINT DEFAULT 0,
+  compacted_at TIMESTAMP,
+  write_seq BIGINT DEFAULT 0,
+  PRIMARY KEY(table_name)
+);
@@ -7,6 +7,12 @@ import duckdb
 import pandas as pd
 
 from quant.config import settings
+from quant.db.cache import PanelKey, cached_panel
+from quant.db.cache import invalidate as invalidate_panels
+from quant.db.dictionary import insert_encoded, is_encoded
+from quant.db.maintenance import record_write
+from quant.db.panel import Panel
+from quant.db.panel_store import PanelStore
 
 # Use paths from quant settings
 DB_PATH = settings.quant_duckdb_path
@@ -155,6 +161,9 @@ class SeriesStore:
         """
         )
         self.conn.unregister("df_view")
+        # Moves the panel store watermark so stored ohlcv panels get rebuilt
+        record_write(self.conn, "ohlcv")
+        invalidate_panels("ohlcv", [symbol])
 
     def get_ohlcv(
         self, symbol: str, frequency: str = "daily", currency: str = "USD"
@@ -363,25 +372,33 @@ class SeriesStore:
         self.conn.register("df_view", df_final)
         col_list = ", ".join(cols)
         try:
-            self.conn.execute(
-                f"INSERT OR REPLACE INTO features_daily ({col_list}) SELECT {col_list} FROM df_view"
-            )
-        except Exception:
-            set_clauses = ["feature_value = EXCLUDED.feature_value"]
-            if "computed_at" in table_cols:
-                set_clauses.append("computed_at = EXCLUDED.computed_at")
-            conflict_cols = ", ".join(
-                ["symbol", date_col, "feature_name", "feature_version"]
-            )
-            self.conn.execute(
-                f"""
-                INSERT INTO features_daily ({col_list}) SELECT {col_list} FROM df_view
-                ON CONFLICT ({conflict_cols})
-                DO UPDATE SET {', '.join(set_clauses)}
-            """
-            )
+            if is_encoded(self.conn, "features_daily"):
+                # `quant db encode` layout: the name is a view over the fact table
+                insert_encoded(self.conn, "features_daily", "df_view", replace=True)
+            else:
+                try:
+                    self.conn.execute(
+                        f"INSERT OR REPLACE INTO features_daily ({col_list}) SELECT {col_list} FROM df_view"
+                    )
+                except Exception:
+                    set_clauses = ["feature_value = EXCLUDED.feature_value"]
+                    if "computed_at" in table_cols:
+                        set_clauses.append("computed_at = EXCLUDED.computed_at")
+                    conflict_cols = ", ".join(
+                        ["symbol", date_col, "feature_name", "feature_version"]
+                    )
+                    self.conn.execute(
+                        f"""
+                        INSERT INTO features_daily ({col_list}) SELECT {col_list} FROM df_view
+                        ON CONFLICT ({conflict_cols})
+                        DO UPDATE SET {', '.join(set_clauses)}
+                    """
+                    )
+            # Moves the panel store watermark so stored panels get rebuilt
+            record_write(self.conn, "features_daily")
         finally:
             self.conn.unregister("df_view")
+            invalidate_panels("features_daily", [symbol])
 
     def get_features(self, symbol: str, version: str = "v1") -> pd.DataFrame:
         """Returns wide-form features for a symbol."""
@@ -401,6 +418,93 @@ class SeriesStore:
         )
         return df_pivot
 
+    def _get_long_panel(
+        self,
+        table: str,
+        name_col: str,
+        value_col: str,
+        version_col: str,
+        symbols: list[str],
+        version: str,
+    ) -> Panel:
+        date_col = self._get_date_column(table)
+        cols = self.conn.execute(
+            f"""
+            SELECT symbol, {date_col} AS ts, {name_col} AS name, {value_col} AS value
+            FROM {table}
+            WHERE symbol IN (SELECT UNNEST(?::VARCHAR[])) AND {version_col} = ?
+            """,
+            [[s.upper() for s in symbols], version],
+        ).fetchnumpy()
+        names = cols["name"]
+        panel = Panel.from_arrays(
+            symbol=cols["symbol"],
+            ts=cols["ts"],
+            values={},
+            symbols=sorted({s.upper() for s in symbols}),
+        )
+        for name in sorted(set(names.tolist())):
+            m = names == name
+            panel.values[name] = Panel.from_arrays(
+                symbol=cols["symbol"][m],
+                ts=cols["ts"][m],
+                values={name: cols["value"][m]},
+                symbols=panel.symbols,
+                dates=panel.dates,
+            ).values[name]
+        return panel
+
+    def get_feature_panel(self, symbols: list[str], version: str = "v1") -> Panel:
+        """float32 (date x symbol) panel with one field per feature_name."""
+        key = PanelKey.build(
+            db=self.db_path, table="features_daily", symbols=symbols, version=version
+        )
+        return cached_panel(
+            key,
+            lambda: (
+                self._stored_panel("features_daily", symbols, version)
+                or self._get_long_panel(
+                    "features_daily",
+                    "feature_name",
+                    "feature_value",
+                    "feature_version",
+                    symbols,
+                    version,
+                )
+            ),
+        )
+
+    def get_label_panel(self, symbols: list[str], version: str = "v1") -> Panel:
+        """float32 (date x symbol) panel with one field per label_name."""
+        key = PanelKey.build(
+            db=self.db_path, table="labels", symbols=symbols, version=version
+        )
+        return cached_panel(
+            key,
+            lambda: (
+                self._stored_panel("labels", symbols, version)
+                or self._get_long_panel(
+                    "labels",
+                    "label_name",
+                    "label_value",
+                    "label_version",
+                    symbols,
+                    version,
+                )
+            ),
+        )
+
+    def _stored_panel(
+        self, table: str, symbols: list[str], version: str
+    ) -> Panel | None:
+        """Fresh on-disk panel (quant.db.panel_store) aligned to `symbols`."""
+        if not settings.quant_panel_store:
+            return None
+        panel = PanelStore(db_path=self.db_path).load(table, version, conn=self.conn)
+        if panel is None:
+            return None
+        return panel.reindex(symbols=sorted({s.upper() for s in symbols}))
+
     def save_labels(self, df: pd.DataFrame, symbol: str, version: str = "v1"):
         """
         Save labels to DuckDB.
@@ -460,25 +564,33 @@ class SeriesStore:
         self.conn.register("df_view", df_final)
         col_list = ", ".join(cols)
         try:
-            self.conn.execute(
-                f"INSERT OR REPLACE INTO labels ({col_list}) SELECT {col_list} FROM df_view"
-            )
-        except Exception:
-            set_clauses = ["label_value = EXCLUDED.label_value"]
-            if "computed_at" in table_cols:
-                set_clauses.append("computed_at = EXCLUDED.computed_at")
-            conflict_cols = ", ".join(
-                ["symbol", date_col, "label_name", "label_version"]
-            )
-            self.conn.execute(
-                f"""
-                INSERT INTO labels ({col_list}) SELECT {col_list} FROM df_view
-                ON CONFLICT ({conflict_cols})
-                DO UPDATE SET {', '.join(set_clauses)}
-            """
-            )
+            if is_encoded(self.conn, "labels"):
+                # `quant db encode` layout: the name is a view over the fact table
+                insert_encoded(self.conn, "labels", "df_view", replace=True)
+            else:
+                try:
+                    self.conn.execute(
+                        f"INSERT OR REPLACE INTO labels ({col_list}) SELECT {col_list} FROM df_view"
+                    )
+                except Exception:
+                    set_clauses = ["label_value = EXCLUDED.label_value"]
+                    if "computed_at" in table_cols:
+                        set_clauses.append("computed_at = EXCLUDED.computed_at")
+                    conflict_cols = ", ".join(
+                        ["symbol", date_col, "label_name", "label_version"]
+                    )
+                    self.conn.execute(
+                        f"""
+                        INSERT INTO labels ({col_list}) SELECT {col_list} FROM df_view
+                        ON CONFLICT ({conflict_cols})
+                        DO UPDATE SET {', '.join(set_clauses)}
+                    """
+                    )
+            # Moves the panel store watermark so stored panels get rebuilt
+            record_write(self.conn, "labels")
         finally:
             self.conn.unregister("df_view")
+            invalidate_panels("labels", [symbol])
 
     def get_labels(self, symbol: str, version: str = "v1") -> pd.DataFrame:
         """Returns wide-form labels for a symbol."""
@@ -5,7 +5,11 @@ import numpy as np
 import pandas as pd
 
 from ..config import settings
+from ..data_curator.returns import RETURN_COLUMNS
+from ..db.cache import invalidate as invalidate_panels
+from ..db.dictionary import delete_symbol_rows, insert_encoded, is_encoded
 from ..db.duck import connect as duck_connect
+from ..db.maintenance import record_write
 
 logger = logging.getLogger(__name__)
 
@@ -29,10 +33,29 @@ class FeatureCalculator:
         finally:
             conn.close()
 
-    def calculate_v1_features(self, df: pd.DataFrame) -> pd.DataFrame:
+    def load_returns(self, symbol: str) -> pd.DataFrame:
+        """Load precomputed returns (ret_1d..ret_60d) indexed by ts."""
+        conn = duck_connect(self.db_path)
+        try:
+            df = conn.execute(
+                f"SELECT ts, {', '.join(RETURN_COLUMNS)} FROM returns "
+                "WHERE symbol = ? ORDER BY ts",
+                [symbol],
+            ).df()
+            if not df.empty:
+                df["ts"] = pd.to_datetime(df["ts"])
+                df = df.set_index("ts")
+            return df
+        finally:
+            conn.close()
+
+    def calculate_v1_features(
+        self, df: pd.DataFrame, returns: pd.DataFrame | None = None
+    ) -> pd.DataFrame:
         """
         Calculate v1 feature set.
         - returns: ret_1d, ret_5d, ret_20d, ret_60d
+          (taken from the precomputed `returns` table when it covers every row)
         - volatility: vol_20d (rolling std of ret_1d)
         - gap: gap_open ((open - prev_close) / prev_close)
         - range: hl_range ((high - low) / close)
@@ -45,10 +68,13 @@ class FeatureCalculator:
         feat_df = pd.DataFrame(index=df.index)
 
         # 1. Returns
-        feat_df["ret_1d"] = df["close"].pct_change(1)
-        feat_df["ret_5d"] = df["close"].pct_change(5)
-        feat_df["ret_20d"] = df["close"].pct_change(20)
-        feat_df["ret_60d"] = df["close"].pct_change(60)
+        if returns is not None and returns.index.equals(df.index):
+            feat_df[RETURN_COLUMNS] = returns[RETURN_COLUMNS]
+        else:
+            feat_df["ret_1d"] = df["close"].pct_change(1)
+            feat_df["ret_5d"] = df["close"].pct_change(5)
+            feat_df["ret_20d"] = df["close"].pct_change(20)
+            feat_df["ret_60d"] = df["close"].pct_change(60)
 
         # 2. Volatility
         feat_df["vol_20d"] = feat_df["ret_1d"].rolling(20).std()
@@ -118,29 +144,41 @@ class FeatureCalculator:
             # Atomic Delete & Insert (Upsert)
             conn.execute("BEGIN TRANSACTION")
             try:
-                # Use explicit DELETE to handle overlap safely
-                conn.execute(
-                    f"""
-                    DELETE FROM features_daily 
-                    WHERE symbol = '{symbol}' 
-                      AND feature_version = '{version}'
-                      AND ts::DATE IN (SELECT ts::DATE FROM df_tmp)
-                """
-                )
-                conn.execute(
+                if is_encoded(conn, "features_daily"):
+                    deleted = delete_symbol_rows(
+                        conn,
+                        "features_daily",
+                        symbol=symbol,
+                        version=version,
+                        src="df_tmp",
+                    )
+                    insert_encoded(conn, "features_daily", "df_tmp")
+                else:
+                    # Use explicit DELETE to handle overlap safely
+                    deleted = conn.execute(
+                        f"""
+                        DELETE FROM features_daily 
+                        WHERE symbol = '{symbol}' 
+                          AND feature_version = '{version}'
+                          AND ts::DATE IN (SELECT ts::DATE FROM df_tmp)
                     """
-                    INSERT INTO features_daily 
-                    (symbol, ts, feature_name, feature_value, feature_version, computed_at)
-                    SELECT 
-                        symbol, ts::DATE, feature_name, feature_value, feature_version, computed_at::TIMESTAMP 
-                    FROM df_tmp
-                """
-                )
+                    ).fetchone()[0]
+                    conn.execute(
+                        """
+                        INSERT INTO features_daily 
+                        (symbol, ts, feature_name, feature_value, feature_version, computed_at)
+                        SELECT 
+                            symbol, ts::DATE, feature_name, feature_value, feature_version, computed_at::TIMESTAMP 
+                        FROM df_tmp
+                    """
+                    )
+                record_write(conn, "features_daily", deleted)
                 conn.execute("COMMIT")
             except Exception as e:
                 conn.execute("ROLLBACK")
                 raise e
 
+            invalidate_panels("features_daily", [symbol])
             logger.debug(
                 f"Successfully saved {len(df_long)} feature rows for {symbol} (version={version})"
             )
@@ -155,5 +193,7 @@ class FeatureCalculator:
             logger.warning(f"No OHLCV data found for {symbol}")
             return
 
-        df_features = self.calculate_v1_features(df_ohlcv)
+        df_features = self.calculate_v1_features(
+            df_ohlcv, returns=self.load_returns(symbol)
+        )
         self.save_features(symbol, df_features, version)
@@ -4,7 +4,10 @@ import numpy as np
 import pandas as pd
 
 from ..config import settings
+from ..db.cache import invalidate as invalidate_panels
+from ..db.dictionary import delete_symbol_rows, insert_encoded, is_encoded
 from ..db.duck import connect as duck_connect
+from ..db.maintenance import record_write
 
 logger = logging.getLogger(__name__)
 
@@ -94,25 +97,33 @@ class LabelCalculator:
             # Atomic Delete & Insert (Upsert)
             conn.execute("BEGIN TRANSACTION")
             try:
-                conn.execute(
-                    f"""
-                    DELETE FROM labels 
-                    WHERE symbol = '{symbol}' 
-                      AND label_version = '{version}'
-                      AND ts::DATE IN (SELECT ts::DATE FROM df_tmp)
-                """
-                )
-                conn.execute(
+                if is_encoded(conn, "labels"):
+                    deleted = delete_symbol_rows(
+                        conn, "labels", symbol=symbol, version=version, src="df_tmp"
+                    )
+                    insert_encoded(conn, "labels", "df_tmp")
+                else:
+                    deleted = conn.execute(
+                        f"""
+                        DELETE FROM labels 
+                        WHERE symbol = '{symbol}' 
+                          AND label_version = '{version}'
+                          AND ts::DATE IN (SELECT ts::DATE FROM df_tmp)
                     """
-                    INSERT INTO labels (symbol, ts, label_name, label_value, label_version)
-                    SELECT symbol, ts::DATE, label_name, label_value, label_version FROM df_tmp
-                """
-                )
+                    ).fetchone()[0]
+                    conn.execute(
+                        """
+                        INSERT INTO labels (symbol, ts, label_name, label_value, label_version)
+                        SELECT symbol, ts::DATE, label_name, label_value, label_version FROM df_tmp
+                    """
+                    )
+                record_write(conn, "labels", deleted)
                 conn.execute("COMMIT")
             except Exception as e:
                 conn.execute("ROLLBACK")
                 raise e
 
+            invalidate_panels("labels", [symbol])
             logger.debug(
                 f"Successfully saved {len(df_long)} label rows for {symbol} (version={version})"
             )
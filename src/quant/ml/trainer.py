@@ -11,6 +11,7 @@ from sklearn.metrics import accuracy_score, precision_score
 
 from ..config import settings
 from ..db.metastore import MetaStore
+from ..db.panel import Panel
 from ..db.timeseries import SeriesStore
 from ..ml.experts import detect_market_regime, get_regime_label
 from ..ml.splits import get_time_series_splits
@@ -60,11 +61,42 @@ class MLTrainer:
         self.model_dir = Path(settings.repo_root) / "artifacts" / "models"
         self.model_dir.mkdir(parents=True, exist_ok=True)
 
+    def load_panels(
+        self,
+        symbols: list[str],
+        feature_version: str = "v1",
+        label_version: str = "v1",
+    ) -> tuple[Panel, Panel]:
+        """Features/labels for all symbols as float32 panels (one load each)."""
+        return (
+            self.series_store.get_feature_panel(symbols, version=feature_version),
+            self.series_store.get_label_panel(symbols, version=label_version),
+        )
+
     def prepare_data(
-        self, symbol: str, feature_version: str = "v1", label_version: str = "v1"
+        self,
+        symbol: str,
+        feature_version: str = "v1",
+        label_version: str = "v1",
+        features: Panel | None = None,
+        labels: Panel | None = None,
     ) -> pd.DataFrame:
-        df_feat = self.series_store.get_features(symbol, version=feature_version)
-        df_label = self.series_store.get_labels(symbol, version=label_version)
+        """Features joined with labels for one symbol.
+
+        Preloaded float32 panels (SeriesStore.get_feature_panel/get_label_panel)
+        avoid one DuckDB round-trip per symbol when training many symbols.
+        """
+        symbol = symbol.upper()
+        df_feat = (
+            features.symbol_frame(symbol)
+            if features is not None
+            else self.series_store.get_features(symbol, version=feature_version)
+        )
+        df_label = (
+            labels.symbol_frame(symbol)
+            if labels is not None
+            else self.series_store.get_labels(symbol, version=label_version)
+        )
 
         if df_feat.empty or df_label.empty:
             return pd.DataFrame()
@@ -79,8 +111,12 @@ class MLTrainer:
         horizon: int = 60,
         feature_selection: bool = False,
         stability_n_runs: int = 10,
+        features: Panel | None = None,
+        labels: Panel | None = None,
     ) -> str | None:
-        df = self.prepare_data(symbol, feature_version, label_version)
+        df = self.prepare_data(
+            symbol, feature_version, label_version, features=features, labels=labels
+        )
         if df.empty:
             logger.warning(f"No data for {symbol}. Skipping train.")
             return None
@@ -161,8 +197,12 @@ class MLTrainer:
         feature_version: str = "v1",
         label_version: str = "v1",
         horizon: int = 60,
+        features: Panel | None = None,
+        labels: Panel | None = None,
     ) -> list[str]:
-        df = self.prepare_data(symbol, feature_version, label_version)
+        df = self.prepare_data(
+            symbol, feature_version, label_version, features=features, labels=labels
+        )
         if df.empty:
             return []
 
@@ -1,6 +1,7 @@
 import logging
 from typing import Any
 
+import numpy as np
 import pandas as pd
 
 logger = logging.getLogger(__name__)
@@ -99,3 +100,85 @@ class PortfolioSupervisor:
         # To strictly implement a placeholder, we can just add a note.
 
         return df
+
+    def audit_many(
+        self, df_targets: pd.DataFrame, date_col: str | None = "asof"
+    ) -> pd.DataFrame:
+        """Audit every rebalance date of a multi-date targets frame at once.
+
+        Same rules and flags as calling audit() on each `date_col` group
+        (the whole frame is one portfolio when the column is absent), but
+        evaluated as column operations: R3 ranks approved rows by score
+        within each date, R1 scales each date's approved weights by its own
+        gross exposure. Row order and index are kept.
+        """
+        if df_targets.empty:
+            return df_targets
+
+        r1_gross_cap = self.config.get("gross_exposure_cap", 1.0)
+        r2_max_weight = self.config.get("max_weight_per_symbol", 0.15)
+        r3_max_positions = self.config.get("max_positions", 10)
+        r5_score_floor = self.config.get("score_floor", None)
+
+        df = df_targets.copy()
+        n = len(df)
+        if date_col and date_col in df.columns:
+            codes, uniques = pd.factorize(df[date_col].astype(str))
+        else:
+            codes, uniques = np.zeros(n, dtype=np.int64), [None]
+        weight = df["weight"].to_numpy(dtype=np.float64, copy=True)
+        score = df["score"].to_numpy(dtype=np.float64)
+        approved = np.ones(n, dtype=bool)
+        flags = np.full(n, "", dtype=object)
+
+        def add_flag(mask: np.ndarray, text) -> None:
+            """Append `text` (a string, or one per True cell of `mask`)."""
+            idx = np.flatnonzero(mask)
+            prev = flags[idx]
+            text = np.asarray(text, dtype=object)
+            flags[idx] = np.where(prev == "", text, prev + "," + text)
+
+        # R2: Max Position Weight (flag only)
+        r2 = weight > r2_max_weight
+        add_flag(
+            r2,
+            [f"R2:WeightExceeded({w:.2f}>{r2_max_weight:.2f})" for w in weight[r2]],
+        )
+
+        # R5: Score Floor
+        if r5_score_floor is not None:
+            r5 = score < r5_score_floor
+            approved &= ~r5
+            add_flag(
+                r5,
+                [f"R5:ScoreTooLow({v:.2f}<{r5_score_floor:.2f})" for v in score[r5]],
+            )
+
+        # R3: Max Positions per date (approved rows ranked by score, NaN last)
+        order = np.lexsort((-np.nan_to_num(score, nan=-np.inf), codes))
+        order = order[approved[order]]
+        rank = pd.Series(codes[order]).groupby(codes[order]).cumcount().to_numpy()
+        r3 = np.zeros(n, dtype=bool)
+        r3[order[rank >= r3_max_positions]] = True
+        approved &= ~r3
+        add_flag(r3, "R3:MaxPositionsExceeded")
+
+        # R1: Gross Exposure Cap per date
+        total = np.bincount(codes, weights=weight * approved, minlength=len(uniques))
+        over = total > r1_gross_cap
+        if over.any():
+            scale = np.ones(len(uniques))
+            scale[over] = r1_gross_cap / total[over]
+            r1 = approved & over[codes]
+            weight[r1] *= scale[codes[r1]]
+            labels = np.array([f"R1:Scaled({s:.2f})" for s in scale], dtype=object)
+            add_flag(r1, labels[codes[r1]])
+            logger.info(
+                f"R1: Scaled gross exposure to {r1_gross_cap:.2f} on "
+                f"{int(over.sum())}/{len(uniques)} dates"
+            )
+
+        df["weight"] = weight
+        df["approved"] = approved
+        df["risk_flags"] = flags
+        return df
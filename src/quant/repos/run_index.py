@@ -0,0 +1,275 @@
+"""SQLite index over the run artifacts (artifacts/index/run_index.db).
+
+`artifacts/runs/<run_id>/run.json` and `artifacts/index/runs/<slug>.json`
+stay the source of truth. Writers (`PipelineRunner._persist_run_json`, the
+alias index entry, the UI's initial run.json) upsert the same payload here,
+so the UI can page through runs without parsing every file on each render.
+`quant runs reindex` rebuilds the index from the files (legacy runs, or
+runs written while the index was unavailable).
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from pathlib import Path
+from typing import Any
+
+from ..config import settings
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    kind TEXT,
+    status TEXT,
+    started_at TEXT,
+    ended_at TEXT,
+    run_slug TEXT,
+    strategy_id TEXT,
+    sort_key TEXT,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_kind_sort ON runs (kind, sort_key);
+CREATE INDEX IF NOT EXISTS idx_runs_sort ON runs (sort_key);
+CREATE TABLE IF NOT EXISTS aliases (
+    run_slug TEXT PRIMARY KEY,
+    run_id TEXT,
+    created_at TEXT,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_aliases_created ON aliases (created_at);
+"""
+
+
+def index_path() -> Path:
+    return settings.quant_artifacts_dir / "index" / "run_index.db"
+
+
+def _sort_key(payload: dict[str, Any]) -> str:
+    # Same ordering as the old run.json scan
+    return str(payload.get("started_at") or payload.get("generated_at") or "")
+
+
+class RunIndex:
+    def __init__(self, path: Path | str | None = None):
+        self.path = Path(path or index_path())
+
+    @property
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def ensure(self) -> RunIndex:
+        """Build the index from the artifacts on first use (legacy trees)."""
+        if not self.exists:
+            self.rebuild()
+        return self
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        return conn
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _run_row(payload: dict[str, Any]) -> tuple:
+        return (
+            str(payload["run_id"]),
+            payload.get("kind"),
+            payload.get("status"),
+            payload.get("started_at"),
+            payload.get("ended_at"),
+            payload.get("run_slug"),
+            payload.get("strategy_id"),
+            _sort_key(payload),
+            json.dumps(payload, ensure_ascii=False),
+        )
+
+    @staticmethod
+    def _alias_row(payload: dict[str, Any]) -> tuple:
+        return (
+            str(payload["run_slug"]),
+            payload.get("run_id"),
+            str(payload.get("created_at") or ""),
+            json.dumps(payload, ensure_ascii=False),
+        )
+
+    def upsert_run(self, payload: dict[str, Any]) -> None:
+        """Insert or replace one run.json payload (keyed by run_id)."""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    self._run_row(payload),
+                )
+        finally:
+            conn.close()
+
+    def upsert_alias(self, payload: dict[str, Any]) -> None:
+        """Insert or replace one alias index entry (keyed by run_slug)."""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO aliases VALUES (?, ?, ?, ?)",
+                    self._alias_row(payload),
+                )
+        finally:
+            conn.close()
+
+    def rebuild(
+        self, runs_dir: Path | str | None = None, aliases_dir: Path | str | None = None
+    ) -> tuple[int, int]:
+        """Replace the index with a scan of run.json / alias files.
+
+        Returns (runs, aliases) indexed. plan_* directories are skipped, and
+        unreadable files are ignored like the UI scan did.
+        """
+        runs_base = Path(runs_dir or settings.quant_runs_dir)
+        alias_base = Path(
+            aliases_dir or settings.quant_artifacts_dir / "index" / "runs"
+        )
+
+        runs: list[tuple] = []
+        if runs_base.exists():
+            for d in runs_base.iterdir():
+                if not d.is_dir() or d.name.startswith("plan_"):
+                    continue
+                payload = _read_json(d / "run.json")
+                if payload is not None and payload.get("run_id"):
+                    runs.append(self._run_row(payload))
+
+        aliases: list[tuple] = []
+        if alias_base.exists():
+            for p in alias_base.glob("*.json"):
+                payload = _read_json(p)
+                if payload is not None:
+                    payload.setdefault("run_slug", p.stem)
+                    aliases.append(self._alias_row(payload))
+
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM runs")
+                conn.execute("DELETE FROM aliases")
+                conn.executemany(
+                    "INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    runs,
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO aliases VALUES (?, ?, ?, ?)", aliases
+                )
+        finally:
+            conn.close()
+        return len(runs), len(aliases)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def list_runs(
+        self,
+        *,
+        kind: str | None = None,
+        status: str | None = None,
+        limit: int | None = 50,
+        offset: int = 0,
+    ) -> list[dict[str, Any]]:
+        """run.json payloads, newest first."""
+        where, params = _filters(kind=kind, status=status)
+        sql = f"SELECT payload FROM runs {where} ORDER BY sort_key DESC, run_id"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += [int(limit), max(int(offset), 0)]
+        conn = self._connect()
+        try:
+            rows = conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+        return [json.loads(r[0]) for r in rows]
+
+    def count_runs(self, *, kind: str | None = None, status: str | None = None) -> int:
+        where, params = _filters(kind=kind, status=status)
+        conn = self._connect()
+        try:
+            row = conn.execute(f"SELECT COUNT(*) FROM runs {where}", params).fetchone()
+            return int(row[0])
+        finally:
+            conn.close()
+
+    def list_aliases(
+        self, *, limit: int | None = 50, offset: int = 0
+    ) -> list[dict[str, Any]]:
+        """Alias index entries, newest first."""
+        sql = "SELECT payload FROM aliases ORDER BY created_at DESC, run_slug"
+        params: list[Any] = []
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params = [int(limit), max(int(offset), 0)]
+        conn = self._connect()
+        try:
+            rows = conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+        return [json.loads(r[0]) for r in rows]
+
+    def count_aliases(self) -> int:
+        conn = self._connect()
+        try:
+            return int(conn.execute("SELECT COUNT(*) FROM aliases").fetchone()[0])
+        finally:
+            conn.close()
+
+    def get_alias(self, run_slug: str) -> dict[str, Any] | None:
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT payload FROM aliases WHERE run_slug = ?", [run_slug]
+            ).fetchone()
+        finally:
+            conn.close()
+        return json.loads(row[0]) if row else None
+
+
+def _read_json(path: Path) -> dict[str, Any] | None:
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return None
+    return payload if isinstance(payload, dict) else None
+
+
+def _filters(**eq: str | None) -> tuple[str, list[Any]]:
+    parts = [f"{col} = ?" for col, v in eq.items() if v]
+    params: list[Any] = [v for v in eq.values() if v]
+    return ("WHERE " + " AND ".join(parts)) if parts else "", params
+
+
+def index_run(payload: dict[str, Any]) -> None:
+    """Writer hook, called after run.json is written (best-effort).
+
+    A missing index is built from the files instead, which includes this run.
+    """
+    try:
+        idx = RunIndex()
+        if idx.exists:
+            idx.upsert_run(payload)
+        else:
+            idx.rebuild()
+    except Exception:
+        pass
+
+
+def index_alias(payload: dict[str, Any]) -> None:
+    """Writer hook for alias entries (same rules as index_run)."""
+    try:
+        idx = RunIndex()
+        if idx.exists:
+            idx.upsert_alias(payload)
+        else:
+            idx.rebuild()
+    except Exception:
+        pass
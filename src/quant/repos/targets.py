@@ -1,17 +1,30 @@
 import json
 import logging
 from datetime import datetime
+from pathlib import Path
 
 import pandas as pd
 
 from ..config import settings
+from ..db.dictionary import ENCODED_TABLES, insert_encoded, is_encoded
 from ..db.duck import connect as duck_connect
+from ..db.maintenance import record_write
 
 log = logging.getLogger(__name__)
 
 
-def save_targets(df: pd.DataFrame):
-    """Save finalized targets to DuckDB ensuring strict schema compliance."""
+def save_targets(
+    df: pd.DataFrame,
+    db_path: str | Path | None = None,
+    window: tuple[str, str] | None = None,
+):
+    """Save finalized targets to DuckDB ensuring strict schema compliance.
+
+    `db_path` defaults to settings.quant_duckdb_path. With `window`
+    (from_date, to_date) every existing row of the strategy in that range is
+    replaced, not just the dates being written, so dates that are no longer
+    rebalance dates (e.g. daily -> weekly) do not linger.
+    """
     if df.empty:
         return
 
@@ -75,55 +88,92 @@ def save_targets(df: pd.DataFrame):
     # 4. Strict Column Selection
     df_db = df_db[required_cols]
 
-    conn = duck_connect(settings.quant_duckdb_path)
+    conn = duck_connect(Path(db_path or settings.quant_duckdb_path))
     try:
         strategy_id = df_db.iloc[0]["strategy_id"]
         study_date = df_db.iloc[0]["study_date"]
-
-        # Delete existing for the same strategy/date
-        conn.execute(
-            "DELETE FROM targets WHERE strategy_id = ? AND study_date = ?",
-            (strategy_id, str(study_date)),
-        )
+        study_dates = sorted({str(d) for d in df_db["study_date"]})
+
+        encoded = is_encoded(conn, "targets")
+        table = ENCODED_TABLES["targets"].fact if encoded else "targets"
+
+        # Delete existing for the same strategy/date(s) (and window)
+        where = "study_date IN (SELECT UNNEST(?::DATE[]))"
+        params: list = [strategy_id, study_dates]
+        if window is not None:
+            where += " OR study_date BETWEEN CAST(? AS DATE) AND CAST(? AS DATE)"
+            params += [str(window[0]), str(window[1])]
+        deleted = conn.execute(
+            f"DELETE FROM {table} WHERE strategy_id = ? AND ({where})", params
+        ).fetchone()[0]
+        record_write(conn, "targets", deleted)
 
         # Insert using register/append
         conn.register("df_targets_tmp", df_db)
 
-        # Explicit column list for insert
-        cols_str = ", ".join(required_cols)
-        conn.execute(
-            f"INSERT INTO targets ({cols_str}) SELECT {cols_str} FROM df_targets_tmp"
-        )
+        if encoded:
+            insert_encoded(conn, "targets", "df_targets_tmp")
+        else:
+            # Explicit column list for insert
+            cols_str = ", ".join(required_cols)
+            conn.execute(
+                f"INSERT INTO targets ({cols_str}) "
+                f"SELECT {cols_str} FROM df_targets_tmp"
+            )
 
         # Per-date logging can get very noisy during windowed recommend runs.
         # Keep this at DEBUG; the pipeline will emit an aggregated summary/progress.
+        more = f" (+{len(study_dates) - 1} dates)" if len(study_dates) > 1 else ""
         log.debug(
-            f"Successfully saved {len(df_db)} targets for {strategy_id} on {study_date}"
+            f"Successfully saved {len(df_db)} targets for {strategy_id} on "
+            f"{study_date}{more}"
         )
     finally:
         conn.close()
 
 
-def save_targets_many(df: pd.DataFrame):
+def save_targets_many(
+    df: pd.DataFrame,
+    db_path: str | Path | None = None,
+    window: tuple[str, str] | None = None,
+):
     """Save targets for one or many asof/study_date values.
 
     - Backward-compatible wrapper around save_targets.
-    - If df contains multiple dates, we upsert per date (delete+insert).
+    - Upserts per strategy: one delete + insert covering all of its dates
+      (and the whole `window`, when given).
     """
     if df is None or df.empty:
         return
 
-    if "study_date" in df.columns:
-        key = "study_date"
-    elif "asof" in df.columns:
-        key = "asof"
-    else:
-        save_targets(df)
+    if "strategy_id" not in df.columns:
+        save_targets(df, db_path, window)
         return
 
-    # Normalize key for stable grouping
-    tmp = df.copy()
-    tmp[key] = pd.to_datetime(tmp[key]).dt.strftime("%Y-%m-%d")
+    for _, g in df.groupby("strategy_id", sort=False):
+        save_targets(g, db_path, window)
+
 
-    for _, g in tmp.groupby(key):
-        save_targets(g)
+def clear_targets(
+    strategy_id: str,
+    from_date: str,
+    to_date: str,
+    db_path: str | Path | None = None,
+) -> int:
+    """Delete a strategy's targets in [from_date, to_date]; returns rows deleted.
+
+    For window writers that save date by date: clear the window once first.
+    """
+    conn = duck_connect(Path(db_path or settings.quant_duckdb_path))
+    try:
+        encoded = is_encoded(conn, "targets")
+        table = ENCODED_TABLES["targets"].fact if encoded else "targets"
+        deleted = conn.execute(
+            f"DELETE FROM {table} WHERE strategy_id = ? "
+            "AND study_date BETWEEN CAST(? AS DATE) AND CAST(? AS DATE)",
+            [strategy_id, str(from_date), str(to_date)],
+        ).fetchone()[0]
+        record_write(conn, "targets", deleted)
+        return int(deleted)
+    finally:
+        conn.close()
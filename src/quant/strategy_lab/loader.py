@@ -4,6 +4,8 @@ from typing import Any
 
 import yaml
 
+from .rebalance import validate_rebalance
+
 logger = logging.getLogger(__name__)
 
 
@@ -55,6 +57,9 @@ class StrategyLoader:
         if "type" not in universe:
             raise ValueError("Universe must have a 'type'.")
 
+        # Rebalance validation
+        validate_rebalance(config)
+
         # Signal/Recommender validation
         # - Backward compatible: legacy uses `signal`
         # - V2 ML POC path: `recommender` (plugin) is optional
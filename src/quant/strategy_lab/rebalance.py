@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import cache
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+from pandas.tseries.holiday import (
+    AbstractHolidayCalendar,
+    GoodFriday,
+    Holiday,
+    USLaborDay,
+    USMartinLutherKingJr,
+    USMemorialDay,
+    USPresidentsDay,
+    USThanksgivingDay,
+    nearest_workday,
+    sunday_to_monday,
+)
+from pandas.tseries.offsets import CustomBusinessDay
+
+from ..config import settings
+from ..db.duck import connect as duck_connect
+
+REBALANCE_FREQUENCIES = ("daily", "weekly", "monthly", "custom")
+REBALANCE_SCOPES = ("asof", "window")
+
+# Calendar days loaded around a window so its edge weeks/months are complete
+CALENDAR_LOOKBACK_DAYS = 7
+CALENDAR_LOOKAHEAD_DAYS = 31
+
+
+class ExchangeHolidayCalendar(AbstractHolidayCalendar):
+    """Regular NYSE full-day holidays (no one-off closures)."""
+
+    rules = [
+        # A Saturday New Year's Day is not observed on the Friday before
+        Holiday("NewYearsDay", month=1, day=1, observance=sunday_to_monday),
+        USMartinLutherKingJr,
+        USPresidentsDay,
+        GoodFriday,
+        USMemorialDay,
+        Holiday(
+            "Juneteenth",
+            month=6,
+            day=19,
+            start_date="2022-06-19",
+            observance=nearest_workday,
+        ),
+        Holiday("IndependenceDay", month=7, day=4, observance=nearest_workday),
+        USLaborDay,
+        USThanksgivingDay,
+        Holiday("Christmas", month=12, day=25, observance=nearest_workday),
+    ]
+
+
+@cache
+def _exchange_session() -> CustomBusinessDay:
+    return CustomBusinessDay(calendar=ExchangeHolidayCalendar())
+
+
+def next_exchange_session(ts: pd.Timestamp) -> pd.Timestamp:
+    """First exchange session strictly after `ts`."""
+    return pd.Timestamp(ts).normalize() + _exchange_session()
+
+
+def rebalance_settings(config: dict[str, Any]) -> tuple[str, str]:
+    """Returns (frequency, scope) from the `rebalance` YAML block."""
+    rebalance = config.get("rebalance") or {}
+    frequency = str(rebalance.get("frequency") or "daily").strip().lower()
+    scope = str(rebalance.get("scope") or "asof").strip().lower()
+    return frequency, scope
+
+
+def validate_rebalance(config: dict[str, Any]) -> tuple[str, str]:
+    """Checks the `rebalance` block and returns its (frequency, scope)."""
+    rebalance = config.get("rebalance") or {}
+    if not isinstance(rebalance, dict):
+        raise ValueError("rebalance must be a mapping.")
+    frequency, scope = rebalance_settings(config)
+    if frequency not in REBALANCE_FREQUENCIES:
+        raise ValueError(
+            "rebalance.frequency must be one of "
+            f"{list(REBALANCE_FREQUENCIES)} (got {frequency})"
+        )
+    if frequency == "custom":
+        dates = rebalance.get("dates")
+        if not isinstance(dates, list) or not dates:
+            raise ValueError(
+                "rebalance.dates (non-empty list) is required for frequency=custom"
+            )
+    if scope not in REBALANCE_SCOPES:
+        raise ValueError(
+            f"rebalance.scope must be one of {list(REBALANCE_SCOPES)} (got {scope})"
+        )
+    return frequency, scope
+
+
+def load_trading_dates(
+    *,
+    from_date: str,
+    to_date: str,
+    symbols: list[str] | None = None,
+    db_path: Path | str | None = None,
+) -> pd.DatetimeIndex:
+    """Distinct ohlcv trading dates in [from_date, to_date] (sorted)."""
+    params: list[Any] = [from_date, to_date]
+    symbol_filter = ""
+    if symbols:
+        symbol_filter = "AND symbol IN (SELECT UNNEST(?::VARCHAR[]))"
+        params.append(list(symbols))
+
+    query = f"""
+        SELECT DISTINCT ts
+        FROM ohlcv
+        WHERE ts >= CAST(? AS DATE)
+          AND ts <= CAST(? AS DATE)
+          {symbol_filter}
+        ORDER BY ts
+    """
+    conn = duck_connect(Path(db_path or settings.quant_duckdb_path), read_only=True)
+    try:
+        df = conn.execute(query, params).df()
+    finally:
+        conn.close()
+    return pd.DatetimeIndex(pd.to_datetime(df["ts"]), name="ts")
+
+
+def select_rebalance_dates(
+    trading_dates: pd.DatetimeIndex,
+    frequency: str,
+    custom_dates: list[str] | None = None,
+) -> pd.DatetimeIndex:
+    """Pick rebalance dates out of a trading calendar.
+
+    - daily: every trading date
+    - weekly: first trading date of each week (Mon-based)
+    - monthly: last trading date of each month. The calendar's final month has
+      no month-end yet when the next exchange session after its last date is
+      still in that month (data not in yet), so an in-progress month never
+      rebalances early; a month whose last weekday is a holiday still closes
+    - custom: each listed date snapped forward to the next trading date
+
+    Edge weeks/months are judged on `trading_dates` alone: pass a calendar
+    that extends past the window and clip afterwards (RebalanceCalendar does).
+    """
+    dates = pd.DatetimeIndex(trading_dates).normalize().unique().sort_values()
+    if dates.empty or frequency == "daily":
+        return dates
+
+    s = pd.Series(dates, index=dates)
+    if frequency == "weekly":
+        return pd.DatetimeIndex(s.groupby(dates.to_period("W-SUN")).min().values)
+    if frequency == "monthly":
+        month_ends = pd.DatetimeIndex(s.groupby(dates.to_period("M")).max().values)
+        last = dates[-1]
+        if next_exchange_session(last).to_period("M") == last.to_period("M"):
+            month_ends = month_ends[month_ends != last]
+        return month_ends
+    if frequency == "custom":
+        wanted = pd.DatetimeIndex(pd.to_datetime(custom_dates or [])).normalize()
+        pos = dates.searchsorted(wanted, side="left")
+        pos = pos[pos < len(dates)]
+        return dates[pos].unique()
+
+    raise ValueError(
+        f"rebalance.frequency must be one of {list(REBALANCE_FREQUENCIES)} "
+        f"(got {frequency})"
+    )
+
+
+@dataclass(frozen=True)
+class RebalanceCalendar:
+    """Rebalance dates for a strategy window.
+
+    Built from ohlcv trading dates so recommenders, the supervisor and the
+    targets writer only touch the dates that actually rebalance. Non-rebalance
+    days are covered by the backtest Hold policy.
+    """
+
+    frequency: str
+    dates: pd.DatetimeIndex
+
+    @classmethod
+    def from_config(
+        cls,
+        config: dict[str, Any],
+        *,
+        from_date: str,
+        to_date: str,
+        symbols: list[str] | None = None,
+        db_path: Path | str | None = None,
+    ) -> RebalanceCalendar:
+        frequency, _ = rebalance_settings(config)
+        start, end = pd.Timestamp(from_date), pd.Timestamp(to_date)
+        # Whole edge weeks/months (plus what follows the window) decide whether
+        # a window-edge date starts a week or ends a month
+        trading_dates = load_trading_dates(
+            from_date=(start - pd.Timedelta(days=CALENDAR_LOOKBACK_DAYS)).strftime(
+                "%Y-%m-%d"
+            ),
+            to_date=(end + pd.Timedelta(days=CALENDAR_LOOKAHEAD_DAYS)).strftime(
+                "%Y-%m-%d"
+            ),
+            symbols=symbols,
+            db_path=db_path,
+        )
+        custom = [
+            d
+            for d in ((config.get("rebalance") or {}).get("dates") or [])
+            if start <= pd.Timestamp(d) <= end
+        ]
+        dates = select_rebalance_dates(trading_dates, frequency, custom)
+        return cls(frequency=frequency, dates=dates[(dates >= start) & (dates <= end)])
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def as_strings(self) -> list[str]:
+        return [d.strftime("%Y-%m-%d") for d in self.dates]
+
+    def filter_targets(self, df: pd.DataFrame, date_col: str = "asof") -> pd.DataFrame:
+        """Keep only rows whose `date_col` is a rebalance date."""
+        if df.empty or self.frequency == "daily":
+            return df
+        mask = pd.to_datetime(df[date_col]).dt.normalize().isin(self.dates)
+        return df.loc[mask]
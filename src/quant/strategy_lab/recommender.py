@@ -63,7 +63,8 @@ class Recommender:
     ) -> pd.DataFrame:
         """Pipeline API: generate targets for a date window.
 
-        - factor_rank: current V2 behavior is typically 'asof=to_date' only.
+        - factor_rank: 'asof=to_date' only by default; with rebalance.scope=window
+          it ranks every rebalance date in the window in a single query.
         - ml_gbdt: generates Top-K targets per available rebalance date.
         """
 
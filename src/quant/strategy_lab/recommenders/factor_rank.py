@@ -8,11 +8,18 @@ import pandas as pd
 
 from ...config import settings
 from ...db.duck import connect as duck_connect
+from ..rebalance import RebalanceCalendar, rebalance_settings, validate_rebalance
 from .base import BaseRecommender, RecommenderContext
 
 
 class FactorRankRecommender(BaseRecommender):
-    """Deterministic baseline: rank by a single factor, take Top-K."""
+    """Deterministic baseline: rank by a single factor, take Top-K.
+
+    - rebalance.scope=asof (default): targets for ctx.to_date only
+    - rebalance.scope=window: targets for every rebalance date
+      (RebalanceCalendar) in ctx.from_date~ctx.to_date, ranked inside DuckDB
+      in a single query
+    """
 
     type_name = "factor_rank"
 
@@ -36,6 +43,8 @@ class FactorRankRecommender(BaseRecommender):
         if "top_k" not in portfolio:
             raise ValueError("portfolio.top_k is required")
 
+        validate_rebalance(config)
+
     def _load_features(
         self,
         *,
@@ -61,6 +70,113 @@ class FactorRankRecommender(BaseRecommender):
         finally:
             conn.close()
 
+    def _load_topk_window(
+        self,
+        *,
+        version: str,
+        feature_name: str,
+        rebalance_dates: list[str],
+        top_k: int,
+        symbols: list[str] | None = None,
+    ) -> pd.DataFrame:
+        """Top-K per rebalance date for the whole window in one query.
+
+        Ranking uses ROW_NUMBER() OVER (PARTITION BY ts ...) so only the Top-K
+        rows per date leave DuckDB.
+        """
+        if not rebalance_dates:
+            return pd.DataFrame(columns=["symbol", "ts", "score"])
+
+        params: list[Any] = [version, feature_name, list(rebalance_dates)]
+        symbol_filter = ""
+        if symbols:
+            symbol_filter = "AND symbol IN (SELECT UNNEST(?::VARCHAR[]))"
+            params.append(list(symbols))
+        params.append(int(top_k))
+
+        query = f"""
+            WITH f AS (
+                SELECT symbol, ts, feature_value AS score
+                FROM features_daily
+                WHERE feature_version = ?
+                  AND feature_name = ?
+                  AND ts IN (SELECT UNNEST(?::DATE[]))
+                  AND feature_value IS NOT NULL
+                  {symbol_filter}
+            ),
+            ranked AS (
+                SELECT
+                    f.symbol,
+                    f.ts,
+                    f.score,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY f.ts ORDER BY f.score DESC, f.symbol
+                    ) AS rn
+                FROM f
+            )
+            SELECT symbol, ts, score
+            FROM ranked
+            WHERE rn <= ?
+            ORDER BY ts, rn
+        """
+        conn = duck_connect(Path(self.db_path), read_only=True)
+        try:
+            return conn.execute(query, params).df()
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _apply_weighting(df: pd.DataFrame, weighting: str) -> pd.Series:
+        """Per-date weights for a (ts, symbol, score) frame of Top-K rows."""
+        n = df.groupby("ts")["score"].transform("size")
+        equal = 1.0 / n
+        if weighting != "score_weighted":
+            return equal
+        scores = df["score"].clip(lower=0)
+        total = scores.groupby(df["ts"]).transform("sum")
+        return (scores / total).where(total > 0, equal)
+
+    def _generate_targets_window(self, ctx: RecommenderContext) -> pd.DataFrame:
+        cfg = ctx.strategy_config
+        portfolio = cfg.get("portfolio", {})
+        inputs = cfg.get("signal", {}).get("inputs", {})
+        calendar = RebalanceCalendar.from_config(
+            cfg,
+            from_date=ctx.from_date,
+            to_date=ctx.to_date,
+            symbols=ctx.symbols or None,
+            db_path=self.db_path,
+        )
+
+        df = self._load_topk_window(
+            version=inputs.get("feature_version"),
+            feature_name=inputs.get("feature_name"),
+            rebalance_dates=calendar.as_strings(),
+            top_k=int(portfolio.get("top_k", 5)),
+            symbols=ctx.symbols or None,
+        )
+        if df.empty:
+            return pd.DataFrame()
+
+        df["ts"] = pd.to_datetime(df["ts"])
+        df["weight"] = self._apply_weighting(df, portfolio.get("weighting", "equal"))
+        df["strategy_id"] = cfg["strategy_id"]
+        df["version"] = cfg["version"]
+        df["asof"] = df["ts"].dt.strftime("%Y-%m-%d")
+        df["generated_at"] = datetime.now(UTC)
+
+        return df[
+            [
+                "strategy_id",
+                "version",
+                "asof",
+                "symbol",
+                "weight",
+                "score",
+                "generated_at",
+            ]
+        ]
+
     def predict(self, ctx: RecommenderContext) -> pd.DataFrame:
         # factor_rank is not a model; return score series for the single asof date.
         cfg = ctx.strategy_config
@@ -85,6 +201,10 @@ class FactorRankRecommender(BaseRecommender):
         cfg = ctx.strategy_config
         portfolio = cfg.get("portfolio", {})
 
+        _, scope = rebalance_settings(cfg)
+        if scope == "window":
+            return self._generate_targets_window(ctx)
+
         df = self.predict(ctx)
         if df.empty:
             return pd.DataFrame()
@@ -13,7 +13,10 @@ import numpy as np
 import pandas as pd
 
 from ...config import settings
+from ...db.cache import PanelKey, cached_panel
 from ...db.duck import connect as duck_connect
+from ...db.panel import Panel, load_feature_panel
+from ..rebalance import RebalanceCalendar
 from .base import BaseRecommender, RecommenderContext
 
 _DEFAULT_FEATURESET_V1 = [
@@ -27,6 +30,9 @@ _DEFAULT_FEATURESET_V1 = [
     "volume_ratio_20d",
 ]
 
+# Symbols per DuckDB round-trip when streaming the training matrix.
+_TRAIN_CHUNK_SYMBOLS = 256
+
 
 def _parse_date(s: str) -> pd.Timestamp:
     return pd.to_datetime(s).normalize()
@@ -98,6 +104,15 @@ def _redirect_fds_to_devnull():
                     os.close(saved_err)
 
 
+def _named(X: np.ndarray, columns: list[str]) -> pd.DataFrame:
+    """Zero-copy named view over a float32 matrix.
+
+    The sklearn wrappers check feature names between fit and predict, so both
+    sides get the same column labels without materializing a float64 frame.
+    """
+    return pd.DataFrame(X, columns=columns, copy=False)
+
+
 def _spearman(a: np.ndarray, b: np.ndarray) -> float:
     if len(a) < 2:
         return float("nan")
@@ -205,7 +220,7 @@ class MLGBDTRecommender(BaseRecommender):
         weighting = rec.get("weighting", "equal")
         return cfg, top_k, weighting
 
-    def _load_feature_matrix(
+    def _load_feature_panel(
         self,
         *,
         symbols: list[str],
@@ -213,87 +228,221 @@ class MLGBDTRecommender(BaseRecommender):
         date_to: str,
         feature_version: str,
         feature_names: list[str],
-    ) -> pd.DataFrame:
-        if not symbols:
-            return pd.DataFrame()
-        sym_list = "', '".join([s.upper() for s in symbols])
-        feat_list = "', '".join(feature_names)
-        conn = duck_connect(self.db_path)
-        try:
-            q = f"""
-                SELECT symbol, ts, feature_name, feature_value
-                FROM features_daily
-                WHERE symbol IN ('{sym_list}')
-                  AND feature_version = '{feature_version}'
-                  AND feature_name IN ('{feat_list}')
-                  AND ts >= DATE '{date_from}'
-                  AND ts <= DATE '{date_to}'
-            """
-            df_long = conn.execute(q).df()
-        finally:
-            conn.close()
+        dates: list[str] | None = None,
+    ) -> Panel:
+        """float32 (date x symbol) panel with one field per feature.
 
-        if df_long.empty:
-            return pd.DataFrame()
+        `dates` restricts rows to the given days (e.g. rebalance dates).
+        """
+        if not symbols or (dates is not None and not dates):
+            return Panel.empty()
 
-        df_long["ts"] = pd.to_datetime(df_long["ts"])
-        df_wide = (
-            df_long.pivot_table(
-                index=["symbol", "ts"],
-                columns="feature_name",
-                values="feature_value",
-                aggfunc=lambda x: x.iloc[0],
-            )
-            .reset_index()
-            .sort_values(["symbol", "ts"])
+        def _load() -> Panel:
+            conn = duck_connect(self.db_path, read_only=True)
+            try:
+                return load_feature_panel(
+                    conn,
+                    symbols=[s.upper() for s in symbols],
+                    feature_version=feature_version,
+                    feature_names=feature_names,
+                    from_date=date_from,
+                    to_date=date_to,
+                    dates=dates,
+                )
+            finally:
+                conn.close()
+
+        key = PanelKey.build(
+            db=self.db_path,
+            table="features_daily",
+            symbols=symbols,
+            from_date=date_from,
+            to_date=date_to,
+            version=feature_version,
+            fields=feature_names,
+            dates=dates,
         )
-        df_wide.columns.name = None
-        return df_wide
+        return cached_panel(key, _load)
 
-    def _load_forward_return(
+    def _count_training_rows(
         self,
+        conn,
         *,
         symbols: list[str],
-        date_from: str,
-        date_to: str,
-        horizon: int,
-    ) -> pd.DataFrame:
-        if not symbols:
-            return pd.DataFrame()
-        sym_list = "', '".join([s.upper() for s in symbols])
+        feature_version: str,
+        feature_names: list[str],
+        ml_cfg: MLConfig,
+    ) -> tuple[int, int]:
+        """Upper bound of (train, valid) rows: distinct (symbol, ts) with features.
 
-        # Need extra lookahead rows to compute LEAD(close, horizon)
-        date_to_fwd = str(
-            (_parse_date(date_to) + pd.Timedelta(days=horizon + 3)).date()
+        The two windows are counted independently; a ts inside both counts twice.
+        """
+        row = conn.execute(
+            """
+            SELECT
+                COUNT(*) FILTER (
+                    WHERE ts BETWEEN CAST(? AS DATE) AND CAST(? AS DATE)
+                ),
+                COUNT(*) FILTER (
+                    WHERE ts BETWEEN CAST(? AS DATE) AND CAST(? AS DATE)
+                )
+            FROM (
+                SELECT DISTINCT symbol, ts
+                FROM features_daily
+                WHERE symbol IN (SELECT UNNEST(?::VARCHAR[]))
+                  AND feature_version = ?
+                  AND feature_name IN (SELECT UNNEST(?::VARCHAR[]))
+                  AND (
+                    ts BETWEEN CAST(? AS DATE) AND CAST(? AS DATE)
+                    OR ts BETWEEN CAST(? AS DATE) AND CAST(? AS DATE)
+                  )
+            )
+            """,
+            [
+                ml_cfg.train_from,
+                ml_cfg.train_to,
+                ml_cfg.valid_from,
+                ml_cfg.valid_to,
+                symbols,
+                feature_version,
+                feature_names,
+                ml_cfg.train_from,
+                ml_cfg.train_to,
+                ml_cfg.valid_from,
+                ml_cfg.valid_to,
+            ],
+        ).fetchone()
+        return (int(row[0]), int(row[1])) if row else (0, 0)
+
+    def _load_training_matrix(
+        self,
+        *,
+        symbols: list[str],
+        feature_version: str,
+        feature_names: list[str],
+        ml_cfg: MLConfig,
+        horizon: int,
+        chunk_symbols: int = _TRAIN_CHUNK_SYMBOLS,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Stream train/valid (X, y) into preallocated float32 arrays.
+
+        Symbols are processed in blocks. DuckDB pivots each block with
+        conditional aggregation and joins it with the LEAD() forward return,
+        so no long-form frame is built. Peak memory is the final matrices plus
+        one block. Rows are assigned by the configured train/valid ranges, so a
+        row inside both windows lands in both sets.
+        """
+        symbols = [s.upper() for s in symbols]
+        n_feat = len(feature_names)
+        # Same lookahead as the old features/labels loaders (horizon + 3 days, x2)
+        lookahead = pd.Timedelta(days=2 * (horizon + 3))
+        px_from = min(ml_cfg.train_from, ml_cfg.valid_from, key=_parse_date)
+        px_to = max(ml_cfg.train_to, ml_cfg.valid_to, key=_parse_date)
+        fwd_end = str((_parse_date(px_to) + lookahead).date())
+        pivot_cols = ",\n".join(
+            f'FIRST(feature_value) FILTER (WHERE feature_name = ?) AS "f{i}"'
+            for i in range(n_feat)
         )
-        conn = duck_connect(self.db_path)
+        not_null = " AND ".join(f'f."f{i}" IS NOT NULL' for i in range(n_feat))
+        select_cols = ", ".join(f'f."f{i}"' for i in range(n_feat))
+        query = f"""
+            WITH f AS (
+                SELECT symbol, ts,
+                {pivot_cols}
+                FROM features_daily
+                WHERE symbol IN (SELECT UNNEST(?::VARCHAR[]))
+                  AND feature_version = ?
+                  AND feature_name IN (SELECT UNNEST(?::VARCHAR[]))
+                  AND (
+                    ts BETWEEN CAST(? AS DATE) AND CAST(? AS DATE)
+                    OR ts BETWEEN CAST(? AS DATE) AND CAST(? AS DATE)
+                  )
+                GROUP BY symbol, ts
+            ),
+            px AS (
+                SELECT
+                    symbol,
+                    ts,
+                    LEAD(close, {int(horizon)}) OVER (
+                        PARTITION BY symbol ORDER BY ts
+                    ) / close - 1.0 AS y
+                FROM ohlcv
+                WHERE symbol IN (SELECT UNNEST(?::VARCHAR[]))
+                  AND ts >= CAST(? AS DATE)
+                  AND ts <= CAST(? AS DATE)
+            )
+            SELECT
+                {select_cols},
+                px.y,
+                f.ts BETWEEN CAST(? AS DATE) AND CAST(? AS DATE) AS is_train,
+                f.ts BETWEEN CAST(? AS DATE) AND CAST(? AS DATE) AS is_valid
+            FROM f
+            JOIN px USING (symbol, ts)
+            WHERE px.y IS NOT NULL AND {not_null}
+            ORDER BY f.symbol, f.ts
+        """
+
+        conn = duck_connect(self.db_path, read_only=True)
         try:
-            q = f"""
-            WITH px AS (
-              SELECT
-                symbol,
-                ts,
-                close,
-                LEAD(close, {horizon}) OVER (PARTITION BY symbol ORDER BY ts) AS close_fwd
-              FROM ohlcv
-              WHERE symbol IN ('{sym_list}')
-                AND ts >= DATE '{date_from}'
-                                AND ts <= DATE '{date_to_fwd}'
-              ORDER BY symbol, ts
+            n_train, n_valid = self._count_training_rows(
+                conn,
+                symbols=symbols,
+                feature_version=feature_version,
+                feature_names=feature_names,
+                ml_cfg=ml_cfg,
             )
-            SELECT symbol, ts, (close_fwd / close - 1.0) AS y
-            FROM px
-                        WHERE close_fwd IS NOT NULL
-                            AND ts <= DATE '{date_to}'
-            """
-            df = conn.execute(q).df()
+            X_train = np.empty((n_train, n_feat), dtype=np.float32)
+            y_train = np.empty(n_train, dtype=np.float32)
+            X_valid = np.empty((n_valid, n_feat), dtype=np.float32)
+            y_valid = np.empty(n_valid, dtype=np.float32)
+            i_train = 0
+            i_valid = 0
+
+            for start in range(0, len(symbols), max(1, int(chunk_symbols))):
+                block = symbols[start : start + max(1, int(chunk_symbols))]
+                cols = conn.execute(
+                    query,
+                    [
+                        *feature_names,
+                        block,
+                        feature_version,
+                        feature_names,
+                        ml_cfg.train_from,
+                        ml_cfg.train_to,
+                        ml_cfg.valid_from,
+                        ml_cfg.valid_to,
+                        block,
+                        px_from,
+                        fwd_end,
+                        ml_cfg.train_from,
+                        ml_cfg.train_to,
+                        ml_cfg.valid_from,
+                        ml_cfg.valid_to,
+                    ],
+                ).fetchnumpy()
+                is_train = np.asarray(cols["is_train"], dtype=bool)
+                is_valid = np.asarray(cols["is_valid"], dtype=bool)
+                n_tr = int(is_train.sum())
+                n_va = int(is_valid.sum())
+                for j in range(n_feat):
+                    v = np.asarray(cols[f"f{j}"], dtype=np.float32)
+                    X_train[i_train : i_train + n_tr, j] = v[is_train]
+                    X_valid[i_valid : i_valid + n_va, j] = v[is_valid]
+                y = np.asarray(cols["y"], dtype=np.float32)
+                y_train[i_train : i_train + n_tr] = y[is_train]
+                y_valid[i_valid : i_valid + n_va] = y[is_valid]
+                i_train += n_tr
+                i_valid += n_va
+                del cols
         finally:
             conn.close()
 
-        if df.empty:
-            return pd.DataFrame()
-        df["ts"] = pd.to_datetime(df["ts"])
-        return df
+        return (
+            X_train[:i_train],
+            y_train[:i_train],
+            X_valid[:i_valid],
+            y_valid[:i_valid],
+        )
 
     def _make_model(self, algo: str, params: dict[str, Any]):
         if algo == "lightgbm":
@@ -358,52 +507,19 @@ class MLGBDTRecommender(BaseRecommender):
 
         horizon = 5 if ml_cfg.target == "forward_ret_5d" else 20
 
-        # Load features for train+valid (labels need horizon future; extend end date)
-        max_end = str(_parse_date(ml_cfg.valid_to) + pd.Timedelta(days=horizon + 3))
-        df_x = self._load_feature_matrix(
+        X_train, y_train, X_valid, y_valid = self._load_training_matrix(
             symbols=ctx.symbols,
-            date_from=ml_cfg.train_from,
-            date_to=max_end,
             feature_version=feature_version,
             feature_names=feature_names,
-        )
-        df_y = self._load_forward_return(
-            symbols=ctx.symbols,
-            date_from=ml_cfg.train_from,
-            date_to=max_end,
+            ml_cfg=ml_cfg,
             horizon=horizon,
         )
-
-        if df_x.empty or df_y.empty:
+        if len(y_train) == 0 or len(y_valid) == 0:
             raise ValueError(
-                "Training data is empty: ensure features_daily and ohlcv exist"
+                "train/valid split produced empty dataset: "
+                "ensure features_daily and ohlcv exist"
             )
-
-        df = pd.merge(df_x, df_y, on=["symbol", "ts"], how="inner")
-        if df.empty:
-            raise ValueError("No joined rows between features and labels")
-
-        # Split
-        ts = df["ts"]
-        train_mask = (ts >= _parse_date(ml_cfg.train_from)) & (
-            ts <= _parse_date(ml_cfg.train_to)
-        )
-        valid_mask = (ts >= _parse_date(ml_cfg.valid_from)) & (
-            ts <= _parse_date(ml_cfg.valid_to)
-        )
-
-        feature_cols = [c for c in df.columns if c not in {"symbol", "ts", "y"}]
-        df_train = df.loc[train_mask].dropna(subset=feature_cols + ["y"]).copy()
-        df_valid = df.loc[valid_mask].dropna(subset=feature_cols + ["y"]).copy()
-
-        if df_train.empty or df_valid.empty:
-            raise ValueError("train/valid split produced empty dataset")
-
-        # Keep X as DataFrame to preserve feature names and avoid sklearn warnings.
-        X_train = df_train[feature_cols].astype(float)
-        y_train = df_train["y"].to_numpy(dtype=float)
-        X_valid = df_valid[feature_cols].astype(float)
-        y_valid = df_valid["y"].to_numpy(dtype=float)
+        feature_cols = feature_names
 
         model = self._make_model(ml_cfg.algo, ml_cfg.params)
 
@@ -415,14 +531,17 @@ class MLGBDTRecommender(BaseRecommender):
             if log_enabled and ctx.artifacts_dir is not None:
                 lgb_log = ctx.artifacts_dir / "stages" / "recommend" / "lightgbm.log"
                 with _redirect_fds_to_file(lgb_log):
-                    model.fit(X_train, y_train)
+                    model.fit(_named(X_train, feature_cols), y_train)
             else:
                 with _redirect_fds_to_devnull():
-                    model.fit(X_train, y_train)
+                    model.fit(_named(X_train, feature_cols), y_train)
         else:
-            model.fit(X_train, y_train)
+            model.fit(_named(X_train, feature_cols), y_train)
 
-        yhat_valid = np.asarray(model.predict(X_valid), dtype=float)
+        y_valid = y_valid.astype(float)
+        yhat_valid = np.asarray(
+            model.predict(_named(X_valid, feature_cols)), dtype=float
+        )
         rmse = float(np.sqrt(np.mean((y_valid - yhat_valid) ** 2)))
         mae = float(np.mean(np.abs(y_valid - yhat_valid)))
         rank_ic = _spearman(y_valid, yhat_valid)
@@ -506,39 +625,44 @@ class MLGBDTRecommender(BaseRecommender):
         )
         feature_names = list(_DEFAULT_FEATURESET_V1)
 
-        df_x = self._load_feature_matrix(
+        # Score rebalance dates only; the backtest Hold policy covers the rest.
+        calendar = RebalanceCalendar.from_config(
+            strategy_config,
+            from_date=ctx.from_date,
+            to_date=ctx.to_date,
+            symbols=ctx.symbols,
+            db_path=self.db_path,
+        )
+        rebalance_dates = (
+            None if calendar.frequency == "daily" else calendar.as_strings()
+        )
+
+        feature_cols = self._feature_names or feature_names
+        panel = self._load_feature_panel(
             symbols=ctx.symbols,
             date_from=ctx.from_date,
             date_to=ctx.to_date,
             feature_version=feature_version,
             feature_names=feature_names,
+            dates=rebalance_dates,
         )
-        if df_x.empty:
-            return pd.DataFrame(columns=["symbol", "ts", "score"])
-
-        # Align columns to training
-        feature_cols = self._feature_names or [
-            c for c in df_x.columns if c not in {"symbol", "ts"}
-        ]
-        for c in feature_cols:
-            if c not in df_x.columns:
-                df_x[c] = np.nan
 
-        df_x = df_x.dropna(subset=feature_cols).copy()
-        if df_x.empty:
+        # Model-ready float32 rows (symbol-major, rows with any NaN feature dropped)
+        if not all(c in panel for c in feature_cols):
+            return pd.DataFrame(columns=["symbol", "ts", "score"])
+        sym_codes, day_idx, X = panel.stack(feature_cols)
+        if len(X) == 0:
             return pd.DataFrame(columns=["symbol", "ts", "score"])
 
-        # Keep X as DataFrame to preserve feature names and avoid sklearn warnings.
-        X = df_x[feature_cols].astype(float)
         # Ensure model is available; attempt to (re)train if missing
         if self._model is None:
             self.fit(ctx)
         if self._model is None:
             raise RuntimeError("Model is not trained; cannot predict")
 
-        yhat = np.asarray(self._model.predict(X), dtype=float)
+        yhat = np.asarray(self._model.predict(_named(X, feature_cols)), dtype=float)
 
-        out = df_x[["symbol", "ts"]].copy()
+        out = panel.rows_frame(sym_codes, day_idx)
         out["score"] = yhat
 
         # Optional predictions dump
@@ -558,7 +682,7 @@ class MLGBDTRecommender(BaseRecommender):
         if df_pred.empty:
             return pd.DataFrame()
 
-        # Ranking per rebalance date (daily by available feature ts)
+        # Ranking per rebalance date (predict() already restricts to the calendar)
         # ensure ts is datetime and format as YYYY-MM-DD
         df_pred["ts"] = pd.to_datetime(df_pred["ts"])
         df_pred["asof"] = df_pred["ts"].apply(lambda t: t.strftime("%Y-%m-%d"))
@@ -568,6 +692,7 @@ class MLGBDTRecommender(BaseRecommender):
             gg = g.sort_values("score", ascending=False).head(top_k).copy()
             if gg.empty:
                 continue
+            gg["symbol"] = gg["symbol"].astype(str)
             if weighting == "equal":
                 gg["weight"] = 1.0 / len(gg)
             elif weighting == "score_weighted":
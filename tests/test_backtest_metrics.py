@@ -0,0 +1,397 @@
+import duckdb
+import numpy as np
+import pandas as pd
+import pytest
+
+from quant.backtest_engine import metrics
+from quant.backtest_engine.engine import BacktestEngine
+from quant.db.duck import SCHEMA_PATH
+
+
+def test_metric_kernels_match_pandas_reference():
+    rng = np.random.default_rng(7)
+    r = rng.normal(0.0005, 0.01, 500)
+    s = pd.Series(r)
+
+    curve = metrics.equity_curve(r, window=20)
+    equity = (1 + s).cumprod()
+    np.testing.assert_allclose(curve["equity"], equity)
+    peak = equity.cummax().clip(lower=1.0)
+    np.testing.assert_allclose(curve["drawdown"], equity / peak - 1)
+
+    roll = s.rolling(20)
+    np.testing.assert_allclose(
+        curve["rolling_vol"], roll.std() * np.sqrt(252), atol=1e-10
+    )
+    np.testing.assert_allclose(
+        curve["rolling_sharpe"], roll.mean() / roll.std() * np.sqrt(252), atol=1e-8
+    )
+
+    # Underwater days: reference loop
+    uw, last_peak = [], -1
+    for i, dd in enumerate(curve["drawdown"]):
+        if dd >= 0:
+            last_peak = i
+        uw.append(i - last_peak)
+    assert curve["underwater_days"].tolist() == uw
+
+    # Rebalance every 5th day -> 100 holding periods
+    rebalance = np.arange(500) % 5 == 4
+    m = metrics.compute_metrics(
+        r,
+        span_days=730,
+        turnover=np.where(rebalance, 0.5, 0.0),
+        rebalance=rebalance,
+        exposure=np.ones(500),
+    )
+    assert m.n_days == 500
+    assert np.isclose(m.sharpe, s.mean() / s.std() * np.sqrt(252))
+    assert np.isclose(m.cagr, equity.iloc[-1] ** (365 / 730) - 1)
+    assert np.isclose(m.max_dd, curve["drawdown"].min())
+    assert np.isclose(m.turnover, 0.5 * 100 * 252 / 500)
+    period_id = np.concatenate(([0], np.cumsum(rebalance[:-1])))
+    periods = (1 + s).groupby(period_id).prod()
+    assert m.num_trades == len(periods) == 100
+    assert np.isclose(m.win_rate, ((periods - 1) > 0).mean())
+    assert np.isclose(m.avg_trade, (periods - 1).mean())
+    assert m.max_dd_duration == max(uw)
+
+
+def _seed_backtest_db(db_path, n_days: int = 60) -> pd.DatetimeIndex:
+    dates = pd.bdate_range("2023-01-02", periods=n_days)
+    rng = np.random.default_rng(1)
+    px = pd.concat(
+        pd.DataFrame(
+            {
+                "symbol": sym,
+                "ts": dates.date,
+                "close": 100 * np.cumprod(1 + rng.normal(0, 0.01, len(dates))),
+            }
+        )
+        for sym in ["AAA", "BBB"]
+    )
+    rebal = dates[::10]
+    w_aaa = np.resize([0.5, 0.7, 0.2, 0.6], len(rebal))
+    targets = pd.DataFrame(
+        {
+            "strategy_id": "s1",
+            "version": "1",
+            "study_date": np.repeat(rebal.date, 2),
+            "symbol": ["AAA", "BBB"] * len(rebal),
+            "weight": np.column_stack([w_aaa, 1 - w_aaa]).ravel(),
+            "approved": True,
+        }
+    )
+    conn = duckdb.connect(str(db_path))
+    conn.execute(SCHEMA_PATH.read_text(encoding="utf-8"))
+    conn.register("px", px)
+    conn.execute("INSERT INTO ohlcv (symbol, ts, close) SELECT * FROM px")
+    conn.register("tg", targets)
+    conn.execute(
+        "INSERT INTO targets (strategy_id, version, study_date, symbol, weight, "
+        "approved) SELECT * FROM tg"
+    )
+    conn.close()
+    return dates
+
+
+CONFIG = {
+    "strategy_id": "s1",
+    "version": "1",
+    "backtest": {"fee_bps": 10, "slippage_bps": 5},
+}
+
+
+def test_backtest_persists_summary_and_equity_curve(tmp_path):
+    db_path = tmp_path / "quant.duckdb"
+    _seed_backtest_db(db_path)
+    res = BacktestEngine(str(db_path)).run(CONFIG, "2023-01-02", "2023-03-24")
+
+    conn = duckdb.connect(str(db_path), read_only=True)
+    summ = conn.execute("SELECT * FROM backtest_summary").df().iloc[0]
+    curve = conn.execute(
+        "SELECT * FROM backtest_equity_curve WHERE run_id = ? ORDER BY ts",
+        [res["run_id"]],
+    ).df()
+    trades = conn.execute(
+        "SELECT * FROM backtest_trades WHERE run_id = ? ORDER BY entry_ts, symbol",
+        [res["run_id"]],
+    ).df()
+    conn.close()
+
+    # Ledger attribution: per-symbol W_{t-1} * r_t net of own cost sums to the day
+    daily = trades.groupby("entry_ts")["pnl_pct"].sum()
+    np.testing.assert_allclose(daily.to_numpy(), curve["daily_return"], atol=1e-12)
+    by_sym = trades.groupby("symbol")["pnl_pct"].sum()
+    assert set(by_sym.index) == {"AAA", "BBB"}
+    assert not np.isclose(by_sym["AAA"], by_sym["BBB"])
+    first = trades[trades["entry_ts"] == trades["entry_ts"].min()]
+    np.testing.assert_allclose(first["fees"], 0.5 * 15 / 10000)
+
+    assert len(curve) == summ["n_days"] == res["n_days"]
+    assert summ["num_trades"] == res["num_trades"] > 0
+    assert 0 <= summ["win_rate"] <= 1
+    assert summ["turnover"] > 0
+    assert summ["fee_bps"] == 10
+    assert summ["slippage_bps"] == 5
+    np.testing.assert_allclose(curve["equity"], (1 + curve["daily_return"]).cumprod())
+    assert np.isclose(curve["drawdown"].min(), summ["max_dd"])
+
+
+def test_backtest_resume_matches_full_rerun(tmp_path, monkeypatch):
+    full_db, inc_db = tmp_path / "full.duckdb", tmp_path / "inc.duckdb"
+    _seed_backtest_db(full_db)
+    _seed_backtest_db(inc_db)
+
+    def fail_write_state(*args, **kwargs):
+        raise RuntimeError("state write failed")
+
+    full = BacktestEngine(str(full_db)).run(CONFIG, "2023-01-02", "2023-03-24")
+    engine = BacktestEngine(str(inc_db))
+    # A run failing mid-write leaves no summary without curve / state behind
+    with monkeypatch.context() as m:
+        m.setattr(BacktestEngine, "_write_state", staticmethod(fail_write_state))
+        with pytest.raises(RuntimeError, match="state write failed"):
+            engine.run(CONFIG, "2023-01-02", "2023-02-14")
+    first = engine.run(CONFIG, "2023-01-02", "2023-02-14")
+    assert engine.resume(CONFIG, "2023-02-14")["n_new_days"] == 0
+
+    # A write failing mid-resume is rolled back, so the retry below does not
+    # append the same ledger / curve rows twice
+    with monkeypatch.context() as m:
+        m.setattr(BacktestEngine, "_write_state", staticmethod(fail_write_state))
+        with pytest.raises(RuntimeError, match="state write failed"):
+            engine.resume(CONFIG, "2023-02-15")
+
+    # Append one day, then the rest (two nightly updates)
+    assert engine.resume(CONFIG, "2023-02-15")["n_new_days"] == 1
+    res = engine.resume(CONFIG, "2023-03-24")
+    assert res["run_id"] == first["run_id"]
+    assert res["n_days"] == full["n_days"]
+    for key in ("cagr", "sharpe", "max_dd", "vol", "turnover", "win_rate"):
+        assert np.isclose(res[key], full[key]), key
+    assert res["num_trades"] == full["num_trades"]
+
+    def curves(db_path):
+        conn = duckdb.connect(str(db_path), read_only=True)
+        curve = conn.execute(
+            "SELECT * EXCLUDE (run_id) FROM backtest_equity_curve ORDER BY ts"
+        ).df()
+        trades = conn.execute(
+            "SELECT entry_ts, symbol, qty, pnl_pct, fees FROM backtest_trades "
+            "ORDER BY entry_ts, symbol"
+        ).df()
+        summ = conn.execute("SELECT to_ts, n_days FROM backtest_summary").df()
+        conn.close()
+        return curve, trades, summ
+
+    (c_full, t_full, s_full), (c_inc, t_inc, s_inc) = curves(full_db), curves(inc_db)
+    pd.testing.assert_frame_equal(c_inc, c_full, check_exact=False, atol=1e-10)
+    pd.testing.assert_frame_equal(t_inc, t_full, check_exact=False, atol=1e-12)
+    pd.testing.assert_frame_equal(s_inc, s_full)
+
+
+def test_stationary_bootstrap_and_persisted_intervals(tmp_path):
+    from quant.backtest_engine import bootstrap
+
+    rng = np.random.default_rng(5)
+    idx = bootstrap.stationary_bootstrap_indices(300, 200, 10.0, rng)
+    assert idx.shape == (200, 300)
+    assert idx.min() >= 0
+    assert idx.max() < 300
+    # Blocks continue with the next day (wrapping); new blocks every ~10 days
+    breaks = np.diff(idx, axis=1) % 300 != 1
+    assert 0.05 < breaks.mean() < 0.15
+
+    r = rng.normal(0.0005, 0.01, 1000)
+    samples = bootstrap.bootstrap_metrics(r, 400, seed=1, batch_size=128)
+    assert {k: len(v) for k, v in samples.items()} == dict.fromkeys(
+        bootstrap.BOOTSTRAP_METRICS, 400
+    )
+    # Identity resample reproduces compute_metrics
+    ident = bootstrap.resampled_metrics(r, np.arange(1000)[None, :])
+    m = metrics.compute_metrics(r)
+    assert np.isclose(ident["sharpe"][0], m.sharpe)
+    assert np.isclose(ident["cagr"][0], m.cagr)
+    assert np.isclose(ident["max_dd"][0], m.max_dd)
+    ci = bootstrap.confidence_intervals(samples)
+    assert ci["sharpe"]["ci_low"] < m.sharpe < ci["sharpe"]["ci_high"]
+
+    db_path = tmp_path / "quant.duckdb"
+    _seed_backtest_db(db_path)
+    engine = BacktestEngine(str(db_path))
+    res = engine.run(CONFIG, "2023-01-02", "2023-03-24")
+    out = engine.bootstrap(res["run_id"], 300, seed=3)
+    assert set(out) == {"sharpe", "cagr", "max_dd"}
+    assert np.isclose(out["sharpe"]["point"], res["sharpe"])
+    assert out == engine.bootstrap(res["run_id"], 300, seed=3)  # replaces rows
+    conn = duckdb.connect(str(db_path), read_only=True)
+    rows = conn.execute("SELECT metric, n_samples FROM backtest_bootstrap").fetchall()
+    conn.close()
+    assert sorted(rows) == [("cagr", 300), ("max_dd", 300), ("sharpe", 300)]
+
+
+def test_run_many_shares_panel_and_matches_single_runs(tmp_path, monkeypatch):
+    db_path = tmp_path / "batch.duckdb"
+    # One DB per reference run: single-run ids are per second
+    single_dbs = {sid: tmp_path / f"{sid}.duckdb" for sid in ("s1", "s2")}
+    for path in (db_path, *single_dbs.values()):
+        _seed_backtest_db(path)
+        conn = duckdb.connect(str(path))
+        # Second strategy: AAA only, rebalanced on a different schedule
+        conn.execute(
+            """
+            INSERT INTO targets (strategy_id, version, study_date, symbol, weight,
+                                 approved)
+            SELECT 's2', '1', study_date + INTERVAL 3 DAY, symbol, 1.0, True
+            FROM targets WHERE symbol = 'AAA'
+            """
+        )
+        conn.close()
+    configs = [CONFIG, {**CONFIG, "strategy_id": "s2"}, {**CONFIG, "strategy_id": "s3"}]
+
+    engine = BacktestEngine(str(db_path))
+    loads = []
+    original = engine._load_returns_panel
+    monkeypatch.setattr(
+        engine, "_load_returns_panel", lambda *a: loads.append(a) or original(*a)
+    )
+    results = engine.run_many(configs, "2023-01-02", "2023-03-24")
+    assert len(loads) == 1
+    assert results["s3"] is None
+
+    for sid, path in single_dbs.items():
+        ref = BacktestEngine(str(path)).run(
+            {**CONFIG, "strategy_id": sid}, "2023-01-02", "2023-03-24"
+        )
+        for key in ("cagr", "sharpe", "max_dd", "turnover", "num_trades"):
+            assert np.isclose(results[sid][key], ref[key]), (sid, key)
+
+    conn = duckdb.connect(str(db_path), read_only=True)
+    batch = conn.execute(
+        "SELECT DISTINCT batch_id FROM backtest_summary ORDER BY 1"
+    ).fetchall()
+    n_states = conn.execute("SELECT COUNT(*) FROM backtest_state").fetchone()[0]
+    conn.close()
+    assert len(batch) == 1
+    assert batch[0][0].startswith("btb_")
+    assert n_states == 2
+
+
+def test_sqrt_impact_cost_model_prices_trades_from_ohlcv(tmp_path):
+    from quant.backtest_engine import costs
+
+    x = np.random.default_rng(3).normal(size=(50, 3))
+    x[::7, 1] = np.nan
+    np.testing.assert_allclose(
+        costs.rolling_nanmean(x, 5),
+        pd.DataFrame(x).rolling(5, min_periods=1).mean().to_numpy(),
+    )
+    high, low = 101.0 + x[:, :1] ** 2, 99.0 - x[:, :1] ** 2
+    assert (costs.corwin_schultz_spread(high, low)[1:] >= 0).all()
+    assert isinstance(costs.build_cost_model(CONFIG), costs.FlatCostModel)
+
+    def run(aum: float, name: str):
+        db_path = tmp_path / f"{name}.duckdb"
+        dates = _seed_backtest_db(db_path)
+        conn = duckdb.connect(str(db_path))
+        conn.execute(
+            "UPDATE ohlcv SET high = close * 1.01, low = close * 0.99, volume = 1e6"
+        )
+        conn.close()
+        config = {
+            **CONFIG,
+            "backtest": {
+                **CONFIG["backtest"],
+                "cost_model": {"type": "sqrt_impact", "aum": aum, "spread_bps": 4},
+            },
+        }
+        res = BacktestEngine(str(db_path)).run(config, "2023-01-02", "2023-03-24")
+        conn = duckdb.connect(str(db_path), read_only=True)
+        fees = conn.execute(
+            "SELECT entry_ts, symbol, fees FROM backtest_trades ORDER BY 1, 2"
+        ).df()
+        close = conn.execute("SELECT ts, symbol, close FROM ohlcv ORDER BY 1, 2").df()
+        conn.close()
+        return res, fees, close, dates
+
+    small, fees, close, dates = run(1e6, "small")
+    big, fees_big, _, _ = run(1e9, "big")
+
+    # First day has no market history: fee + flat slippage
+    first = fees[fees["entry_ts"] == fees["entry_ts"].min()]
+    np.testing.assert_allclose(first["fees"], 0.5 * 15 / 10000)
+
+    # Second rebalance (day 10): fee + half spread + sigma * sqrt(participation)
+    day = dates[10]
+    adv = (
+        close.assign(dv=close["close"] * 1e6)
+        .pivot(index="ts", columns="symbol", values="dv")
+        .iloc[:10]
+        .mean()
+    )
+    sigma = np.log(1.01 / 0.99) / np.sqrt(4 * np.log(2))
+    trade = 0.2  # AAA 0.5 -> 0.7, BBB 0.5 -> 0.3
+    expected = trade * (
+        10 / 10000 + 2 / 10000 + sigma * np.sqrt(trade * 1e6 / adv.to_numpy())
+    )
+    got = fees[pd.to_datetime(fees["entry_ts"]) == day].sort_values("symbol")
+    np.testing.assert_allclose(got["fees"], expected, rtol=1e-5)
+
+    # Same trades, 1000x the capital: sqrt(1000)x the impact, lower returns
+    assert (fees_big["fees"].to_numpy() >= fees["fees"].to_numpy()).all()
+    assert big["cost_drag"] > small["cost_drag"] > 0
+    assert big["cagr"] < small["cagr"]
+
+
+def test_in_memory_targets_match_targets_table(tmp_path):
+    from quant.portfolio_supervisor.engine import PortfolioSupervisor
+
+    rng = np.random.default_rng(11)
+    raw = pd.DataFrame(
+        {
+            "asof": np.repeat(pd.bdate_range("2024-01-01", periods=30).date, 12),
+            "symbol": [f"S{i}" for i in range(12)] * 30,
+            "weight": rng.uniform(0.0, 0.3, 360),
+            "score": rng.normal(size=360),
+        }
+    )
+    raw.loc[7, "score"] = np.nan
+    supervisor = PortfolioSupervisor(
+        {
+            "supervisor": {
+                "gross_exposure_cap": 1.0,
+                "max_weight_per_symbol": 0.2,
+                "max_positions": 5,
+                "score_floor": -1.0,
+            }
+        }
+    )
+    per_date = pd.concat(supervisor.audit(g) for _, g in raw.groupby("asof"))
+    audited = supervisor.audit_many(raw)
+    pd.testing.assert_frame_equal(audited.loc[per_date.index], per_date)
+
+    # Backtesting the targets frame directly == reading them from DuckDB
+    dates = _seed_backtest_db(tmp_path / "table.duckdb")
+    _seed_backtest_db(tmp_path / "memory.duckdb")
+    conn = duckdb.connect(str(tmp_path / "table.duckdb"), read_only=True)
+    targets = conn.execute("SELECT * FROM targets").df()
+    conn.close()
+    targets.loc[targets.index[-2:], "approved"] = False
+    for db in ("table", "memory"):
+        conn = duckdb.connect(str(tmp_path / f"{db}.duckdb"))
+        conn.execute("DELETE FROM targets")
+        if db == "table":
+            conn.register("tg", targets)
+            conn.execute("INSERT INTO targets SELECT * FROM tg")
+        conn.close()
+
+    engine = BacktestEngine(str(tmp_path / "memory.duckdb"))
+    frame = targets.rename(columns={"study_date": "asof"})
+    res = engine.run(CONFIG, "2023-01-02", "2023-03-24", targets=frame)
+    ref = BacktestEngine(str(tmp_path / "table.duckdb")).run(
+        CONFIG, "2023-01-02", "2023-03-24"
+    )
+    for key in ("cagr", "sharpe", "max_dd", "turnover", "num_trades", "n_days"):
+        assert np.isclose(res[key], ref[key]), key
+    assert len(dates) == res["n_days"]
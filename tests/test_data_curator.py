@@ -0,0 +1,286 @@
+import duckdb
+import numpy as np
+import pandas as pd
+import pytest
+
+from quant.data_curator.ingest import DataIngester
+from quant.data_curator.provider import LocalFileProvider
+from quant.data_curator.quality_gate import DataQualityError, QualityGate
+from quant.db.duck import SCHEMA_PATH
+
+
+def _bars(n: int, seed: int, start: str = "2024-01-02") -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 50 * np.cumprod(1 + rng.normal(0, 0.02, n))
+    return pd.DataFrame(
+        {
+            "date": pd.bdate_range(start, periods=n).date,
+            "open": close * 0.99,
+            "high": close * 1.02,
+            "low": close * 0.97,
+            "close": close,
+            "adj_close": close * np.linspace(0.9, 1.0, n),
+            "volume": rng.integers(1_000, 5_000, n).astype(float),
+        }
+    )
+
+
+def _write_dumps(root) -> None:
+    root.mkdir()
+    # Yahoo-style CSV, one file per symbol
+    _bars(40, 1).rename(
+        columns={"date": "Date", "adj_close": "Adj Close", "close": "Close"}
+    ).to_csv(root / "aaa.csv", index=False)
+    # One directory per symbol, Alpha Vantage column names, yearly Parquet
+    av = _bars(40, 2, "2023-12-01").rename(
+        columns={
+            "date": "timestamp",
+            "open": "1. open",
+            "high": "2. high",
+            "low": "3. low",
+            "close": "4. close",
+            "adj_close": "5. adjusted close",
+            "volume": "6. volume",
+        }
+    )
+    (root / "BBB").mkdir()
+    year = pd.to_datetime(av["timestamp"]).dt.year
+    for y, part in av.groupby(year):
+        part.to_parquet(root / "BBB" / f"{y}.parquet", index=False)
+    # Duplicate dates: rejected by the quality gate
+    bad = _bars(10, 3)
+    pd.concat([bad, bad.tail(2)]).to_csv(root / "CCC.csv", index=False)
+
+
+def _new_db(path) -> str:
+    conn = duckdb.connect(str(path))
+    conn.execute(SCHEMA_PATH.read_text(encoding="utf-8"))
+    conn.close()
+    return str(path)
+
+
+def test_local_file_bulk_load_matches_per_symbol_ingest(tmp_path):
+    _write_dumps(tmp_path / "dumps")
+    provider = LocalFileProvider(tmp_path / "dumps")
+    assert provider.list_symbols() == ["AAA", "BBB", "CCC"]
+
+    df = provider.get_daily_ohlcv("BBB")
+    assert len(df) == 40
+    assert df.index.is_monotonic_increasing
+    assert (df["split_coefficient"] == 1).all()
+    assert (df["dividend_amount"] == 0).all()
+
+    bulk_db = _new_db(tmp_path / "bulk.duckdb")
+    report = DataIngester(provider, db_path=bulk_db).bulk_load()
+    report = report.set_index("symbol")
+    assert report.loc[["AAA", "BBB"], "passed"].all()
+    assert report.loc[["AAA", "BBB"], "n_loaded"].tolist() == [40, 40]
+    assert not report.loc["CCC", "passed"]
+    assert "duplicate timestamps" in report.loc["CCC", "reason"]
+    assert report.loc["CCC", "n_loaded"] == 0
+
+    # Same adjusted rows as the per-symbol path through the same provider
+    single_db = _new_db(tmp_path / "single.duckdb")
+    single = DataIngester(provider, db_path=single_db)
+    for sym in ("AAA", "BBB"):
+        single.ingest_symbol(sym)
+
+    def rows(db):
+        conn = duckdb.connect(db, read_only=True)
+        out = conn.execute(
+            "SELECT symbol, ts, open, high, low, close, volume, adjusted_close "
+            "FROM ohlcv ORDER BY symbol, ts"
+        ).df()
+        n_ret = conn.execute("SELECT COUNT(*) FROM returns").fetchone()[0]
+        conn.close()
+        return out, n_ret
+
+    (bulk, bulk_ret), (ref, ref_ret) = rows(bulk_db), rows(single_db)
+    pd.testing.assert_frame_equal(bulk, ref, check_exact=False, rtol=1e-12)
+    assert bulk_ret == ref_ret == 80
+    np.testing.assert_allclose(bulk["close"], bulk["adjusted_close"])
+
+    # Incremental re-run: nothing after the stored history
+    again = DataIngester(provider, db_path=bulk_db).bulk_load(["aaa"])
+    assert again["n_loaded"].tolist() == [0]
+
+
+def test_bulk_load_rolls_back_ohlcv_when_returns_fail(tmp_path, monkeypatch):
+    import quant.data_curator.ingest as ingest
+
+    _write_dumps(tmp_path / "dumps")
+    db = _new_db(tmp_path / "bulk.duckdb")
+
+    def boom(conn, symbols):
+        raise RuntimeError("returns failed")
+
+    monkeypatch.setattr(ingest, "recompute_returns", boom)
+    with pytest.raises(RuntimeError, match="returns failed"):
+        DataIngester(LocalFileProvider(tmp_path / "dumps"), db_path=db).bulk_load()
+
+    conn = duckdb.connect(db, read_only=True)
+    n_px = conn.execute("SELECT COUNT(*) FROM ohlcv").fetchone()[0]
+    conn.close()
+    assert n_px == 0
+
+
+def test_validate_batch_reports_every_symbol_in_one_pass(tmp_path):
+    conn = duckdb.connect(_new_db(tmp_path / "audit.duckdb"))
+    frames = []
+    for sym, seed in (("GOOD", 1), ("SPIKE", 2), ("STALE", 3), ("GAPPY", 4)):
+        df = _bars(30, seed).drop(columns="adj_close").rename(columns={"date": "ts"})
+        df.insert(0, "symbol", sym)
+        df["adjusted_close"] = df["close"]
+        frames.append(df)
+    data = pd.concat(frames, ignore_index=True)
+    spike = data.index[data["symbol"] == "SPIKE"][10]
+    data.loc[spike, ["open", "high", "low", "close"]] *= 3
+    data.loc[spike + 1, "high"] = data.loc[spike + 1, "low"] * 0.5  # high < low
+    stale = data.index[data["symbol"] == "STALE"][5:12]
+    data.loc[stale, ["open", "high", "low", "close"]] = data.loc[stale[0], "close"]
+    gappy = data["symbol"] == "GAPPY"
+    data = data[~gappy | ~data.index.isin(data.index[gappy][10:20])]
+    conn.register("data_tmp", data)
+    conn.execute(
+        "INSERT INTO ohlcv SELECT symbol, ts::DATE, open, high, low, close, volume, "
+        "adjusted_close, 'test', now()::TIMESTAMP FROM data_tmp"
+    )
+    # A staged batch with duplicates and NaNs, checked by the same query
+    conn.execute(
+        "CREATE TEMP TABLE stage AS SELECT * FROM ohlcv WHERE symbol = 'GOOD' "
+        "UNION ALL SELECT * FROM ohlcv WHERE symbol = 'GOOD' AND ts < '2024-01-05'"
+    )
+    conn.execute("UPDATE stage SET volume = NULL WHERE ts > '2024-01-20'")
+
+    report = QualityGate.validate_batch(conn).set_index("symbol")
+    assert report.index.tolist() == ["GAPPY", "GOOD", "SPIKE", "STALE"]
+    assert report["passed"].all()
+    assert report.loc["GOOD", "warnings"] == ""
+    assert report.loc["SPIKE", "n_return_spikes"] == 2  # up 3x, then back
+    assert report.loc["SPIKE", "n_ohlc_inconsistent"] >= 1
+    assert report.loc["STALE", "max_stale_run"] == 7
+    assert report.loc["STALE", "warnings"] == "stale prices"
+    assert report.loc["GAPPY", "n_gaps"] == 1
+    assert report.loc["GAPPY", "max_gap_days"] == 15  # 11 business days
+    assert report.loc["GAPPY", "n_rows"] == 20
+
+    only = QualityGate.validate_batch(conn, symbols=["good"])
+    assert only["symbol"].tolist() == ["GOOD"]
+
+    staged = QualityGate.validate_batch(conn, "stage").iloc[0]
+    assert staged["n_duplicate_ts"] == 3
+    assert not staged["passed"]
+    assert staged["reason"] == "duplicate timestamps, too many NaN values"
+
+    conn.execute("CREATE TEMP TABLE no_volume AS SELECT * EXCLUDE (volume) FROM ohlcv")
+    with pytest.raises(DataQualityError, match="volume"):
+        QualityGate.validate_batch(conn, "no_volume")
+    conn.close()
+
+
+class _CompactFiles(LocalFileProvider):
+    """Vendor files served like Alpha Vantage: compact = last 10 bars."""
+
+    def get_daily_ohlcv(self, symbol: str, outputsize: str = "full") -> pd.DataFrame:
+        df = super().get_daily_ohlcv(symbol, outputsize)
+        return df.tail(10) if outputsize == "compact" else df
+
+
+def test_incremental_ingest_readjusts_history_after_dividend(tmp_path):
+    dumps = tmp_path / "dumps"
+    dumps.mkdir()
+    bars = _bars(45, 5)
+    bars.head(40).to_csv(dumps / "AAA.csv", index=False)
+    _bars(45, 6).head(40).to_csv(dumps / "BBB.csv", index=False)
+
+    db = _new_db(tmp_path / "q.duckdb")
+    ingester = DataIngester(_CompactFiles(dumps), db_path=db)
+    for sym in ("AAA", "BBB"):
+        ingester.ingest_symbol(sym)
+    conn = duckdb.connect(db)
+    for sym in ("AAA", "BBB"):
+        conn.execute(
+            "INSERT INTO features_daily SELECT symbol, ts, 'f', 1.0, 'v1', NULL "
+            "FROM ohlcv WHERE symbol = ?",
+            [sym],
+        )
+        conn.execute(
+            "INSERT INTO labels SELECT symbol, ts, 'l', 1.0, 'v1' FROM ohlcv "
+            "WHERE symbol = ?",
+            [sym],
+        )
+    conn.close()
+
+    # No corporate action: plain incremental append
+    bars.head(41).to_csv(dumps / "AAA.csv", index=False)
+    ingester.ingest_symbol("AAA")
+    assert ingester.readjusted == {}
+
+    # Dividend going ex on bar 43: the vendor rescales every earlier adj close
+    bars.loc[:42, "adj_close"] *= 0.98
+    bars.to_csv(dumps / "AAA.csv", index=False)
+    ingester.ingest_symbol("AAA")
+    assert ingester.readjusted == {"AAA": pytest.approx(0.98)}
+
+    ref_db = _new_db(tmp_path / "ref.duckdb")
+    DataIngester(_CompactFiles(dumps), db_path=ref_db).ingest_symbol("AAA")
+
+    def table(db, sql):
+        conn = duckdb.connect(db, read_only=True)
+        try:
+            return conn.execute(sql).df()
+        finally:
+            conn.close()
+
+    prices = "SELECT ts, open, high, low, close, adjusted_close FROM ohlcv "
+    prices += "WHERE symbol = 'AAA' ORDER BY ts"
+    rets = "SELECT * FROM returns WHERE symbol = 'AAA' ORDER BY ts"
+    pd.testing.assert_frame_equal(table(db, prices), table(ref_db, prices))
+    pd.testing.assert_frame_equal(table(db, rets), table(ref_db, rets))
+
+    counts = table(
+        db,
+        "SELECT symbol, (SELECT COUNT(*) FROM features_daily f "
+        "WHERE f.symbol = s.symbol) AS n_feat, (SELECT COUNT(*) FROM labels l "
+        "WHERE l.symbol = s.symbol) AS n_lbl FROM (VALUES ('AAA'), ('BBB')) "
+        "s(symbol) ORDER BY symbol",
+    )
+    assert counts["n_feat"].tolist() == [0, 40]
+    assert counts["n_lbl"].tolist() == [0, 40]
+
+
+def test_incremental_ingest_ignores_rounding_on_sub_dollar_prices(tmp_path):
+    dumps = tmp_path / "dumps"
+    dumps.mkdir()
+    # ~$0.30 stock quoted to 4 decimals, like Alpha Vantage's adjusted_close
+    bars = _bars(45, 7)
+    price_cols = ["open", "high", "low", "close", "adj_close"]
+    bars[price_cols] = (bars[price_cols] * 0.006).round(4)
+    bars.head(40).to_csv(dumps / "PENNY.csv", index=False)
+
+    db = _new_db(tmp_path / "q.duckdb")
+    ingester = DataIngester(_CompactFiles(dumps), db_path=db)
+    ingester.ingest_symbol("PENNY")
+    conn = duckdb.connect(db)
+    conn.execute(
+        "INSERT INTO features_daily SELECT symbol, ts, 'f', 1.0, 'v1', NULL "
+        "FROM ohlcv WHERE symbol = 'PENNY'"
+    )
+    conn.close()
+
+    # The vendor re-rounds the overlap: last-decimal jitter is no adjustment
+    jittered = bars.head(41).copy()
+    jittered.loc[30:39:2, "adj_close"] += 0.0001
+    jittered.to_csv(dumps / "PENNY.csv", index=False)
+    ingester.ingest_symbol("PENNY")
+    assert ingester.readjusted == {}
+    conn = duckdb.connect(db, read_only=True)
+    n_feat = conn.execute("SELECT COUNT(*) FROM features_daily").fetchone()[0]
+    conn.close()
+    assert n_feat == 40
+
+    # A real dividend is still detected through the rounding
+    bars.loc[:42, "adj_close"] = (bars.loc[:42, "adj_close"] * 0.98).round(4)
+    bars.to_csv(dumps / "PENNY.csv", index=False)
+    ingester.ingest_symbol("PENNY")
+    assert ingester.readjusted["PENNY"] == pytest.approx(0.98, abs=1e-3)
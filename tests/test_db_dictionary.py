@@ -0,0 +1,81 @@
+import duckdb
+import pandas as pd
+import pytest
+
+from quant.db.dictionary import decode, encode, is_encoded
+from quant.db.duck import SCHEMA_PATH
+from quant.feature_store.features import FeatureCalculator
+
+
+def _features_frame() -> pd.DataFrame:
+    idx = pd.DatetimeIndex(pd.bdate_range("2024-01-02", periods=3), name="ts")
+    return pd.DataFrame({"ret_1d": [0.1, 0.2, 0.3], "vol_20d": [1.0, 2.0, 3.0]}, idx)
+
+
+def test_encode_keeps_view_rows_and_writers_round_trip(tmp_path):
+    db_path = tmp_path / "quant.duckdb"
+    conn = duckdb.connect(str(db_path))
+    conn.execute(SCHEMA_PATH.read_text(encoding="utf-8"))
+    conn.close()
+
+    calc = FeatureCalculator(db_path=str(db_path))
+    calc.save_features("AAPL", _features_frame(), "v1")
+
+    query = (
+        "SELECT symbol, ts, feature_name, feature_value, feature_version "
+        "FROM features_daily ORDER BY symbol, ts, feature_name"
+    )
+    conn = duckdb.connect(str(db_path))
+    before = conn.execute(query).df()
+    assert encode(conn, ["features_daily"]) == {"features_daily": 6}
+    assert is_encoded(conn, "features_daily")
+    pd.testing.assert_frame_equal(conn.execute(query).df(), before)
+    conn.close()
+
+    # Writers go through the fact table once encoded (upsert + new symbol)
+    calc.save_features("AAPL", _features_frame() * 2, "v1")
+    calc.save_features("MSFT", _features_frame(), "v1")
+
+    conn = duckdb.connect(str(db_path))
+    got = conn.execute(query).df()
+    assert len(got) == 12
+    aapl = got[got["symbol"] == "AAPL"]
+    assert aapl["feature_value"].tolist() == (before["feature_value"] * 2).tolist()
+    assert conn.execute("SELECT COUNT(*) FROM dim_symbol").fetchone()[0] == 2
+
+    assert decode(conn, ["features_daily"]) == {"features_daily": 12}
+    assert not is_encoded(conn, "features_daily")
+    pd.testing.assert_frame_equal(conn.execute(query).df(), got)
+    conn.close()
+
+
+def test_series_store_writers_upsert_through_encoded_views(tmp_path):
+    from quant.db.timeseries import SeriesStore
+
+    db_path = tmp_path / "quant.duckdb"
+    conn = duckdb.connect(str(db_path))
+    conn.execute(SCHEMA_PATH.read_text(encoding="utf-8"))
+    encode(conn, ["features_daily", "labels"])
+    conn.close()
+
+    frame = _features_frame()
+    with SeriesStore(db_path) as store:
+        store.save_features(frame, "aapl", "v1")
+        store.save_features(frame[["ret_1d"]] * 2, "aapl", "v1")
+        store.save_labels(frame.rename(columns={"ret_1d": "fwd_1d"}), "aapl", "v1")
+        store.save_labels(
+            frame[["ret_1d"]].rename(columns={"ret_1d": "fwd_1d"}) * 3, "aapl", "v1"
+        )
+
+    conn = duckdb.connect(str(db_path))
+    features = conn.execute(
+        "SELECT feature_name, SUM(feature_value) FROM features_daily "
+        "WHERE symbol = 'AAPL' GROUP BY 1 ORDER BY 1"
+    ).fetchall()
+    labels = conn.execute(
+        "SELECT label_name, SUM(label_value) FROM labels "
+        "WHERE symbol = 'AAPL' GROUP BY 1 ORDER BY 1"
+    ).fetchall()
+    conn.close()
+    assert features == [("ret_1d", pytest.approx(1.2)), ("vol_20d", 6.0)]
+    assert labels == [("fwd_1d", pytest.approx(1.8)), ("vol_20d", 6.0)]
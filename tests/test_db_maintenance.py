@@ -0,0 +1,68 @@
+import duckdb
+import numpy as np
+import pandas as pd
+
+from quant.db.duck import SCHEMA_PATH
+from quant.db.maintenance import (
+    deleted_rows,
+    maybe_compact,
+    record_write,
+    rewrite_file,
+    write_seq,
+)
+from quant.feature_store.features import FeatureCalculator
+
+
+def _features(dates: pd.DatetimeIndex, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        rng.random((len(dates), 2)), index=dates.rename("ts"), columns=["a", "b"]
+    )
+
+
+def test_upsert_churn_triggers_sorted_compaction(tmp_path):
+    db_path = tmp_path / "quant.duckdb"
+    conn = duckdb.connect(str(db_path))
+    conn.execute(SCHEMA_PATH.read_text(encoding="utf-8"))
+    conn.close()
+
+    dates = pd.bdate_range("2024-01-01", periods=40)
+    calc = FeatureCalculator(db_path=str(db_path))
+    for i, sym in enumerate(["MSFT", "AAPL"]):
+        calc.save_features(sym, _features(dates, i), "v1")
+    # Overlapping re-run for AAPL appends its rows after MSFT's
+    calc.save_features("AAPL", _features(dates[-10:], 7), "v1")
+
+    query = "SELECT * FROM features_daily ORDER BY symbol, ts, feature_name"
+    conn = duckdb.connect(str(db_path))
+    assert deleted_rows(conn) == {"features_daily": 20}
+    expected = conn.execute(query).df()
+    conn.close()
+
+    assert maybe_compact(db_path, threshold=100) == []
+    results = maybe_compact(db_path, threshold=20)
+    assert [(r.table, r.rows) for r in results] == [("features_daily", 160)]
+
+    rewrite_file(db_path)
+
+    conn = duckdb.connect(str(db_path))
+    assert deleted_rows(conn) == {"features_daily": 0}
+    pd.testing.assert_frame_equal(conn.execute(query).df(), expected)
+    # Physical (scan) order now follows the compaction key
+    scan = conn.execute("SELECT symbol, ts FROM features_daily").df()
+    assert scan["symbol"].is_monotonic_increasing
+    assert scan.groupby("symbol")["ts"].apply(lambda s: s.is_monotonic_increasing).all()
+    conn.close()
+
+
+def test_record_write_creates_stats_table_after_rollback(tmp_path):
+    conn = duckdb.connect(str(tmp_path / "old.duckdb"))
+    conn.execute("BEGIN TRANSACTION")
+    record_write(conn, "ohlcv", 3)
+    conn.execute("ROLLBACK")
+    # The rolled-back DDL is not remembered as done
+    record_write(conn, "ohlcv", 2)
+    record_write(conn, "ohlcv")
+    assert write_seq(conn, "ohlcv") == 2
+    assert deleted_rows(conn) == {"ohlcv": 2}
+    conn.close()
@@ -0,0 +1,110 @@
+import time
+
+import pytest
+
+from quant.data_curator import provider as provider_mod
+from quant.data_curator.http_cache import CacheMissError, ResponseCache
+from quant.data_curator.provider import AlphaVantageProvider
+
+DAILY = {
+    "Time Series (Daily)": {
+        "2024-01-03": {
+            "1. open": "10",
+            "2. high": "11",
+            "3. low": "9",
+            "4. close": "10.5",
+            "5. adjusted close": "10.5",
+            "6. volume": "1000",
+            "7. dividend amount": "0",
+            "8. split coefficient": "1",
+        }
+    }
+}
+
+
+class _Response:
+    def __init__(self, data):
+        self._data = data
+
+    def raise_for_status(self):
+        return None
+
+    def json(self):
+        return self._data
+
+
+@pytest.fixture
+def http_calls(monkeypatch):
+    calls = []
+
+    def fake_get(url, params, timeout):
+        calls.append(dict(params))
+        return _Response(DAILY)
+
+    monkeypatch.setattr(provider_mod.requests, "get", fake_get)
+    return calls
+
+
+def test_record_then_replay_offline(tmp_path, http_calls):
+    recorder = AlphaVantageProvider("key", cache=ResponseCache(tmp_path, mode="record"))
+    df = recorder.get_daily_ohlcv("AAPL")
+    assert len(http_calls) == 1
+    assert df["close"].iloc[0] == 10.5
+    stored = list((tmp_path / "TIME_SERIES_DAILY_ADJUSTED").iterdir())
+    assert len(stored) == 1
+    assert stored[0].name.startswith("AAPL__compact__")
+    assert b"key" not in stored[0].read_bytes()
+
+    # Replay: no API key, no network, same frame
+    replayer = AlphaVantageProvider(None, cache=ResponseCache(tmp_path, mode="replay"))
+    assert replayer.get_daily_ohlcv("AAPL").equals(df)
+    assert len(http_calls) == 1
+    with pytest.raises(CacheMissError):
+        replayer.get_daily_ohlcv("MSFT")
+    with pytest.raises(CacheMissError):
+        replayer.get_daily_ohlcv("AAPL", outputsize="full")
+    with pytest.raises(ValueError):
+        AlphaVantageProvider(None, cache=ResponseCache(tmp_path, mode="use"))
+
+
+def test_read_through_ttl_and_lru_eviction(tmp_path, http_calls):
+    cache = ResponseCache(tmp_path, mode="use", ttl_seconds=3600)
+    provider = AlphaVantageProvider("key", cache=cache)
+    provider.get_daily_ohlcv("AAPL")
+    provider.get_daily_ohlcv("AAPL")
+    assert len(http_calls) == 1
+    assert cache.hits == 1
+
+    cache.ttl_seconds = 0.0
+    time.sleep(0.01)
+    provider.get_daily_ohlcv("AAPL")
+    assert len(http_calls) == 2
+
+    # Budget of two entries: the least recently used one goes
+    lru = ResponseCache(tmp_path / "lru", mode="use", max_bytes=0)
+    for sym in ("A", "B"):
+        path = lru.put({"function": "F", "symbol": sym}, DAILY)
+    lru.max_bytes = int(path.stat().st_size * 2.5)
+    time.sleep(0.01)
+    assert lru.get({"function": "F", "symbol": "A"}) == DAILY  # touch A
+    time.sleep(0.01)
+    lru.put({"function": "F", "symbol": "C"}, DAILY)
+    names = sorted(p.name.split("__")[0] for p in path.parent.iterdir())
+    assert names == ["A", "C"]
+    assert lru.get({"function": "F", "symbol": "B"}) is None
+
+
+def test_put_scans_the_store_once_until_over_budget(tmp_path, monkeypatch):
+    cache = ResponseCache(tmp_path, mode="use", max_bytes=10**9)
+    scans = []
+    scan = cache._scan
+    monkeypatch.setattr(cache, "_scan", lambda: scans.append(1) or scan())
+    paths = [cache.put({"function": "F", "symbol": s}, DAILY) for s in "ABCD"]
+    cache.put({"function": "F", "symbol": "A"}, DAILY)  # overwrite, same size
+    assert len(scans) == 1
+    assert cache._nbytes == sum(p.stat().st_size for p in paths)
+
+    cache.max_bytes = cache._nbytes
+    cache.put({"function": "F", "symbol": "E"}, DAILY)
+    assert len(scans) == 2
+    assert cache._nbytes <= cache.max_bytes
@@ -0,0 +1,200 @@
+import numpy as np
+import pandas as pd
+
+from quant.db.panel import Panel, returns_from_close
+
+
+def test_panel_from_long_is_float32_with_shared_axes():
+    df = pd.DataFrame(
+        {
+            "symbol": ["MSFT", "AAPL", "AAPL", "MSFT"],
+            "ts": pd.to_datetime(
+                ["2024-01-02", "2024-01-02", "2024-01-03", "2024-01-04"]
+            ),
+            "feature_name": ["ret_1d", "ret_1d", "ret_1d", "vol_20d"],
+            "feature_value": [0.1, 0.2, 0.3, 0.4],
+        }
+    )
+    panel = Panel.from_long(df, value_col="feature_value", field_col="feature_name")
+
+    assert list(panel.symbols) == ["AAPL", "MSFT"]
+    assert panel.shape == (3, 2)
+    assert panel.fields == ["ret_1d", "vol_20d"]
+    assert all(panel[f].dtype == np.float32 for f in panel.fields)
+    assert panel["ret_1d"][0, 1] == np.float32(0.1)
+    assert np.isnan(panel["vol_20d"][0, 0])
+
+    frame = panel.to_frame("ret_1d")
+    assert list(frame.columns) == ["AAPL", "MSFT"]
+    assert frame.loc["2024-01-03", "AAPL"] == np.float32(0.3)
+
+    sym_codes, day_idx, X = panel.stack(["ret_1d"])
+    assert sym_codes.dtype == np.int32
+    assert day_idx.dtype == np.int32
+    assert X.dtype == np.float32
+    assert X.shape == (3, 1)
+    rows = panel.rows_frame(sym_codes, day_idx)
+    assert isinstance(rows["symbol"].dtype, pd.CategoricalDtype)
+    assert list(rows["symbol"].astype(str)) == ["AAPL", "AAPL", "MSFT"]
+
+    aligned = panel.reindex(symbols=["MSFT", "NVDA"])
+    assert aligned.shape == (3, 2)
+    assert np.isnan(aligned["ret_1d"][:, 1]).all()
+
+
+def test_returns_from_close_matches_pct_change_with_pad():
+    close = pd.DataFrame(
+        {"A": [100.0, 101.0, np.nan, 103.0], "B": [np.nan, 50.0, 55.0, 55.0]}
+    )
+    expected = close.ffill().pct_change().fillna(0).to_numpy()
+    got = returns_from_close(close.to_numpy(dtype=np.float32))
+    assert got.dtype == np.float32
+    np.testing.assert_allclose(got, expected, rtol=1e-6, atol=1e-7)
+
+
+def test_panel_cache_hits_slices_and_invalidates(tmp_path):
+    import duckdb
+
+    from quant.db.cache import PanelCache, PanelKey, _slice
+    from quant.db.maintenance import record_write
+
+    db = tmp_path / "quant.duckdb"
+    duckdb.connect(str(db)).close()
+
+    dates = pd.bdate_range("2024-01-01", periods=20)
+    panel = Panel.from_wide(
+        pd.DataFrame(np.ones((20, 2)), index=dates, columns=["AAPL", "MSFT"]),
+        "ret_1d",
+    )
+
+    def key(**kw):
+        base = {
+            "db": db,
+            "table": "returns",
+            "symbols": ["msft", "AAPL"],
+            "from_date": "2024-01-01",
+            "to_date": "2024-01-26",
+        }
+        return PanelKey.build(**{**base, **kw})
+
+    cache = PanelCache(max_bytes=10 * panel.nbytes)
+    assert cache.get(key()) is None
+    cache.put(key(), panel)
+    assert cache.get(key()) is panel
+    assert not panel["ret_1d"].flags.writeable
+
+    # Narrower range on the same symbols -> sliced from the cached entry
+    narrow = key(from_date="2024-01-08", to_date="2024-01-12")
+    hit = cache.get(narrow)
+    assert hit is panel
+    assert _slice(hit, narrow).shape == (5, 2)
+    # Different symbol set / table is a miss
+    assert cache.get(key(symbols=["AAPL"])) is None
+    assert cache.get(key(table="features_daily")) is None
+
+    assert cache.invalidate("returns", ["NVDA"]) == 0
+    assert cache.invalidate("returns", ["aapl"]) == 1
+    assert len(cache) == 0
+    assert cache.nbytes == 0
+
+    # Writes to unrelated tables keep the entry; a recorded write to a source
+    # table (any process) drops it
+    cache.put(key(), panel)
+    conn = duckdb.connect(str(db))
+    conn.execute("CREATE TABLE t (x INTEGER)")
+    conn.execute("INSERT INTO t VALUES (1)")
+    record_write(conn, "targets")
+    conn.close()
+    assert cache.get(key()) is panel
+    conn = duckdb.connect(str(db))
+    record_write(conn, "ohlcv")  # returns panels fall back to ohlcv close
+    conn.close()
+    assert cache.get(key()) is None
+
+    # LRU eviction under the byte budget
+    small = PanelCache(max_bytes=int(panel.nbytes * 1.5))
+    small.put(key(), panel)
+    small.put(key(to_date="2024-01-25"), panel)
+    assert len(small) == 1
+    assert small.get(key()) is None
+
+
+def test_panel_store_round_trip_is_mmapped_and_detects_stale(tmp_path):
+    import duckdb
+
+    from quant.db.duck import SCHEMA_PATH
+    from quant.db.maintenance import record_write
+    from quant.db.panel_store import PanelStore
+
+    db = tmp_path / "quant.duckdb"
+    conn = duckdb.connect(str(db))
+    conn.execute(SCHEMA_PATH.read_text(encoding="utf-8"))
+    conn.execute(
+        """
+        INSERT INTO features_daily (symbol, ts, feature_name, feature_value,
+                                    feature_version)
+        SELECT sym, DATE '2024-01-01' + d::INT, name, d * 1.0, 'v1'
+        FROM (VALUES ('AAPL'), ('MSFT')) s(sym), range(5) r(d),
+             (VALUES ('ret_1d'), ('vol_20d')) f(name)
+        """
+    )
+    conn.close()
+
+    store = PanelStore(root=tmp_path / "panels", db_path=db)
+    assert store.load("features_daily") is None
+    built = store.build("features_daily")
+
+    loaded = store.load("features_daily")
+    assert isinstance(loaded["ret_1d"], np.memmap)
+    assert list(loaded.symbols) == ["AAPL", "MSFT"]
+    assert loaded.fields == built.fields
+    np.testing.assert_array_equal(loaded["vol_20d"], built["vol_20d"])
+    np.testing.assert_array_equal(loaded.dates, built.dates)
+
+    # A recorded write (same row count / max ts) still invalidates the files
+    conn = duckdb.connect(str(db))
+    conn.execute("UPDATE features_daily SET feature_value = 0")
+    record_write(conn, "features_daily")
+    conn.close()
+    assert not store.is_fresh("features_daily")
+    assert store.load("features_daily") is None
+    assert store.load("features_daily", check=False) is not None
+
+
+def test_series_store_write_moves_the_ohlcv_watermark(tmp_path):
+    import duckdb
+
+    from quant.db.duck import table_ddl
+    from quant.db.maintenance import write_seq
+    from quant.db.timeseries import SeriesStore
+
+    db = tmp_path / "legacy.duckdb"
+    conn = duckdb.connect(str(db))
+    conn.execute(
+        """
+        CREATE TABLE ohlcv (
+          frequency TEXT, symbol TEXT, currency TEXT, date DATE, open DOUBLE,
+          high DOUBLE, low DOUBLE, close DOUBLE, volume DOUBLE, type TEXT,
+          updated_at TIMESTAMP, PRIMARY KEY (frequency, symbol, date)
+        )
+        """
+    )
+    conn.close()
+
+    bars = pd.DataFrame(
+        {"open": 1.0, "high": 2.0, "low": 0.5, "close": 1.5, "volume": 10.0},
+        index=pd.Index(pd.bdate_range("2024-01-01", periods=3), name="date"),
+    )
+    with SeriesStore(db) as store:
+        before = write_seq(store.conn, "ohlcv")
+        store.save_ohlcv(bars, "AAPL", "daily")
+        assert write_seq(store.conn, "ohlcv") == before + 1
+
+        # Same rows with new values: count and max ts stay, write_seq moves
+        for table in ("features_daily", "labels"):
+            store.conn.execute(table_ddl(table))
+        for value in (1.0, 2.0):
+            store.save_features(bars[["close"]] * value, "AAPL")
+            store.save_labels(bars[["close"]] * value, "AAPL")
+        assert write_seq(store.conn, "features_daily") == 2
+        assert write_seq(store.conn, "labels") == 2
@@ -1,5 +1,6 @@
 import json
 import os
+import shutil
 import subprocess
 import uuid
 from pathlib import Path
@@ -10,6 +11,7 @@ import pandas as pd
 import pytest
 
 from quant.strategy_lab.loader import StrategyLoader
+from quant.strategy_lab.rebalance import RebalanceCalendar, select_rebalance_dates
 
 
 def _env_for_tmp(tmp_path: Path) -> dict:
@@ -451,3 +453,389 @@ def test_factor_rank_pipeline_remains_baseline(tmp_path: Path):
         ), "baseline factor_rank should emit targets only for asof=to_date"
     finally:
         conn.close()
+
+
+def test_factor_rank_window_scope_ranks_all_rebalance_dates(tmp_path: Path):
+    from quant.strategy_lab.recommender import Recommender
+
+    env = _env_for_tmp(tmp_path)
+    _init_dbs(env)
+
+    duckdb_path = Path(env["QUANT_DUCKDB_PATH"])
+    symbols = ["AAPL", "PLTR", "QQQM"]
+    _seed_ohlcv_and_features(
+        duckdb_path=duckdb_path,
+        symbols=symbols,
+        date_from="2022-09-01",
+        date_to="2023-02-10",
+    )
+
+    config = {
+        "strategy_id": "t_factor_rank_window",
+        "version": "0.1",
+        "universe": {"type": "symbols", "symbols": symbols},
+        "signal": {
+            "type": "factor_rank",
+            "inputs": {"feature_version": "v1", "feature_name": "ret_20d"},
+        },
+        "rebalance": {"frequency": "weekly", "scope": "window"},
+        "portfolio": {"top_k": 2, "weighting": "equal"},
+        "supervisor": {"max_positions": 10},
+    }
+    StrategyLoader.validate_schema(config)
+
+    rec = Recommender(db_path=str(duckdb_path))
+    df = rec.generate_targets_for_window(
+        config=config,
+        symbols=symbols,
+        from_date="2023-01-09",
+        to_date="2023-01-31",
+    )
+
+    # Mondays 01-09, 01-16, 01-23, 01-30 (seed has calendar-day rows)
+    assert sorted(df["asof"].unique()) == [
+        "2023-01-09",
+        "2023-01-16",
+        "2023-01-23",
+        "2023-01-30",
+    ]
+    assert (df.groupby("asof").size() == 2).all()
+    assert np.allclose(df.groupby("asof")["weight"].sum(), 1.0)
+
+    # Each date's Top-K must match the single-asof baseline
+    daily = Recommender(db_path=str(duckdb_path)).generate_targets(
+        {**config, "rebalance": {"frequency": "daily"}}, "2023-01-16"
+    )
+    window_day = df[df["asof"] == "2023-01-16"]
+    assert list(window_day["symbol"]) == list(daily["symbol"])
+
+    bad = {**config, "rebalance": {"frequency": "hourly"}}
+    with pytest.raises(ValueError):
+        StrategyLoader.validate_schema(bad)
+
+
+def test_backtest_from_recommender_skips_targets_table(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    from quant.backtest_engine.research import (
+        backtest_from_recommender,
+        recommend_targets,
+    )
+    from quant.config import settings
+
+    env = _env_for_tmp(tmp_path)
+    _init_dbs(env)
+
+    duckdb_path = Path(env["QUANT_DUCKDB_PATH"])
+    symbols = ["AAPL", "PLTR", "QQQM"]
+    _seed_ohlcv_and_features(
+        duckdb_path=duckdb_path,
+        symbols=symbols,
+        date_from="2022-09-01",
+        date_to="2023-02-10",
+    )
+    persist_path = tmp_path / "research.duckdb"
+    shutil.copy(duckdb_path, persist_path)
+    config = {
+        "strategy_id": "t_in_memory",
+        "version": "0.1",
+        "universe": {"type": "symbols", "symbols": symbols},
+        "signal": {
+            "type": "factor_rank",
+            "inputs": {"feature_version": "v1", "feature_name": "ret_20d"},
+        },
+        "rebalance": {"frequency": "weekly", "scope": "window"},
+        "portfolio": {"top_k": 2, "weighting": "equal"},
+        "supervisor": {"max_positions": 10, "max_weight_per_symbol": 0.5},
+        "backtest": {"fee_bps": 5, "slippage_bps": 5},
+    }
+
+    result, targets = backtest_from_recommender(
+        config, "2023-01-09", "2023-01-31", db_path=str(duckdb_path)
+    )
+    assert targets["asof"].nunique() == 4
+    assert targets["approved"].all()
+    assert result is not None
+    assert result["num_trades"] > 0
+
+    conn = duckdb.connect(str(duckdb_path), read_only=True)
+    try:
+        n_targets = conn.execute("SELECT COUNT(*) FROM targets").fetchone()[0]
+        n_runs = conn.execute("SELECT COUNT(*) FROM backtest_summary").fetchone()[0]
+    finally:
+        conn.close()
+    assert n_targets == 0
+    assert n_runs == 1
+
+    # Persisted targets go to the research DB, never the configured one
+    prod_path = tmp_path / "prod.duckdb"
+    monkeypatch.setattr(settings, "quant_duckdb_path", prod_path)
+    backtest_from_recommender(
+        config,
+        "2023-01-09",
+        "2023-01-31",
+        persist_targets=True,
+        db_path=str(persist_path),
+    )
+    conn = duckdb.connect(str(persist_path), read_only=True)
+    try:
+        n_targets = conn.execute("SELECT COUNT(*) FROM targets").fetchone()[0]
+    finally:
+        conn.close()
+    assert n_targets == len(targets)
+    assert not prod_path.exists()
+
+    # asof scope: an off-calendar to_date yields nothing, as in run_recommend
+    asof_config = {**config, "rebalance": {"frequency": "weekly", "scope": "asof"}}
+    on_calendar = recommend_targets(
+        asof_config, "2023-01-09", "2023-01-09", db_path=str(duckdb_path)
+    )
+    assert on_calendar["asof"].astype(str).unique().tolist() == ["2023-01-09"]
+    off_calendar = recommend_targets(
+        asof_config, "2023-01-11", "2023-01-11", db_path=str(duckdb_path)
+    )
+    assert off_calendar.empty
+
+
+def test_rebalance_calendar_selects_weekly_monthly_and_custom_dates():
+    # Trading calendar with a holiday on Monday 2023-01-16
+    days = pd.bdate_range("2023-01-02", "2023-02-28")
+    days = days[days != pd.Timestamp("2023-01-16")]
+
+    daily = select_rebalance_dates(days, "daily")
+    assert len(daily) == len(days)
+
+    weekly = select_rebalance_dates(days, "weekly")
+    assert pd.Timestamp("2023-01-17") in weekly  # holiday Monday -> Tuesday
+    assert len(weekly) == 9
+
+    monthly = select_rebalance_dates(days, "monthly")
+    assert list(monthly) == [pd.Timestamp("2023-01-31"), pd.Timestamp("2023-02-28")]
+
+    custom = select_rebalance_dates(
+        days, "custom", ["2023-01-14", "2023-02-01", "2023-03-31"]
+    )
+    # Weekend snaps to the next trading day; dates past the calendar are dropped
+    assert list(custom) == [pd.Timestamp("2023-01-17"), pd.Timestamp("2023-02-01")]
+
+
+def test_loader_and_factor_rank_share_rebalance_validation():
+    from quant.strategy_lab.recommenders.factor_rank import FactorRankRecommender
+
+    config = {
+        "strategy_id": "s",
+        "version": "1",
+        "universe": {"type": "static", "symbols": ["AAA"]},
+        "signal": {
+            "type": "factor_rank",
+            "inputs": {"feature_name": "ret_20d", "feature_version": "v1"},
+        },
+        "portfolio": {"top_k": 1},
+        "supervisor": {},
+        "rebalance": {"frequency": "custom"},
+    }
+    message = r"rebalance.dates \(non-empty list\) is required"
+    with pytest.raises(ValueError, match=message):
+        StrategyLoader.validate_schema(config)
+    with pytest.raises(ValueError, match=message):
+        FactorRankRecommender(db_path="unused.duckdb").validate(config)
+
+
+def test_rebalance_calendar_ignores_partial_weeks_and_months_at_window_edges(
+    tmp_path: Path,
+):
+    db_path = tmp_path / "cal.duckdb"
+    conn = duckdb.connect(str(db_path))
+    conn.execute("CREATE TABLE ohlcv (symbol TEXT, ts DATE)")
+    days = pd.bdate_range("2023-12-01", "2024-02-20")
+    conn.execute("INSERT INTO ohlcv SELECT 'AAA', UNNEST(?::DATE[])", [list(days.date)])
+    conn.close()
+
+    def calendar(frequency: str, start: str, end: str) -> list[str]:
+        config = {"rebalance": {"frequency": frequency}}
+        return RebalanceCalendar.from_config(
+            config, from_date=start, to_date=end, db_path=db_path
+        ).as_strings()
+
+    # Wednesday window start is not a week start; 2024-02-14 is not a month-end
+    weekly = calendar("weekly", "2024-01-10", "2024-02-14")
+    assert weekly[0] == "2024-01-15"
+    assert calendar("monthly", "2024-01-10", "2024-02-14") == ["2024-01-31"]
+
+    # One-day (nightly) windows only rebalance on real week starts/month-ends
+    assert calendar("weekly", "2024-01-03", "2024-01-03") == []
+    assert calendar("monthly", "2024-01-03", "2024-01-03") == []
+    assert calendar("weekly", "2024-01-08", "2024-01-08") == ["2024-01-08"]
+    assert calendar("monthly", "2024-01-31", "2024-01-31") == ["2024-01-31"]
+
+    # February is still in progress when the data stops on 2024-02-20
+    assert calendar("monthly", "2024-02-01", "2024-02-20") == []
+
+
+def test_monthly_rebalance_closes_months_ending_before_an_exchange_holiday():
+    # Good Friday 2024-03-29 and Memorial Day 2021-05-31 end their months
+    for last in ("2024-03-28", "2021-05-28"):
+        days = pd.bdate_range(end=last, periods=30)
+        monthly = select_rebalance_dates(days, "monthly")
+        assert monthly[-1] == pd.Timestamp(last)
+
+    # A regular weekday mid-month is still in progress
+    days = pd.bdate_range(end="2024-03-27", periods=30)
+    assert pd.Timestamp("2024-03-27") not in select_rebalance_dates(days, "monthly")
+
+
+def test_window_targets_replace_dates_left_from_a_previous_calendar(
+    tmp_path: Path,
+):
+    from quant.db.duck import SCHEMA_PATH
+    from quant.repos.targets import clear_targets, save_targets_many
+
+    db_path = tmp_path / "targets.duckdb"
+    conn = duckdb.connect(str(db_path))
+    conn.execute(SCHEMA_PATH.read_text(encoding="utf-8"))
+    conn.close()
+
+    def targets(strategy_id: str, dates) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "strategy_id": strategy_id,
+                "asof": [d.strftime("%Y-%m-%d") for d in dates],
+                "symbol": "AAA",
+                "weight": 1.0,
+            }
+        )
+
+    days = pd.bdate_range("2024-01-01", "2024-01-31")
+    weekly = select_rebalance_dates(days, "weekly")
+    save_targets_many(pd.concat([targets("s", days), targets("other", days)]), db_path)
+    # Switched from daily to weekly: only the weekly dates remain in the window
+    save_targets_many(
+        targets("s", weekly), db_path, window=("2024-01-01", "2024-01-31")
+    )
+
+    def stored(strategy_id: str) -> list[str]:
+        conn = duckdb.connect(str(db_path))
+        rows = conn.execute(
+            "SELECT DISTINCT study_date FROM targets WHERE strategy_id = ? "
+            "ORDER BY 1",
+            [strategy_id],
+        ).fetchall()
+        conn.close()
+        return [str(r[0]) for r in rows]
+
+    assert stored("s") == [d.strftime("%Y-%m-%d") for d in weekly]
+    assert len(stored("other")) == len(days)
+
+    # Per-date writers clear the window once up front
+    assert clear_targets("s", "2024-01-08", "2024-01-14", db_path) == 1
+    assert "2024-01-08" not in stored("s")
+
+
+def test_ml_gbdt_training_matrix_streams_float32_independent_of_chunking(
+    tmp_path: Path,
+):
+    from quant.strategy_lab.recommenders.ml_gbdt import (
+        _DEFAULT_FEATURESET_V1,
+        MLConfig,
+        MLGBDTRecommender,
+    )
+
+    env = _env_for_tmp(tmp_path)
+    _init_dbs(env)
+
+    duckdb_path = Path(env["QUANT_DUCKDB_PATH"])
+    symbols = ["AAPL", "PLTR", "QQQM"]
+    _seed_ohlcv_and_features(
+        duckdb_path=duckdb_path,
+        symbols=symbols,
+        date_from="2022-09-01",
+        date_to="2023-02-20",
+    )
+
+    ml_cfg = MLConfig(
+        algo="lightgbm",
+        target="forward_ret_5d",
+        featureset="default",
+        train_from="2022-12-01",
+        train_to="2023-01-15",
+        valid_from="2023-01-16",
+        valid_to="2023-02-10",
+        params={},
+    )
+    rec = MLGBDTRecommender(db_path=str(duckdb_path))
+    kwargs = {
+        "symbols": symbols,
+        "feature_version": "v1",
+        "feature_names": list(_DEFAULT_FEATURESET_V1),
+        "ml_cfg": ml_cfg,
+        "horizon": 5,
+    }
+    one_block = rec._load_training_matrix(**kwargs, chunk_symbols=len(symbols))
+    per_symbol = rec._load_training_matrix(**kwargs, chunk_symbols=1)
+
+    X_train, y_train, X_valid, y_valid = one_block
+    assert X_train.dtype == np.float32
+    assert X_valid.dtype == np.float32
+    assert X_train.shape[1] == len(_DEFAULT_FEATURESET_V1)
+    assert len(y_train) > 0
+    assert len(y_valid) > 0
+    assert not np.isnan(X_train).any()
+    assert not np.isnan(y_train).any()
+    for a, b in zip(one_block, per_symbol, strict=True):
+        np.testing.assert_array_equal(a, b)
+
+
+def test_ml_gbdt_training_matrix_keeps_overlapping_windows_in_both_sets(
+    tmp_path: Path,
+):
+    from dataclasses import replace
+
+    from quant.db.duck import SCHEMA_PATH
+    from quant.strategy_lab.recommenders.ml_gbdt import (
+        _DEFAULT_FEATURESET_V1,
+        MLConfig,
+        MLGBDTRecommender,
+    )
+
+    duckdb_path = tmp_path / "quant.duckdb"
+    conn = duckdb.connect(str(duckdb_path))
+    conn.execute(SCHEMA_PATH.read_text(encoding="utf-8"))
+    conn.close()
+    symbols = ["AAPL", "PLTR"]
+    _seed_ohlcv_and_features(
+        duckdb_path=duckdb_path,
+        symbols=symbols,
+        date_from="2022-09-01",
+        date_to="2023-02-20",
+    )
+
+    base = MLConfig(
+        algo="lightgbm",
+        target="forward_ret_5d",
+        featureset="default",
+        train_from="2022-12-01",
+        train_to="2023-01-20",
+        valid_from="2023-01-16",
+        valid_to="2023-02-10",
+        params={},
+    )
+    rec = MLGBDTRecommender(db_path=str(duckdb_path))
+
+    def matrix(ml_cfg: MLConfig):
+        return rec._load_training_matrix(
+            symbols=symbols,
+            feature_version="v1",
+            feature_names=list(_DEFAULT_FEATURESET_V1),
+            ml_cfg=ml_cfg,
+            horizon=5,
+        )
+
+    X_train, y_train, X_valid, y_valid = matrix(base)
+    # Each set matches what its own range yields without the overlap
+    train_only = matrix(replace(base, valid_from="2023-01-21"))
+    valid_only = matrix(replace(base, train_to="2023-01-15"))
+    np.testing.assert_array_equal(X_train, train_only[0])
+    np.testing.assert_array_equal(y_train, train_only[1])
+    np.testing.assert_array_equal(X_valid, valid_only[2])
+    np.testing.assert_array_equal(y_valid, valid_only[3])
+    assert len(y_valid) > len(train_only[3])
@@ -0,0 +1,67 @@
+import duckdb
+import numpy as np
+import pandas as pd
+
+from quant.backtest_engine.engine import BacktestEngine
+from quant.data_curator.returns import rebuild_returns, update_returns
+from quant.db.duck import SCHEMA_PATH
+
+
+def _seed(db_path) -> None:
+    rng = np.random.default_rng(3)
+    dates = pd.bdate_range("2023-01-02", periods=120)
+    frames = []
+    for sym in ["AAA", "BBB"]:
+        keep = rng.random(len(dates)) > 0.1  # gaps: returns span trading rows
+        frames.append(
+            pd.DataFrame(
+                {
+                    "symbol": sym,
+                    "ts": dates[keep].date,
+                    "close": 100 + np.cumsum(rng.normal(0, 1, keep.sum())),
+                }
+            )
+        )
+    conn = duckdb.connect(str(db_path))
+    conn.execute(SCHEMA_PATH.read_text(encoding="utf-8"))
+    conn.register("px", pd.concat(frames))
+    conn.execute("INSERT INTO ohlcv (symbol, ts, close) SELECT * FROM px")
+    conn.close()
+
+
+def test_returns_table_incremental_and_backtest_read(tmp_path):
+    db_path = tmp_path / "quant.duckdb"
+    _seed(db_path)
+
+    engine = BacktestEngine(str(db_path))
+    # No precomputed returns yet -> close/pct_change fallback
+    computed = engine.load_returns_panel(["AAA", "BBB"], "2023-02-01", "2023-06-01")
+
+    conn = duckdb.connect(str(db_path))
+    n_px = conn.execute("SELECT COUNT(*) FROM ohlcv").fetchone()[0]
+    assert rebuild_returns(conn) == n_px
+    query = "SELECT * FROM returns ORDER BY symbol, ts"
+    full = conn.execute(query).df()
+
+    close = conn.execute(
+        "SELECT ts, close FROM ohlcv WHERE symbol = 'AAA' ORDER BY ts"
+    ).df()["close"]
+    np.testing.assert_allclose(
+        full.loc[full["symbol"] == "AAA", "ret_5d"], close.pct_change(5)
+    )
+
+    conn.execute("DELETE FROM returns WHERE ts >= DATE '2023-04-01'")
+    for sym in ["AAA", "BBB"]:
+        update_returns(conn, sym, since="2023-04-01")
+    pd.testing.assert_frame_equal(conn.execute(query).df(), full)
+    conn.close()
+
+    stored = engine.load_returns_panel(["AAA", "BBB"], "2023-02-01", "2023-06-01")
+    assert stored.shape == computed.shape
+    in_range = stored.dates >= np.datetime64("2023-02-01")
+    # Gap days are missing rows (NaN) instead of 0; the engine zero-fills both
+    np.testing.assert_allclose(
+        np.nan_to_num(stored["ret_1d"][in_range]),
+        computed["ret_1d"][in_range],
+        atol=1e-6,
+    )
@@ -0,0 +1,48 @@
+import json
+
+from quant.repos.run_index import RunIndex
+
+
+def _write_run(runs_dir, run_id: str, started_at: str, kind: str = "pipeline"):
+    d = runs_dir / run_id
+    d.mkdir(parents=True)
+    payload = {"run_id": run_id, "kind": kind, "status": "success"}
+    payload["started_at"] = started_at
+    (d / "run.json").write_text(json.dumps(payload), encoding="utf-8")
+    return payload
+
+
+def test_run_index_rebuild_upsert_and_paging(tmp_path):
+    runs_dir = tmp_path / "runs"
+    aliases_dir = tmp_path / "index" / "runs"
+    aliases_dir.mkdir(parents=True)
+    for i in range(5):
+        _write_run(runs_dir, f"r{i}", f"2024-01-0{i + 1}T00:00:00")
+    _write_run(runs_dir, "s0", "2024-02-01T00:00:00", kind="symbol-register")
+    (runs_dir / "plan_x").mkdir()
+    (runs_dir / "plan_x" / "run.json").write_text('{"run_id": "plan_x"}')
+    (runs_dir / "broken").mkdir()
+    (runs_dir / "broken" / "run.json").write_text("{not json")
+    (aliases_dir / "slug_a.json").write_text(
+        json.dumps({"run_id": "r1", "created_at": "2024-01-02"}), encoding="utf-8"
+    )
+
+    idx = RunIndex(tmp_path / "index" / "run_index.db")
+    assert idx.rebuild(runs_dir, aliases_dir) == (6, 1)
+
+    assert [r["run_id"] for r in idx.list_runs(limit=3)] == ["s0", "r4", "r3"]
+    assert [r["run_id"] for r in idx.list_runs(limit=3, offset=3)] == [
+        "r2",
+        "r1",
+        "r0",
+    ]
+    assert idx.count_runs(kind="pipeline") == 5
+    assert idx.list_runs(kind="pipeline", limit=1)[0]["run_id"] == "r4"
+    assert idx.get_alias("slug_a")["run_id"] == "r1"
+
+    # Writers upsert the latest payload (running -> success)
+    payload = _write_run(runs_dir, "r9", "2024-03-01T00:00:00")
+    idx.upsert_run({**payload, "status": "running"})
+    idx.upsert_run(payload)
+    assert idx.count_runs() == 7
+    assert idx.list_runs(limit=1)[0] == payload
@@ -190,3 +190,149 @@ def test_no_sql_fstrings_in_data_center_page():
     ]
     for pat in forbidden:
         assert pat not in text
+
+
+def test_duck_read_pool_reuses_and_releases_connection(tmp_path: Path):
+    import duckdb
+
+    from app.ui.db_pool import DuckReadPool, file_watermark
+
+    db = str(tmp_path / "pool.duckdb")
+    w = duckdb.connect(db)
+    w.execute("CREATE TABLE t AS SELECT 1 AS x")
+    w.close()
+
+    pool = DuckReadPool(db, idle_s=60)
+    mark = file_watermark(db)
+    for _ in range(3):
+        with pool.cursor() as cur:
+            assert cur.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1
+    assert pool.opened == 1
+    assert pool.is_open
+    assert file_watermark(db) == mark  # reads don't move the watermark
+
+    # Released before a writer can take the file, then reopened on the new state
+    pool.close()
+    w = duckdb.connect(db)
+    w.execute("INSERT INTO t VALUES (2)")
+    w.close()
+    assert file_watermark(db) != mark
+    with pool.cursor() as cur:
+        assert cur.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 2
+    assert pool.opened == 2
+
+    idle = DuckReadPool(db, idle_s=0)
+    with idle.cursor() as cur:
+        cur.execute("SELECT 1").fetchone()
+    assert not idle.is_open
+
+
+def test_downsample_lttb_and_ohlc_resample():
+    import numpy as np
+    import pandas as pd
+
+    from app.ui.downsample import downsample_ohlc, lttb_indices
+
+    rng = np.random.default_rng(0)
+    y = np.cumsum(rng.normal(size=10_000))
+    idx = lttb_indices(y, 500)
+    assert len(idx) == 500
+    assert idx[0] == 0
+    assert idx[-1] == len(y) - 1
+    assert np.all(np.diff(idx) > 0)
+    assert int(np.argmin(y)) in idx
+    assert int(np.argmax(y)) in idx
+    assert len(lttb_indices(y[:100], 500)) == 100
+
+    ts = pd.bdate_range("2000-01-03", periods=5_000)
+    close = 100 + np.cumsum(rng.normal(size=len(ts)))
+    df = pd.DataFrame(
+        {
+            "ts": ts,
+            "open": close,
+            "high": close + 1,
+            "low": close - 1,
+            "close": close,
+            "volume": 1.0,
+        }
+    )
+    bars, period = downsample_ohlc(df, budget=1_500)
+    assert period == "weekly"
+    assert len(bars) <= 1_500
+    assert bars["volume"].sum() == len(df)
+    assert bars["high"].max() == df["high"].max()
+    assert bars["ts"].iloc[-1] == ts[-1]
+    same, none = downsample_ohlc(df.tail(200), budget=1_500)
+    assert none is None
+    assert len(same) == 200
+
+
+def test_progress_tailer_reads_only_appended_lines(tmp_path: Path):
+    from app.ui.log_tail import ProgressTailer, tail_lines
+
+    log = tmp_path / "pipeline.log"
+    log.write_text(
+        "start\n"
+        'PROGRESS_JSON: {"stage":"ingest","event":"tick","current":1,"total":3}\n'
+        "middle\n",
+        encoding="utf-8",
+    )
+    tailer = ProgressTailer(tmp_path)
+    assert tailer.poll()["ingest"].current == 1
+    offset = tailer.offset
+
+    with log.open("a", encoding="utf-8") as f:
+        f.write('PROGRESS_JSON: {"stage":"ingest","event":"tick","current":2')
+    assert tailer.poll()["ingest"].current == 1  # partial line is held back
+    with log.open("a", encoding="utf-8") as f:
+        f.write(',"total":3}\nend\n')
+    latest = tailer.poll()
+    assert latest["ingest"].current == 2
+    assert tailer.n_events == 2
+    assert tailer.offset > offset
+
+    assert tail_lines(log, 2, skip_prefix="PROGRESS_JSON:") == ["middle", "end"]
+
+    # Compact events file takes over once the pipeline writes it
+    (tmp_path / "progress.jsonl").write_text(
+        '{"stage":"features","event":"start","current":0,"total":1}\n',
+        encoding="utf-8",
+    )
+    assert list(tailer.poll()) == ["features"]
+
+
+def test_progress_socket_push_and_fallback(tmp_path: Path):
+    import socket
+    import time
+
+    import pytest
+
+    if not hasattr(socket, "AF_UNIX"):
+        pytest.skip("Unix sockets unavailable")
+
+    from app.ui.progress_channel import ProgressSubscriber
+    from quant.batch_orchestrator.progress_channel import publish
+
+    sub = ProgressSubscriber(str(tmp_path / "p.sock"))
+    try:
+        path = sub.env()["QUANT_PROGRESS_SOCKET"]
+        event = {"run_id": "r1", "stage": "ingest", "event": "symbol_done"}
+        assert publish({**event, "current": 2, "total": 3}, path)
+        end = {"run_id": "r1", "event": "pipeline_end", "status": "success"}
+        assert publish(end, path)
+
+        deadline = time.time() + 2
+        snap = sub.snapshot("r1")
+        while (snap is None or not snap.finished) and time.time() < deadline:
+            time.sleep(0.01)
+            snap = sub.snapshot("r1")
+        assert snap.latest["ingest"].current == 2
+        assert snap.finished
+        assert snap.status == "success"
+        assert sub.snapshot("other") is None
+    finally:
+        sub.close()
+
+    # Listener gone / not configured: publishing is a silent no-op
+    assert publish({"run_id": "r1"}, str(tmp_path / "p.sock")) is False
+    assert publish({"run_id": "r1"}) is False